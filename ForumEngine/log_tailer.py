@@ -0,0 +1,194 @@
+"""
+日志增量读取 - 按字节偏移跟踪日志文件，并在 Linux 上用 inotify 等待文件变化
+
+LogTailer 只 stat 文件并从上次的字节偏移继续读，不再为了判断"是否有新行"而从头数行；
+通过 inode 与文件大小识别重建/截断。LogWatcher 负责阻塞等待"可能有新内容"：
+inotify 可用时事件到达即返回（毫秒级），否则退化为定时轮询。
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+
+class LogTailer:
+    """单个日志文件的增量读取器"""
+
+    def __init__(self, file_path: Path, from_end: bool = True):
+        """
+        Args:
+            file_path: 日志文件路径
+            from_end: True 时以当前文件末尾为基线（只读取之后追加的内容）
+        """
+        self.file_path = Path(file_path)
+        self.position = 0
+        self.inode: Optional[int] = None
+        self._partial = b''  # 尚未以换行结尾的半行，等下次读取补全
+        if from_end:
+            self.reset_to_end()
+
+    def reset_to_end(self):
+        """把读取位置移到文件当前末尾"""
+        self._partial = b''
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            self.position, self.inode = 0, None
+            return
+        self.position, self.inode = stat.st_size, stat.st_ino
+
+    def read_new_lines(self) -> Tuple[List[str], bool]:
+        """
+        读取自上次以来新增的完整行
+
+        Returns:
+            (新行列表（已 strip、去掉空行）, 文件是否被截断/重建/删除)
+        """
+        truncated = False
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            if self.inode is not None or self.position:
+                truncated = True
+            self.position, self.inode, self._partial = 0, None, b''
+            return [], truncated
+
+        # Windows 上 st_ino 可能恒为 0，只在两边都有效时比较
+        if self.inode and stat.st_ino and stat.st_ino != self.inode:
+            truncated = True
+        elif stat.st_size < self.position:
+            truncated = True
+        if truncated:
+            self.position, self._partial = 0, b''
+        self.inode = stat.st_ino
+
+        if stat.st_size <= self.position:
+            return [], truncated
+
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.position)
+            data = f.read()
+        self.position += len(data)
+
+        *complete, self._partial = (self._partial + data).split(b'\n')
+        lines = []
+        for raw in complete:
+            line = raw.decode('utf-8', errors='replace').strip()
+            if line:
+                lines.append(line)
+        return lines, truncated
+
+
+class LogWatcher:
+    """轮询等待：每隔 poll_interval 秒返回一次，由调用方检查文件"""
+
+    mode = 'poll'
+
+    def __init__(self, poll_interval: float = 0.5):
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+
+    def wait(self, timeout: float) -> bool:
+        """等待文件可能发生变化，返回 False 表示已被 close() 唤醒"""
+        return not self._stop_event.wait(min(timeout, self.poll_interval))
+
+    def close(self):
+        self._stop_event.set()
+
+
+class InotifyLogWatcher(LogWatcher):
+    """
+    基于 inotify 的等待（仅 Linux，通过 ctypes 调用 libc，无额外依赖）
+
+    监听日志目录而不是单个文件，这样日志被删除重建后仍能收到事件；只有 file_names 中的文件
+    变化才会唤醒调用方（例如写 forum.log 本身不会触发一轮无效扫描）。
+    """
+
+    mode = 'inotify'
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    _EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, directory: Path, file_names: Iterable[str]):
+        super().__init__()
+        self.file_names = {name.encode() for name in file_names}
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError('当前平台不支持 inotify')
+
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 失败')
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE
+        if libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f'inotify_add_watch 失败: {directory}')
+
+    def _drain(self) -> bool:
+        """读出所有待处理事件，返回其中是否有关注的文件"""
+        relevant = False
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return relevant
+            if not buffer:
+                return relevant
+            offset = 0
+            while offset + self._EVENT_HEADER.size <= len(buffer):
+                _, _, _, name_len = self._EVENT_HEADER.unpack_from(buffer, offset)
+                offset += self._EVENT_HEADER.size
+                name = buffer[offset:offset + name_len].rstrip(b'\0')
+                offset += name_len
+                if name in self.file_names:
+                    relevant = True
+
+    def wait(self, timeout: float) -> bool:
+        """阻塞直到关注的文件发生变化或超时；超时也返回 True，让调用方兜底检查一次"""
+        deadline = time.monotonic() + timeout
+        while not self._stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready or self._drain():
+                return True
+        return False
+
+    def close(self):
+        super().close()
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+def create_log_watcher(directory: Path, file_names: Iterable[str], mode: str = 'auto',
+                       poll_interval: float = 0.5) -> LogWatcher:
+    """
+    按配置创建等待器
+
+    Args:
+        mode: auto（优先 inotify，不可用时轮询）/ inotify / poll
+    """
+    if mode in ('auto', 'inotify'):
+        try:
+            return InotifyLogWatcher(directory, file_names)
+        except (OSError, AttributeError) as e:
+            logger.info(f"ForumEngine: inotify 不可用（{e}），改用 {poll_interval}s 轮询")
+    return LogWatcher(poll_interval)
@@ -0,0 +1,158 @@
+"""
+论坛消息总线 - LogMonitor 写入 forum.log 的同时发布结构化消息
+
+app.py 订阅总线按批推送到前端，/api/forum/log 以 seq 游标增量读取，不再轮询和重复解析 forum.log。
+每条消息带单调递增的 seq，消费方只需记住上次的 seq 即可去重。
+
+- memory: 进程内环形缓冲（默认，LogMonitor 与 Web 服务同进程）
+- redis: Redis Stream（XADD / XREAD BLOCK），LogMonitor 与 Web 服务分属不同进程时使用
+"""
+
+import json
+import threading
+from collections import deque
+from itertools import islice
+from typing import Dict, List, NamedTuple, Optional
+
+from loguru import logger
+
+from config import settings
+
+FORUM_STREAM_KEY = "forum:messages"
+FORUM_SEQ_KEY = "forum:messages:seq"
+
+# seq 与 Stream ID 一一对应（"<seq>-0"），INCR 与 XADD 在脚本里原子执行，保证多进程发布时 ID 递增
+_PUBLISH_LUA = """
+local seq = redis.call('INCR', KEYS[1])
+redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[2], seq .. '-0', 'data', ARGV[1])
+return seq
+"""
+
+
+class ForumBatch(NamedTuple):
+    """一次增量读取的结果"""
+    messages: List[Dict]
+    cursor: int  # 下次读取时传入的游标
+    gap: bool  # 游标早于保留窗口或来自上一个进程（seq 已重置），调用方应整体重新同步
+
+
+def build_forum_message(line: str, content: str, source: Optional[str], timestamp: str) -> Dict:
+    """构造总线消息：line 为写入 forum.log 的原始行，content 保留原始多行文本"""
+    return {
+        'line': line,
+        'source': source.upper() if source else None,
+        'content': content,
+        'timestamp': timestamp,
+    }
+
+
+class ForumMessageBus:
+    """进程内消息总线：固定长度的环形缓冲 + Condition 唤醒等待者"""
+
+    backend = 'memory'
+
+    def __init__(self, max_messages: int = 2000):
+        self._messages: deque = deque(maxlen=max_messages)
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    def publish(self, message: Dict) -> Dict:
+        with self._cond:
+            self._seq += 1
+            message = dict(message, seq=self._seq)
+            self._messages.append(message)
+            self._cond.notify_all()
+        return message
+
+    def latest_seq(self) -> int:
+        with self._cond:
+            return self._seq
+
+    def read_since(self, cursor: int, limit: int = 500, timeout: float = 0) -> ForumBatch:
+        """
+        读取 seq > cursor 的消息
+
+        Args:
+            cursor: 上次读取返回的游标，0 表示从保留窗口开头读
+            limit: 单次最多返回条数
+            timeout: 没有新消息时最多阻塞等待的秒数，0 表示立即返回
+        """
+        with self._cond:
+            if timeout and cursor == self._seq:
+                self._cond.wait_for(lambda: self._seq != cursor, timeout)
+            if not self._messages:
+                return ForumBatch([], self._seq, cursor != self._seq)
+
+            first_seq = self._messages[0]['seq']
+            gap = cursor > self._seq or cursor < first_seq - 1
+            start = first_seq - 1 if gap else cursor
+            messages = list(islice(self._messages, start - (first_seq - 1), start - (first_seq - 1) + limit))
+            next_cursor = messages[-1]['seq'] if messages else self._seq
+            return ForumBatch(messages, next_cursor, gap)
+
+
+class RedisForumMessageBus:
+    """基于 Redis Stream 的跨进程消息总线，保留最近约 max_messages 条"""
+
+    backend = 'redis'
+
+    def __init__(self, redis_client, max_messages: int = 2000):
+        self._redis = redis_client
+        self.max_messages = max_messages
+        self._publish_script = redis_client.register_script(_PUBLISH_LUA)
+
+    def publish(self, message: Dict) -> Dict:
+        payload = json.dumps(message, ensure_ascii=False)
+        seq = int(self._publish_script(keys=[FORUM_SEQ_KEY, FORUM_STREAM_KEY], args=[payload, self.max_messages]))
+        return dict(message, seq=seq)
+
+    def latest_seq(self) -> int:
+        return int(self._redis.get(FORUM_SEQ_KEY) or 0)
+
+    @staticmethod
+    def _decode_entries(entries) -> List[Dict]:
+        messages = []
+        for entry_id, fields in entries:
+            entry_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+            data = fields.get('data') or fields.get(b'data')
+            message = json.loads(data)
+            message['seq'] = int(entry_id.split('-', 1)[0])
+            messages.append(message)
+        return messages
+
+    def read_since(self, cursor: int, limit: int = 500, timeout: float = 0) -> ForumBatch:
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.get(FORUM_SEQ_KEY)
+        pipe.xrange(FORUM_STREAM_KEY, count=1)
+        latest, first = pipe.execute()
+        latest = int(latest or 0)
+        first_seq = self._decode_entries(first)[0]['seq'] if first else latest + 1
+
+        gap = cursor > latest or cursor < first_seq - 1
+        start = first_seq - 1 if gap else cursor
+        block = int(timeout * 1000) if timeout and not gap and start >= latest else None
+        response = self._redis.xread({FORUM_STREAM_KEY: f"{start}-0"}, count=limit, block=block)
+        messages = self._decode_entries(response[0][1]) if response else []
+        next_cursor = messages[-1]['seq'] if messages else start
+        return ForumBatch(messages, next_cursor, gap)
+
+
+_bus_instance = None
+_bus_lock = threading.Lock()
+
+
+def get_forum_message_bus():
+    """按 FORUM_MESSAGE_BUS 配置获取全局消息总线"""
+    global _bus_instance
+    if _bus_instance is None:
+        with _bus_lock:
+            if _bus_instance is None:
+                size = settings.FORUM_MESSAGE_BUS_SIZE
+                if settings.FORUM_MESSAGE_BUS == 'redis':
+                    import redis
+                    client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+                    _bus_instance = RedisForumMessageBus(client, size)
+                else:
+                    _bus_instance = ForumMessageBus(size)
+                logger.info(f"ForumEngine: 论坛消息总线使用 {_bus_instance.backend}")
+    return _bus_instance
@@ -13,6 +13,10 @@ from typing import Dict, Optional, List
 from threading import Lock
 from loguru import logger
 
+from config import settings
+from .log_tailer import LogTailer, create_log_watcher
+from .message_bus import build_forum_message, get_forum_message_bus
+
 # 导入论坛主持人模块
 try:
     from .llm_host import generate_host_speech
@@ -21,13 +25,25 @@ except ImportError:
     logger.exception("ForumEngine: 论坛主持人模块未找到，将以纯监控模式运行")
     HOST_AVAILABLE = False
 
+# 论坛会话在无任何日志增长多久（秒）后自动结束
+SEARCH_INACTIVE_TIMEOUT = 7200
+# 等待文件事件的最长时间（秒），超时后兜底检查一次并判断会话是否超时
+WATCH_WAIT_TIMEOUT = 1.0
+
+
 class LogMonitor:
     """基于文件变化的智能日志监控器"""
    
-    def __init__(self, log_dir: str = "logs"):
-        """初始化日志监控器"""
+    def __init__(self, log_dir: str = "logs", message_bus=None):
+        """初始化日志监控器
+
+        Args:
+            log_dir: 日志目录
+            message_bus: 论坛消息总线，默认按配置使用全局总线
+        """
         self.log_dir = Path(log_dir)
         self.forum_log_file = self.log_dir / "forum.log"
+        self.message_bus = message_bus
        
         # 要监控的日志文件
         self.monitored_logs = {
@@ -39,10 +55,9 @@ class LogMonitor:
         # 监控状态
         self.is_monitoring = False
         self.monitor_thread = None
-        self.file_positions = {}  # 记录每个文件的读取位置
-        self.file_line_counts = {}  # 记录每个文件的行数
+        self.tailers: Dict[str, LogTailer] = {}  # 每个文件的增量读取器（字节偏移/inode）
         self.is_searching = False  # 是否正在搜索
-        self.search_inactive_count = 0  # 搜索非活跃计数器
+        self.last_activity_time = 0.0  # 最近一次日志增长的时间（monotonic）
         self.write_lock = Lock()  # 写入锁，防止并发写入冲突
         
         # 主持人相关状态
@@ -113,12 +128,24 @@ class LogMonitor:
                     content_one_line = content.replace('\n', '\\n').replace('\r', '\\r')
                     # 如果提供了来源标签，则在时间戳后添加
                     if source:
-                        f.write(f"[{timestamp}] [{source}] {content_one_line}\n")
+                        line = f"[{timestamp}] [{source}] {content_one_line}"
                     else:
-                        f.write(f"[{timestamp}] {content_one_line}\n")
+                        line = f"[{timestamp}] {content_one_line}"
+                    f.write(line + "\n")
                     f.flush()
+                # 持锁发布，保证总线中的顺序与forum.log一致
+                self._publish_forum_message(build_forum_message(line, content, source, timestamp))
         except Exception as e:
             logger.exception(f"ForumEngine: 写入forum.log失败: {e}")
+
+    def _publish_forum_message(self, message: Dict):
+        """发布到论坛消息总线；总线不可用时只记录日志，不影响forum.log写入"""
+        try:
+            if self.message_bus is None:
+                self.message_bus = get_forum_message_bus()
+            self.message_bus.publish(message)
+        except Exception as e:
+            logger.warning(f"ForumEngine: 发布论坛消息失败: {e}")
     
     def get_log_level(self, line: str) -> Optional[str]:
         """检测日志行的级别（INFO/ERROR/WARNING/DEBUG等）
@@ -376,52 +403,6 @@ class LogMonitor:
         except:
             return 0
    
-    def get_file_line_count(self, file_path: Path) -> int:
-        """获取文件行数"""
-        try:
-            if not file_path.exists():
-                return 0
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return sum(1 for _ in f)
-        except:
-            return 0
-   
-    def read_new_lines(self, file_path: Path, app_name: str) -> List[str]:
-        """读取文件中的新行"""
-        new_lines = []
-       
-        try:
-            if not file_path.exists():
-                return new_lines
-           
-            current_size = self.get_file_size(file_path)
-            last_position = self.file_positions.get(app_name, 0)
-           
-            # 如果文件变小了，说明被清空了，重新从头开始
-            if current_size < last_position:
-                last_position = 0
-                # 重置JSON捕获状态
-                self.capturing_json[app_name] = False
-                self.json_buffer[app_name] = []
-                self.in_error_block[app_name] = False
-           
-            if current_size > last_position:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    f.seek(last_position)
-                    new_content = f.read()
-                    new_lines = new_content.split('\n')
-                   
-                    # 更新位置
-                    self.file_positions[app_name] = f.tell()
-                   
-                    # 过滤空行
-                    new_lines = [line.strip() for line in new_lines if line.strip()]
-                   
-        except Exception as e:
-            logger.exception(f"ForumEngine: 读取{app_name}日志失败: {e}")
-       
-        return new_lines
-   
     def process_lines_for_json(self, lines: List[str], app_name: str) -> List[str]:
         """处理行以捕获多行JSON内容
         
@@ -581,124 +562,116 @@ class LogMonitor:
         
         return content.strip()
    
+    def _reset_capture_state(self, app_name: str):
+        """重置某个app的多行JSON捕获状态"""
+        self.capturing_json[app_name] = False
+        self.json_buffer[app_name] = []
+        self.in_error_block[app_name] = False
+
+    def _end_forum_session(self):
+        """结束当前论坛会话，回到等待FirstSummaryNode触发的状态"""
+        self.is_searching = False
+        # 重置主持人相关状态
+        self.agent_speeches_buffer = []
+        self.is_host_generating = False
+        # 写入结束标记
+        end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.write_to_forum_log(f"=== ForumEngine 论坛结束 - {end_time} ===", "SYSTEM")
+
+    def process_log_updates(self) -> bool:
+        """
+        读取三个log文件自上次以来的新增内容并处理，返回是否有新内容
+
+        只做 stat + 从上次字节偏移继续读，不会重新扫描整个文件
+        """
+        updates = {}
+        any_shrink = False
+        for app_name, tailer in self.tailers.items():
+            new_lines, truncated = tailer.read_new_lines()
+            if truncated:
+                any_shrink = True
+                self._reset_capture_state(app_name)
+            if new_lines:
+                updates[app_name] = new_lines
+
+        # log被清空或重建，先结束当前搜索会话；清空后写入的新内容仍按新会话正常处理
+        if any_shrink and self.is_searching:
+            self._end_forum_session()
+
+        for app_name, new_lines in updates.items():
+            # 先检查是否需要触发搜索（只触发一次）
+            if not self.is_searching:
+                for line in new_lines:
+                    # 检查是否包含目标节点模式（支持多种格式）
+                    if line.strip() and self.is_target_log_line(line):
+                        # 进一步确认是首次总结节点（FirstSummaryNode或包含"正在生成首次段落总结"）
+                        if 'FirstSummaryNode' in line or '正在生成首次段落总结' in line:
+                            logger.info(f"ForumEngine: 在{app_name}中检测到第一次论坛发表内容")
+                            self.is_searching = True
+                            # 清空forum.log开始新会话
+                            self.clear_forum_log()
+                            break  # 找到一个就够了，跳出循环
+
+            # 处理所有新增内容（如果正在搜索状态）
+            if self.is_searching:
+                captured_contents = self.process_lines_for_json(new_lines, app_name)
+
+                for content in captured_contents:
+                    # 将app_name转换为大写作为标签（如 insight -> INSIGHT）
+                    source_tag = app_name.upper()
+                    self.write_to_forum_log(content, source_tag)
+
+                    # 将发言添加到缓冲区（格式化为完整的日志行）
+                    timestamp = datetime.now().strftime('%H:%M:%S')
+                    log_line = f"[{timestamp}] [{source_tag}] {content}"
+                    self.agent_speeches_buffer.append(log_line)
+
+                    # 检查是否需要触发主持人发言
+                    if len(self.agent_speeches_buffer) >= self.host_speech_threshold and not self.is_host_generating:
+                        # 同步触发主持人发言
+                        self._trigger_host_speech()
+
+        # 检查是否应该结束当前搜索会话
+        now = time.monotonic()
+        if updates:
+            self.last_activity_time = now
+        elif self.is_searching and now - self.last_activity_time >= SEARCH_INACTIVE_TIMEOUT:
+            logger.info("ForumEngine: 长时间无活动，结束论坛")
+            self._end_forum_session()
+
+        return bool(updates)
+
     def monitor_logs(self):
-        """智能监控日志文件"""
+        """智能监控日志文件：文件事件（inotify）或轮询唤醒后增量读取新内容"""
         logger.info("ForumEngine: 论坛创建中...")
-       
-        # 初始化文件行数和位置 - 记录当前状态作为基线
+
+        # 记录当前文件末尾作为基线
         for app_name, log_file in self.monitored_logs.items():
-            self.file_line_counts[app_name] = self.get_file_line_count(log_file)
-            self.file_positions[app_name] = self.get_file_size(log_file)
-            self.capturing_json[app_name] = False
-            self.json_buffer[app_name] = []
-            self.in_error_block[app_name] = False
-            # logger.info(f"ForumEngine: {app_name} 基线行数: {self.file_line_counts[app_name]}")
-       
-        while self.is_monitoring:
-            try:
-                # 同时检测三个log文件的变化
-                any_growth = False
-                any_shrink = False
-                captured_any = False
-               
-                # 为每个log文件独立处理
-                for app_name, log_file in self.monitored_logs.items():
-                    current_lines = self.get_file_line_count(log_file)
-                    previous_lines = self.file_line_counts.get(app_name, 0)
-                   
-                    if current_lines > previous_lines:
-                        any_growth = True
-                        # 立即读取新增内容
-                        new_lines = self.read_new_lines(log_file, app_name)
-                       
-                        # 先检查是否需要触发搜索（只触发一次）
-                        if not self.is_searching:
-                            for line in new_lines:
-                                # 检查是否包含目标节点模式（支持多种格式）
-                                if line.strip() and self.is_target_log_line(line):
-                                    # 进一步确认是首次总结节点（FirstSummaryNode或包含"正在生成首次段落总结"）
-                                    if 'FirstSummaryNode' in line or '正在生成首次段落总结' in line:
-                                        logger.info(f"ForumEngine: 在{app_name}中检测到第一次论坛发表内容")
-                                        self.is_searching = True
-                                        self.search_inactive_count = 0
-                                        # 清空forum.log开始新会话
-                                        self.clear_forum_log()
-                                        break  # 找到一个就够了，跳出循环
-                       
-                        # 处理所有新增内容（如果正在搜索状态）
-                        if self.is_searching:
-                            # 使用新的处理逻辑
-                            captured_contents = self.process_lines_for_json(new_lines, app_name)
-                            
-                            for content in captured_contents:
-                                # 将app_name转换为大写作为标签（如 insight -> INSIGHT）
-                                source_tag = app_name.upper()
-                                self.write_to_forum_log(content, source_tag)
-                                # logger.info(f"ForumEngine: 捕获 - {content}")
-                                captured_any = True
-                                
-                                # 将发言添加到缓冲区（格式化为完整的日志行）
-                                timestamp = datetime.now().strftime('%H:%M:%S')
-                                log_line = f"[{timestamp}] [{source_tag}] {content}"
-                                self.agent_speeches_buffer.append(log_line)
-                                
-                                # 检查是否需要触发主持人发言
-                                if len(self.agent_speeches_buffer) >= self.host_speech_threshold and not self.is_host_generating:
-                                    # 同步触发主持人发言
-                                    self._trigger_host_speech()
-                   
-                    elif current_lines < previous_lines:
-                        any_shrink = True
-                        # logger.info(f"ForumEngine: 检测到 {app_name} 日志缩短，将重置基线")
-                        # 重置文件位置到新的文件末尾
-                        self.file_positions[app_name] = self.get_file_size(log_file)
-                        # 重置JSON捕获状态
-                        self.capturing_json[app_name] = False
-                        self.json_buffer[app_name] = []
-                        self.in_error_block[app_name] = False
-                   
-                    # 更新行数记录
-                    self.file_line_counts[app_name] = current_lines
-               
-                # 检查是否应该结束当前搜索会话
-                if self.is_searching:
-                    if any_shrink:
-                        # log变短，结束当前搜索会话，重置为等待状态
-                        # logger.info("ForumEngine: 日志缩短，结束当前搜索会话，回到等待状态")
-                        self.is_searching = False
-                        self.search_inactive_count = 0
-                        # 重置主持人相关状态
-                        self.agent_speeches_buffer = []
-                        self.is_host_generating = False
-                        # 写入结束标记
-                        end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        self.write_to_forum_log(f"=== ForumEngine 论坛结束 - {end_time} ===", "SYSTEM")
-                        # logger.info("ForumEngine: 已重置基线，等待下次FirstSummaryNode触发")
-                    elif not any_growth and not captured_any:
-                        # 没有增长也没有捕获内容，增加非活跃计数
-                        self.search_inactive_count += 1
-                        if self.search_inactive_count >= 7200:  # 超时无活动自动结束
-                            logger.info("ForumEngine: 长时间无活动，结束论坛")
-                            self.is_searching = False
-                            self.search_inactive_count = 0
-                            # 重置主持人相关状态
-                            self.agent_speeches_buffer = []
-                            self.is_host_generating = False
-                            # 写入结束标记
-                            end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                            self.write_to_forum_log(f"=== ForumEngine 论坛结束 - {end_time} ===", "SYSTEM")
-                    else:
-                        self.search_inactive_count = 0  # 重置计数器
-               
-                # 短暂休眠
-                time.sleep(1)
-               
-            except Exception as e:
-                logger.exception(f"ForumEngine: 论坛记录中出错: {e}")
-                import traceback
-                traceback.print_exc()
-                time.sleep(2)
-       
+            self.tailers[app_name] = LogTailer(log_file, from_end=True)
+            self._reset_capture_state(app_name)
+        self.last_activity_time = time.monotonic()
+
+        watcher = create_log_watcher(
+            self.log_dir,
+            [log_file.name for log_file in self.monitored_logs.values()],
+            mode=settings.FORUM_LOG_WATCH_MODE,
+            poll_interval=settings.FORUM_LOG_POLL_INTERVAL,
+        )
+        logger.info(f"ForumEngine: 日志监听方式 {watcher.mode}")
+
+        try:
+            while self.is_monitoring:
+                try:
+                    self.process_log_updates()
+                    watcher.wait(WATCH_WAIT_TIMEOUT)
+                except Exception as e:
+                    logger.exception(f"ForumEngine: 论坛记录中出错: {e}")
+                    import traceback
+                    traceback.print_exc()
+                    time.sleep(2)
+        finally:
+            watcher.close()
+
         logger.info("ForumEngine: 停止论坛日志文件")
    
     def start_monitoring(self):
@@ -6,8 +6,11 @@ Deep Search Agent主类
 import json
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 from loguru import logger
@@ -37,6 +40,10 @@ ENABLE_CLUSTERING: bool = True  # 是否启用聚类采样
 MAX_CLUSTERED_RESULTS: int = 50  # 聚类后最大返回结果数
 RESULTS_PER_CLUSTER: int = 5  # 每个聚类返回的结果数
 
+# 聚类模型在进程内共享，避免 Agent 池中每个实例各加载一份
+_shared_clustering_model = None
+_clustering_model_lock = threading.Lock()
+
 
 class DeepSearchAgent:
     """Deep Search Agent主类"""
@@ -93,12 +100,16 @@ class DeepSearchAgent:
         self.report_formatting_node = ReportFormattingNode(self.llm_client)
 
     def _get_clustering_model(self):
-        """懒加载聚类模型"""
+        """懒加载聚类模型（进程内共享）"""
+        global _shared_clustering_model
         if self._clustering_model is None:
-            logger.info("  加载聚类模型 (paraphrase-multilingual-MiniLM-L12-v2)...")
-            self._clustering_model = SentenceTransformer(
-                "paraphrase-multilingual-MiniLM-L12-v2"
-            )
+            with _clustering_model_lock:
+                if _shared_clustering_model is None:
+                    logger.info("  加载聚类模型 (paraphrase-multilingual-MiniLM-L12-v2)...")
+                    _shared_clustering_model = SentenceTransformer(
+                        "paraphrase-multilingual-MiniLM-L12-v2"
+                    )
+            self._clustering_model = _shared_clustering_model
         return self._clustering_model
 
     def _validate_date_format(self, date_str: str) -> bool:
@@ -253,87 +264,10 @@ class DeepSearchAgent:
         logger.info(f"  🔍 原始查询: '{query}'")
         logger.info(f"  ✨ 优化后关键词: {optimized_response.optimized_keywords}")
 
-        # 使用优化后的关键词进行多次查询并整合结果
-        all_results = []
-        total_count = 0
-
-        for keyword in optimized_response.optimized_keywords:
-            logger.info(f"    查询关键词: '{keyword}'")
-
-            try:
-                if tool_name == "search_topic_globally":
-                    # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
-                    limit_per_table = (
-                        self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE
-                    )
-                    response = self.search_agency.search_topic_globally(
-                        topic=keyword, limit_per_table=limit_per_table
-                    )
-                elif tool_name == "search_topic_by_date":
-                    start_date = kwargs.get("start_date")
-                    end_date = kwargs.get("end_date")
-                    # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
-                    limit_per_table = (
-                        self.config.DEFAULT_SEARCH_TOPIC_BY_DATE_LIMIT_PER_TABLE
-                    )
-                    if not start_date or not end_date:
-                        raise ValueError(
-                            "search_topic_by_date工具需要start_date和end_date参数"
-                        )
-                    response = self.search_agency.search_topic_by_date(
-                        topic=keyword,
-                        start_date=start_date,
-                        end_date=end_date,
-                        limit_per_table=limit_per_table,
-                    )
-                elif tool_name == "get_comments_for_topic":
-                    # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
-                    limit = self.config.DEFAULT_GET_COMMENTS_FOR_TOPIC_LIMIT // len(
-                        optimized_response.optimized_keywords
-                    )
-                    limit = max(limit, 50)
-                    response = self.search_agency.get_comments_for_topic(
-                        topic=keyword, limit=limit
-                    )
-                elif tool_name == "search_topic_on_platform":
-                    platform = kwargs.get("platform")
-                    start_date = kwargs.get("start_date")
-                    end_date = kwargs.get("end_date")
-                    # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
-                    limit = self.config.DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT // len(
-                        optimized_response.optimized_keywords
-                    )
-                    limit = max(limit, 30)
-                    if not platform:
-                        raise ValueError("search_topic_on_platform工具需要platform参数")
-                    response = self.search_agency.search_topic_on_platform(
-                        platform=platform,
-                        topic=keyword,
-                        start_date=start_date,
-                        end_date=end_date,
-                        limit=limit,
-                    )
-                else:
-                    logger.info(f"    未知的搜索工具: {tool_name}，使用默认全局搜索")
-                    response = self.search_agency.search_topic_globally(
-                        topic=keyword,
-                        limit_per_table=self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE,
-                    )
-
-                # 收集结果
-                if response.results:
-                    logger.info(f"     找到 {len(response.results)} 条结果")
-                    all_results.extend(response.results)
-                    total_count += len(response.results)
-                else:
-                    logger.info(f"     未找到结果")
-
-            except Exception as e:
-                logger.error(f"      查询'{keyword}'时出错: {str(e)}")
-                continue
-
-        # 去重和整合结果
-        unique_results = self._deduplicate_results(all_results)
+        # 使用优化后的关键词并发查询，边完成边去重整合
+        unique_results, total_count = self._run_keyword_searches(
+            tool_name, optimized_response.optimized_keywords, **kwargs
+        )
         logger.info(f"  总计找到 {total_count} 条结果，去重后 {len(unique_results)} 条")
 
         if ENABLE_CLUSTERING:
@@ -370,6 +304,142 @@ class DeepSearchAgent:
 
         return integrated_response
 
+    def _search_single_keyword(
+        self, tool_name: str, keyword: str, keyword_count: int, **kwargs
+    ) -> DBResponse:
+        """用单个优化后的关键词执行一次数据库工具调用"""
+        logger.info(f"    查询关键词: '{keyword}'")
+
+        if tool_name == "search_topic_globally":
+            # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
+            limit_per_table = (
+                self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE
+            )
+            return self.search_agency.search_topic_globally(
+                topic=keyword, limit_per_table=limit_per_table
+            )
+        elif tool_name == "search_topic_by_date":
+            start_date = kwargs.get("start_date")
+            end_date = kwargs.get("end_date")
+            # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
+            limit_per_table = (
+                self.config.DEFAULT_SEARCH_TOPIC_BY_DATE_LIMIT_PER_TABLE
+            )
+            if not start_date or not end_date:
+                raise ValueError(
+                    "search_topic_by_date工具需要start_date和end_date参数"
+                )
+            return self.search_agency.search_topic_by_date(
+                topic=keyword,
+                start_date=start_date,
+                end_date=end_date,
+                limit_per_table=limit_per_table,
+            )
+        elif tool_name == "get_comments_for_topic":
+            # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
+            limit = self.config.DEFAULT_GET_COMMENTS_FOR_TOPIC_LIMIT // keyword_count
+            limit = max(limit, 50)
+            return self.search_agency.get_comments_for_topic(
+                topic=keyword, limit=limit
+            )
+        elif tool_name == "search_topic_on_platform":
+            platform = kwargs.get("platform")
+            start_date = kwargs.get("start_date")
+            end_date = kwargs.get("end_date")
+            # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
+            limit = self.config.DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT // keyword_count
+            limit = max(limit, 30)
+            if not platform:
+                raise ValueError("search_topic_on_platform工具需要platform参数")
+            return self.search_agency.search_topic_on_platform(
+                platform=platform,
+                topic=keyword,
+                start_date=start_date,
+                end_date=end_date,
+                limit=limit,
+            )
+        else:
+            logger.info(f"    未知的搜索工具: {tool_name}，使用默认全局搜索")
+            return self.search_agency.search_topic_globally(
+                topic=keyword,
+                limit_per_table=self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE,
+            )
+
+    def _run_keyword_searches(
+        self, tool_name: str, keywords: List[str], **kwargs
+    ) -> Tuple[List, int]:
+        """
+        并发执行各关键词的子查询，按完成顺序增量去重。
+
+        并发宽度由 KEYWORD_SEARCH_CONCURRENCY 控制（1 为串行），使用有界线程池
+        （gevent 打过猴子补丁时线程即协程，与 _process_paragraphs 的协程调度兼容）。
+        各关键词的多表查询都提交到同一个进程级查询线程池，并发宽度 × 表数可能超过其线程数，
+        超出的表查询会排队；表级超时从查询开始执行时计时，排队不会导致表结果被丢弃。
+        去重后的结果数达到 KEYWORD_SEARCH_MAX_RESULTS，或等待超过 KEYWORD_SEARCH_TIMEOUT
+        时，不再等待其余关键词，其结果丢弃。最终结果按关键词顺序整合，全部关键词都返回时
+        与逐个串行查询的结果完全一致。
+
+        返回:
+            (去重后的结果列表, 去重前的结果总数)
+        """
+        if not keywords:
+            return [], 0
+
+        max_results = int(getattr(self.config, "KEYWORD_SEARCH_MAX_RESULTS", 0) or 0)
+        width = max(1, min(int(getattr(self.config, "KEYWORD_SEARCH_CONCURRENCY", 1) or 1), len(keywords)))
+        timeout = getattr(self.config, "KEYWORD_SEARCH_TIMEOUT", None) or None
+        keyword_results: Dict[int, List] = {}
+        seen = set()
+
+        def collect(index: int, response: Optional[DBResponse]) -> bool:
+            """记录一个关键词的结果，返回是否已达到结果上限"""
+            results = response.results if response and response.results else []
+            if results:
+                logger.info(f"     '{keywords[index]}' 找到 {len(results)} 条结果")
+            else:
+                logger.info(f"     '{keywords[index]}' 未找到结果")
+            keyword_results[index] = results
+            seen.update(self._result_identity(result) for result in results)
+            return bool(max_results) and len(seen) >= max_results
+
+        def search(index: int) -> Optional[DBResponse]:
+            try:
+                return self._search_single_keyword(tool_name, keywords[index], len(keywords), **kwargs)
+            except Exception as e:
+                logger.error(f"      查询'{keywords[index]}'时出错: {str(e)}")
+                return None
+
+        if width == 1:
+            for index in range(len(keywords)):
+                if collect(index, search(index)):
+                    break
+        else:
+            executor = ThreadPoolExecutor(max_workers=width, thread_name_prefix="insight-keyword")
+            futures = {executor.submit(search, index): index for index in range(len(keywords))}
+            try:
+                for future in as_completed(futures, timeout=timeout):
+                    if collect(futures[future], future.result()):
+                        break
+            except FuturesTimeoutError:
+                logger.warning(f"  关键词子查询超过 {timeout}s 预算，未返回的关键词结果已丢弃")
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        skipped = [keywords[i] for i in range(len(keywords)) if i not in keyword_results]
+        if skipped:
+            logger.info(f"  已达到结果上限或等待预算，跳过关键词: {skipped}")
+
+        all_results = [result for index in sorted(keyword_results) for result in keyword_results[index]]
+        unique_results = self._deduplicate_results(all_results)
+        if max_results:
+            unique_results = unique_results[:max_results]
+        return unique_results, len(all_results)
+
+    @staticmethod
+    def _result_identity(result) -> str:
+        """搜索结果的去重标识：优先URL，否则取内容前100字"""
+        return result.url if result.url else result.title_or_content[:100]
+
     def _deduplicate_results(self, results: List) -> List:
         """
         去重搜索结果
@@ -379,7 +449,7 @@ class DeepSearchAgent:
 
         for result in results:
             # 使用URL或内容作为去重标识
-            identifier = result.url if result.url else result.title_or_content[:100]
+            identifier = self._result_identity(result)
             if identifier not in seen:
                 seen.add(identifier)
                 unique_results.append(result)
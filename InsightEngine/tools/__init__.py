@@ -12,12 +12,14 @@ from .search import (
 from .keyword_optimizer import (
     KeywordOptimizer,
     KeywordOptimizationResponse,
+    KeywordOptimizationCache,
     keyword_optimizer
 )
 from .sentiment_analyzer import (
     WeiboMultilingualSentimentAnalyzer,
     SentimentResult,
     BatchSentimentResult,
+    SentimentResultCache,
     multilingual_sentiment_analyzer,
     analyze_sentiment
 )
@@ -29,10 +31,12 @@ __all__ = [
     "print_response_summary",
     "KeywordOptimizer",
     "KeywordOptimizationResponse",
+    "KeywordOptimizationCache",
     "keyword_optimizer",
     "WeiboMultilingualSentimentAnalyzer",
     "SentimentResult",
     "BatchSentimentResult",
+    "SentimentResultCache",
     "multilingual_sentiment_analyzer",
     "analyze_sentiment"
 ]
@@ -7,7 +7,9 @@ from openai import OpenAI
 import json
 import sys
 import os
-from typing import List, Dict, Any
+import hashlib
+import unicodedata
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
 # 添加项目根目录到Python路径以导入config
@@ -23,6 +25,7 @@ if utils_dir not in sys.path:
     sys.path.append(utils_dir)
 
 from retry_helper import with_graceful_retry, SEARCH_API_RETRY_CONFIG
+from ..utils.result_cache import TwoTierResultCache
 
 @dataclass
 class KeywordOptimizationResponse:
@@ -33,19 +36,58 @@ class KeywordOptimizationResponse:
     success: bool
     error_message: str = ""
 
+
+class KeywordOptimizationCache(TwoTierResultCache):
+    """
+    关键词优化结果缓存
+
+    第一层为进程内 LRU，第二层为可选的 Redis（带 TTL）。段落、反思轮次和并发任务经常
+    发出相同或仅大小写/空白不同的查询，命中后无需再等待一次 LLM 往返。
+    只缓存 LLM 成功返回的结果，备用关键词提取的结果不入缓存。
+    """
+
+    KEY_PREFIX = "cache:keyword_optimizer:"
+    LABEL = "关键词缓存"
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        ttl: Optional[int] = None,
+    ):
+        super().__init__(
+            max_entries=settings.KEYWORD_OPTIMIZER_CACHE_MAX_ENTRIES if max_entries is None else max_entries,
+            redis_url=settings.KEYWORD_OPTIMIZER_CACHE_REDIS_URL if redis_url is None else redis_url,
+            ttl=settings.KEYWORD_OPTIMIZER_CACHE_TTL if ttl is None else ttl,
+        )
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """规范化查询文本：全半角统一、小写、合并空白"""
+        text = unicodedata.normalize("NFKC", text or "")
+        return " ".join(text.lower().split())
+
+    @classmethod
+    def make_key(cls, model: str, query: str, context: str = "") -> str:
+        raw = f"{model}\0{cls.normalize(query)}\0{cls.normalize(context)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
 class KeywordOptimizer:
     """
     关键词优化器
     使用硅基流动的Qwen3模型将Agent生成的搜索词优化为更贴近真实舆情的关键词
     """
     
-    def __init__(self, api_key: str = None, base_url: str = None, model_name: str = None):
+    def __init__(self, api_key: str = None, base_url: str = None, model_name: str = None,
+                 cache: Optional[KeywordOptimizationCache] = None):
         """
         初始化关键词优化器
         
         Args:
             api_key: 硅基流动API密钥，如果不提供则从配置文件读取
             base_url: 接口基础地址，默认使用配置文件提供的SiliconFlow地址
+            cache: 优化结果缓存，默认按配置创建
         """
         self.api_key = api_key or settings.KEYWORD_OPTIMIZER_API_KEY
 
@@ -59,6 +101,7 @@ class KeywordOptimizer:
             base_url=self.base_url
         )
         self.model = model_name or settings.KEYWORD_OPTIMIZER_MODEL_NAME
+        self.cache = cache or KeywordOptimizationCache()
     
     def optimize_keywords(self, original_query: str, context: str = "") -> KeywordOptimizationResponse:
         """
@@ -73,6 +116,19 @@ class KeywordOptimizer:
         """
         logger.info(f"🔍 关键词优化中间件: 处理查询 '{original_query}'")
         
+        cache_key = self.cache.make_key(str(self.model), original_query, context)
+        cached, tier = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info(
+                f"⚡ 关键词缓存命中({tier}): {len(cached['keywords'])}个关键词，{self.cache.describe()}"
+            )
+            return KeywordOptimizationResponse(
+                original_query=original_query,
+                optimized_keywords=list(cached["keywords"]),
+                reasoning=cached.get("reasoning", ""),
+                success=True
+            )
+        
         try:
             # 构建优化prompt
             system_prompt = self._build_system_prompt()
@@ -85,26 +141,17 @@ class KeywordOptimizer:
                 # 解析响应
                 content = response["content"]
                 try:
-                    # 尝试解析JSON格式的响应
-                    if content.strip().startswith('{'):
-                        parsed = json.loads(content)
-                        keywords = parsed.get("keywords", [])
-                        reasoning = parsed.get("reasoning", "")
-                    else:
-                        # 如果不是JSON格式，尝试从文本中提取关键词
-                        keywords = self._extract_keywords_from_text(content)
-                        reasoning = content
-                    
-                    # 验证关键词质量
-                    validated_keywords = self._validate_keywords(keywords)
+                    validated_keywords, reasoning = self._parse_optimization_content(content)
                     
                     logger.info(
                         f"✅ 优化成功: {len(validated_keywords)}个关键词" +
                         ("" if not validated_keywords else "\n" +
                          "\n".join([f"   {i}. '{k}'" for i, k in enumerate(validated_keywords, 1)]))
                     )
-                        
                     
+                    if validated_keywords:
+                        self.cache.set(cache_key, {"keywords": validated_keywords, "reasoning": reasoning})
+                    logger.info(f"   关键词缓存{self.cache.describe()}")
                     
                     return KeywordOptimizationResponse(
                         original_query=original_query,
@@ -147,6 +194,21 @@ class KeywordOptimizer:
                 error_message=str(e)
             )
     
+    def _parse_optimization_content(self, content: str) -> Tuple[List[str], str]:
+        """解析单条优化响应，返回 (校验后的关键词, 理由)"""
+        # 尝试解析JSON格式的响应
+        if content.strip().startswith('{'):
+            parsed = json.loads(content)
+            keywords = parsed.get("keywords", [])
+            reasoning = parsed.get("reasoning", "")
+        else:
+            # 如果不是JSON格式，尝试从文本中提取关键词
+            keywords = self._extract_keywords_from_text(content)
+            reasoning = content
+        
+        # 验证关键词质量
+        return self._validate_keywords(keywords), reasoning
+    
     def _build_system_prompt(self) -> str:
         """构建系统prompt"""
         return """你是一位专业的舆情数据挖掘专家。你的任务是将用户提供的搜索查询优化为更适合在社交媒体舆情数据库中查找的关键词。
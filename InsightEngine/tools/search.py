@@ -25,10 +25,12 @@ V3.0 核心更新:
 
 import os
 import json
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
 from loguru import logger
-from typing import List, Dict, Any, Optional, Literal
+from typing import List, Dict, Any, Optional, Literal, Iterator, Tuple, Union
 from dataclasses import dataclass, field
-from ..utils.db import fetch_all
+from ..utils.db import fetch_all, get_query_executor
 from datetime import datetime, timedelta, date
 from InsightEngine.utils.config import settings
 
@@ -74,15 +76,81 @@ class MediaCrawlerDB:
         """
         pass
         
-    def _execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+    def _execute_query(self, query: str, params: tuple = None, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
         try:
             # 直接调用同步版本的 fetch_all
-            return fetch_all(query, params)
+            return fetch_all(query, params, timeout=timeout)
         
         except Exception as e:
             logger.exception(f"数据库查询时发生错误: {e}")
             return []
 
+    def _run_table_queries(self, table_queries: List[Tuple[str, str, Dict[str, Any]]]) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        执行一组按表拆分的查询，按 table_queries 的顺序逐个产出 (表名, 行列表)。
+
+        开启 DB_PARALLEL_TABLE_QUERIES 时各表查询并发提交到进程级共享的查询线程池。
+        该线程池同时服务所有并发的关键词子查询，提交的表可能先排队等待空闲线程，
+        因此 DB_TABLE_QUERY_TIMEOUT 从每张表的查询真正开始执行时计时，排队时间不计入预算；
+        开始执行后仍未在预算内返回的表会被丢弃并记录警告，不会拖住整个工具调用。
+        同一预算也作为服务端语句超时下发给数据库，超时的慢查询由数据库终止并归还线程与连接，
+        排队中的表随后即可开始执行。
+        结果按表的原始顺序重排，输出与串行执行一致、不随完成先后变化。
+        """
+        if not settings.DB_PARALLEL_TABLE_QUERIES or len(table_queries) <= 1:
+            for table, query, params in table_queries:
+                yield table, self._execute_query(query, params)
+            return
+
+        executor = get_query_executor()
+        timeout = settings.DB_TABLE_QUERY_TIMEOUT
+        started: Dict[str, float] = {}
+
+        def run(table: str, query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+            started[table] = time.monotonic()
+            return self._execute_query(query, params, timeout)
+
+        futures = {
+            executor.submit(run, table, query, params): table
+            for table, query, params in table_queries
+        }
+        completed: Dict[str, List[Dict[str, Any]]] = {}
+        dropped: List[str] = []
+        pending = set(futures)
+        while pending:
+            # 只对已开始执行的表计算截止时间；全部仍在排队时等待一个完整预算后重新检查
+            deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started] if timeout else []
+            wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else (timeout or None)
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                completed[futures[future]] = future.result()
+            now = time.monotonic()
+            expired = {f for f in pending if timeout and futures[f] in started and now - started[futures[f]] >= timeout}
+            if expired:
+                dropped.extend(futures[f] for f in expired)
+                pending -= expired
+        if dropped:
+            logger.warning(f"以下表查询开始执行后超过 {timeout}s 预算，结果已丢弃: {dropped}")
+
+        for table, _, _ in table_queries:
+            if table in completed:
+                yield table, completed[table]
+
+    def _build_topic_result(self, table: str, content_type: str, row: Dict[str, Any]) -> QueryResult:
+        """将话题搜索命中的单行数据转换为 QueryResult"""
+        content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
+        time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
+        return QueryResult(
+            platform=table.split('_')[0], content_type=content_type,
+            title_or_content=content if content else '',
+            author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
+            url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
+            publish_time=self._to_datetime(time_key),
+            engagement=self._extract_engagement(row),
+            source_keyword=row.get('source_keyword'),
+            source_table=table
+        )
+
     @staticmethod
     def _to_datetime(ts: Any) -> Optional[datetime]:
         if not ts: return None
@@ -104,6 +172,85 @@ class MediaCrawlerDB:
         self._table_columns_cache[table_name] = columns
         return columns
 
+    # MySQL ngram 解析器默认 ngram_token_size=2，更短的词无法通过全文索引命中
+    FULLTEXT_MIN_TERM_LENGTH = 2
+    _fulltext_columns_cache: Optional[Dict[str, List[Tuple[str, ...]]]] = None
+
+    def _get_fulltext_columns(self) -> Dict[str, List[Tuple[str, ...]]]:
+        """
+        检测 MindSpider 创建的 FULLTEXT 索引（仅 MySQL），返回 表名 -> [索引列元组, ...]。
+
+        PostgreSQL 的 pg_trgm GIN 索引可直接加速 LIKE '%词%'，无需改写查询，因此不在此检测。
+        """
+        if MediaCrawlerDB._fulltext_columns_cache is not None:
+            return MediaCrawlerDB._fulltext_columns_cache
+        indexes: Dict[str, Dict[str, List[str]]] = {}
+        if settings.DB_FULLTEXT_SEARCH and (settings.DB_DIALECT or 'mysql').lower() == 'mysql':
+            rows = self._execute_query(
+                "SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND INDEX_TYPE = 'FULLTEXT' "
+                "ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX"
+            )
+            for row in rows:
+                indexes.setdefault(row['TABLE_NAME'], {}).setdefault(row['INDEX_NAME'], []).append(row['COLUMN_NAME'])
+        MediaCrawlerDB._fulltext_columns_cache = {
+            table: [tuple(cols) for cols in by_index.values()] for table, by_index in indexes.items()
+        }
+        if MediaCrawlerDB._fulltext_columns_cache:
+            logger.info(f"检测到全文索引，话题搜索将使用 MATCH ... AGAINST: {sorted(MediaCrawlerDB._fulltext_columns_cache)}")
+        return MediaCrawlerDB._fulltext_columns_cache
+
+    def _build_topic_filter(self, table: str, fields: List[str], topic: str, named: bool = True, pname: str = "term") -> Tuple[str, Union[Dict[str, Any], List[Any]]]:
+        """
+        生成话题匹配的 WHERE 片段。
+
+        表上存在恰好覆盖 fields 的 FULLTEXT 索引时使用 ngram 短语匹配
+        MATCH(...) AGAINST('"词"' IN BOOLEAN MODE)，否则回退为各列 LIKE '%词%' 的 OR 组合。
+
+        Args:
+            named: True 时使用 :name 占位符并返回参数字典，否则使用 %s 并返回参数列表。
+            pname: 命名参数前缀。
+        """
+        fulltext_indexes = self._get_fulltext_columns().get(table, [])
+        phrase = topic.replace('"', ' ').strip()
+        if len(phrase) >= self.FULLTEXT_MIN_TERM_LENGTH and any(set(cols) == set(fields) for cols in fulltext_indexes):
+            cols = next(cols for cols in fulltext_indexes if set(cols) == set(fields))
+            column_sql = ", ".join(f"`{col}`" for col in cols)
+            placeholder = f":{pname}_ft" if named else "%s"
+            clause = f"MATCH({column_sql}) AGAINST({placeholder} IN BOOLEAN MODE)"
+            value = f'"{phrase}"'
+            return clause, ({f"{pname}_ft": value} if named else [value])
+
+        search_term = f"%{topic}%"
+        if named:
+            clauses, params = [], {}
+            for idx, column in enumerate(fields):
+                clauses.append(f'{self._wrap_query_field_with_dialect(column)} LIKE :{pname}_{idx}')
+                params[f"{pname}_{idx}"] = search_term
+            return " OR ".join(clauses), params
+        return " OR ".join(f"`{column}` LIKE %s" for column in fields), [search_term] * len(fields)
+
+    def _build_time_filter(self, time_col: str, time_type: str, start_dt: datetime, end_dt: datetime, named: bool = True, pname: str = "t") -> Tuple[str, Union[Dict[str, Any], List[Any]]]:
+        """
+        生成半开区间 [start_dt, end_dt) 的时间过滤片段，参数按各平台存储格式归一化。
+
+        时间列直接与同类型参数比较（不做 CAST/函数包装），以便命中 create_time/time 等列上的索引：
+        - sec / ms: 整数秒 / 毫秒时间戳
+        - str / date_str: 'YYYY-MM-DD'，字符串（含 'YYYY-MM-DD HH:MM:SS' 前缀）按字典序比较
+        - sec_str: 以字符串存储的秒级时间戳，10 位数字内字典序与数值序一致
+        """
+        if time_type == 'sec': bounds = (int(start_dt.timestamp()), int(end_dt.timestamp()))
+        elif time_type == 'ms': bounds = (int(start_dt.timestamp() * 1000), int(end_dt.timestamp() * 1000))
+        elif time_type in ['str', 'date_str']: bounds = (start_dt.strftime('%Y-%m-%d'), end_dt.strftime('%Y-%m-%d'))
+        elif time_type == 'sec_str': bounds = (str(int(start_dt.timestamp())), str(int(end_dt.timestamp())))
+        else: raise ValueError(f"未知的时间类型: {time_type}")
+
+        column = self._wrap_query_field_with_dialect(time_col) if named else f"`{time_col}`"
+        if named:
+            clause = f"{column} >= :{pname}_start AND {column} < :{pname}_end"
+            return clause, {f"{pname}_start": bounds[0], f"{pname}_end": bounds[1]}
+        return f"{column} >= %s AND {column} < %s", list(bounds)
+
     def _extract_engagement(self, row: Dict[str, Any]) -> Dict[str, int]:
         """从数据行中提取并统一互动指标"""
         engagement = {}
@@ -193,33 +340,19 @@ class MediaCrawlerDB:
         params_for_log = {'topic': topic, 'limit_per_table': limit_per_table}
         logger.info(f"--- TOOL: 全局话题搜索 (params: {params_for_log}) ---")
         
-        search_term, all_results = f"%{topic}%", []
+        all_results = []
         search_configs = { 'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'bilibili_video_comment': {'fields': ['content'], 'type': 'comment'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'douyin_aweme_comment': {'fields': ['content'], 'type': 'comment'}, 'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'kuaishou_video_comment': {'fields': ['content'], 'type': 'comment'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note'}, 'weibo_note_comment': {'fields': ['content'], 'type': 'comment'}, 'xhs_note': {'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note'}, 'xhs_note_comment': {'fields': ['content'], 'type': 'comment'}, 'zhihu_content': {'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content'}, 'zhihu_comment': {'fields': ['content'], 'type': 'comment'}, 'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note'}, 'tieba_comment': {'fields': ['content'], 'type': 'comment'}, 'daily_news': {'fields': ['title'], 'type': 'news'}, }
         
+        table_queries = []
         for table, config in search_configs.items():
-            param_dict = {}
-            where_clauses = []
-            for idx, field in enumerate(config['fields']):
-                pname = f"term_{idx}"
-                where_clauses.append(f'{self._wrap_query_field_with_dialect(field)} LIKE :{pname}')
-                param_dict[pname] = search_term
+            where_clause, param_dict = self._build_topic_filter(table, config['fields'], topic)
             param_dict['limit'] = limit_per_table
-            where_clause = " OR ".join(where_clauses)
             query = f'SELECT * FROM {self._wrap_query_field_with_dialect(table)} WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
-            raw_results = self._execute_query(query, param_dict)
-            for row in raw_results:
-                content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
-                time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
-                all_results.append(QueryResult(
-                    platform=table.split('_')[0], content_type=config['type'],
-                    title_or_content=content if content else '',
-                    author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
-                    url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
-                    publish_time=self._to_datetime(time_key),
-                    engagement=self._extract_engagement(row),
-                    source_keyword=row.get('source_keyword'),
-                    source_table=table
-                ))
+            table_queries.append((table, query, param_dict))
+
+        for table, raw_results in self._run_table_queries(table_queries):
+            content_type = search_configs[table]['type']
+            all_results.extend(self._build_topic_result(table, content_type, row) for row in raw_results)
         return DBResponse("search_topic_globally", params_for_log, results=all_results, results_count=len(all_results))
 
     def search_topic_by_date(self, topic: str, start_date: str, end_date: str, limit_per_table: int = 100) -> DBResponse:
@@ -243,7 +376,7 @@ class MediaCrawlerDB:
         except ValueError:
             return DBResponse("search_topic_by_date", params_for_log, error_message="日期格式错误，请使用 'YYYY-MM-DD' 格式。")
         
-        search_term, all_results = f"%{topic}%", []
+        all_results = []
         search_configs = {
             'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'sec'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'},
             'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note', 'time_col': 'create_date_time', 'time_type': 'str'},
@@ -251,30 +384,18 @@ class MediaCrawlerDB:
             'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note', 'time_col': 'publish_time', 'time_type': 'str'}, 'daily_news': {'fields': ['title'], 'type': 'news', 'time_col': 'crawl_date', 'time_type': 'date_str'},
         }
 
+        table_queries = []
         for table, config in search_configs.items():
-            param_dict = {}
-            where_clauses = []
-            for idx, field in enumerate(config['fields']):
-                pname = f"term_{idx}"
-                where_clauses.append(f'{self._wrap_query_field_with_dialect(field)} LIKE :{pname}')
-                param_dict[pname] = search_term
+            where_clause, param_dict = self._build_topic_filter(table, config['fields'], topic)
+            time_clause, time_params = self._build_time_filter(config['time_col'], config['time_type'], start_dt, end_dt)
+            param_dict.update(time_params)
             param_dict['limit'] = limit_per_table
-            where_clause = ' OR '.join(where_clauses)
-            query = f'SELECT * FROM {self._wrap_query_field_with_dialect(table)} WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
-            raw_results = self._execute_query(query, param_dict)
-            for row in raw_results:
-                content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
-                time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
-                all_results.append(QueryResult(
-                    platform=table.split('_')[0], content_type=config['type'],
-                    title_or_content=content if content else '',
-                    author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
-                    url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
-                    publish_time=self._to_datetime(time_key),
-                    engagement=self._extract_engagement(row),
-                    source_keyword=row.get('source_keyword'),
-                    source_table=table
-                ))
+            query = f'SELECT * FROM {self._wrap_query_field_with_dialect(table)} WHERE ({where_clause}) AND ({time_clause}) ORDER BY id DESC LIMIT :limit'
+            table_queries.append((table, query, param_dict))
+
+        for table, raw_results in self._run_table_queries(table_queries):
+            content_type = search_configs[table]['type']
+            all_results.extend(self._build_topic_result(table, content_type, row) for row in raw_results)
         return DBResponse("search_topic_by_date", params_for_log, results=all_results, results_count=len(all_results))
         
     def get_comments_for_topic(self, topic: str, limit: int = 500) -> DBResponse:
@@ -291,25 +412,25 @@ class MediaCrawlerDB:
         params_for_log = {'topic': topic, 'limit': limit}
         logger.info(f"--- TOOL: 获取话题评论 (params: {params_for_log}) ---")
         
-        search_term = f"%{topic}%"
         comment_tables = ['bilibili_video_comment', 'douyin_aweme_comment', 'kuaishou_video_comment', 'weibo_note_comment', 'xhs_note_comment', 'zhihu_comment', 'tieba_comment']
         
-        all_queries = []
+        all_queries, params = [], []
         for table in comment_tables:
             cols = self._get_table_columns(table)
             author_col = 'user_nickname' if 'user_nickname' in cols else 'nickname'
             like_col = 'comment_like_count' if 'comment_like_count' in cols else 'like_count' if 'like_count' in cols else None
             time_col = 'publish_time' if 'publish_time' in cols else 'create_date_time' if 'create_date_time' in cols else 'create_time'
             like_select = f"`{like_col}` as likes" if like_col else "'0' as likes"
+            topic_clause, topic_params = self._build_topic_filter(table, ['content'], topic, named=False)
             
             query = (f"SELECT '{table.split('_')[0]}' as platform, `content`, `{author_col}` as author, "
                      f"`{time_col}` as ts, {like_select}, '{table}' as source_table "
-                     f"FROM `{table}` WHERE `content` LIKE %s")
+                     f"FROM `{table}` WHERE {topic_clause}")
             all_queries.append(query)
+            params.extend(topic_params)
 
         final_query = f"({' ) UNION ALL ( '.join(all_queries)}) ORDER BY ts DESC LIMIT %s"
-        params = (search_term,) * len(comment_tables) + (limit,)
-        raw_results = self._execute_query(final_query, params)
+        raw_results = self._execute_query(final_query, tuple(params) + (limit,))
         
         formatted = [QueryResult(platform=r['platform'], content_type='comment', title_or_content=r['content'], author_nickname=r['author'], publish_time=self._to_datetime(r['ts']), engagement={'likes': int(r['likes']) if str(r['likes']).isdigit() else 0}, source_table=r['source_table']) for r in raw_results]
         return DBResponse("get_comments_for_topic", params_for_log, results=formatted, results_count=len(formatted))
@@ -343,7 +464,7 @@ class MediaCrawlerDB:
         if platform not in all_configs:
             return DBResponse("search_topic_on_platform", params_for_log, error_message=f"不支持的平台: {platform}")
 
-        search_term, all_results = f"%{topic}%", []
+        all_results = []
         platform_configs = all_configs[platform]
 
         time_clause, time_params_tuple = "", ()
@@ -357,20 +478,11 @@ class MediaCrawlerDB:
 
         for config in platform_configs:
             table = config['table']
-            topic_clause = " OR ".join([f"`{field}` LIKE %s" for field in config['fields']])
-            query = f"SELECT * FROM `{table}` WHERE {topic_clause}"
-            params = [search_term] * len(config['fields'])
+            topic_clause, params = self._build_topic_filter(table, config['fields'], topic, named=False)
+            query = f"SELECT * FROM `{table}` WHERE ({topic_clause})"
 
             if start_dt and end_dt and 'time_col' in config:
-                time_col, time_type = config['time_col'], config['time_type']
-                if time_type == 'sec': t_params = (int(start_dt.timestamp()), int(end_dt.timestamp()))
-                elif time_type == 'ms': t_params = (int(start_dt.timestamp() * 1000), int(end_dt.timestamp() * 1000))
-                elif time_type in ['str', 'date_str']: t_params = (start_dt.strftime('%Y-%m-%d'), end_dt.strftime('%Y-%m-%d'))
-                else: t_params = (str(int(start_dt.timestamp())), str(int(end_dt.timestamp())))
-                
-                t_clause = f"`{time_col}` >= %s AND `{time_col}` < %s"
-                if table == 'zhihu_content': t_clause = f"CAST(`{time_col}` AS UNSIGNED) >= %s AND CAST(`{time_col}` AS UNSIGNED) < %s"
-                
+                t_clause, t_params = self._build_time_filter(config['time_col'], config['time_type'], start_dt, end_dt, named=False)
                 query += f" AND ({t_clause})"
                 params.extend(t_params)
 
@@ -5,10 +5,13 @@
 
 import os
 import sys
+import hashlib
 from typing import List, Dict, Any, Optional, Union
 from dataclasses import dataclass
 import re
 
+from ..utils.result_cache import TwoTierResultCache
+
 try:
     import torch
 
@@ -31,6 +34,19 @@ except ImportError:
 # INFO：若想跳过情感分析，可手动切换此开关为False
 SENTIMENT_ANALYSIS_ENABLED = True
 
+# 批量推理时每个 micro-batch 的文本数量
+SENTIMENT_BATCH_SIZE = 32
+
+# CPU 推理时是否启用动态量化（Linear 层 int8），可显著提升 CPU 吞吐，
+# 但概率输出与未量化模型存在微小差异
+SENTIMENT_CPU_DYNAMIC_QUANTIZATION = False
+
+# 情感结果缓存：按「模型标识 + 规范化文本」的哈希缓存，进程内 LRU 为第一层，
+# 配置 SENTIMENT_CACHE_REDIS_URL 后启用跨进程共享的 Redis 第二层
+SENTIMENT_CACHE_MAX_ENTRIES = 20000
+SENTIMENT_CACHE_REDIS_URL = os.getenv("SENTIMENT_CACHE_REDIS_URL")
+SENTIMENT_CACHE_TTL = 7 * 86400
+
 
 def _describe_missing_dependencies() -> str:
     missing = []
@@ -76,17 +92,49 @@ class BatchSentimentResult:
     analysis_performed: bool = True
 
 
+class SentimentResultCache(TwoTierResultCache):
+    """
+    情感分析结果缓存
+
+    第一层为进程内 LRU，第二层为可选的 Redis（带 TTL），用于在多个 Agent、
+    段落、反思轮次以及并发任务之间复用同一文本的情感结果。
+    缓存值只包含概率分布，标签与置信度在命中时由调用方重建。
+    """
+
+    KEY_PREFIX = "cache:sentiment:"
+    LABEL = "情感缓存"
+
+    def __init__(
+        self,
+        max_entries: int = SENTIMENT_CACHE_MAX_ENTRIES,
+        redis_url: Optional[str] = SENTIMENT_CACHE_REDIS_URL,
+        ttl: int = SENTIMENT_CACHE_TTL,
+    ):
+        super().__init__(max_entries=max_entries, redis_url=redis_url, ttl=ttl)
+
+    @staticmethod
+    def make_key(model_id: str, normalized_text: str) -> str:
+        digest = hashlib.sha256(
+            f"{model_id}\0{normalized_text}".encode("utf-8")
+        ).hexdigest()
+        return digest
+
+
 class WeiboMultilingualSentimentAnalyzer:
     """
     多语言情感分析器
     封装WeiboMultilingualSentiment模型，为AI Agent提供情感分析功能
     """
 
-    def __init__(self):
+    MODEL_NAME = "tabularisai/multilingual-sentiment-analysis"
+
+    def __init__(self, result_cache: Optional[SentimentResultCache] = None):
         """初始化情感分析器"""
+        self.result_cache = result_cache or SentimentResultCache()
         self.model = None
         self.tokenizer = None
         self.device = None
+        self.is_quantized = False
         self.is_initialized = False
         self.is_disabled = False
         self.disable_reason: Optional[str] = None
@@ -124,6 +172,7 @@ class WeiboMultilingualSentimentAnalyzer:
             self.model = None
             self.tokenizer = None
             self.device = None
+            self.is_quantized = False
             self.is_initialized = False
 
     def enable(self) -> bool:
@@ -183,7 +232,7 @@ class WeiboMultilingualSentimentAnalyzer:
             assert AutoModelForSequenceClassification is not None
 
             # 使用多语言情感分析模型
-            model_name = "tabularisai/multilingual-sentiment-analysis"
+            model_name = self.MODEL_NAME
             local_model_path = os.path.join(weibo_sentiment_path, "model")
 
             # 检查本地是否已有模型
@@ -215,6 +264,11 @@ class WeiboMultilingualSentimentAnalyzer:
             self.device = device
             self.model.to(self.device)
             self.model.eval()
+            if (
+                SENTIMENT_CPU_DYNAMIC_QUANTIZATION
+                and getattr(self.device, "type", str(self.device)) == "cpu"
+            ):
+                self._quantize_for_cpu()
             self.is_initialized = True
             self.enable()
 
@@ -239,6 +293,99 @@ class WeiboMultilingualSentimentAnalyzer:
             self.disable(error_message, drop_state=True)
             return False
 
+    def _quantize_for_cpu(self) -> None:
+        """对 Linear 层做 int8 动态量化，失败时保留原模型"""
+        assert torch is not None
+        try:
+            self.model = torch.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            self.model.eval()
+            self.is_quantized = True
+            print("已启用 CPU 动态量化 (int8)")
+        except Exception as e:
+            print(f"CPU 动态量化失败，继续使用未量化模型: {e}")
+
+    def _predict_probabilities(self, processed_texts: List[str]):
+        """
+        对一组已预处理的文本执行一次前向计算
+
+        Args:
+            processed_texts: 预处理后的非空文本列表
+
+        Returns:
+            形状为 (len(processed_texts), 类别数) 的概率张量（CPU）
+        """
+        assert self.tokenizer is not None
+        assert torch is not None
+        assert self.model is not None
+        # 分词编码（按批次内最长文本填充）
+        inputs = self.tokenizer(
+            processed_texts,
+            max_length=512,
+            padding=True,
+            truncation=True,
+            return_tensors="pt",
+        )
+
+        # 转移到设备
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+
+        with torch.no_grad():
+            logits = self.model(**inputs).logits
+            probabilities = torch.softmax(logits, dim=1)
+
+        return probabilities.cpu()
+
+    def _cache_model_id(self) -> str:
+        """缓存键中的模型标识；量化模型的输出不同，单独区分（以量化是否实际成功为准）"""
+        return f"{self.MODEL_NAME}{'#int8' if self.is_quantized else ''}"
+
+    def _predict_cached(self, processed_texts: List[str]) -> List[List[float]]:
+        """
+        带缓存的概率预测：只有缓存未命中（且批次内去重后）的文本才交给模型
+
+        Args:
+            processed_texts: 预处理后的非空文本列表
+
+        Returns:
+            与输入一一对应的概率列表
+        """
+        model_id = self._cache_model_id()
+        keys = [
+            SentimentResultCache.make_key(model_id, text) for text in processed_texts
+        ]
+        cached = self.result_cache.get_many(list(dict.fromkeys(keys)))
+
+        miss_texts: Dict[str, str] = {}
+        for key, text in zip(keys, processed_texts):
+            if key not in cached:
+                miss_texts.setdefault(key, text)
+
+        if miss_texts:
+            probabilities = self._predict_probabilities(list(miss_texts.values()))
+            computed = {
+                key: probabilities[row].tolist()
+                for row, key in enumerate(miss_texts)
+            }
+            self.result_cache.set_many(computed)
+            cached.update(computed)
+
+        return [cached[key] for key in keys]
+
+    def _build_success_result(self, text: str, probabilities) -> SentimentResult:
+        """根据单条文本的概率向量构建结果"""
+        probabilities = [float(p) for p in probabilities]
+        prediction = max(range(len(probabilities)), key=probabilities.__getitem__)
+        prob_dist = dict(zip(self.sentiment_map.values(), probabilities))
+        return SentimentResult(
+            text=text,
+            sentiment_label=self.sentiment_map[prediction],
+            confidence=probabilities[prediction],
+            probability_distribution=prob_dist,
+            success=True,
+        )
+
     def _preprocess_text(self, text: str) -> str:
         """
         文本预处理
@@ -304,44 +451,8 @@ class WeiboMultilingualSentimentAnalyzer:
                     error_message="输入文本为空或无效内容",
                     analysis_performed=False,
                 )
-            assert self.tokenizer is not None
-            # 分词编码
-            inputs = self.tokenizer(
-                processed_text,
-                max_length=512,
-                padding=True,
-                truncation=True,
-                return_tensors="pt",
-            )
-
-            # 转移到设备
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-
-            # 预测
-            assert torch is not None
-            assert self.model is not None
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                logits = outputs.logits
-                probabilities = torch.softmax(logits, dim=1)
-                prediction = int(torch.argmax(probabilities, dim=1).item())
-
-            # 构建结果
-            confidence = probabilities[0][prediction].item()
-            label = self.sentiment_map[prediction]
-
-            # 构建概率分布字典
-            prob_dist = {}
-            for label_name, prob in zip(self.sentiment_map.values(), probabilities[0]):
-                prob_dist[label_name] = prob.item()
-
-            return SentimentResult(
-                text=text,
-                sentiment_label=label,
-                confidence=confidence,
-                probability_distribution=prob_dist,
-                success=True,
-            )
+            probabilities = self._predict_cached([processed_text])
+            return self._build_success_result(text, probabilities[0])
 
         except Exception as e:
             return SentimentResult(
@@ -355,14 +466,22 @@ class WeiboMultilingualSentimentAnalyzer:
             )
 
     def analyze_batch(
-        self, texts: List[str], show_progress: bool = True
+        self,
+        texts: List[str],
+        show_progress: bool = True,
+        batch_size: Optional[int] = None,
     ) -> BatchSentimentResult:
         """
         批量情感分析
 
+        文本按长度排序后以 micro-batch 为单位分词，每个批次只做一次前向计算，
+        结果按输入顺序返回，与逐条调用 analyze_single_text 一致。
+        已缓存的文本不会进入模型。
+
         Args:
             texts: 文本列表
             show_progress: 是否显示进度
+            batch_size: 每个 micro-batch 的文本数，默认使用 SENTIMENT_BATCH_SIZE
 
         Returns:
             BatchSentimentResult对象
@@ -399,17 +518,55 @@ class WeiboMultilingualSentimentAnalyzer:
                 analysis_performed=False,
             )
 
-        results = []
-        success_count = 0
-        total_confidence = 0.0
+        batch_size = max(1, batch_size or SENTIMENT_BATCH_SIZE)
+        results: List[Optional[SentimentResult]] = [None] * len(texts)
 
+        pending = []
         for i, text in enumerate(texts):
-            if show_progress and len(texts) > 1:
-                print(f"处理进度: {i + 1}/{len(texts)}")
+            processed_text = self._preprocess_text(text)
+            if processed_text:
+                pending.append((i, processed_text))
+            else:
+                results[i] = SentimentResult(
+                    text=text,
+                    sentiment_label="输入错误",
+                    confidence=0.0,
+                    probability_distribution={},
+                    success=False,
+                    error_message="输入文本为空或无效内容",
+                    analysis_performed=False,
+                )
 
-            result = self.analyze_single_text(text)
-            results.append(result)
+        # 按长度排序后切分 micro-batch，减少同批次内的填充
+        pending.sort(key=lambda item: len(item[1]))
+        total_batches = (len(pending) + batch_size - 1) // batch_size
+
+        for batch_index in range(total_batches):
+            chunk = pending[batch_index * batch_size:(batch_index + 1) * batch_size]
+            if show_progress and total_batches > 1:
+                print(f"处理进度: 批次 {batch_index + 1}/{total_batches}（{len(chunk)}条）")
+
+            try:
+                probabilities = self._predict_cached([t for _, t in chunk])
+            except Exception as e:
+                for i, _ in chunk:
+                    results[i] = SentimentResult(
+                        text=texts[i],
+                        sentiment_label="分析失败",
+                        confidence=0.0,
+                        probability_distribution={},
+                        success=False,
+                        error_message=f"预测时发生错误: {str(e)}",
+                        analysis_performed=False,
+                    )
+                continue
+
+            for row, (i, _) in enumerate(chunk):
+                results[i] = self._build_success_result(texts[i], probabilities[row])
 
+        success_count = 0
+        total_confidence = 0.0
+        for result in results:
             if result.success:
                 success_count += 1
                 total_confidence += result.confidence
@@ -597,7 +754,7 @@ class WeiboMultilingualSentimentAnalyzer:
             模型信息字典
         """
         return {
-            "model_name": "tabularisai/multilingual-sentiment-analysis",
+            "model_name": self.MODEL_NAME,
             "supported_languages": [
                 "中文",
                 "英文",
@@ -625,6 +782,9 @@ class WeiboMultilingualSentimentAnalyzer:
             "sentiment_levels": list(self.sentiment_map.values()),
             "is_initialized": self.is_initialized,
             "device": str(self.device) if self.device else "未设置",
+            "batch_size": SENTIMENT_BATCH_SIZE,
+            "cpu_dynamic_quantization": SENTIMENT_CPU_DYNAMIC_QUANTIZATION,
+            "result_cache": self.result_cache.stats(),
         }
 
 
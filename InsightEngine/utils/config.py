@@ -22,6 +22,11 @@ class Settings(BaseSettings):
     DB_PORT: int = Field(3306, description="数据库端口")
     DB_CHARSET: str = Field("utf8mb4", description="数据库字符集")
     DB_DIALECT: Optional[str] = Field("mysql", description="数据库方言，如mysql、postgresql等，SQLAlchemy后端选择")
+    DB_POOL_SIZE: int = Field(8, description="SQLAlchemy连接池常驻连接数")
+    DB_MAX_OVERFLOW: int = Field(8, description="SQLAlchemy连接池允许的额外溢出连接数")
+    DB_PARALLEL_TABLE_QUERIES: bool = Field(True, description="多表搜索时是否并发执行各表查询")
+    DB_TABLE_QUERY_TIMEOUT: float = Field(30.0, description="并发多表查询的等待预算（秒），同时作为服务端语句超时（MySQL MAX_EXECUTION_TIME / PostgreSQL statement_timeout），超时的表结果将被丢弃")
+    DB_FULLTEXT_SEARCH: bool = Field(True, description="检测到MindSpider创建的全文索引时，话题搜索改用MATCH ... AGAINST（MySQL）")
     MAX_REFLECTIONS: int = Field(3, description="最大反思次数")
     MAX_PARAGRAPHS: int = Field(6, description="最大段落数")
     SEARCH_TIMEOUT: int = Field(240, description="单次搜索请求超时")
@@ -33,6 +38,9 @@ class Settings(BaseSettings):
     DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT: int = Field(200, description="平台搜索话题最大数")
     MAX_SEARCH_RESULTS_FOR_LLM: int = Field(0, description="供LLM用搜索结果最大数")
     MAX_HIGH_CONFIDENCE_SENTIMENT_RESULTS: int = Field(0, description="高置信度情感分析最大数")
+    KEYWORD_SEARCH_CONCURRENCY: int = Field(4, description="一次工具调用中各优化关键词子查询的并发数，1 为串行")
+    KEYWORD_SEARCH_TIMEOUT: float = Field(60.0, description="等待全部关键词子查询的预算（秒），超时未返回的关键词结果将被丢弃")
+    KEYWORD_SEARCH_MAX_RESULTS: int = Field(0, description="一次工具调用去重后最多收集的结果数，达到后不再等待其余关键词；0 表示不限")
     OUTPUT_DIR: str = Field("reports", description="输出路径")
     SAVE_INTERMEDIATE_STATES: bool = Field(True, description="是否保存中间状态")
 
@@ -8,19 +8,25 @@
 from __future__ import annotations
 from urllib.parse import quote_plus
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, Iterable, List, Optional, Union
 
 from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
 from InsightEngine.utils.config import settings
 
 __all__ = [
     "get_engine",
+    "get_pool_capacity",
+    "get_query_executor",
     "fetch_all",
 ]
 
 
 _engine: Optional[Engine] = None
+_query_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
 
 
 def _build_database_url() -> str:
@@ -52,18 +58,77 @@ def get_engine() -> Engine:
             database_url,
             pool_pre_ping=True,
             pool_recycle=1800,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
         )
     return _engine
 
 
-def fetch_all(query: str, params: Optional[Union[Iterable[Any], Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+def get_pool_capacity() -> int:
+    """连接池可同时签出的最大连接数（常驻 + 溢出）。"""
+    return max(1, settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+
+
+def get_query_executor() -> ThreadPoolExecutor:
+    """
+    获取进程级共享的查询线程池。
+
+    线程数与连接池容量一致，执行中的查询不会因等待连接签出而阻塞。
+    多个关键词子查询并发提交时，超出线程数的表查询会在线程池中排队，
+    调用方的超时预算应从查询开始执行时计时（见 MediaCrawlerDB._run_table_queries）。
+    """
+    global _query_executor
+    if _query_executor is None:
+        with _executor_lock:
+            if _query_executor is None:
+                _query_executor = ThreadPoolExecutor(
+                    max_workers=get_pool_capacity(),
+                    thread_name_prefix="insight-db",
+                )
+    return _query_executor
+
+
+def _apply_statement_timeout(conn: Connection, timeout: float) -> bool:
+    """
+    为当前连接设置服务端语句超时，返回归还连接前是否需要复位。
+
+    MySQL 使用会话级 MAX_EXECUTION_TIME（仅作用于只读 SELECT），连接会回到池中复用，需要复位；
+    PostgreSQL 使用 SET LOCAL statement_timeout，随事务结束自动失效。其他方言不设置。
+    """
+    milliseconds = max(1, int(timeout * 1000))
+    dialect = conn.dialect.name
+    if dialect == "mysql":
+        conn.execute(text(f"SET SESSION MAX_EXECUTION_TIME = {milliseconds}"))
+        return True
+    if dialect == "postgresql":
+        conn.execute(text(f"SET LOCAL statement_timeout = {milliseconds}"))
+    return False
+
+
+def fetch_all(
+    query: str,
+    params: Optional[Union[Iterable[Any], Dict[str, Any]]] = None,
+    timeout: Optional[float] = None,
+) -> List[Dict[str, Any]]:
     """
     执行只读查询并返回字典列表（同步版本）。
+
+    timeout 为服务端语句超时（秒）：超时的查询由数据库主动终止并抛出异常，
+    及时释放查询线程与池中的连接，而不是一直占用到数据库返回。
     """
     engine: Engine = get_engine()
     with engine.connect() as conn:
-        result = conn.execute(text(query), params or {})
-        rows = result.mappings().all()
+        reset = _apply_statement_timeout(conn, timeout) if timeout else False
+        try:
+            result = conn.execute(text(query), params or {})
+            rows = result.mappings().all()
+        finally:
+            if reset:
+                try:
+                    conn.execute(text("SET SESSION MAX_EXECUTION_TIME = DEFAULT"))
+                except Exception:
+                    # 无法复位的连接不再放回池中，避免带着超时设置被其他查询复用
+                    conn.invalidate()
         # 将 RowMapping 转换为普通字典
         return [dict(row) for row in rows]
 
@@ -0,0 +1,163 @@
+"""
+两级结果缓存
+
+第一层为进程内 LRU，第二层为可选的 Redis（带 TTL），值以 JSON 序列化。
+情感分析与关键词优化的结果缓存都基于此实现，子类只需给出键前缀、日志标签与缓存键的构造方式。
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+__all__ = ["TwoTierResultCache"]
+
+
+class TwoTierResultCache:
+    """
+    进程内 LRU + 可选 Redis 的两级缓存
+
+    Redis 不可用或读写失败时只记录警告并退化为进程内缓存；
+    Redis 中无法解析的条目按未命中处理，重新计算后会被覆盖。
+    """
+
+    KEY_PREFIX = "cache:result:"
+    LABEL = "结果缓存"
+
+    def __init__(self, max_entries: int, redis_url: Optional[str], ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        if redis_url:
+            try:
+                import redis
+
+                self._redis = redis.from_url(redis_url)
+            except Exception as e:
+                logger.warning(f"{self.LABEL} Redis 不可用，仅使用进程内缓存: {e}")
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Tuple[Optional[Any], str]:
+        """查询单个键，返回 (值, 命中层级 memory/redis/miss)"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return self._entries[key], "memory"
+
+        found = self._fetch_from_redis([key])
+        if key in found:
+            return found[key], "redis"
+
+        with self._lock:
+            self.misses += 1
+        return None, "miss"
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """批量查询缓存，返回命中的 key -> 值"""
+        found: Dict[str, Any] = {}
+        remaining: List[str] = []
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+                else:
+                    remaining.append(key)
+            self.memory_hits += len(found)
+
+        if remaining:
+            redis_found = self._fetch_from_redis(remaining)
+            found.update(redis_found)
+            remaining = [k for k in remaining if k not in redis_found]
+
+        with self._lock:
+            self.misses += len(remaining)
+        return found
+
+    def set(self, key: str, value: Any) -> None:
+        """写入单个键"""
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        """批量写入缓存"""
+        if not items or self.max_entries <= 0:
+            return
+        with self._lock:
+            for key, value in items.items():
+                self._remember(key, value)
+        if self._redis is not None:
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for key, value in items.items():
+                    pipe.set(self.KEY_PREFIX + key, json.dumps(value, ensure_ascii=False), ex=self.ttl)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"{self.LABEL} Redis 写入失败: {e}")
+
+    def _fetch_from_redis(self, keys: List[str]) -> Dict[str, Any]:
+        """从 Redis 批量读取并回填进程内缓存，只统计 Redis 命中"""
+        if self._redis is None:
+            return {}
+        try:
+            values = self._redis.mget([self.KEY_PREFIX + k for k in keys])
+        except Exception as e:
+            logger.warning(f"{self.LABEL} Redis 读取失败: {e}")
+            return {}
+
+        found: Dict[str, Any] = {}
+        for key, value in zip(keys, values):
+            if not value:
+                continue
+            try:
+                found[key] = json.loads(value)
+            except (TypeError, ValueError):
+                continue
+        if found:
+            with self._lock:
+                self.redis_hits += len(found)
+                for key, value in found.items():
+                    self._remember(key, value)
+        return found
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空进程内缓存与命中统计（Redis 中的条目按 TTL 自然过期）"""
+        with self._lock:
+            self._entries.clear()
+            self.memory_hits = self.redis_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.redis_hits + self.misses
+            hits = self.memory_hits + self.redis_hits
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "redis_enabled": self._redis is not None,
+                "memory_hits": self.memory_hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def describe(self) -> str:
+        """用于日志的一行命中率摘要"""
+        stats = self.stats()
+        return (
+            f"命中率 {stats['hit_ratio']:.1%}（内存 {stats['memory_hits']} / "
+            f"Redis {stats['redis_hits']} / 未命中 {stats['misses']}）"
+        )
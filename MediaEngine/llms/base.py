@@ -6,8 +6,7 @@ Unified OpenAI-compatible LLM client for the Media Engine, with retry support.
 
 import os
 import sys
-from datetime import datetime
-from typing import Any, Dict, Optional, Generator
+from typing import Any, Dict, List, Optional, Generator
 from loguru import logger
 
 from openai import OpenAI
@@ -45,6 +44,16 @@ except ImportError:
 
     LLM_RETRY_CONFIG = None
 
+from prompt_cache import (
+    CACHE_HINT_NONE,
+    PromptCacheStats,
+    build_messages,
+    create_stream_completion,
+    current_time_note,
+    request_options,
+    stream_chunk_usage,
+)
+
 
 class LLMClient:
     """
@@ -74,19 +83,11 @@ class LLMClient:
         if base_url:
             client_kwargs["base_url"] = base_url
         self.client = OpenAI(**client_kwargs)
+        self.cache_stats = PromptCacheStats()
 
     @with_retry(LLM_RETRY_CONFIG)
     def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
-        current_time = datetime.now().strftime("%Y年%m月%d日%H时%M分")
-        time_prefix = f"今天的实际时间是{current_time}"
-        if user_prompt:
-            user_prompt = f"{time_prefix}\n{user_prompt}"
-        else:
-            user_prompt = time_prefix
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
+        messages = self._build_messages(system_prompt, user_prompt)
 
         allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty", "stream"}
         extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
@@ -99,8 +100,10 @@ class LLMClient:
                 messages=messages,
                 timeout=timeout,
                 **extra_params,
+                **request_options(self.model_name, system_prompt),
             )
 
+            self._record_usage(getattr(response, "usage", None))
             if response.choices and response.choices[0].message:
                 return self.validate_response(response.choices[0].message.content)
             return ""
@@ -126,7 +129,7 @@ class LLMClient:
 
                     response = deepseek_client.chat.completions.create(
                         model=deepseek_config["model_name"],
-                        messages=messages,
+                        messages=self._build_messages(system_prompt, user_prompt, cache_hint=CACHE_HINT_NONE),
                         timeout=timeout,
                         **extra_params,
                     )
@@ -155,16 +158,7 @@ class LLMClient:
         Yields:
             响应文本块（str）
         """
-        current_time = datetime.now().strftime("%Y年%m月%d日%H时%M分")
-        time_prefix = f"今天的实际时间是{current_time}"
-        if user_prompt:
-            user_prompt = f"{time_prefix}\n{user_prompt}"
-        else:
-            user_prompt = time_prefix
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
+        messages = self._build_messages(system_prompt, user_prompt)
 
         allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty"}
         extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
@@ -174,18 +168,23 @@ class LLMClient:
         timeout = kwargs.pop("timeout", self.timeout)
 
         try:
-            stream = self.client.chat.completions.create(
+            stream = create_stream_completion(
+                self.client,
                 model=self.model_name,
                 messages=messages,
                 timeout=timeout,
                 **extra_params,
+                **request_options(self.model_name, system_prompt, stream=True),
             )
             
+            usage = None
             for chunk in stream:
+                usage = stream_chunk_usage(chunk) or usage
                 if chunk.choices and len(chunk.choices) > 0:
                     delta = chunk.choices[0].delta
                     if delta and delta.content:
                         yield delta.content
+            self._record_usage(usage)
         except Exception as e:
             logger.error(f"流式请求失败: {str(e)}")
             raise e
@@ -233,14 +232,7 @@ class LLMClient:
                         max_retries=0,
                     )
 
-                    current_time = datetime.now().strftime("%Y年%m月%d日%H时%M分")
-                    time_prefix = f"今天的实际时间是{current_time}"
-                    full_user_prompt = f"{time_prefix}\n{user_prompt}" if user_prompt else time_prefix
-
-                    messages = [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": full_user_prompt},
-                    ]
+                    messages = self._build_messages(system_prompt, user_prompt, cache_hint=CACHE_HINT_NONE)
 
                     allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty"}
                     extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
@@ -274,6 +266,36 @@ class LLMClient:
             # 其他错误直接抛出
             raise
 
+    def _build_messages(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        cache_hint: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        编排消息：系统提示词在前，当前时间追加在用户输入末尾，
+        保证时间变化不影响服务商对稳定前缀的缓存命中。
+        """
+        return build_messages(
+            system_prompt,
+            user_prompt,
+            time_note=current_time_note(),
+            cache_hint=cache_hint,
+        )
+
+    def _record_usage(self, usage: Any) -> None:
+        """记录本次调用的提示词与缓存命中token数"""
+        extracted = self.cache_stats.record(usage)
+        if extracted:
+            logger.debug(
+                f"[MediaEngine] LLM用量: 提示词 {extracted['prompt_tokens']} tokens，"
+                f"命中缓存 {extracted['cached_tokens']} tokens"
+            )
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """返回累计的提示词缓存命中统计"""
+        return self.cache_stats.snapshot()
+
     @staticmethod
     def validate_response(response: Optional[str]) -> str:
         if response is None:
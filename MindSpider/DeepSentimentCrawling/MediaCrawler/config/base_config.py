@@ -63,6 +63,23 @@ AUTO_CLOSE_BROWSER = True
 # 数据保存类型选项配置,支持五种类型：csv、db、json、sqlite、postgresql, 最好保存到DB，有排重的功能。
 SAVE_DATA_OPTION = "postgresql"  # csv or db or json or sqlite or postgresql
 
+# 数据库批量写入（仅 db/sqlite/postgresql 生效）：内容与评论先进入按表划分的内存缓冲，
+# 达到条数或等待时间后批量 upsert，爬虫结束时自动落盘剩余数据
+ENABLE_DB_BULK_WRITE = True
+# 每批写入的最大行数
+DB_BULK_BATCH_SIZE = 200
+# 缓冲最长等待时间（秒）
+DB_BULK_FLUSH_INTERVAL = 2.0
+
+# JSON 存储写入模式（仅 SAVE_DATA_OPTION = "json" 生效）：
+# jsonl - 每条数据追加一行到 data/{platform}/jsonl/*.jsonl，写入代价与已有数据量无关
+# array - 旧模式，每写一条都重写整个 data/{platform}/json/*.json 数组文件
+JSON_WRITE_MODE = "jsonl"
+# jsonl 模式下爬虫结束时是否额外导出旧版 JSON 数组文件（供依赖 .json 格式的下游读取）
+JSONL_EXPORT_JSON_ARRAY = True
+# jsonl 写入缓冲行数，攒够后一次性追加到文件
+JSONL_BUFFER_LINES = 50
+
 # 用户浏览器缓存的浏览器文件配置
 USER_DATA_DIR = "%s_user_data_dir"  # %s will be replaced by platform name
 
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+# @Desc    : 数据库批量写入缓冲（write-behind）
+#            store_content/store_comment 先把行写入按表划分的内存缓冲，达到条数或时间阈值后
+#            一次性批量 upsert；爬虫结束时由 main.py 调用 flush_all() 落盘剩余数据。
+#
+#            - 业务键上存在唯一索引时使用方言原生 upsert：
+#              MySQL `INSERT ... ON DUPLICATE KEY UPDATE`，PostgreSQL/SQLite `INSERT ... ON CONFLICT DO UPDATE`
+#            - 否则（现有表多数只有普通索引）退化为每批一次 `SELECT key IN (...)` + executemany INSERT/UPDATE，
+#              与逐条 SELECT/INSERT/UPDATE 的语义保持一致
+#            - 整批写入失败时逐行重试：只丢弃（并记录）本身无法写入的行；连接类故障时把未写入的行放回缓冲，
+#              等下次 flush 再写，不会因为一行坏数据或一次断连丢掉整批
+import asyncio
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, inspect as sqlalchemy_inspect, insert, select, tuple_, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+import config
+from database.db_session import get_async_engine
+from tools import utils
+
+# 每条语句的绑定参数上限（asyncpg 为 32767，SQLite 新版本为 32766）
+MAX_BIND_PARAMS = 30000
+# 只在插入时写入、更新时保留原值的列
+INSERT_ONLY_COLUMNS = ("id", "add_ts")
+# 视为暂时性故障（连接断开、锁超时等）的异常，对应的行会放回缓冲稍后重试
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, OSError, asyncio.TimeoutError)
+
+
+class BulkUpsertBuffer:
+    """
+    单表写入缓冲
+
+    同一批次内相同业务键的行会合并（后写覆盖先写），与逐条写入的最终结果一致。
+    """
+
+    def __init__(
+        self,
+        model,
+        key_columns: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        db_type: Optional[str] = None,
+        engine: Optional[AsyncEngine] = None,
+    ):
+        """
+        Args:
+            model: ORM 模型类
+            key_columns: 业务键列（如 comment_id，或 (up_id, fan_id)）
+            update_columns: 命中已有行时更新的列，None 表示更新本次提供的全部列（add_ts 除外）
+            batch_size: 触发 flush 的缓冲行数，默认 config.DB_BULK_BATCH_SIZE
+            flush_interval: 首条数据进入缓冲后最长等待时间（秒），默认 config.DB_BULK_FLUSH_INTERVAL
+            db_type: 数据库类型，默认 config.SAVE_DATA_OPTION
+            engine: 指定异步引擎（测试/基准使用），默认按 db_type 取共享引擎
+        """
+        self.table = model.__table__
+        self.key_columns: Tuple[str, ...] = tuple(key_columns)
+        self.update_columns = tuple(update_columns) if update_columns is not None else None
+        self.batch_size = batch_size or config.DB_BULK_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else config.DB_BULK_FLUSH_INTERVAL
+        self.db_type = db_type
+        self._engine = engine
+
+        self._column_names = set(self.table.columns.keys())
+        self._pending: Dict[tuple, Dict] = {}
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._native_upsert: Optional[bool] = None
+
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.batches_written = 0
+
+    def _row_key(self, row: Dict) -> tuple:
+        key = tuple(row.get(column) for column in self.key_columns)
+        if None in key:
+            # 缺少业务键的行无法去重，单独保留
+            key = ("__row__", id(row))
+        return key
+
+    async def add(self, row: Dict) -> None:
+        """放入一行，达到批量阈值时立即 flush，否则在 flush_interval 后自动 flush"""
+        row = {key: value for key, value in row.items() if key in self._column_names}
+        key = self._row_key(row)
+        if key in self._pending:
+            merged = self._pending[key]
+            for column in INSERT_ONLY_COLUMNS:
+                row.pop(column, None)
+            merged.update(row)
+        else:
+            self._pending[key] = row
+
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+        else:
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            utils.logger.error(f"[BulkUpsertBuffer] {self.table.name} 定时 flush 失败: {e}")
+
+    async def flush(self) -> int:
+        """
+        把当前缓冲写入数据库，返回写入行数
+
+        整批失败时逐行重试；连接类故障会把未写入的行放回缓冲并抛出异常。
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            rows = list(self._pending.values())
+            self._pending = {}
+            if self._timer is not None and self._timer is not asyncio.current_task():
+                self._timer.cancel()
+            self._timer = None
+
+            engine = self._engine or get_async_engine(self.db_type or config.SAVE_DATA_OPTION)
+            try:
+                await self._write(engine, rows)
+            except TRANSIENT_ERRORS:
+                self._requeue(rows)
+                raise
+            except Exception as e:
+                utils.logger.warning(
+                    f"[BulkUpsertBuffer] {self.table.name} 批量写入 {len(rows)} 行失败，逐行重试以隔离异常数据: {e}"
+                )
+                written = await self._write_rows_individually(engine, rows)
+            else:
+                written = len(rows)
+
+            self.rows_written += written
+            self.batches_written += 1
+            return written
+
+    # ====== 内部实现 ======
+
+    async def _write(self, engine: AsyncEngine, rows: List[Dict]) -> None:
+        """在一个事务内写入一批行"""
+        async with engine.begin() as conn:
+            if self._native_upsert is None:
+                self._native_upsert = await conn.run_sync(self._has_unique_key)
+            for group in self._group_by_columns(rows):
+                if self._native_upsert:
+                    await self._native_bulk_upsert(conn, group)
+                else:
+                    await self._select_then_write(conn, group)
+
+    async def _write_rows_individually(self, engine: AsyncEngine, rows: List[Dict]) -> int:
+        """逐行写入，丢弃并记录无法写入的行；遇到连接类故障时剩余行放回缓冲并抛出"""
+        written = 0
+        for index, row in enumerate(rows):
+            try:
+                await self._write(engine, [row])
+            except TRANSIENT_ERRORS:
+                self.rows_written += written
+                self._requeue(rows[index:])
+                raise
+            except Exception as e:
+                self.rows_failed += 1
+                key = {column: row.get(column) for column in self.key_columns}
+                utils.logger.error(f"[BulkUpsertBuffer] {self.table.name} 丢弃无法写入的行 {key}: {e}")
+            else:
+                written += 1
+        return written
+
+    def _requeue(self, rows: List[Dict]) -> None:
+        """把未写入的行放回缓冲；flush 期间又写入的同键新数据优先，插入专用列保留旧值"""
+        for row in rows:
+            key = self._row_key(row)
+            newer = self._pending.get(key)
+            if newer is not None:
+                row = {**row, **{k: v for k, v in newer.items() if k not in INSERT_ONLY_COLUMNS}}
+            self._pending[key] = row
+        utils.logger.warning(f"[BulkUpsertBuffer] {self.table.name} 写入失败，{len(rows)} 行已放回缓冲等待重试")
+        self._schedule_flush()
+
+    def _has_unique_key(self, sync_conn) -> bool:
+        """检查数据库中业务键是否有唯一约束/唯一索引（原生 upsert 的前提）"""
+        inspector = sqlalchemy_inspect(sync_conn)
+        wanted = set(self.key_columns)
+        candidates: List[Iterable[str]] = [
+            constraint.get("column_names") or []
+            for constraint in inspector.get_unique_constraints(self.table.name)
+        ]
+        candidates.extend(
+            index.get("column_names") or []
+            for index in inspector.get_indexes(self.table.name)
+            if index.get("unique")
+        )
+        return any(set(columns) == wanted for columns in candidates)
+
+    @staticmethod
+    def _group_by_columns(rows: List[Dict]) -> List[List[Dict]]:
+        """按列集合分组，保证同一条语句内每行列一致，未提供的列不会被写成 NULL"""
+        groups: Dict[frozenset, List[Dict]] = {}
+        for row in rows:
+            groups.setdefault(frozenset(row), []).append(row)
+        return list(groups.values())
+
+    def _columns_to_update(self, row: Dict) -> List[str]:
+        if self.update_columns is not None:
+            return [column for column in self.update_columns if column in row]
+        return [
+            column for column in row
+            if column not in self.key_columns and column not in INSERT_ONLY_COLUMNS
+        ]
+
+    def _chunks(self, rows: List[Dict]) -> Iterable[List[Dict]]:
+        per_chunk = max(1, MAX_BIND_PARAMS // max(1, len(rows[0])))
+        for start in range(0, len(rows), per_chunk):
+            yield rows[start:start + per_chunk]
+
+    async def _native_bulk_upsert(self, conn, rows: List[Dict]) -> None:
+        dialect = conn.dialect.name
+        update_cols = self._columns_to_update(rows[0])
+        for chunk in self._chunks(rows):
+            if dialect == "mysql":
+                stmt = mysql.insert(self.table).values(chunk)
+                if update_cols:
+                    stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in update_cols})
+                else:
+                    stmt = stmt.prefix_with("IGNORE")
+            else:
+                dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                stmt = dialect_insert(self.table).values(chunk)
+                if update_cols:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=list(self.key_columns),
+                        set_={c: stmt.excluded[c] for c in update_cols},
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=list(self.key_columns))
+            await conn.execute(stmt)
+
+    async def _select_then_write(self, conn, rows: List[Dict]) -> None:
+        key_cols = [self.table.c[column] for column in self.key_columns]
+        keys = [tuple(row.get(column) for column in self.key_columns) for row in rows]
+
+        existing = set()
+        per_chunk = max(1, MAX_BIND_PARAMS // len(key_cols))
+        for start in range(0, len(keys), per_chunk):
+            chunk = keys[start:start + per_chunk]
+            if len(key_cols) == 1:
+                condition = key_cols[0].in_([key[0] for key in chunk])
+            else:
+                condition = tuple_(*key_cols).in_(chunk)
+            result = await conn.execute(select(*key_cols).where(condition))
+            existing.update(tuple(record) for record in result)
+
+        to_insert = [row for row, key in zip(rows, keys) if key not in existing]
+        to_update = [row for row, key in zip(rows, keys) if key in existing]
+
+        if to_insert:
+            await conn.execute(insert(self.table), to_insert)
+
+        update_cols = self._columns_to_update(rows[0])
+        if to_update and update_cols:
+            stmt = (
+                update(self.table)
+                .where(*[col == bindparam(f"b_{col.name}") for col in key_cols])
+                .values({column: bindparam(column) for column in update_cols})
+            )
+            params = [
+                {
+                    **{column: row.get(column) for column in update_cols},
+                    **{f"b_{column}": row.get(column) for column in self.key_columns},
+                }
+                for row in to_update
+            ]
+            await conn.execute(stmt, params)
+
+
+_buffers: Dict[str, BulkUpsertBuffer] = {}
+
+
+def get_bulk_buffer(model, key_columns: Sequence[str], **kwargs) -> BulkUpsertBuffer:
+    """按表获取（或创建）写入缓冲，同一张表在进程内共享一个缓冲"""
+    table_name = model.__table__.name
+    buffer = _buffers.get(table_name)
+    if buffer is None:
+        buffer = BulkUpsertBuffer(model, key_columns, **kwargs)
+        _buffers[table_name] = buffer
+    return buffer
+
+
+def bulk_write_enabled() -> bool:
+    return bool(getattr(config, "ENABLE_DB_BULK_WRITE", False)) and config.SAVE_DATA_OPTION in (
+        "db", "mysql", "sqlite", "postgresql"
+    )
+
+
+async def flush_all() -> int:
+    """落盘所有缓冲中的剩余数据（爬虫结束时调用）"""
+    total = 0
+    for buffer in list(_buffers.values()):
+        try:
+            total += await buffer.flush()
+        except Exception as e:
+            utils.logger.error(f"[BulkUpsertBuffer] {buffer.table.name} flush 失败: {e}")
+    return total
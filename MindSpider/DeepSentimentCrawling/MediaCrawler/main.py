@@ -15,7 +15,7 @@ from typing import Optional
 
 import cmd_arg
 import config
-from database import db
+from database import bulk_writer, db
 from base.base_crawler import AbstractCrawler
 from media_platform.bilibili import BilibiliCrawler
 from media_platform.douyin import DouYinCrawler
@@ -24,7 +24,7 @@ from media_platform.tieba import TieBaCrawler
 from media_platform.weibo import WeiboCrawler
 from media_platform.xhs import XiaoHongShuCrawler
 from media_platform.zhihu import ZhihuCrawler
-from tools.async_file_writer import AsyncFileWriter
+from tools.async_file_writer import AsyncFileWriter, flush_jsonl_sinks
 from var import crawler_type_var
 
 
@@ -72,7 +72,15 @@ async def main():
 
 
     crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
-    await crawler.start()
+    try:
+        await crawler.start()
+    finally:
+        # 批量写入模式下落盘缓冲中剩余的内容/评论
+        if bulk_writer.bulk_write_enabled():
+            await bulk_writer.flush_all()
+        # JSONL 模式下落盘缓冲并按配置导出旧版 JSON 数组文件
+        if config.SAVE_DATA_OPTION == "json" and config.JSON_WRITE_MODE == "jsonl":
+            await flush_jsonl_sinks()
 
     # Generate wordcloud after crawling is complete
     # Only for JSON save mode
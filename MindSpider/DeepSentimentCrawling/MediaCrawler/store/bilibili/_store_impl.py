@@ -26,6 +26,7 @@ from sqlalchemy.orm import sessionmaker
 
 import config
 from base.base_crawler import AbstractStore
+from database.bulk_writer import bulk_write_enabled, get_bulk_buffer
 from database.db_session import get_session
 from database.models import BilibiliVideoComment, BilibiliVideo, BilibiliUpInfo, BilibiliUpDynamic, BilibiliContactInfo
 from tools.async_file_writer import AsyncFileWriter
@@ -141,6 +142,10 @@ class BiliDbStoreImplement(AbstractStore):
             video_id = int(video_id) if not isinstance(video_id, int) else video_id
             content_item["video_id"] = video_id
         content_item = _sanitize_strings(content_item)
+        if bulk_write_enabled():
+            content_item["add_ts"] = utils.get_current_timestamp()
+            await get_bulk_buffer(BilibiliVideo, ("video_id",)).add(content_item)
+            return
         async with get_session() as session:
             result = await session.execute(select(BilibiliVideo).where(BilibiliVideo.video_id == video_id))
             video_detail = result.scalar_one_or_none()
@@ -166,6 +171,10 @@ class BiliDbStoreImplement(AbstractStore):
             comment_id = int(comment_id) if not isinstance(comment_id, int) else comment_id
             comment_item["comment_id"] = comment_id
         comment_item = _sanitize_strings(comment_item)
+        if bulk_write_enabled():
+            comment_item["add_ts"] = utils.get_current_timestamp()
+            await get_bulk_buffer(BilibiliVideoComment, ("comment_id",)).add(comment_item)
+            return
         async with get_session() as session:
             result = await session.execute(select(BilibiliVideoComment).where(BilibiliVideoComment.comment_id == comment_id))
             comment_detail = result.scalar_one_or_none()
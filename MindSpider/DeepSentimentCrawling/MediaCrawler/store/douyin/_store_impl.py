@@ -23,6 +23,7 @@ from sqlalchemy import select
 
 import config
 from base.base_crawler import AbstractStore
+from database.bulk_writer import bulk_write_enabled, get_bulk_buffer
 from database.db_session import get_session
 from database.models import DouyinAweme, DouyinAwemeComment, DyCreator
 from tools import utils, words
@@ -88,6 +89,10 @@ class DouyinDbStoreImplement(AbstractStore):
             content_item: content item dict
         """
         aweme_id = content_item.get("aweme_id")
+        if bulk_write_enabled() and content_item.get("title"):
+            content_item["add_ts"] = utils.get_current_timestamp()
+            await get_bulk_buffer(DouyinAweme, ("aweme_id",)).add(content_item)
+            return
         async with get_session() as session:
             result = await session.execute(select(DouyinAweme).where(DouyinAweme.aweme_id == aweme_id))
             aweme_detail = result.scalar_one_or_none()
@@ -109,6 +114,10 @@ class DouyinDbStoreImplement(AbstractStore):
             comment_item: comment item dict
         """
         comment_id = comment_item.get("comment_id")
+        if bulk_write_enabled():
+            comment_item["add_ts"] = utils.get_current_timestamp()
+            await get_bulk_buffer(DouyinAwemeComment, ("comment_id",)).add(comment_item)
+            return
         async with get_session() as session:
             result = await session.execute(select(DouyinAwemeComment).where(DouyinAwemeComment.comment_id == comment_id))
             comment_detail = result.scalar_one_or_none()
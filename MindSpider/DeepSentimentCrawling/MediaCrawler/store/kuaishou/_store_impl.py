@@ -26,6 +26,7 @@ from sqlalchemy import select
 
 import config
 from base.base_crawler import AbstractStore
+from database.bulk_writer import bulk_write_enabled, get_bulk_buffer
 from database.db_session import get_session
 from database.models import KuaishouVideo, KuaishouVideoComment
 from tools import utils, words
@@ -89,6 +90,10 @@ class KuaishouDbStoreImplement(AbstractStore):
             content_item: content item dict
         """
         video_id = content_item.get("video_id")
+        if bulk_write_enabled():
+            content_item["add_ts"] = utils.get_current_timestamp()
+            await get_bulk_buffer(KuaishouVideo, ("video_id",)).add(content_item)
+            return
         async with get_session() as session:
             result = await session.execute(select(KuaishouVideo).where(KuaishouVideo.video_id == video_id))
             video_detail = result.scalar_one_or_none()
@@ -109,6 +114,10 @@ class KuaishouDbStoreImplement(AbstractStore):
             comment_item: comment item dict
         """
         comment_id = comment_item.get("comment_id")
+        if bulk_write_enabled():
+            comment_item["add_ts"] = utils.get_current_timestamp()
+            await get_bulk_buffer(KuaishouVideoComment, ("comment_id",)).add(comment_item)
+            return
         async with get_session() as session:
             result = await session.execute(
                 select(KuaishouVideoComment).where(KuaishouVideoComment.comment_id == comment_id))
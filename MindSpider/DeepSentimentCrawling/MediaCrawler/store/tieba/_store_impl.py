@@ -28,6 +28,7 @@ import config
 from base.base_crawler import AbstractStore
 from database.models import TiebaNote, TiebaComment, TiebaCreator
 from tools import utils, words
+from database.bulk_writer import bulk_write_enabled, get_bulk_buffer
 from database.db_session import get_session
 from var import crawler_type_var
 from tools.async_file_writer import AsyncFileWriter
@@ -95,6 +96,9 @@ class TieBaDbStoreImplement(AbstractStore):
             content_item: content item dict
         """
         note_id = content_item.get("note_id")
+        if bulk_write_enabled():
+            await get_bulk_buffer(TiebaNote, ("note_id",)).add(content_item)
+            return
         async with get_session() as session:
             stmt = select(TiebaNote).where(TiebaNote.note_id == note_id)
             res = await session.execute(stmt)
@@ -114,6 +118,9 @@ class TieBaDbStoreImplement(AbstractStore):
             comment_item: comment item dict
         """
         comment_id = comment_item.get("comment_id")
+        if bulk_write_enabled():
+            await get_bulk_buffer(TiebaComment, ("comment_id",)).add(comment_item)
+            return
         async with get_session() as session:
             stmt = select(TiebaComment).where(TiebaComment.comment_id == comment_id)
             res = await session.execute(stmt)
@@ -29,6 +29,7 @@ from base.base_crawler import AbstractStore
 from database.models import WeiboCreator, WeiboNote, WeiboNoteComment
 from tools import utils, words
 from tools.async_file_writer import AsyncFileWriter
+from database.bulk_writer import bulk_write_enabled, get_bulk_buffer
 from database.db_session import get_session
 from var import crawler_type_var
 
@@ -99,6 +100,11 @@ class WeiboDbStoreImplement(AbstractStore):
 
         """
         note_id = content_item.get("note_id")
+        if bulk_write_enabled():
+            content_item["add_ts"] = utils.get_current_timestamp()
+            content_item["last_modify_ts"] = utils.get_current_timestamp()
+            await get_bulk_buffer(WeiboNote, ("note_id",)).add(content_item)
+            return
         async with get_session() as session:
             stmt = select(WeiboNote).where(WeiboNote.note_id == note_id)
             res = await session.execute(stmt)
@@ -125,6 +131,11 @@ class WeiboDbStoreImplement(AbstractStore):
 
         """
         comment_id = comment_item.get("comment_id")
+        if bulk_write_enabled():
+            comment_item["add_ts"] = utils.get_current_timestamp()
+            comment_item["last_modify_ts"] = utils.get_current_timestamp()
+            await get_bulk_buffer(WeiboNoteComment, ("comment_id",)).add(comment_item)
+            return
         async with get_session() as session:
             stmt = select(WeiboNoteComment).where(WeiboNoteComment.comment_id == comment_id)
             res = await session.execute(stmt)
@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from base.base_crawler import AbstractStore
+from database.bulk_writer import bulk_write_enabled, get_bulk_buffer
 from database.db_session import get_session
 from database.models import XhsNote, XhsNoteComment, XhsCreator
 
@@ -82,6 +83,12 @@ class XhsJsonStoreImplement(AbstractStore):
 
 
 class XhsDbStoreImplement(AbstractStore):
+    # 已存在记录时只刷新互动数据（与 update_content/update_comment 一致）
+    CONTENT_UPDATE_COLUMNS = (
+        "last_modify_ts", "liked_count", "collected_count", "comment_count", "share_count", "last_update_time",
+    )
+    COMMENT_UPDATE_COLUMNS = ("last_modify_ts", "like_count", "sub_comment_count")
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
@@ -89,6 +96,10 @@ class XhsDbStoreImplement(AbstractStore):
         note_id = content_item.get("note_id")
         if not note_id:
             return
+        if bulk_write_enabled():
+            buffer = get_bulk_buffer(XhsNote, ("note_id",), update_columns=self.CONTENT_UPDATE_COLUMNS)
+            await buffer.add(self._content_row(content_item))
+            return
         async with get_session() as session:
             if await self.content_is_exist(session, note_id):
                 await self.update_content(session, content_item)
@@ -96,9 +107,13 @@ class XhsDbStoreImplement(AbstractStore):
                 await self.add_content(session, content_item)
 
     async def add_content(self, session: AsyncSession, content_item: Dict):
+        session.add(XhsNote(**self._content_row(content_item)))
+
+    @staticmethod
+    def _content_row(content_item: Dict) -> Dict:
         add_ts = int(get_current_timestamp())
         last_modify_ts = int(get_current_timestamp())
-        note = XhsNote(
+        return dict(
             user_id=content_item.get("user_id"),
             nickname=content_item.get("nickname"),
             avatar=content_item.get("avatar"),
@@ -122,7 +137,6 @@ class XhsDbStoreImplement(AbstractStore):
             source_keyword=content_item.get("source_keyword", ""),
             xsec_token=content_item.get("xsec_token", "")
         )
-        session.add(note)
 
     async def update_content(self, session: AsyncSession, content_item: Dict):
         note_id = content_item.get("note_id")
@@ -146,6 +160,12 @@ class XhsDbStoreImplement(AbstractStore):
     async def store_comment(self, comment_item: Dict):
         if not comment_item:
             return
+        if bulk_write_enabled():
+            if not comment_item.get("comment_id"):
+                return
+            buffer = get_bulk_buffer(XhsNoteComment, ("comment_id",), update_columns=self.COMMENT_UPDATE_COLUMNS)
+            await buffer.add(self._comment_row(comment_item))
+            return
         async with get_session() as session:
             comment_id = comment_item.get("comment_id")
             if not comment_id:
@@ -156,9 +176,13 @@ class XhsDbStoreImplement(AbstractStore):
                 await self.add_comment(session, comment_item)
 
     async def add_comment(self, session: AsyncSession, comment_item: Dict):
+        session.add(XhsNoteComment(**self._comment_row(comment_item)))
+
+    @staticmethod
+    def _comment_row(comment_item: Dict) -> Dict:
         add_ts = int(get_current_timestamp())
         last_modify_ts = int(get_current_timestamp())
-        comment = XhsNoteComment(
+        return dict(
             user_id=comment_item.get("user_id"),
             nickname=comment_item.get("nickname"),
             avatar=comment_item.get("avatar"),
@@ -174,7 +198,6 @@ class XhsDbStoreImplement(AbstractStore):
             parent_comment_id=comment_item.get("parent_comment_id"),
             like_count=str(comment_item.get("like_count"))
         )
-        session.add(comment)
 
     async def update_comment(self, session: AsyncSession, comment_item: Dict):
         comment_id = comment_item.get("comment_id")
@@ -26,6 +26,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 import config
 from base.base_crawler import AbstractStore
+from database.bulk_writer import bulk_write_enabled, get_bulk_buffer
 from database.db_session import get_session
 from database.models import ZhihuContent, ZhihuComment, ZhihuCreator
 from tools import utils, words
@@ -94,6 +95,9 @@ class ZhihuDbStoreImplement(AbstractStore):
             content_item: content item dict
         """
         content_id = content_item.get("content_id")
+        if bulk_write_enabled():
+            await get_bulk_buffer(ZhihuContent, ("content_id",)).add(content_item)
+            return
         async with get_session() as session:
             stmt = select(ZhihuContent).where(ZhihuContent.content_id == content_id)
             result = await session.execute(stmt)
@@ -113,6 +117,9 @@ class ZhihuDbStoreImplement(AbstractStore):
             comment_item: comment item dict
         """
         comment_id = comment_item.get("comment_id")
+        if bulk_write_enabled():
+            await get_bulk_buffer(ZhihuComment, ("comment_id",)).add(comment_item)
+            return
         async with get_session() as session:
             stmt = select(ZhihuComment).where(ZhihuComment.comment_id == comment_id)
             result = await session.execute(stmt)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import config
+from tools import async_file_writer
+from tools.async_file_writer import AsyncFileWriter, compact_jsonl_to_json, flush_jsonl_sinks, iter_jsonl
+
+
+class TestAsyncFileWriterJsonl(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmpdir.name)
+        async_file_writer._jsonl_sinks.clear()
+        self.patches = [
+            mock.patch.object(config, "JSON_WRITE_MODE", "jsonl"),
+            mock.patch.object(config, "JSONL_BUFFER_LINES", 4),
+            mock.patch.object(config, "ENABLE_GET_WORDCLOUD", False),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        async_file_writer._jsonl_sinks.clear()
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+
+    async def _read_jsonl(self, path):
+        return [item async for item in iter_jsonl(path)]
+
+    def test_concurrent_writers_append_every_item(self):
+        items = [{"comment_id": str(i), "content": f"评论{i}"} for i in range(37)]
+
+        async def scenario():
+            # 每次写入都新建 writer，与 store 工厂的用法一致
+            await asyncio.gather(*[
+                AsyncFileWriter("xhs", "search").write_single_item_to_json(item, "comments")
+                for item in items
+            ])
+            await flush_jsonl_sinks(export_json_array=False)
+            path = AsyncFileWriter("xhs", "search")._get_file_path("jsonl", "comments")
+            return await self._read_jsonl(path)
+
+        written = asyncio.run(scenario())
+        self.assertEqual(sorted(written, key=lambda x: int(x["comment_id"])), items)
+
+    def test_export_matches_legacy_array_format(self):
+        items = [{"note_id": "n1", "title": "标题", "tags": ["a", "b"]}, {"note_id": "n2", "nested": {"k": 1}}]
+
+        async def scenario():
+            writer = AsyncFileWriter("xhs", "search")
+            for item in items:
+                await writer.write_single_item_to_json(item, "contents")
+            await flush_jsonl_sinks(export_json_array=True)
+            with open(writer._get_file_path("json", "contents"), encoding="utf-8") as f:
+                return f.read()
+
+        exported = asyncio.run(scenario())
+        self.assertEqual(exported, json.dumps(items, ensure_ascii=False, indent=4))
+
+    def test_compact_empty_and_malformed_lines(self):
+        async def scenario():
+            with open("partial.jsonl", "w", encoding="utf-8") as f:
+                f.write('{"a": 1}\n\n{"a": 2}\n{"a": ')
+            count = await compact_jsonl_to_json("partial.jsonl", "partial.json")
+            with open("partial.json", encoding="utf-8") as f:
+                return count, json.load(f)
+
+        count, data = asyncio.run(scenario())
+        self.assertEqual(count, 2)
+        self.assertEqual(data, [{"a": 1}, {"a": 2}])
+
+    def test_legacy_array_is_migrated_before_appending(self):
+        async def scenario():
+            writer = AsyncFileWriter("dy", "search")
+            with mock.patch.object(config, "JSON_WRITE_MODE", "array"):
+                await writer.write_single_item_to_json({"id": 1}, "contents")
+            await writer.write_single_item_to_json({"id": 2}, "contents")
+            await flush_jsonl_sinks(export_json_array=True)
+            with open(writer._get_file_path("json", "contents"), encoding="utf-8") as f:
+                return json.load(f)
+
+        self.assertEqual(asyncio.run(scenario()), [{"id": 1}, {"id": 2}])
+
+    def test_iter_comments_streams_unflushed_jsonl(self):
+        async def scenario():
+            writer = AsyncFileWriter("wb", "search")
+            await writer.write_single_item_to_json({"content": "第一条"}, "comments")
+            await writer.write_single_item_to_json({"text": "第二条"}, "comments")
+            return [comment async for comment in writer._iter_comments()]
+
+        self.assertEqual(asyncio.run(scenario()), [{"content": "第一条"}, {"text": "第二条"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
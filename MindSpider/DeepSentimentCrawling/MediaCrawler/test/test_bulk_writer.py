@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import Index, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.bulk_writer import BulkUpsertBuffer
+from database.models import Base, DouyinAwemeComment, XhsNoteComment
+
+
+def _comment(comment_id, content, like_count="0", add_ts=1):
+    return {
+        "comment_id": comment_id,
+        "aweme_id": "a1",
+        "content": content,
+        "like_count": like_count,
+        "add_ts": add_ts,
+    }
+
+
+class TestBulkUpsertBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmpdir.name, "bulk.db")
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+
+    def tearDown(self):
+        asyncio.run(self.engine.dispose())
+        self.tmpdir.cleanup()
+
+    async def _create_tables(self, unique_comment_id=False):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            if unique_comment_id:
+                index = Index("uq_douyin_comment_id", DouyinAwemeComment.__table__.c.comment_id, unique=True)
+                await conn.run_sync(index.create)
+
+    async def _rows(self, model):
+        async with self.engine.connect() as conn:
+            result = await conn.execute(select(model.__table__).order_by(model.__table__.c.comment_id))
+            return [dict(row._mapping) for row in result]
+
+    def _run_upsert_roundtrip(self, unique_comment_id):
+        async def scenario():
+            await self._create_tables(unique_comment_id)
+            buffer = BulkUpsertBuffer(
+                DouyinAwemeComment, ("comment_id",), batch_size=1000, flush_interval=60, engine=self.engine
+            )
+            await buffer.add(_comment("c1", "first", add_ts=1))
+            await buffer.add(_comment("c2", "second", add_ts=1))
+            await buffer.add(_comment("c1", "first-edited", add_ts=2))
+            self.assertEqual(await buffer.flush(), 2)
+
+            await buffer.add(_comment("c2", "second-updated", like_count="9", add_ts=3))
+            await buffer.add(_comment("c3", "third", add_ts=3))
+            await buffer.flush()
+            self.assertEqual(buffer._native_upsert, unique_comment_id)
+            return await self._rows(DouyinAwemeComment)
+
+        rows = asyncio.run(scenario())
+        self.assertEqual([r["comment_id"] for r in rows], ["c1", "c2", "c3"])
+        self.assertEqual(rows[0]["content"], "first-edited")
+        self.assertEqual(rows[1]["content"], "second-updated")
+        self.assertEqual(rows[1]["like_count"], "9")
+        # add_ts 只在插入时写入
+        self.assertEqual([r["add_ts"] for r in rows], [1, 1, 3])
+
+    def test_fallback_without_unique_key(self):
+        self._run_upsert_roundtrip(unique_comment_id=False)
+
+    def test_native_upsert_with_unique_key(self):
+        self._run_upsert_roundtrip(unique_comment_id=True)
+
+    def test_update_columns_limit_updates(self):
+        async def scenario():
+            await self._create_tables()
+            buffer = BulkUpsertBuffer(
+                XhsNoteComment, ("comment_id",), update_columns=("like_count",),
+                batch_size=1000, flush_interval=60, engine=self.engine,
+            )
+            await buffer.add({"comment_id": "x1", "content": "original", "like_count": "1"})
+            await buffer.flush()
+            await buffer.add({"comment_id": "x1", "content": "changed", "like_count": "5"})
+            await buffer.flush()
+            return await self._rows(XhsNoteComment)
+
+        rows = asyncio.run(scenario())
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["content"], "original")
+        self.assertEqual(rows[0]["like_count"], "5")
+
+    def test_flushes_on_batch_size_and_interval(self):
+        async def scenario():
+            await self._create_tables()
+            buffer = BulkUpsertBuffer(
+                DouyinAwemeComment, ("comment_id",), batch_size=3, flush_interval=0.05, engine=self.engine
+            )
+            for idx in range(3):
+                await buffer.add(_comment(f"b{idx}", "x"))
+            self.assertEqual(buffer.rows_written, 3)
+            await buffer.add(_comment("b3", "x"))
+            await asyncio.sleep(0.2)
+            self.assertEqual(buffer.rows_written, 4)
+            return await self._rows(DouyinAwemeComment)
+
+        self.assertEqual(len(asyncio.run(scenario())), 4)
+
+    def test_bad_row_does_not_drop_batch(self):
+        async def scenario():
+            await self._create_tables()
+            buffer = BulkUpsertBuffer(
+                DouyinAwemeComment, ("comment_id",), batch_size=1000, flush_interval=60, engine=self.engine
+            )
+            await buffer.add(_comment("c1", "first"))
+            await buffer.flush()
+            existing_id = (await self._rows(DouyinAwemeComment))[0]["id"]
+
+            await buffer.add(_comment("c2", "second"))
+            # 主键冲突：整批事务回滚，逐行重试后只有这一行被丢弃
+            await buffer.add({**_comment("c3", "bad"), "id": existing_id})
+            await buffer.add(_comment("c4", "fourth"))
+            self.assertEqual(await buffer.flush(), 2)
+            self.assertEqual(buffer.rows_failed, 1)
+            self.assertEqual(buffer._pending, {})
+            return await self._rows(DouyinAwemeComment)
+
+        rows = asyncio.run(scenario())
+        self.assertEqual([r["comment_id"] for r in rows], ["c1", "c2", "c4"])
+
+    def test_transient_failure_requeues_rows(self):
+        async def scenario():
+            await self._create_tables()
+            buffer = BulkUpsertBuffer(
+                DouyinAwemeComment, ("comment_id",), batch_size=1000, flush_interval=60, engine=self.engine
+            )
+            real_write = buffer._write
+            calls = []
+
+            async def flaky_write(engine, rows):
+                calls.append(len(rows))
+                if len(calls) == 1:
+                    raise OperationalError("INSERT", {}, Exception("server has gone away"))
+                await real_write(engine, rows)
+
+            buffer._write = flaky_write
+            await buffer.add(_comment("c1", "first", add_ts=1))
+            await buffer.add(_comment("c2", "second", add_ts=1))
+            with self.assertRaises(OperationalError):
+                await buffer.flush()
+            self.assertEqual(len(buffer._pending), 2)
+
+            # 故障期间写入的同键新数据优先，add_ts 保留首次写入的值
+            await buffer.add(_comment("c2", "second-updated", add_ts=5))
+            self.assertEqual(await buffer.flush(), 2)
+            self.assertEqual(calls, [2, 2])
+            return await self._rows(DouyinAwemeComment)
+
+        rows = asyncio.run(scenario())
+        self.assertEqual([(r["comment_id"], r["content"], r["add_ts"]) for r in rows],
+                         [("c1", "first", 1), ("c2", "second-updated", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,12 +3,103 @@ import csv
 import json
 import os
 import pathlib
-from typing import Dict, List
+import textwrap
+from collections import Counter
+from typing import AsyncIterator, Dict, List, Optional
 import aiofiles
 import config
 from tools.utils import utils
 from tools.words import AsyncWordCloudGenerator
 
+
+class JsonlSink:
+    """
+    单个 JSON Lines 文件的追加写入缓冲
+    每条数据序列化为一行，攒够 buffer_lines 行后一次性追加到文件末尾，写入代价与文件已有大小无关。
+    同一文件在进程内只有一个 sink（各 store 实例共享），保证行不会交错。
+    """
+
+    def __init__(self, file_path: str, buffer_lines: int):
+        self.file_path = file_path
+        self.buffer_lines = max(1, buffer_lines)
+        self._buffer: List[str] = []
+        self._lock = asyncio.Lock()
+
+    async def append(self, item: Dict):
+        self._buffer.append(json.dumps(item, ensure_ascii=False) + "\n")
+        if len(self._buffer) >= self.buffer_lines:
+            await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            if not self._buffer:
+                return
+            lines, self._buffer = self._buffer, []
+            async with aiofiles.open(self.file_path, 'a', encoding='utf-8') as f:
+                await f.write(''.join(lines))
+
+
+_jsonl_sinks: Dict[str, JsonlSink] = {}
+
+
+async def iter_jsonl(file_path: str) -> AsyncIterator[Dict]:
+    """逐行读取 JSONL 文件，跳过空行和（进程中断导致的）不完整行"""
+    async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
+        async for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                utils.logger.warning(f"[iter_jsonl] Skip malformed line in {file_path}")
+
+
+async def compact_jsonl_to_json(jsonl_path: str, json_path: str) -> int:
+    """
+    把 JSONL 文件流式导出为旧版 JSON 数组文件（格式与 indent=4 的 json.dumps(list) 一致）
+    先写临时文件再替换，导出过程中不会留下半截的 JSON 文件。返回导出条数。
+    """
+    count = 0
+    tmp_path = f"{json_path}.tmp"
+    async with aiofiles.open(tmp_path, 'w', encoding='utf-8') as out:
+        await out.write('[')
+        async for item in iter_jsonl(jsonl_path):
+            body = textwrap.indent(json.dumps(item, ensure_ascii=False, indent=4), ' ' * 4)
+            await out.write((',\n' if count else '\n') + body)
+            count += 1
+        await out.write('\n]' if count else ']')
+    os.replace(tmp_path, json_path)
+    return count
+
+
+async def flush_jsonl_sinks(export_json_array: Optional[bool] = None) -> int:
+    """
+    落盘所有 JSONL 缓冲（爬虫结束时调用），按配置把每个 JSONL 文件导出为旧版 JSON 数组文件
+    返回导出的文件数
+    """
+    if export_json_array is None:
+        export_json_array = config.JSONL_EXPORT_JSON_ARRAY
+    exported = 0
+    for jsonl_path, sink in list(_jsonl_sinks.items()):
+        try:
+            await sink.flush()
+            if export_json_array:
+                await compact_jsonl_to_json(jsonl_path, _legacy_json_path(jsonl_path))
+                exported += 1
+        except Exception as e:
+            utils.logger.error(f"[flush_jsonl_sinks] Failed to flush {jsonl_path}: {e}")
+    return exported
+
+
+def _legacy_json_path(jsonl_path: str) -> str:
+    """data/{platform}/jsonl/x.jsonl -> data/{platform}/json/x.json"""
+    jsonl = pathlib.Path(jsonl_path)
+    json_dir = jsonl.parent.parent / 'json'
+    json_dir.mkdir(parents=True, exist_ok=True)
+    return str(json_dir / f"{jsonl.stem}.json")
+
+
 class AsyncFileWriter:
     def __init__(self, platform: str, crawler_type: str):
         self.lock = asyncio.Lock()
@@ -33,6 +124,10 @@ class AsyncFileWriter:
                 await writer.writerow(item)
 
     async def write_single_item_to_json(self, item: Dict, item_type: str):
+        if config.JSON_WRITE_MODE == "jsonl":
+            await self.append_jsonl(item, item_type)
+            return
+
         file_path = self._get_file_path('json', item_type)
         async with self.lock:
             existing_data = []
@@ -52,6 +147,56 @@ class AsyncFileWriter:
             async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
                 await f.write(json.dumps(existing_data, ensure_ascii=False, indent=4))
 
+    async def append_jsonl(self, item: Dict, item_type: str):
+        """以 JSON Lines 追加一条数据（经进程内共享的缓冲写入）"""
+        file_path = self._get_file_path('jsonl', item_type)
+        sink = _jsonl_sinks.get(file_path)
+        if sink is None:
+            sink = JsonlSink(file_path, config.JSONL_BUFFER_LINES)
+            _jsonl_sinks[file_path] = sink
+            await self._migrate_legacy_json(item_type, file_path)
+        await sink.append(item)
+
+    async def _migrate_legacy_json(self, item_type: str, jsonl_path: str):
+        """
+        当天已有旧版 JSON 数组文件而还没有 JSONL 文件时（例如切换写入模式前跑过一次），
+        先把旧数据转写为 JSONL，避免导出时覆盖丢失
+        """
+        json_path = self._get_file_path('json', item_type)
+        if os.path.exists(jsonl_path) or not os.path.exists(json_path) or os.path.getsize(json_path) == 0:
+            return
+        try:
+            async with aiofiles.open(json_path, 'r', encoding='utf-8') as f:
+                legacy_data = json.loads(await f.read())
+        except json.JSONDecodeError:
+            return
+        if not isinstance(legacy_data, list):
+            legacy_data = [legacy_data]
+        async with aiofiles.open(jsonl_path, 'a', encoding='utf-8') as f:
+            await f.write(''.join(json.dumps(item, ensure_ascii=False) + '\n' for item in legacy_data))
+
+    async def _iter_comments(self) -> AsyncIterator[Dict]:
+        """流式读取评论数据：优先读 JSONL，不存在时回退到旧版 JSON 数组文件"""
+        jsonl_path = self._get_file_path('jsonl', 'comments')
+        sink = _jsonl_sinks.get(jsonl_path)
+        if sink is not None:
+            await sink.flush()
+        if os.path.exists(jsonl_path) and os.path.getsize(jsonl_path) > 0:
+            async for comment in iter_jsonl(jsonl_path):
+                yield comment
+            return
+
+        json_path = self._get_file_path('json', 'comments')
+        if not os.path.exists(json_path) or os.path.getsize(json_path) == 0:
+            return
+        async with aiofiles.open(json_path, 'r', encoding='utf-8') as f:
+            content = await f.read()
+        comments_data = json.loads(content) if content else []
+        if not isinstance(comments_data, list):
+            comments_data = [comments_data]
+        for comment in comments_data:
+            yield comment
+
     async def generate_wordcloud_from_comments(self):
         """
         Generate wordcloud from comments data
@@ -64,33 +209,19 @@ class AsyncFileWriter:
             return
 
         try:
-            # Read comments from JSON file
-            comments_file_path = self._get_file_path('json', 'comments')
-            if not os.path.exists(comments_file_path) or os.path.getsize(comments_file_path) == 0:
-                utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No comments file found at {comments_file_path}")
-                return
-
-            async with aiofiles.open(comments_file_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                if not content:
-                    utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Comments file is empty")
-                    return
-
-                comments_data = json.loads(content)
-                if not isinstance(comments_data, list):
-                    comments_data = [comments_data]
-
-            # Filter comments data to only include 'content' field
+            # Stream comments and count words one by one, never holding the whole file in memory
             # Handle different comment data structures across platforms
-            filtered_data = []
-            for comment in comments_data:
+            word_freq = Counter()
+            comment_count = 0
+            async for comment in self._iter_comments():
                 if isinstance(comment, dict):
                     # Try different possible content field names
                     content_text = comment.get('content') or comment.get('comment_text') or comment.get('text') or ''
                     if content_text:
-                        filtered_data.append({'content': content_text})
+                        self.wordcloud_generator.update_word_freq(word_freq, content_text)
+                        comment_count += 1
 
-            if not filtered_data:
+            if not comment_count:
                 utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No valid comment content found")
                 return
 
@@ -99,9 +230,9 @@ class AsyncFileWriter:
             pathlib.Path(words_base_path).mkdir(parents=True, exist_ok=True)
             words_file_prefix = f"{words_base_path}/{self.crawler_type}_comments_{utils.get_current_date()}"
 
-            utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Generating wordcloud from {len(filtered_data)} comments")
-            await self.wordcloud_generator.generate_word_frequency_and_cloud(filtered_data, words_file_prefix)
+            utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Generating wordcloud from {comment_count} comments")
+            await self.wordcloud_generator.save_word_frequency_and_cloud(word_freq, words_file_prefix)
             utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Wordcloud generated successfully at {words_file_prefix}")
 
         except Exception as e:
-            utils.logger.error(f"[AsyncFileWriter.generate_wordcloud_from_comments] Error generating wordcloud: {e}")
\ No newline at end of file
+            utils.logger.error(f"[AsyncFileWriter.generate_wordcloud_from_comments] Error generating wordcloud: {e}")
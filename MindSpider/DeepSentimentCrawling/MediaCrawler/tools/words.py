@@ -12,6 +12,7 @@
 import asyncio
 import json
 import logging
+import os
 from collections import Counter
 
 import aiofiles
@@ -40,11 +41,19 @@ class AsyncWordCloudGenerator:
         with open(self.stop_words_file, 'r', encoding='utf-8') as f:
             return set(f.read().strip().split('\n'))
 
+    def update_word_freq(self, word_freq: Counter, text: str):
+        """对一段文本分词并累加到词频计数（便于逐条流式统计）"""
+        word_freq.update(
+            word for word in jieba.lcut(text) if word not in self.stop_words and len(word.strip()) > 0
+        )
+
     async def generate_word_frequency_and_cloud(self, data, save_words_prefix):
-        all_text = ' '.join(item['content'] for item in data)
-        words = [word for word in jieba.lcut(all_text) if word not in self.stop_words and len(word.strip()) > 0]
-        word_freq = Counter(words)
+        word_freq = Counter()
+        for item in data:
+            self.update_word_freq(word_freq, item['content'])
+        await self.save_word_frequency_and_cloud(word_freq, save_words_prefix)
 
+    async def save_word_frequency_and_cloud(self, word_freq: Counter, save_words_prefix):
         # Save word frequency to file
         freq_file = f"{save_words_prefix}_word_freq.json"
         async with aiofiles.open(freq_file, 'w', encoding='utf-8') as file:
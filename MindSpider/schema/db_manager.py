@@ -27,6 +27,28 @@ except ImportError:
 
 from config import settings
 
+# InsightEngine 话题搜索涉及的表及其文本列（与 MediaCrawlerDB.search_topic_globally 一致）
+# MySQL 为每张表建立一个覆盖全部列的 ngram FULLTEXT 索引，供 MATCH ... AGAINST 使用；
+# PostgreSQL 为每一列建立 pg_trgm GIN 索引，原有 LIKE '%词%' 查询可直接走索引
+FULLTEXT_SEARCH_COLUMNS = {
+    'bilibili_video': ['title', 'desc', 'source_keyword'],
+    'bilibili_video_comment': ['content'],
+    'douyin_aweme': ['title', 'desc', 'source_keyword'],
+    'douyin_aweme_comment': ['content'],
+    'kuaishou_video': ['title', 'desc', 'source_keyword'],
+    'kuaishou_video_comment': ['content'],
+    'weibo_note': ['content', 'source_keyword'],
+    'weibo_note_comment': ['content'],
+    'xhs_note': ['title', 'desc', 'tag_list', 'source_keyword'],
+    'xhs_note_comment': ['content'],
+    'zhihu_content': ['title', 'desc', 'content_text', 'source_keyword'],
+    'zhihu_comment': ['content'],
+    'tieba_note': ['title', 'desc', 'source_keyword'],
+    'tieba_comment': ['content'],
+    'daily_news': ['title'],
+}
+
+
 class DatabaseManager:
     def __init__(self):
         self.engine: Engine = None
@@ -199,8 +221,8 @@ class DatabaseManager:
         if news_data:
             data_recent_message += "每日新闻统计:"
             data_recent_message += "\n"
-            for date, count, platforms in news_data:
-                data_recent_message += f"  {date}: {count} 条新闻, {platforms} 个平台"
+            for crawl_date, count, platforms in news_data:
+                data_recent_message += f"  {crawl_date}: {count} 条新闻, {platforms} 个平台"
                 data_recent_message += "\n"
         
         # 最近的话题
@@ -220,8 +242,8 @@ class DatabaseManager:
         if topic_data:
             data_recent_message += "每日话题统计:"
             data_recent_message += "\n"
-            for date, count in topic_data:
-                data_recent_message += f"  {date}: {count} 个话题"
+            for extract_date, count in topic_data:
+                data_recent_message += f"  {extract_date}: {count} 个话题"
                 data_recent_message += "\n"
         logger.info(data_recent_message)
     
@@ -261,6 +283,55 @@ class DatabaseManager:
             cleanup_message += "\n"
         logger.info(cleanup_message)
 
+    def create_fulltext_indexes(self):
+        """为话题搜索相关表创建全文/三元组索引（已存在的索引会跳过）"""
+        index_message = ""
+        index_message += "\n" + "=" * 60
+        index_message += "创建全文搜索索引"
+        index_message += "=" * 60
+        index_message += "\n"
+
+        existing_tables = set(inspect(self.engine).get_table_names())
+        dialect = self.engine.dialect.name
+
+        with self.engine.begin() as conn:
+            if dialect == "postgresql":
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            elif dialect == "mysql":
+                rows = conn.execute(text(
+                    "SELECT DISTINCT TABLE_NAME, INDEX_NAME FROM information_schema.STATISTICS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND INDEX_TYPE = 'FULLTEXT'"
+                )).all()
+                existing_indexes = {(table, index) for table, index in rows}
+            else:
+                logger.error(f"不支持的数据库类型: {dialect}，仅支持 MySQL 与 PostgreSQL")
+                return
+
+        for table, columns in FULLTEXT_SEARCH_COLUMNS.items():
+            if table not in existing_tables:
+                index_message += f"  - {table:<25} 表不存在，跳过\n"
+                continue
+            try:
+                with self.engine.begin() as conn:
+                    if dialect == "mysql":
+                        index_name = f"ft_search_{table}"
+                        if (table, index_name) in existing_indexes:
+                            index_message += f"  - {table:<25} 已存在 {index_name}\n"
+                            continue
+                        column_sql = ", ".join(f"`{col}`" for col in columns)
+                        conn.execute(text(
+                            f"ALTER TABLE `{table}` ADD FULLTEXT INDEX `{index_name}` ({column_sql}) WITH PARSER ngram"
+                        ))
+                    else:
+                        for col in columns:
+                            conn.execute(text(
+                                f'CREATE INDEX IF NOT EXISTS "trgm_{table}_{col}" ON "{table}" USING gin ("{col}" gin_trgm_ops)'
+                            ))
+                index_message += f"  - {table:<25} 索引已就绪 ({', '.join(columns)})\n"
+            except Exception as e:
+                index_message += f"  - {table:<25} 创建失败: {e}\n"
+        logger.info(index_message)
+
 def main():
     parser = argparse.ArgumentParser(description="MindSpider数据库管理工具")
     parser.add_argument("--tables", action="store_true", help="显示所有表")
@@ -268,11 +339,12 @@ def main():
     parser.add_argument("--recent", type=int, default=7, help="显示最近N天的数据 (默认7天)")
     parser.add_argument("--cleanup", type=int, help="清理N天前的数据")
     parser.add_argument("--execute", action="store_true", help="执行实际清理操作")
+    parser.add_argument("--fulltext-index", action="store_true", help="为话题搜索表创建全文索引（MySQL ngram / PostgreSQL pg_trgm）")
     
     args = parser.parse_args()
     
     # 如果没有参数，显示所有信息
-    if not any([args.tables, args.stats, args.recent != 7, args.cleanup]):
+    if not any([args.tables, args.stats, args.recent != 7, args.cleanup, args.fulltext_index]):
         args.tables = True
         args.stats = True
     
@@ -285,11 +357,14 @@ def main():
         if args.stats:
             db_manager.show_statistics()
         
-        if args.recent != 7 or not any([args.tables, args.stats, args.cleanup]):
+        if args.recent != 7 or not any([args.tables, args.stats, args.cleanup, args.fulltext_index]):
             db_manager.show_recent_data(args.recent)
         
         if args.cleanup:
             db_manager.cleanup_old_data(args.cleanup, dry_run=not args.execute)
+
+        if args.fulltext_index:
+            db_manager.create_fulltext_indexes()
     
     finally:
         db_manager.close()
@@ -10,6 +10,8 @@ Report Agent主类。
 
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from copy import deepcopy
 from pathlib import Path
 from uuid import uuid4
@@ -30,6 +32,7 @@ from .nodes import (
     TemplateSelectionNode,
     ChapterGenerationNode,
     ChapterJsonParseError,
+    ChapterStreamAbortedError,
     ChapterContentError,
     ChapterValidationError,
     DocumentLayoutNode,
@@ -419,6 +422,8 @@ class ReportAgent:
             self.chapter_storage,
             fallback_llm_clients=self.json_rescue_clients,
             error_log_dir=self.config.JSON_ERROR_LOG_DIR,
+            stream_max_preamble_chars=self.config.CHAPTER_STREAM_MAX_PREAMBLE_CHARS,
+            stream_max_invalid_blocks=self.config.CHAPTER_STREAM_MAX_INVALID_BLOCKS,
         )
     
     def generate_report(
@@ -437,7 +442,7 @@ class ReportAgent:
         主要阶段：
             1. 归一化三引擎报告 + 论坛日志，并输出流式事件；
             2. 模板选择 → 模板切片 → 文档布局 → 篇幅规划；
-            3. 结合篇幅目标逐章调用LLM，遇到解析错误会自动重试；
+            3. 结合篇幅目标按并发宽度调度章节LLM调用，遇到解析错误会按章节自动重试；
             4. 将章节装订成Document IR，再交给HTML渲染器生成成品；
             5. 可选地将HTML/IR/状态落盘，并向外界回传路径信息。
 
@@ -630,14 +635,21 @@ class ReportAgent:
                     emit('stage', {'stage': 'graphrag_error', 'error': str(graph_error)})
             # ==================== GraphRAG 初始化结束 ====================
 
-            chapters = []
             chapter_max_attempts = max(
                 self._CONTENT_SPARSE_MIN_ATTEMPTS, self.config.CHAPTER_JSON_MAX_ATTEMPTS
             )
             total_chapters = len(sections)  # 总章节数
             completed_chapters = 0  # 已完成章节数
+            chapter_progress_lock = threading.Lock()
 
-            for section in sections:
+            def generate_chapter(section: TemplateSection) -> Dict[str, Any]:
+                """
+                生成单个章节（含GraphRAG查询、重试与稀疏兜底）。
+
+                章节之间只共享只读的 generation_context / word_plan / 知识图谱，
+                因此可以在线程池中并发执行；chunk 事件按 chapterId 区分。
+                """
+                nonlocal completed_chapters
                 logger.info(f"生成章节: {section.title}")
                 emit('chapter_status', {
                     'chapterId': section.chapter_id,
@@ -660,6 +672,14 @@ class ReportAgent:
                         'delta': delta
                     })
 
+                def block_callback(block_event: Dict[str, Any], meta: Dict[str, Any], section_ref: TemplateSection = section):
+                    """流式解析出完整block后推送，前端可先行渲染已校验通过的内容。"""
+                    emit('chapter_block', {
+                        'chapterId': meta.get('chapterId') or section_ref.chapter_id,
+                        'title': meta.get('title') or section_ref.title,
+                        **block_event
+                    })
+
                 chapter_payload: Dict[str, Any] | None = None
                 attempt = 1
                 best_sparse_candidate: Dict[str, Any] | None = None
@@ -716,7 +736,10 @@ class ReportAgent:
                             section,
                             chapter_context,  # 使用包含图谱结果的上下文
                             run_dir,
-                            stream_callback=chunk_callback
+                            stream_callback=chunk_callback,
+                            block_callback=block_callback,
+                            # 最后一次尝试不再提前中止，交给完整的修复/兜底流程
+                            stream_abort=attempt < chapter_max_attempts
                         )
                         break
                     except (AttributeError, TypeError, KeyError, IndexError, ValueError, json.JSONDecodeError) as structure_error:
@@ -760,6 +783,9 @@ class ReportAgent:
                         elif isinstance(structured_error, ChapterValidationError):
                             error_kind = "validation"
                             readable_label = "结构校验失败"
+                        elif isinstance(structured_error, ChapterStreamAbortedError):
+                            error_kind = "stream_aborted"
+                            readable_label = "流式校验提前中止"
                         else:
                             error_kind = "json_parse"
                             readable_label = "JSON解析失败"
@@ -839,14 +865,15 @@ class ReportAgent:
                     raise ChapterJsonParseError(
                         f"{section.title} 章节JSON在 {chapter_max_attempts} 次尝试后仍无法解析"
                     )
-                chapters.append(chapter_payload)
-                completed_chapters += 1  # 更新已完成章节数
-                # 计算当前进度：20% + 80% * (已完成章节数 / 总章节数)，四舍五入
-                chapter_progress = 20 + round(80 * completed_chapters / total_chapters)
-                emit('progress', {
-                    'progress': chapter_progress,
-                    'message': f'章节 {completed_chapters}/{total_chapters} 已完成'
-                })
+                # 并发完成时在锁内计数并推送，保证进度事件单调递增
+                with chapter_progress_lock:
+                    completed_chapters += 1  # 更新已完成章节数
+                    # 计算当前进度：20% + 80% * (已完成章节数 / 总章节数)，四舍五入
+                    chapter_progress = 20 + round(80 * completed_chapters / total_chapters)
+                    emit('progress', {
+                        'progress': chapter_progress,
+                        'message': f'章节 {completed_chapters}/{total_chapters} 已完成'
+                    })
                 completion_status = {
                     'chapterId': section.chapter_id,
                     'title': section.title,
@@ -857,6 +884,9 @@ class ReportAgent:
                     completion_status['warning'] = 'content_sparse_fallback'
                     completion_status['warningMessage'] = self._CONTENT_SPARSE_WARNING_TEXT
                 emit('chapter_status', completion_status)
+                return chapter_payload
+
+            chapters = self._run_chapter_schedule(sections, generate_chapter)
 
             document_ir = self.document_composer.build_document(
                 report_id,
@@ -891,6 +921,45 @@ class ReportAgent:
             emit('error', {'stage': 'agent_failed', 'message': str(e)})
             raise
     
+    def _run_chapter_schedule(
+        self,
+        sections: List[TemplateSection],
+        generate_chapter: Callable[[TemplateSection], Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        按配置的并发宽度调度章节生成，结果按模板顺序返回。
+
+        `CHAPTER_PARALLELISM` 为 1 时退化为逐章串行；否则使用有界线程池
+        （gevent 打过猴子补丁时线程即协程）。任一章节最终失败会取消尚未
+        开始的章节并向上抛出，与串行模式的失败语义一致。
+
+        参数:
+            sections: 模板切片得到的章节列表。
+            generate_chapter: 生成单章并返回章节JSON的回调。
+
+        返回:
+            list[dict]: 与 sections 顺序一致的章节JSON列表。
+        """
+        width = max(1, min(int(getattr(self.config, 'CHAPTER_PARALLELISM', 1) or 1), len(sections)))
+        if width == 1:
+            return [generate_chapter(section) for section in sections]
+
+        logger.info(f"章节并发生成: {len(sections)} 章，并发宽度 {width}")
+        results: Dict[int, Dict[str, Any]] = {}
+        executor = ThreadPoolExecutor(max_workers=width, thread_name_prefix="report-chapter")
+        futures = {
+            executor.submit(generate_chapter, section): index
+            for index, section in enumerate(sections)
+        }
+        try:
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown(wait=True)
+        return [results[index] for index in range(len(sections))]
+
     def _select_template(self, query: str, reports: List[Any], forum_logs: str, custom_template: str):
         """
         选择报告模板。
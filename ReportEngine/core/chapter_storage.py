@@ -8,6 +8,7 @@
 from __future__ import annotations
 
 import json
+import threading
 from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -67,6 +68,8 @@ class ChapterStorage:
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self._manifests: Dict[str, Dict[str, object]] = {}
+        # 章节可能并发生成，manifest 的读-改-写需要串行化
+        self._manifest_lock = threading.RLock()
 
     # ======== 会话与清单 ========
 
@@ -276,15 +279,16 @@ class ChapterStorage:
         内部会自动排序并写回缓存+磁盘。
         """
         key = self._key(run_dir)
-        manifest = self._manifests.get(key) or self._read_manifest(run_dir)
-        chapters: List[Dict[str, object]] = manifest.get("chapters", [])
-        chapters = [c for c in chapters if c.get("chapterId") != record.chapter_id]
-        chapters.append(record.to_dict())
-        chapters.sort(key=lambda x: x.get("order", 0))
-        manifest["chapters"] = chapters
-        manifest.setdefault("updatedAt", datetime.utcnow().isoformat() + "Z")
-        self._manifests[key] = manifest
-        self._write_manifest(run_dir, manifest)
+        with self._manifest_lock:
+            manifest = self._manifests.get(key) or self._read_manifest(run_dir)
+            chapters: List[Dict[str, object]] = manifest.get("chapters", [])
+            chapters = [c for c in chapters if c.get("chapterId") != record.chapter_id]
+            chapters.append(record.to_dict())
+            chapters.sort(key=lambda x: x.get("order", 0))
+            manifest["chapters"] = chapters
+            manifest.setdefault("updatedAt", datetime.utcnow().isoformat() + "Z")
+            self._manifests[key] = manifest
+            self._write_manifest(run_dir, manifest)
 
 
 __all__ = ["ChapterStorage", "ChapterRecord"]
@@ -265,6 +265,14 @@ def initialize_report_engine():
         except Exception as dep_err:
             logger.warning(f"依赖检测失败: {dep_err}")
 
+        # 在启动阶段预先 fork PDF 资产渲染进程，避免处理导出请求时从多线程进程中 fork
+        try:
+            from .renderers.asset_prerender import warm_asset_pool
+            workers = warm_asset_pool(settings.PDF_ASSET_WORKERS)
+            logger.info(f"PDF资产渲染进程池已就绪，进程数: {workers}")
+        except Exception as pool_err:
+            logger.warning(f"PDF资产渲染进程池预热失败: {pool_err}")
+
         return True
     except Exception as e:
         logger.exception(f"Report Engine初始化失败: {str(e)}")
@@ -876,7 +884,8 @@ def get_result(task_id: str):
         task_id: 任务ID。
 
     返回:
-        Response: JSON，包含HTML预览与文件路径。
+        Response: 报告HTML。inline 资源模式下直接返回生成时保存的HTML；
+            external 模式按IR流式渲染（整份结果写入渲染缓存，再次查看直接命中）。
     """
     try:
         task = _get_task(task_id)
@@ -893,6 +902,19 @@ def get_result(task_id: str):
                 'task': task.to_dict()
             }), 400
 
+        if settings.REPORT_ASSET_MODE != 'inline' and task.ir_file_path and os.path.exists(task.ir_file_path):
+            with open(task.ir_file_path, 'r', encoding='utf-8') as f:
+                document_ir = json.load(f)
+            from .renderers import HTMLRenderer, guard_render_stream
+            # 保存的HTML内联全部静态资源，网页查看时改为引用外链资源的版本
+            return Response(
+                stream_with_context(guard_render_stream(
+                    HTMLRenderer({'asset_mode': settings.REPORT_ASSET_MODE}).render_stream(document_ir),
+                    f"task_id={task_id}",
+                )),
+                mimetype='text/html'
+            )
+
         return Response(
             task.html_content,
             mimetype='text/html'
@@ -985,6 +1007,30 @@ def download_report(task_id: str):
         }), 500
 
 
+@report_bp.route('/assets/<asset_name>', methods=['GET'])
+def get_report_asset(asset_name: str):
+    """
+    提供报告引用的第三方库（external 资源模式）。
+
+    文件名带内容指纹，同一地址内容永不变化，因此允许浏览器/CDN 长期缓存。
+
+    参数:
+        asset_name: 带指纹的文件名，如 chart.3f2a1b9c0d.js。
+    """
+    from .renderers.static_assets import resolve_versioned_lib
+
+    asset_path = resolve_versioned_lib(asset_name)
+    if asset_path is None:
+        return jsonify({
+            'success': False,
+            'error': '静态资源不存在或版本已更新'
+        }), 404
+
+    response = send_file(asset_path, mimetype='application/javascript', max_age=365 * 24 * 3600)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
 @report_bp.route('/cancel/<task_id>', methods=['POST'])
 def cancel_task(task_id: str):
     """
@@ -5,7 +5,7 @@ GraphRAG 知识图谱模块
 典型用法：
 1) 使用 `StateParser`/`ForumParser` 解析三引擎 state JSON 与 forum.log；
 2) 调用 `GraphBuilder.build` 生成纯结构化的图对象；
-3) 通过 `GraphStorage.save/load` 持久化或读取图数据；
+3) 通过 `GraphStorage.save/load` 持久化或读取图数据（`GraphCatalog` 索引已保存的图谱）；
 4) 以 `QueryEngine` 在章节侧执行多轮图查询。
 """
 
@@ -13,6 +13,7 @@ from .state_parser import StateParser, ParsedState, ParsedSection, SearchRecord
 from .forum_parser import ForumParser, ForumEntry
 from .graph_builder import GraphBuilder
 from .graph_storage import GraphStorage, Graph, Node, Edge
+from .graph_catalog import GraphCatalog
 from .query_engine import QueryEngine, QueryParams, QueryResult
 
 __all__ = [
@@ -29,6 +30,7 @@ __all__ = [
     'Graph',
     'Node',
     'Edge',
+    'GraphCatalog',
     # 查询引擎
     'QueryEngine',
     'QueryParams',
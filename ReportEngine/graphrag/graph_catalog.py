@@ -0,0 +1,282 @@
+"""
+知识图谱目录索引
+
+GraphStorage 按报告ID查找、取最新图谱、列举图谱时原本要遍历章节目录下的全部运行目录，
+目录名对不上时还会逐个打开 graphrag.json 解析。报告越积越多，图谱相关接口也越来越慢。
+
+这里在章节目录下维护一个 SQLite 目录索引（graphrag_catalog.db），GraphStorage.save 时写入：
+- graphs：运行目录名、报告ID、创建时间、文件修改时间与统计信息；
+- aliases：归一化后的标识到运行目录的映射，包括目录名本身、目录名按分隔符切段后的连续片段
+  （如 report-b-20240101 登记 reportb、b20240101 等）以及文件内 task_id/report_id。
+查找全部走别名索引，不再访问文件系统，也不扫描整张表。已有的运行目录可用
+`python -m ReportEngine.scripts.rebuild_graph_catalog` 重建；索引文件不存在或由旧版本写入时首次访问会自动重建。
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+CATALOG_FILENAME = "graphrag_catalog.db"
+
+# 标识来源，查找优先级：目录名 > 目录名片段 > 文件内容（与旧的目录遍历逻辑一致）
+ALIAS_DIR = 0
+ALIAS_CONTENT = 1
+ALIAS_DIR_SEGMENT = 2
+
+# 索引结构版本（PRAGMA user_version），低于该版本的索引文件缺少目录名片段别名，需要重建
+CATALOG_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS graphs (
+    dir_name TEXT PRIMARY KEY,
+    report_id TEXT,
+    created_at TEXT,
+    mtime REAL NOT NULL,
+    stats TEXT
+);
+CREATE INDEX IF NOT EXISTS graphs_mtime ON graphs (mtime);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT NOT NULL,
+    kind INTEGER NOT NULL,
+    dir_name TEXT NOT NULL,
+    PRIMARY KEY (alias, kind, dir_name)
+);
+CREATE INDEX IF NOT EXISTS aliases_dir ON aliases (dir_name);
+"""
+
+_initialized_paths = set()
+_init_lock = threading.Lock()
+
+
+def normalize_identifier(value: Any) -> str:
+    """统一规约ID，去除分隔符便于模糊匹配。"""
+    return re.sub(r'[^a-zA-Z0-9]', '', str(value or '')).lower()
+
+
+def dir_name_segments(dir_name: str) -> List[str]:
+    """
+    目录名按分隔符切段后的全部连续片段（归一化）
+
+    替代旧逻辑中“目录名包含报告ID”的子串匹配：报告ID位于分隔符边界上时（如目录名为
+    报告ID加时间戳后缀），其归一化结果必然是某个连续片段，可以直接走别名索引。
+    """
+    parts = [part for part in re.split(r'[^a-zA-Z0-9]+', str(dir_name)) if part]
+    return sorted({
+        normalize_identifier(''.join(parts[start:end]))
+        for start in range(len(parts))
+        for end in range(start + 1, len(parts) + 1)
+    })
+
+
+def graph_identifiers(data: Dict[str, Any]) -> List[str]:
+    """图谱文件内可用于匹配报告的标识（task_id/report_id/metadata.report_id）"""
+    metadata = data.get('metadata')
+    candidates = [
+        data.get('task_id'),
+        data.get('report_id'),
+        metadata.get('report_id') if isinstance(metadata, dict) else None,
+    ]
+    return [str(candidate) for candidate in candidates if candidate]
+
+
+class GraphCatalog:
+    """
+    章节目录下图谱文件的 SQLite 索引
+
+    只记录运行目录名，路径由 chapters_dir/目录名/graphrag.json 拼出，章节目录整体迁移后仍可用。
+    索引中的目录被手动删除时，查找会顺带清理对应记录。
+    """
+
+    def __init__(self, chapters_dir: Path, graph_filename: str = "graphrag.json"):
+        self.chapters_dir = Path(chapters_dir)
+        self.graph_filename = graph_filename
+        self.db_path = self.chapters_dir / CATALOG_FILENAME
+
+    # ==================== 写入 ====================
+
+    def record(self, dir_name: str, data: Dict[str, Any], mtime: float) -> None:
+        """登记（或覆盖）一个运行目录下的图谱"""
+        with self._connect() as conn:
+            self._insert(conn, dir_name, data, mtime)
+
+    def remove(self, dir_name: str) -> None:
+        """删除一个运行目录的记录"""
+        with self._connect() as conn:
+            self._delete(conn, dir_name)
+
+    def rebuild(self) -> int:
+        """
+        遍历章节目录重建索引
+
+        Returns:
+            登记的图谱数量（无法解析的图谱文件会被跳过，与 list_all_graphs 一致）
+        """
+        entries = []
+        if self.chapters_dir.exists():
+            for run_dir in self.chapters_dir.iterdir():
+                graph_path = run_dir / self.graph_filename
+                if not run_dir.is_dir() or not graph_path.exists():
+                    continue
+                try:
+                    with open(graph_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    entries.append((run_dir.name, data, graph_path.stat().st_mtime))
+                except Exception:
+                    continue
+
+        with self._connect(create=True) as conn:
+            conn.execute("DELETE FROM aliases")
+            conn.execute("DELETE FROM graphs")
+            for dir_name, data, mtime in entries:
+                self._insert(conn, dir_name, data, mtime)
+            conn.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+        return len(entries)
+
+    # ==================== 查询 ====================
+
+    def find_by_report_id(self, report_id: str) -> Optional[Path]:
+        """
+        按报告ID查找图谱文件
+
+        优先级与旧的目录遍历一致：目录名归一化后相等 > 目录名在分隔符边界上包含报告ID
+        （兼容 _/- 差异，多个命中时取最新的）> 文件内 task_id/report_id 归一化后相等。
+        三步都是别名表上的等值查询，耗时与图谱数量无关。
+        """
+        normalized = normalize_identifier(report_id)
+        if not normalized:
+            return None
+        return self._first_existing(
+            lambda conn: self._dir_names(conn, "SELECT dir_name FROM aliases WHERE alias = ? AND kind = ?",
+                                         (normalized, ALIAS_DIR)),
+            lambda conn: self._dir_names(
+                conn,
+                "SELECT a.dir_name FROM aliases a JOIN graphs g ON g.dir_name = a.dir_name "
+                "WHERE a.alias = ? AND a.kind = ? ORDER BY g.mtime DESC",
+                (normalized, ALIAS_DIR_SEGMENT),
+            ),
+            lambda conn: self._dir_names(conn, "SELECT dir_name FROM aliases WHERE alias = ? AND kind = ?",
+                                         (normalized, ALIAS_CONTENT)),
+        )
+
+    def latest(self) -> Optional[Path]:
+        """文件修改时间最新的图谱"""
+        return self._first_existing(
+            lambda conn: self._dir_names(conn, "SELECT dir_name FROM graphs ORDER BY mtime DESC LIMIT 1", ()),
+            repeat=True,
+        )
+
+    def list_graphs(self) -> List[Dict[str, Any]]:
+        """全部图谱信息，按创建时间倒序"""
+        graphs = []
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT dir_name, report_id, created_at, stats FROM graphs ORDER BY created_at DESC"
+            ).fetchall()
+            for dir_name, report_id, created_at, stats in rows:
+                graph_path = self._graph_path(dir_name)
+                if not graph_path.exists():
+                    self._delete(conn, dir_name)
+                    continue
+                graphs.append({
+                    'path': str(graph_path),
+                    'report_id': report_id,
+                    'created_at': created_at,
+                    'stats': json.loads(stats) if stats else {},
+                    'dir_name': dir_name,
+                })
+        return graphs
+
+    # ==================== 内部工具 ====================
+
+    def _graph_path(self, dir_name: str) -> Path:
+        return self.chapters_dir / dir_name / self.graph_filename
+
+    def _first_existing(self, *queries, repeat: bool = False) -> Optional[Path]:
+        """按顺序执行查询，返回首个仍存在的图谱文件；已删除的目录顺带从索引移除"""
+        with self._connect() as conn:
+            for query in queries:
+                while True:
+                    stale = False
+                    for dir_name in query(conn):
+                        graph_path = self._graph_path(dir_name)
+                        if graph_path.exists():
+                            return graph_path
+                        self._delete(conn, dir_name)
+                        stale = True
+                    if not (repeat and stale):
+                        break
+        return None
+
+    @staticmethod
+    def _dir_names(conn: sqlite3.Connection, sql: str, params: tuple) -> List[str]:
+        return [row[0] for row in conn.execute(sql, params).fetchall()]
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, dir_name: str, data: Dict[str, Any], mtime: float) -> None:
+        GraphCatalog._delete(conn, dir_name)
+        conn.execute(
+            "INSERT INTO graphs (dir_name, report_id, created_at, mtime, stats) VALUES (?, ?, ?, ?, ?)",
+            (
+                dir_name,
+                data.get('task_id', dir_name),
+                data.get('created_at'),
+                mtime,
+                json.dumps(data.get('stats', {}), ensure_ascii=False),
+            ),
+        )
+        aliases = {(normalize_identifier(dir_name), ALIAS_DIR)}
+        aliases.update((segment, ALIAS_DIR_SEGMENT) for segment in dir_name_segments(dir_name))
+        aliases.update((normalize_identifier(value), ALIAS_CONTENT) for value in graph_identifiers(data))
+        conn.executemany(
+            "INSERT OR IGNORE INTO aliases (alias, kind, dir_name) VALUES (?, ?, ?)",
+            [(alias, kind, dir_name) for alias, kind in aliases if alias],
+        )
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, dir_name: str) -> None:
+        conn.execute("DELETE FROM aliases WHERE dir_name = ?", (dir_name,))
+        conn.execute("DELETE FROM graphs WHERE dir_name = ?", (dir_name,))
+
+    def _outdated(self) -> bool:
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0] < CATALOG_VERSION
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self, create: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        打开索引数据库（每次操作独立连接，Flask 与报告生成进程可并发读写）
+
+        索引文件不存在或由旧版本写入时先遍历章节目录重建。
+        """
+        self.chapters_dir.mkdir(parents=True, exist_ok=True)
+        key = str(self.db_path.resolve())
+        if not create and (not self.db_path.exists() or (key not in _initialized_paths and self._outdated())):
+            self.rebuild()
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        try:
+            if create or key not in _initialized_paths:
+                with _init_lock:
+                    conn.executescript(_SCHEMA)
+                    _initialized_paths.add(key)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+__all__ = [
+    "CATALOG_FILENAME",
+    "GraphCatalog",
+    "dir_name_segments",
+    "graph_identifiers",
+    "normalize_identifier",
+]
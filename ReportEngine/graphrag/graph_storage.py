@@ -6,11 +6,15 @@
 
 from dataclasses import dataclass, field
 from typing import Dict, Any, List, Optional, Set
-import re
 from datetime import datetime
 import json
 from pathlib import Path
 import hashlib
+import sqlite3
+
+from loguru import logger
+
+from .graph_catalog import GraphCatalog, graph_identifiers, normalize_identifier
 
 
 @dataclass
@@ -111,13 +115,17 @@ class Graph:
     知识图谱
     
     仅负责存储节点/边与邻接表，不依赖外部数据库，便于在章节侧内存查询。
-    邻接表 _adjacency 用于 QueryEngine 按深度扩展邻居节点。
+    邻接表 _adjacency 用于 QueryEngine 按深度扩展邻居节点；出边/入边表与按类型索引
+    让 get_edges_from/get_edges_to/get_nodes_by_type 不再扫描全图。
     """
     
     def __init__(self):
         self._nodes: Dict[str, Node] = {}
         self._edges: List[Edge] = []
         self._adjacency: Dict[str, Set[str]] = {}  # 邻接表
+        self._out_edges: Dict[str, List[Edge]] = {}  # 节点ID -> 出边
+        self._in_edges: Dict[str, List[Edge]] = {}  # 节点ID -> 入边
+        self._nodes_by_type: Dict[str, List[Node]] = {}  # 节点类型 -> 节点（按加入顺序）
         
     @property
     def nodes(self) -> Dict[str, Node]:
@@ -174,11 +182,27 @@ class Graph:
             attributes=attributes
         )
         
-        self._nodes[node_id] = node
-        self._adjacency[node_id] = set()
+        self._index_node(node)
         
         return node
     
+    def _index_node(self, node: Node) -> None:
+        """登记节点并更新按类型索引"""
+        self._nodes[node.id] = node
+        self._adjacency[node.id] = set()
+        self._nodes_by_type.setdefault(node.type, []).append(node)
+    
+    def _index_edge(self, edge: Edge) -> None:
+        """登记边并更新邻接表与出边/入边表"""
+        self._edges.append(edge)
+        self._out_edges.setdefault(edge.from_id, []).append(edge)
+        self._in_edges.setdefault(edge.to_id, []).append(edge)
+        # 更新邻接表
+        if edge.from_id in self._adjacency:
+            self._adjacency[edge.from_id].add(edge.to_id)
+        if edge.to_id in self._adjacency:
+            self._adjacency[edge.to_id].add(edge.from_id)
+    
     def get_node(self, node_id: str) -> Optional[Node]:
         """获取节点"""
         return self._nodes.get(node_id)
@@ -206,13 +230,7 @@ class Graph:
             attributes=attributes
         )
         
-        self._edges.append(edge)
-        
-        # 更新邻接表
-        if from_node.id in self._adjacency:
-            self._adjacency[from_node.id].add(to_node.id)
-        if to_node.id in self._adjacency:
-            self._adjacency[to_node.id].add(from_node.id)
+        self._index_edge(edge)
         
         return edge
     
@@ -223,21 +241,19 @@ class Graph:
     
     def get_edges_from(self, node_id: str) -> List[Edge]:
         """获取从指定节点出发的边"""
-        return [e for e in self._edges if e.from_id == node_id]
+        return list(self._out_edges.get(node_id, ()))
     
     def get_edges_to(self, node_id: str) -> List[Edge]:
         """获取指向指定节点的边"""
-        return [e for e in self._edges if e.to_id == node_id]
+        return list(self._in_edges.get(node_id, ()))
     
     def get_nodes_by_type(self, node_type: str) -> List[Node]:
         """按类型获取节点"""
-        return [n for n in self._nodes.values() if n.type == node_type]
+        return list(self._nodes_by_type.get(node_type, ()))
     
     def get_stats(self) -> Dict[str, int]:
         """获取图谱统计信息"""
-        type_counts = {}
-        for node in self._nodes.values():
-            type_counts[node.type] = type_counts.get(node.type, 0) + 1
+        type_counts = {node_type: len(nodes) for node_type, nodes in self._nodes_by_type.items() if nodes}
         
         return {
             'total_nodes': self.node_count,
@@ -278,18 +294,15 @@ class Graph:
         # 添加节点
         for node_data in data.get('nodes', []):
             node = Node.from_dict(node_data)
-            graph._nodes[node.id] = node
-            graph._adjacency[node.id] = set()
+            if node.id in graph._nodes:
+                # 重复ID以后出现的为准（与直接覆盖字典一致），同时替换类型索引中的旧节点
+                old = graph._nodes[node.id]
+                graph._nodes_by_type[old.type].remove(old)
+            graph._index_node(node)
         
         # 添加边
         for edge_data in data.get('edges', []):
-            edge = Edge.from_dict(edge_data)
-            graph._edges.append(edge)
-            # 更新邻接表
-            if edge.from_id in graph._adjacency:
-                graph._adjacency[edge.from_id].add(edge.to_id)
-            if edge.to_id in graph._adjacency:
-                graph._adjacency[edge.to_id].add(edge.from_id)
+            graph._index_edge(Edge.from_dict(edge_data))
         
         return graph
 
@@ -300,7 +313,8 @@ class GraphStorage:
     
     将 Graph 对象序列化为 JSON（graphrag.json），路径与 ChapterStorage 输出目录一致，
     便于 Web/Report 引擎共享。支持按报告ID查找、列举最新图谱，供 Flask API 或
-    GraphRAGQueryNode 直接读取。
+    GraphRAGQueryNode 直接读取。查找走章节目录下的 GraphCatalog 索引，索引不可用时
+    退回遍历运行目录。
     """
     
     FILENAME = "graphrag.json"
@@ -308,20 +322,15 @@ class GraphStorage:
     @staticmethod
     def _normalize_identifier(value: str) -> str:
         """统一规约ID，去除分隔符便于模糊匹配。"""
-        return re.sub(r'[^a-zA-Z0-9]', '', str(value or '')).lower()
+        return normalize_identifier(value)
 
     def _graph_file_matches(self, graph_path: Path, normalized_target: str) -> bool:
         """检查图文件中的 task_id/report_id 是否与目标匹配。"""
         try:
             with open(graph_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            candidates = [
-                data.get('task_id'),
-                data.get('report_id'),
-                data.get('metadata', {}).get('report_id') if isinstance(data.get('metadata'), dict) else None
-            ]
-            for candidate in candidates:
-                if candidate and self._normalize_identifier(candidate) == normalized_target:
+            for candidate in graph_identifiers(data):
+                if self._normalize_identifier(candidate) == normalized_target:
                     return True
         except Exception:
             return False
@@ -336,6 +345,25 @@ class GraphStorage:
         except ImportError:
             # 回退到默认值
             return Path("final_reports/chapters")
+
+    @property
+    def catalog(self) -> GraphCatalog:
+        """章节目录对应的图谱索引"""
+        return GraphCatalog(self.chapters_dir, self.FILENAME)
+
+    def rebuild_catalog(self) -> int:
+        """遍历章节目录重建图谱索引，返回登记的图谱数量"""
+        return self.catalog.rebuild()
+
+    def _register(self, file_path: Path, output: Dict[str, Any]) -> None:
+        """把章节目录下新保存的图谱写入索引（索引写入失败不影响保存结果）"""
+        run_dir = file_path.parent
+        try:
+            if run_dir.resolve().parent != self.chapters_dir.resolve():
+                return
+            self.catalog.record(run_dir.name, output, file_path.stat().st_mtime)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"知识图谱索引更新失败，将在下次重建时补齐: {e}")
     
     def save(self, graph: Graph, task_id: str, run_dir: Path) -> Path:
         """
@@ -362,6 +390,8 @@ class GraphStorage:
         with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(output, f, ensure_ascii=False, indent=2)
         
+        self._register(file_path, output)
+        
         return file_path
     
     def load(self, path: Path) -> Optional[Graph]:
@@ -409,7 +439,7 @@ class GraphStorage:
         工作方式：
         1) 优先匹配目录名是否含 report_id（兼容 _/- 差异）；
         2) 否则读取 graphrag.json 内 task_id/report_id 做兜底匹配；
-        适配 Agent 运行目录命名不一致的场景。
+        适配 Agent 运行目录命名不一致的场景。两步均由 GraphCatalog 索引完成。
         """
         # 在章节目录中搜索（与 ChapterStorage 保持一致）
         chapters_dir = self.chapters_dir
@@ -418,6 +448,14 @@ class GraphStorage:
         if not report_id:
             return None
 
+        try:
+            return self.catalog.find_by_report_id(report_id)
+        except sqlite3.Error as e:
+            logger.warning(f"知识图谱索引不可用，改为遍历目录查找: {e}")
+            return self._scan_graph_by_report_id(chapters_dir, report_id)
+
+    def _scan_graph_by_report_id(self, chapters_dir: Path, report_id: str) -> Optional[Path]:
+        """遍历运行目录查找图谱（索引不可用时的兜底）"""
         # 兼容不同分隔符（report-xxx 与 report_xxx）以及简化匹配
         normalized_target = self._normalize_identifier(report_id)
         alt_targets = {
@@ -465,6 +503,11 @@ class GraphStorage:
         if not chapters_dir.exists():
             return None
         
+        try:
+            return self.catalog.latest()
+        except sqlite3.Error as e:
+            logger.warning(f"知识图谱索引不可用，改为遍历目录查找: {e}")
+        
         latest_path = None
         latest_time = None
         
@@ -493,6 +536,11 @@ class GraphStorage:
         if not chapters_dir.exists():
             return []
         
+        try:
+            return self.catalog.list_graphs()
+        except sqlite3.Error as e:
+            logger.warning(f"知识图谱索引不可用，改为遍历目录列举: {e}")
+        
         graphs = []
         for run_dir in chapters_dir.iterdir():
             if not run_dir.is_dir():
@@ -4,8 +4,11 @@
 支持基于关键词、节点类型、引擎来源和深度的知识图谱查询。
 """
 
+import threading
+import weakref
 from dataclasses import dataclass, field
-from typing import Dict, Any, List, Optional, Set
+from itertools import islice
+from typing import Dict, Any, Iterable, List, Optional, Set
 
 from .graph_storage import Graph, Node
 
@@ -69,6 +72,87 @@ class QueryResult:
         return summary[:max_length]
 
 
+def _search_text(node: Node) -> str:
+    """关键词匹配所用的小写搜索文本（名称/标题/搜索词/摘要）"""
+    search_text = f"{node.name} {node.get('title', '')} {node.get('query_text', '')} {node.get('summary', '')}"
+    return search_text.lower()
+
+
+class KeywordIndex:
+    """
+    节点搜索文本的 n-gram 倒排索引
+    
+    每个节点的搜索文本只小写化一次，按字符与相邻二元组建立倒排表。查找关键词时取其最稀有的
+    二元组的倒排表作为候选，再逐个做子串校验，结果与逐节点 `keyword in search_text` 完全一致，
+    耗时只与候选数量相关，而非图谱规模。中文没有空格分词，二元组同时适用于中英文。
+    
+    图谱只会追加节点（add_node 对重复ID返回已有节点），update 仅为新增节点建索引；
+    索引建立后修改节点属性不会被感知。
+    """
+    
+    def __init__(self):
+        self._nodes: List[Node] = []
+        self._texts: List[str] = []
+        self._chars: Dict[str, List[int]] = {}
+        self._bigrams: Dict[str, List[int]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._nodes)
+    
+    def update(self, nodes: Iterable[Node]) -> None:
+        """为新增节点建立索引"""
+        for node in nodes:
+            position = len(self._nodes)
+            text = _search_text(node)
+            self._nodes.append(node)
+            self._texts.append(text)
+            for char in set(text):
+                self._chars.setdefault(char, []).append(position)
+            for gram in {text[i:i + 2] for i in range(len(text) - 1)}:
+                self._bigrams.setdefault(gram, []).append(position)
+    
+    def lookup(self, keyword: str) -> List[Node]:
+        """返回搜索文本包含该关键词（忽略大小写）的节点，按加入图谱的顺序"""
+        keyword = keyword.lower()
+        if not keyword:
+            return list(self._nodes)
+        if len(keyword) == 1:
+            return [self._nodes[i] for i in self._chars.get(keyword, ())]
+        
+        postings = []
+        for gram in {keyword[i:i + 2] for i in range(len(keyword) - 1)}:
+            posting = self._bigrams.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+        candidates = min(postings, key=len)
+        if len(keyword) == 2:
+            return [self._nodes[i] for i in candidates]
+        texts = self._texts
+        return [self._nodes[i] for i in candidates if keyword in texts[i]]
+
+
+_keyword_indexes: "weakref.WeakKeyDictionary[Graph, KeywordIndex]" = weakref.WeakKeyDictionary()
+_keyword_indexes_lock = threading.Lock()
+
+
+def get_keyword_index(graph: Graph) -> KeywordIndex:
+    """
+    获取图谱的关键词索引
+    
+    每个 Graph 对象只建一次索引，多个 QueryEngine（GraphRAGQueryNode 每章都会新建）共享；
+    图谱新增节点后按需补齐。
+    """
+    with _keyword_indexes_lock:
+        index = _keyword_indexes.get(graph)
+        if index is None:
+            index = KeywordIndex()
+            _keyword_indexes[graph] = index
+        if len(index) < graph.node_count:
+            index.update(islice(graph.nodes.values(), len(index), None))
+        return index
+
+
 class QueryEngine:
     """
     图查询引擎
@@ -115,9 +199,22 @@ class QueryEngine:
     def _match_keywords(self, params: QueryParams) -> Set[str]:
         """关键词匹配"""
         matched_ids = set()
+        keywords = self._normalize_keywords(params.keywords)
+        
+        if keywords:
+            # 倒排索引取候选，代价与命中数成正比
+            index = get_keyword_index(self.graph)
+            candidates: Dict[str, Node] = {}
+            for keyword in keywords:
+                for node in index.lookup(keyword):
+                    candidates[node.id] = node
+            nodes = candidates.values()
+        else:
+            # 无关键词时：只匹配 section 类型（避免返回整个图谱）
+            # 这样至少能获取到各引擎的段落摘要
+            nodes = self.graph.get_nodes_by_type('section')
         
-        # 使用 .values() 遍历 Node 对象，而非字典键
-        for node in self.graph.nodes.values():
+        for node in nodes:
             # 类型筛选
             if params.node_types and node.type not in params.node_types:
                 continue
@@ -128,36 +225,20 @@ class QueryEngine:
                 if node_engine and node_engine not in params.engine_filter:
                     continue
             
-            # 关键词匹配
-            if self._matches_keywords(node, params.keywords):
-                matched_ids.add(node.id)
+            matched_ids.add(node.id)
         
         return matched_ids
     
-    def _matches_keywords(self, node: Node, keywords: List[str]) -> bool:
-        """检查节点是否匹配关键词"""
+    @staticmethod
+    def _normalize_keywords(keywords: Any) -> List[str]:
+        """规范化关键词参数"""
         # 防御性检查：确保 keywords 为列表类型
         # 若传入字符串，逐字符迭代会导致单字符匹配（如 'a', 'e'），污染结果
         if isinstance(keywords, str):
-            keywords = [k.strip() for k in keywords.replace(',', ' ').split() if k.strip()]
-        elif not isinstance(keywords, list):
-            keywords = []
-        
-        if not keywords:
-            # 无关键词时：只匹配 section 类型（避免返回整个图谱）
-            # 这样至少能获取到各引擎的段落摘要
-            return node.type == 'section'
-        
-        # 构建搜索文本
-        search_text = f"{node.name} {node.get('title', '')} {node.get('query_text', '')} {node.get('summary', '')}"
-        search_text = search_text.lower()
-        
-        # 任一关键词匹配即可
-        for keyword in keywords:
-            if keyword.lower() in search_text:
-                return True
-        
-        return False
+            return [k.strip() for k in keywords.replace(',', ' ').split() if k.strip()]
+        if not isinstance(keywords, list):
+            return []
+        return keywords
     
     def _expand_depth(self, node_ids: Set[str], depth: int) -> Set[str]:
         """从匹配节点向外扩展指定深度"""
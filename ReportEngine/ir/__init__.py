@@ -14,6 +14,7 @@ from .schema import (
     ENGINE_AGENT_TITLES,
 )
 from .validator import IRValidator
+from .stream_parser import ChapterStreamParser, StreamedBlock
 
 __all__ = [
     "IR_VERSION",
@@ -23,4 +24,6 @@ __all__ = [
     "ALLOWED_INLINE_MARKS",
     "ENGINE_AGENT_TITLES",
     "IRValidator",
+    "ChapterStreamParser",
+    "StreamedBlock",
 ]
@@ -0,0 +1,241 @@
+"""
+章节JSON流式增量解析。
+
+章节LLM输出以delta形式陆续到达，原流程要等整段输出结束后才解析与校验，
+模型一旦早早偏离Schema，仍要等完整章节生成完毕才能重试。
+ChapterStreamParser 随delta增量扫描JSON（只维护字符串/转义状态与括号栈），
+章节 blocks 数组中的每个顶层元素一闭合就立即解析并交给 IRValidator 校验：
+完成的block可以提前推送给前端，输出已无法挽回时也能尽早中止本次生成。
+
+这里只负责“提前发现”，最终章节仍由节点在流结束后走完整的修复/校验流程。
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .validator import IRValidator
+
+# blocks 数组只认章节对象上的键：裸章节 {...} 或 {"chapter": {...}} 包裹两种形式
+_CHAPTER_KEY_PATHS = ([None], [None, "chapter"])
+_CLOSERS = {"}": "{", "]": "["}
+
+
+@dataclass
+class StreamedBlock:
+    """流式解析出的一个顶层block"""
+
+    index: int
+    raw: str
+    block: Optional[Dict[str, Any]] = None
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        return self.block is not None and not self.errors
+
+
+class ChapterStreamParser:
+    """
+    章节JSON增量解析器。
+
+    用法：每收到一段delta调用 feed，返回本段内新闭合的block；
+    abort_reason 非空时表示输出已不可恢复，调用方应中止流并重试。
+
+    判定“不可恢复”刻意从严，只覆盖流结束后的修复链也救不回来的情况：
+        - 开头超过 max_preamble_chars 个字符仍未出现JSON；
+        - 连续 max_invalid_blocks 个block无法解析为JSON或与上一个block完全重复（模型陷入循环）。
+    能解析但未通过 IRValidator 校验的block照常标记为不合格并推送，但不计入连续失败：
+    流结束后的结构修复（含LLM修复）通常能救回这类block。两个阈值为0时对应的检查关闭。
+    """
+
+    def __init__(
+        self,
+        validator: IRValidator,
+        block_repair: Optional[Callable[[str], str]] = None,
+        block_sanitizer: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None,
+        max_preamble_chars: int = 2000,
+        max_invalid_blocks: int = 3,
+    ):
+        """
+        Args:
+            validator: 用于逐块校验的IR校验器。
+            block_repair: 可选的文本修复函数，block直接解析失败时再试一次。
+            block_sanitizer: 可选的block规整函数，返回None表示该block无法使用。
+            max_preamble_chars: JSON开始前允许的最多字符数。
+            max_invalid_blocks: 允许连续出现的无法解析/重复block数量。
+        """
+        self.validator = validator
+        self.block_repair = block_repair
+        self.block_sanitizer = block_sanitizer
+        self.max_preamble_chars = max(0, int(max_preamble_chars or 0))
+        self.max_invalid_blocks = max(0, int(max_invalid_blocks or 0))
+
+        self.blocks: List[StreamedBlock] = []
+        self.abort_reason: Optional[str] = None
+
+        self._started = False
+        self._preamble_chars = 0
+        self._in_string = False
+        self._escaped = False
+        # 括号栈与每个容器开启时所属的键
+        self._stack: List[str] = []
+        self._stack_keys: List[Optional[str]] = []
+        self._blocks_depth: Optional[int] = None
+        self._blocks_closed = False
+        # 章节对象层级上最近的字符串与当前键
+        self._key_parts: Optional[List[str]] = None
+        self._last_string: Optional[str] = None
+        self._pending_key: Optional[str] = None
+        # 正在收集的block文本
+        self._block_parts: Optional[List[str]] = None
+        self._invalid_streak = 0
+        self._last_raw: Optional[str] = None
+
+    # ======== 对外接口 ========
+
+    def feed(self, delta: str) -> List[StreamedBlock]:
+        """扫描一段delta，返回其中新闭合的block（已中止时不再解析）"""
+        if self.abort_reason or not delta:
+            return []
+        completed: List[StreamedBlock] = []
+        block_start = 0 if self._block_parts is not None else None
+        key_start = 0 if self._key_parts is not None else None
+
+        for i, ch in enumerate(delta):
+            if not self._started:
+                if ch in "{[":
+                    self._started = True
+                else:
+                    self._preamble_chars += 1
+                    if self.max_preamble_chars and self._preamble_chars > self.max_preamble_chars:
+                        self.abort_reason = f"输出前 {self.max_preamble_chars} 个字符内未出现JSON"
+                        return completed
+                    continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if key_start is not None:
+                        self._key_parts.append(delta[key_start:i])
+                        self._last_string = "".join(self._key_parts)
+                        self._key_parts = None
+                        key_start = None
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._at_chapter_level():
+                    self._key_parts = []
+                    key_start = i + 1
+            elif ch == ":":
+                if self._at_chapter_level():
+                    self._pending_key = self._last_string
+            elif ch == ",":
+                self._pending_key = None
+            elif ch in "{[":
+                if self._in_blocks_array():
+                    self._block_parts = []
+                    block_start = i
+                self._stack.append(ch)
+                self._stack_keys.append(self._pending_key)
+                self._pending_key = None
+                if (
+                    ch == "["
+                    and self._blocks_depth is None
+                    and not self._blocks_closed
+                    and self._stack_keys[-1] == "blocks"
+                    and self._stack_keys[:-1] in _CHAPTER_KEY_PATHS
+                ):
+                    self._blocks_depth = len(self._stack)
+            elif ch in _CLOSERS:
+                # 与栈顶不匹配的多余括号直接忽略（流结束后的括号修复也会剔除它们）
+                if not self._stack or self._stack[-1] != _CLOSERS[ch]:
+                    continue
+                self._stack.pop()
+                self._stack_keys.pop()
+                self._pending_key = None
+                if self._blocks_depth is not None:
+                    if len(self._stack) < self._blocks_depth:
+                        self._blocks_depth = None
+                        self._blocks_closed = True
+                    elif len(self._stack) == self._blocks_depth and self._block_parts is not None:
+                        self._block_parts.append(delta[block_start:i + 1])
+                        raw = "".join(self._block_parts)
+                        self._block_parts = None
+                        block_start = None
+                        completed.append(self._finish_block(raw))
+                        if self.abort_reason:
+                            return completed
+
+        if self._block_parts is not None:
+            self._block_parts.append(delta[block_start:])
+        if self._key_parts is not None:
+            self._key_parts.append(delta[key_start:])
+        return completed
+
+    # ======== 内部工具 ========
+
+    def _at_chapter_level(self) -> bool:
+        """当前是否位于章节对象（或其外层包裹对象）的键值层级"""
+        return (
+            bool(self._stack)
+            and self._stack[-1] == "{"
+            and len(self._stack) <= 2
+            and self._block_parts is None
+        )
+
+    def _in_blocks_array(self) -> bool:
+        return self._blocks_depth is not None and len(self._stack) == self._blocks_depth
+
+    def _finish_block(self, raw: str) -> StreamedBlock:
+        """解析、规整并校验一个闭合的block，同时更新连续失败计数（只统计无法解析与重复的block）"""
+        streamed = StreamedBlock(index=len(self.blocks), raw=raw)
+        path = f"blocks[{streamed.index}]"
+        parsed = self._load_block(raw)
+        unrecoverable = []
+        if parsed is None:
+            unrecoverable.append(f"{path} 无法解析为JSON")
+        else:
+            if self.block_sanitizer:
+                parsed = self.block_sanitizer(parsed)
+            if parsed is None:
+                streamed.errors.append(f"{path} 不是合法的block")
+            else:
+                streamed.block = parsed
+                _, errors = self.validator.validate_block(parsed, path)
+                streamed.errors.extend(errors)
+        stripped = raw.strip()
+        if stripped == self._last_raw:
+            unrecoverable.append(f"{path} 与上一个block完全重复")
+        self._last_raw = stripped
+        streamed.errors.extend(unrecoverable)
+        self.blocks.append(streamed)
+
+        self._invalid_streak = self._invalid_streak + 1 if unrecoverable else 0
+        if self.max_invalid_blocks and self._invalid_streak >= self.max_invalid_blocks:
+            self.abort_reason = (
+                f"连续 {self._invalid_streak} 个block无法解析或重复: {'; '.join(unrecoverable)}"
+            )
+        return streamed
+
+    def _load_block(self, raw: str) -> Optional[Any]:
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            pass
+        if not self.block_repair:
+            return None
+        try:
+            return json.loads(self.block_repair(raw))
+        except (json.JSONDecodeError, ValueError, TypeError):
+            return None
+
+
+__all__ = ["ChapterStreamParser", "StreamedBlock"]
@@ -54,6 +54,12 @@ class IRValidator:
 
         return len(errors) == 0, errors
 
+    def validate_block(self, block: Any, path: str = "block") -> Tuple[bool, List[str]]:
+        """校验单个block，供流式生成时逐块检查"""
+        errors: List[str] = []
+        self._validate_block(block, path, errors)
+        return len(errors) == 0, errors
+
     # ======== 内部工具 ========
 
     def _validate_block(self, block: Any, path: str, errors: List[str]):
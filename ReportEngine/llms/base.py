@@ -7,7 +7,7 @@ Report Engine 默认的OpenAI兼容LLM客户端封装。
 
 import os
 import sys
-from typing import Any, Dict, Optional, Generator
+from typing import Any, Dict, List, Optional, Generator
 from loguru import logger
 
 from openai import OpenAI
@@ -46,6 +46,15 @@ except ImportError:
 
     LLM_RETRY_CONFIG = None
 
+from prompt_cache import (
+    CACHE_HINT_NONE,
+    PromptCacheStats,
+    build_messages,
+    create_stream_completion,
+    request_options,
+    stream_chunk_usage,
+)
+
 
 class LLMClient:
     """针对OpenAI Chat Completion API的轻量封装，统一Report Engine调用入口。"""
@@ -81,6 +90,7 @@ class LLMClient:
         if base_url:
             client_kwargs["base_url"] = base_url
         self.client = OpenAI(**client_kwargs)
+        self.cache_stats = PromptCacheStats()
 
     @with_retry(LLM_RETRY_CONFIG)
     def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
@@ -95,10 +105,7 @@ class LLMClient:
         Returns:
             去除首尾空白后的LLM响应文本
         """
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
+        messages = self._build_messages(system_prompt, user_prompt)
 
         allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty", "stream"}
         extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
@@ -111,8 +118,10 @@ class LLMClient:
                 messages=messages,
                 timeout=timeout,
                 **extra_params,
+                **request_options(self.model_name, system_prompt),
             )
 
+            self._record_usage(getattr(response, "usage", None))
             if response.choices and response.choices[0].message:
                 return self.validate_response(response.choices[0].message.content)
             return ""
@@ -138,7 +147,7 @@ class LLMClient:
 
                     response = deepseek_client.chat.completions.create(
                         model=deepseek_config["model_name"],
-                        messages=messages,
+                        messages=self._build_messages(system_prompt, user_prompt, cache_hint=CACHE_HINT_NONE),
                         timeout=timeout,
                         **extra_params,
                     )
@@ -167,10 +176,7 @@ class LLMClient:
         产出:
             str: 每次yield一段delta文本，方便上层实时渲染。
         """
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
+        messages = self._build_messages(system_prompt, user_prompt)
 
         allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty"}
         extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
@@ -180,18 +186,23 @@ class LLMClient:
         timeout = kwargs.pop("timeout", self.timeout)
 
         try:
-            stream = self.client.chat.completions.create(
+            stream = create_stream_completion(
+                self.client,
                 model=self.model_name,
                 messages=messages,
                 timeout=timeout,
                 **extra_params,
+                **request_options(self.model_name, system_prompt, stream=True),
             )
             
+            usage = None
             for chunk in stream:
+                usage = stream_chunk_usage(chunk) or usage
                 if chunk.choices and len(chunk.choices) > 0:
                     delta = chunk.choices[0].delta
                     if delta and delta.content:
                         yield delta.content
+            self._record_usage(usage)
         except Exception as e:
             logger.error(f"流式请求失败: {str(e)}")
             raise e
@@ -239,10 +250,7 @@ class LLMClient:
                         max_retries=0,
                     )
 
-                    messages = [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ]
+                    messages = self._build_messages(system_prompt, user_prompt, cache_hint=CACHE_HINT_NONE)
 
                     allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty"}
                     extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
@@ -276,6 +284,32 @@ class LLMClient:
             # 其他错误直接抛出
             raise
 
+    def _build_messages(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        cache_hint: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """编排消息：系统提示词在前，本次输入在后，便于服务商缓存稳定前缀"""
+        return build_messages(
+            system_prompt,
+            user_prompt,
+            cache_hint=cache_hint,
+        )
+
+    def _record_usage(self, usage: Any) -> None:
+        """记录本次调用的提示词与缓存命中token数"""
+        extracted = self.cache_stats.record(usage)
+        if extracted:
+            logger.debug(
+                f"[ReportEngine] LLM用量: 提示词 {extracted['prompt_tokens']} tokens，"
+                f"命中缓存 {extracted['cached_tokens']} tokens"
+            )
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """返回累计的提示词缓存命中统计"""
+        return self.cache_stats.snapshot()
+
     @staticmethod
     def validate_response(response: Optional[str]) -> str:
         """兜底处理None/空白字符串，防止上层逻辑崩溃"""
@@ -9,6 +9,7 @@ from .template_selection_node import TemplateSelectionNode
 from .chapter_generation_node import (
     ChapterGenerationNode,
     ChapterJsonParseError,
+    ChapterStreamAbortedError,
     ChapterContentError,
     ChapterValidationError,
 )
@@ -22,6 +23,7 @@ __all__ = [
     "TemplateSelectionNode",
     "ChapterGenerationNode",
     "ChapterJsonParseError",
+    "ChapterStreamAbortedError",
     "ChapterContentError",
     "ChapterValidationError",
     "DocumentLayoutNode",
@@ -8,9 +8,9 @@
 from __future__ import annotations
 
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
-import re
 from typing import Any, Dict, List, Tuple, Callable, Optional, Set
 
 from loguru import logger
@@ -20,6 +20,7 @@ from ..ir import (
     ALLOWED_BLOCK_TYPES,
     ALLOWED_INLINE_MARKS,
     ENGINE_AGENT_TITLES,
+    ChapterStreamParser,
     IRValidator,
 )
 from ..prompts import (
@@ -31,6 +32,7 @@ from ..prompts import (
     build_chapter_user_prompt,
 )
 from ..utils.json_parser import RobustJSONParser, JSONParseError
+from ..utils.json_repairer import REPAIR_MESSAGES, repair_json_text
 from .base_node import BaseNode
 
 try:
@@ -54,6 +56,18 @@ class ChapterJsonParseError(ValueError):
         self.raw_text = raw_text
 
 
+class ChapterStreamAbortedError(ChapterJsonParseError):
+    """
+    流式生成过程中判定输出已不可恢复、提前中止时抛出。
+
+    继承 ChapterJsonParseError，Agent 沿用JSON解析失败的重试流程。
+    """
+
+    def __init__(self, message: str, raw_text: Optional[str] = None, reason: str = ""):
+        super().__init__(message, raw_text=raw_text)
+        self.reason = reason
+
+
 class ChapterContentError(ValueError):
     """
     章节内容稀疏异常。
@@ -100,7 +114,6 @@ class ChapterGenerationNode(BaseNode):
         - 对block结构做容错修复，确保最终JSON可渲染。
     """
 
-    _COLON_EQUALS_PATTERN = re.compile(r'(":\s*)=')
     _LINE_BREAK_SENTINEL = "__LINE_BREAK__"
     _INLINE_MARK_ALIASES = {
         "strong": "bold",
@@ -139,6 +152,8 @@ class ChapterGenerationNode(BaseNode):
         storage: ChapterStorage,
         fallback_llm_clients: Optional[List[Tuple[str, Any]]] = None,
         error_log_dir: Optional[str | Path] = None,
+        stream_max_preamble_chars: int = 2000,
+        stream_max_invalid_blocks: int = 3,
     ):
         """
         记录LLM客户端/校验器/章节存储器，便于run方法调度。
@@ -147,6 +162,8 @@ class ChapterGenerationNode(BaseNode):
             llm_client: 实际调用大模型的客户端
             validator: IR结构校验器
             storage: 负责章节流式落盘的存储器
+            stream_max_preamble_chars: 流式输出开头允许的非JSON字符数，超出即中止（0 不检查）
+            stream_max_invalid_blocks: 流式校验允许连续出现的无法解析/重复block数，达到即中止（0 不检查）
         """
         super().__init__(llm_client, "ChapterGenerationNode")
         self.validator = validator
@@ -158,10 +175,14 @@ class ChapterGenerationNode(BaseNode):
         error_dir.mkdir(parents=True, exist_ok=True)
         self.error_log_dir = error_dir
         self._failed_block_counter = 0
+        # Agent 可能并发生成多个章节，运行级状态的切换与计数需加锁
+        self._state_lock = threading.Lock()
         self._active_run_id: Optional[str] = None
         self._rescue_attempted_labels: Dict[str, Set[str]] = {}
         self._skipped_placeholder_chapters: Set[str] = set()
         self._archived_failed_json: Dict[str, str] = {}
+        self.stream_max_preamble_chars = stream_max_preamble_chars
+        self.stream_max_invalid_blocks = stream_max_invalid_blocks
         # 兜底使用更鲁棒的JSON解析器，尽可能拆出合法块
         self._robust_parser = RobustJSONParser(
             enable_json_repair=True,
@@ -174,6 +195,8 @@ class ChapterGenerationNode(BaseNode):
         context: Dict[str, Any],
         run_dir: Path,
         stream_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        block_callback: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+        stream_abort: bool = True,
         **kwargs,
     ) -> Dict[str, Any]:
         """
@@ -184,6 +207,8 @@ class ChapterGenerationNode(BaseNode):
             context: Agent构造的共享上下文（主题、篇幅、布局等）。
             run_dir: 章节存盘目录，由 `ChapterStorage.start_session` 返回。
             stream_callback: 可选流式回调，将LLM delta 推送给前端。
+            block_callback: 可选回调，流式解析出完整block后立即推送（含校验结果）。
+            stream_abort: 是否允许流式校验判定输出不可恢复时提前中止（最后一次尝试应关闭）。
             **kwargs: 透传温度、top_p等采样参数。
 
         返回:
@@ -191,6 +216,7 @@ class ChapterGenerationNode(BaseNode):
 
         异常:
             ChapterJsonParseError: 多次尝试后仍无法解析合法JSON。
+            ChapterStreamAbortedError: 流式输出已不可恢复，提前中止。
             ChapterContentError: 正文密度不足或只有标题，需要触发重试。
         """
         chapter_meta = {
@@ -212,6 +238,8 @@ class ChapterGenerationNode(BaseNode):
             user_message,
             chapter_dir,
             stream_callback=stream_callback,
+            block_callback=block_callback,
+            stream_abort=stream_abort,
             section_meta=chapter_meta,
             graph_enhanced=graph_enhanced,
             **kwargs,
@@ -459,17 +487,25 @@ class ChapterGenerationNode(BaseNode):
         stream_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
         section_meta: Optional[Dict[str, Any]] = None,
         graph_enhanced: bool = False,
+        block_callback: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+        stream_abort: bool = True,
         **kwargs,
     ) -> str:
         """
         流式调用LLM并实时写入raw文件，同时通过回调将delta抛出。
 
+        每段delta同时喂给 ChapterStreamParser：blocks 中的元素一闭合就校验并经
+        block_callback 推送；判定输出不可恢复时关闭LLM流并抛出 ChapterStreamAbortedError，
+        不必等整章生成完毕再重试。
+
         参数:
             user_message: 拼装好的用户提示词。
             chapter_dir: 章节的本地缓存目录，用于存放 stream.raw。
             stream_callback: SSE流式推送的回调函数。
             section_meta: 附带的章节ID/标题，用于回调payload。
             graph_enhanced: 是否启用GraphRAG增强的系统提示词。
+            block_callback: 完整block的推送回调。
+            stream_abort: 是否允许提前中止。
             **kwargs: 透传温度、top_p等参数。
 
         返回:
@@ -483,6 +519,14 @@ class ChapterGenerationNode(BaseNode):
             system_prompt = SYSTEM_PROMPT_CHAPTER_JSON
         
         chunks: List[str] = []
+        meta = section_meta or {}
+        parser = ChapterStreamParser(
+            self.validator,
+            block_repair=self._repair_llm_json,
+            block_sanitizer=self._sanitize_streamed_block,
+            max_preamble_chars=self.stream_max_preamble_chars if stream_abort else 0,
+            max_invalid_blocks=self.stream_max_invalid_blocks if stream_abort else 0,
+        )
         with self.storage.capture_stream(chapter_dir) as stream_fp:
             stream = self.llm_client.stream_invoke(
                 system_prompt,
@@ -494,13 +538,45 @@ class ChapterGenerationNode(BaseNode):
                 stream_fp.write(delta)
                 chunks.append(delta)
                 if stream_callback:
-                    meta = section_meta or {}
                     try:
                         stream_callback(delta, meta)
                     except Exception as callback_error:  # pragma: no cover - 仅记录，不阻断主流程
                         logger.warning(f"章节流式回调失败: {callback_error}")
+                for streamed in parser.feed(delta):
+                    if not block_callback:
+                        continue
+                    try:
+                        block_callback(
+                            {
+                                "index": streamed.index,
+                                "block": streamed.block,
+                                "valid": streamed.valid,
+                                "errors": streamed.errors,
+                            },
+                            meta,
+                        )
+                    except Exception as callback_error:  # pragma: no cover - 仅记录，不阻断主流程
+                        logger.warning(f"章节block回调失败: {callback_error}")
+                if parser.abort_reason:
+                    close = getattr(stream, "close", None)
+                    if callable(close):
+                        close()
+                    raw_text = "".join(chunks)
+                    raise ChapterStreamAbortedError(
+                        f"{meta.get('title') or '章节'} 流式输出已不可恢复，提前中止"
+                        f"（已接收 {len(raw_text)} 字符）: {parser.abort_reason}",
+                        raw_text=raw_text,
+                        reason=parser.abort_reason,
+                    )
         return "".join(chunks)
 
+    def _sanitize_streamed_block(self, block: Any) -> Optional[Dict[str, Any]]:
+        """按整章相同的规则规整单个流式block，无法使用时返回None"""
+        chapter = {"blocks": [block]}
+        self._sanitize_chapter_blocks(chapter)
+        blocks = chapter.get("blocks") or []
+        return blocks[0] if blocks else None
+
     def _attempt_cross_engine_json_rescue(
         self,
         section: TemplateSection,
@@ -565,12 +641,13 @@ class ChapterGenerationNode(BaseNode):
 
     def _ensure_run_state(self, run_id: str):
         """确保每次报告运行时的修复状态隔离，防止上一份任务的记录影响新任务。"""
-        if self._active_run_id == run_id:
-            return
-        self._active_run_id = run_id
-        self._rescue_attempted_labels = {}
-        self._skipped_placeholder_chapters = set()
-        self._archived_failed_json = {}
+        with self._state_lock:
+            if self._active_run_id == run_id:
+                return
+            self._active_run_id = run_id
+            self._rescue_attempted_labels = {}
+            self._skipped_placeholder_chapters = set()
+            self._archived_failed_json = {}
 
     def _archive_failed_output(self, section: TemplateSection, raw_text: str):
         """缓存当前章节的原始错误JSON，以便后续占位或人工使用。"""
@@ -724,8 +801,9 @@ class ChapterGenerationNode(BaseNode):
     ) -> Optional[Dict[str, str]]:
         """将无法解析的JSON文本落盘，便于在HTML中指向具体文件。"""
         try:
-            self._failed_block_counter += 1
-            entry_id = f"E{self._failed_block_counter:04d}"
+            with self._state_lock:
+                self._failed_block_counter += 1
+                entry_id = f"E{self._failed_block_counter:04d}"
             timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
             slug = section.slug or "section"
             filename = f"{timestamp}-{slug}-{entry_id}.json"
@@ -778,167 +856,11 @@ class ChapterGenerationNode(BaseNode):
         返回:
             str: 修复后的文本；若未做改动则返回原内容。
         """
-        repaired = text
-        mutated = False
-
-        new_text = self._COLON_EQUALS_PATTERN.sub(r"\1", repaired)
-        if new_text != repaired:
-            logger.warning("检测到章节JSON中的\":=\"字符，已自动移除多余的'='号")
-            repaired = new_text
-            mutated = True
-
-        repaired, escaped = self._escape_in_string_controls(repaired)
-        if escaped:
-            logger.warning("检测到章节JSON字符串中存在未转义的控制字符，已自动转换为转义序列")
-            mutated = True
-
-        repaired, balanced = self._balance_brackets(repaired)
-        if balanced:
-            logger.warning("检测到章节JSON括号不平衡，已自动补齐/剔除异常括号")
-            mutated = True
-
-        repaired, commas_fixed = self._fix_missing_commas(repaired)
-        if commas_fixed:
-            logger.warning("检测到章节JSON对象/数组之间缺少逗号，已自动补齐")
-            mutated = True
-
-        return repaired if mutated else text
-
-    def _escape_in_string_controls(self, text: str) -> Tuple[str, bool]:
-        """
-        将字符串字面量中的裸换行/制表符/控制字符替换为JSON合法的转义序列。
-        """
-        if not text:
-            return text, False
-
-        result: List[str] = []
-        in_string = False
-        escaped = False
-        mutated = False
-        control_map = {"\n": "\\n", "\r": "\\n", "\t": "\\t"}
-
-        for ch in text:
-            if escaped:
-                result.append(ch)
-                escaped = False
-                continue
-
-            if ch == "\\":
-                result.append(ch)
-                escaped = True
-                continue
-
-            if ch == '"':
-                result.append(ch)
-                in_string = not in_string
-                continue
-
-            if in_string and ch in control_map:
-                result.append(control_map[ch])
-                mutated = True
-                continue
-
-            if in_string and ord(ch) < 0x20:
-                result.append(f"\\u{ord(ch):04x}")
-                mutated = True
-                continue
-
-            result.append(ch)
-
-        return "".join(result), mutated
-
-    def _fix_missing_commas(self, text: str) -> Tuple[str, bool]:
-        """在对象/数组连续出现时自动补逗号"""
-        if not text:
-            return text, False
-
-        chars: List[str] = []
-        mutated = False
-        in_string = False
-        escaped = False
-        length = len(text)
-        i = 0
-        while i < length:
-            ch = text[i]
-            chars.append(ch)
-            if escaped:
-                escaped = False
-                i += 1
-                continue
-            if ch == "\\":
-                escaped = True
-                i += 1
-                continue
-            if ch == '"':
-                in_string = not in_string
-                i += 1
-                continue
-            if not in_string and ch in "}]":
-                j = i + 1
-                while j < length and text[j] in " \t\r\n":
-                    j += 1
-                if j < length:
-                    next_ch = text[j]
-                    if next_ch in "{[":
-                        chars.append(",")
-                        mutated = True
-            i += 1
-        return "".join(chars), mutated
-
-    def _balance_brackets(self, text: str) -> Tuple[str, bool]:
-        """尝试修复因LLM多写/少写括号导致的不平衡结构"""
-        if not text:
-            return text, False
-
-        result: List[str] = []
-        stack: List[str] = []
-        mutated = False
-        in_string = False
-        escaped = False
-
-        opener_map = {"{": "}", "[": "]"}
-
-        for ch in text:
-            if escaped:
-                result.append(ch)
-                escaped = False
-                continue
-
-            if ch == "\\":
-                result.append(ch)
-                escaped = True
-                continue
-
-            if ch == '"':
-                result.append(ch)
-                in_string = not in_string
-                continue
-
-            if in_string:
-                result.append(ch)
-                continue
-
-            if ch in "{[":
-                stack.append(ch)
-                result.append(ch)
-                continue
-
-            if ch in "}]":
-                if stack and ((ch == "}" and stack[-1] == "{") or (ch == "]" and stack[-1] == "[")):
-                    stack.pop()
-                    result.append(ch)
-                else:
-                    mutated = True
-                continue
-
-            result.append(ch)
-
-        while stack:
-            opener = stack.pop()
-            result.append(opener_map[opener])
-            mutated = True
-
-        return "".join(result), mutated
+        # 与 RobustJSONParser 共用单遍修复；章节IR的列表本身是二维的，不折叠方括号
+        repaired, fixes = repair_json_text(text)
+        for fix in fixes:
+            logger.warning(f"章节JSON修复: {REPAIR_MESSAGES[fix]}")
+        return repaired
 
     def _attempt_json_repair(self, text: str) -> str | None:
         """使用可选的json_repair库进一步修复复杂语法错误"""
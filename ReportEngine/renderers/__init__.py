@@ -4,7 +4,7 @@ Report Engine渲染器集合。
 提供 HTMLRenderer 和 PDFRenderer，支持HTML和PDF输出。
 """
 
-from .html_renderer import HTMLRenderer
+from .html_renderer import HTMLRenderer, guard_render_stream
 from .pdf_renderer import PDFRenderer
 from .pdf_layout_optimizer import (
     PDFLayoutOptimizer,
@@ -20,6 +20,7 @@ from .markdown_renderer import MarkdownRenderer
 
 __all__ = [
     "HTMLRenderer",
+    "guard_render_stream",
     "PDFRenderer",
     "MarkdownRenderer",
     "PDFLayoutOptimizer",
@@ -0,0 +1,388 @@
+"""
+PDF 资产预渲染：图表 SVG、词云 PNG、数学公式 SVG
+
+PDFRenderer 遍历 IR 时只登记渲染任务（AssetBatch），随后统一交给 AssetPrerenderer：
+- 先查按内容寻址的磁盘缓存，键为 widget 数据/props 或公式文本、渲染尺寸、主题与渲染器版本的哈希，
+  重复导出同一份报告时直接复用；
+- 未命中的任务在进程池中并行渲染（matplotlib 不是线程安全的，每个子进程各自持有转换器）。
+"""
+
+from __future__ import annotations
+
+import atexit
+import base64
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+ASSET_CHART = 'chart'
+ASSET_WORDCLOUD = 'wordcloud'
+ASSET_MATH = 'math'
+
+# 渲染参数或输出格式发生不兼容变化时递增，使旧缓存失效
+ASSET_CACHE_VERSION = 1
+
+_CACHE_SUFFIX = {ASSET_CHART: '.svg', ASSET_MATH: '.svg', ASSET_WORDCLOUD: '.png'}
+
+
+def renderer_fingerprint(font_path: str | None, theme: str = '') -> str:
+    """
+    渲染器指纹：字体、主题以及图表/公式转换器源码的哈希
+
+    转换器代码改动后指纹随之变化，缓存自动失效，无需手动清理。
+    """
+    digest = hashlib.sha256(f"v{ASSET_CACHE_VERSION}|{Path(font_path).name if font_path else ''}|{theme}".encode())
+    for module_file in ('chart_to_svg.py', 'math_to_svg.py', 'asset_prerender.py'):
+        try:
+            digest.update((Path(__file__).parent / module_file).read_bytes())
+        except OSError:
+            continue
+    return digest.hexdigest()[:16]
+
+
+def png_data_uri(png_bytes: bytes) -> str:
+    return f"data:image/png;base64,{base64.b64encode(png_bytes).decode('ascii')}"
+
+
+@dataclass
+class AssetJob:
+    """单个待渲染资产"""
+    kind: str
+    payload: Dict[str, Any]
+    key: str
+
+
+class AssetBatch:
+    """
+    一次导出中登记的全部渲染任务
+
+    提供与 ChartToSVGConverter / MathToSVG 同名的方法，遍历 IR 的代码可以原样调用；
+    返回值是资产键而非渲染结果，内容相同的资产只渲染一次。
+    """
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.jobs: Dict[str, AssetJob] = {}
+
+    def add(self, kind: str, payload: Dict[str, Any]) -> str:
+        canonical = json.dumps([kind, self.fingerprint, payload], sort_keys=True, ensure_ascii=False, default=str)
+        key = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        if key not in self.jobs:
+            self.jobs[key] = AssetJob(kind, payload, key)
+        return key
+
+    def convert_widget_to_svg(self, widget_data: Dict[str, Any], width: int = 800,
+                              height: int = 500, dpi: int = 100) -> str:
+        return self.add(ASSET_CHART, {
+            'widget': {
+                'widgetType': widget_data.get('widgetType', ''),
+                'data': widget_data.get('data', {}),
+                'props': widget_data.get('props', {}),
+            },
+            'width': width,
+            'height': height,
+            'dpi': dpi,
+        })
+
+    def convert_display_to_svg(self, latex: str) -> str:
+        return self.add(ASSET_MATH, {'latex': latex, 'display': True})
+
+    def convert_inline_to_svg(self, latex: str) -> str:
+        return self.add(ASSET_MATH, {'latex': latex, 'display': False})
+
+    def convert_wordcloud(self, frequencies: Dict[str, float]) -> str:
+        return self.add(ASSET_WORDCLOUD, {'frequencies': frequencies})
+
+
+class AssetCache:
+    """按资产键存放渲染结果的磁盘缓存（<dir>/<key[:2]>/<key>.svg|.png）"""
+
+    def __init__(self, cache_dir: str | Path):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, kind: str, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{_CACHE_SUFFIX[kind]}"
+
+    def get(self, kind: str, key: str) -> str | bytes | None:
+        path = self._path(kind, key)
+        try:
+            if kind == ASSET_WORDCLOUD:
+                return path.read_bytes()
+            return path.read_text(encoding='utf-8')
+        except OSError:
+            return None
+
+    def put(self, kind: str, key: str, content: str | bytes) -> None:
+        path = self._path(kind, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再原子替换，并发导出时不会读到半截文件
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content if isinstance(content, bytes) else content.encode('utf-8'))
+            os.replace(tmp_name, path)
+        except OSError as exc:
+            logger.warning(f"写入资产缓存失败 {path}: {exc}")
+
+
+# ====== 子进程中执行的渲染函数（模块级，便于进程池序列化） ======
+
+_worker_converters: Dict[str, Any] = {}
+
+
+def _get_worker_converter(kind: str, font_path: str | None):
+    converter = _worker_converters.get(kind)
+    if converter is None:
+        if kind == ASSET_CHART:
+            from .chart_to_svg import create_chart_converter
+            converter = create_chart_converter(font_path=font_path)
+        else:
+            from .math_to_svg import MathToSVG
+            converter = MathToSVG(font_size=16, color='black')
+        _worker_converters[kind] = converter
+    return converter
+
+
+def _render_wordcloud_png(frequencies: Dict[str, float], font_path: str | None) -> bytes:
+    from wordcloud import WordCloud
+
+    wc = WordCloud(
+        width=1000,
+        height=360,
+        background_color="white",
+        font_path=font_path,
+        prefer_horizontal=0.98,
+        random_state=42,
+        max_words=180,
+        collocations=False,
+    )
+    wc.generate_from_frequencies(frequencies)
+    buffer = io.BytesIO()
+    wc.to_image().save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def render_asset(kind: str, payload: Dict[str, Any], font_path: str | None) -> Tuple[str | bytes | None, float]:
+    """渲染单个资产，返回 (SVG字符串/PNG字节，失败为None, 耗时秒)"""
+    started = time.perf_counter()
+    try:
+        if kind == ASSET_CHART:
+            result = _get_worker_converter(kind, font_path).convert_widget_to_svg(
+                payload['widget'], width=payload['width'], height=payload['height'], dpi=payload['dpi']
+            )
+        elif kind == ASSET_MATH:
+            converter = _get_worker_converter(kind, font_path)
+            latex = payload['latex']
+            result = converter.convert_display_to_svg(latex) if payload['display'] else converter.convert_inline_to_svg(latex)
+        elif kind == ASSET_WORDCLOUD:
+            result = _render_wordcloud_png(payload['frequencies'], font_path)
+        else:
+            raise ValueError(f"未知资产类型: {kind}")
+    except Exception as exc:
+        logger.warning(f"渲染{kind}资产失败: {exc}")
+        result = None
+    return result, time.perf_counter() - started
+
+
+# ====== 进程池 ======
+
+# 按进程数登记的共享进程池。池在使用中从不关闭（其他导出可能正等待其中的任务），
+# 只有已损坏的池才会被移出登记表
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pool_lock = threading.Lock()
+# 服务进程在启动阶段预热进程池后置为 True，此后不再从多线程的服务进程中临时 fork
+_prefork_only = False
+
+
+def _fork_available() -> bool:
+    # spawn 会在子进程重新导入主模块（如 app.py），只在支持 fork 的平台启用进程池
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def resolve_asset_workers(workers: int) -> int:
+    """把配置的进程数（0 为自动）换算为实际进程数，不支持 fork 的平台固定为 1"""
+    if not _fork_available():
+        return 1
+    if workers <= 0:
+        return min(4, os.cpu_count() or 1)
+    return workers
+
+
+def _get_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """返回指定进程数的共享进程池；服务进程中未预热的规模返回 None，由调用方串行渲染"""
+    with _pool_lock:
+        pool = _pools.get(workers)
+        if pool is None and not _prefork_only:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+            _pools[workers] = pool
+        return pool
+
+
+def _discard_pool(workers: int, pool: ProcessPoolExecutor) -> None:
+    """移除已损坏的进程池；并发导出可能重复调用，只处理仍在登记表中的同一个池"""
+    with _pool_lock:
+        if _pools.get(workers) is not pool:
+            return
+        del _pools[workers]
+    pool.shutdown(wait=False)
+
+
+def _noop() -> None:
+    return None
+
+
+def warm_asset_pool(workers: int) -> int:
+    """
+    在服务启动阶段创建并预热资产渲染进程池，返回实际进程数
+
+    fork 启动方式下进程池在首次提交任务时一次性 fork 全部子进程；放在启动阶段完成，
+    避免之后在处理请求的多线程环境中 fork（其他线程持有的锁会被复制进子进程，可能死锁）。
+    预热后同一进程不再临时创建新的进程池，进程池损坏时导出改为串行渲染。
+    """
+    global _prefork_only
+    workers = resolve_asset_workers(workers)
+    if workers <= 1:
+        return 1
+    try:
+        pool = _get_pool(workers)
+        if pool is not None:
+            pool.submit(_noop).result()
+    except (BrokenProcessPool, OSError) as exc:
+        logger.warning(f"资产渲染进程池预热失败，PDF导出将串行渲染: {exc}")
+        workers = 1
+    _prefork_only = True
+    return workers
+
+
+def _shutdown_pools() -> None:
+    with _pool_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_shutdown_pools)
+
+
+@dataclass
+class AssetKindStats:
+    total: int = 0
+    cached: int = 0
+    rendered: int = 0
+    failed: int = 0
+    render_seconds: float = 0.0
+
+
+@dataclass
+class AssetRenderReport:
+    """一次导出的资产渲染统计"""
+    workers: int = 1
+    wall_seconds: float = 0.0
+    kinds: Dict[str, AssetKindStats] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        labels = {ASSET_CHART: '图表', ASSET_WORDCLOUD: '词云', ASSET_MATH: '公式'}
+        parts = []
+        for kind, stats in self.kinds.items():
+            parts.append(
+                f"{labels.get(kind, kind)} {stats.total} 个（缓存命中 {stats.cached}，渲染 {stats.rendered}，"
+                f"失败 {stats.failed}，渲染耗时 {stats.render_seconds:.2f}s）"
+            )
+        detail = '；'.join(parts) if parts else '无资产'
+        return f"{detail}；并行度 {self.workers}，总耗时 {self.wall_seconds:.2f}s"
+
+
+class AssetPrerenderer:
+    """经缓存与进程池渲染 AssetBatch 中的全部资产"""
+
+    def __init__(self, font_path: str | None, cache_dir: str | Path | None = None, workers: int = 0):
+        """
+        参数:
+            font_path: 中文字体路径（图表与词云使用）
+            cache_dir: 资产缓存目录，为空则不缓存
+            workers: 渲染进程数，0 为按CPU自动（最多4个），1 为在当前进程串行渲染；
+                进程池规模只由该参数决定，与单次导出的资产数量无关
+        """
+        self.font_path = font_path
+        self.cache = AssetCache(cache_dir) if cache_dir else None
+        self.workers = resolve_asset_workers(workers)
+
+    def render(self, batch: AssetBatch) -> Tuple[Dict[str, str | bytes], AssetRenderReport]:
+        """返回 (资产键 -> 渲染结果, 统计)，渲染失败的资产不在结果中"""
+        started = time.perf_counter()
+        report = AssetRenderReport(workers=1)
+        results: Dict[str, str | bytes] = {}
+        pending = []
+
+        for job in batch.jobs.values():
+            stats = report.kinds.setdefault(job.kind, AssetKindStats())
+            stats.total += 1
+            cached = self.cache.get(job.kind, job.key) if self.cache else None
+            if cached:
+                results[job.key] = cached
+                stats.cached += 1
+            else:
+                pending.append(job)
+
+        if pending:
+            rendered, report.workers = self._render_pending(pending)
+            for job, (content, elapsed) in zip(pending, rendered):
+                stats = report.kinds[job.kind]
+                stats.render_seconds += elapsed
+                if content:
+                    results[job.key] = content
+                    stats.rendered += 1
+                    if self.cache:
+                        self.cache.put(job.kind, job.key, content)
+                else:
+                    stats.failed += 1
+
+        report.wall_seconds = time.perf_counter() - started
+        return results, report
+
+    def _render_pending(self, jobs: list) -> Tuple[list, int]:
+        """返回 (与 jobs 一一对应的渲染结果, 实际并行度)"""
+        rendered = []
+        parallelism = 1
+        if self.workers > 1 and len(jobs) > 1:
+            pool = None
+            try:
+                pool = _get_pool(self.workers)
+                if pool is not None:
+                    futures = [pool.submit(render_asset, job.kind, job.payload, self.font_path) for job in jobs]
+                    parallelism = min(self.workers, len(jobs))
+                    for future in futures:
+                        rendered.append(future.result())
+            except (BrokenProcessPool, CancelledError, RuntimeError, OSError) as exc:
+                # 子进程崩溃、进程退出时任务被取消或池已关闭：剩余任务在当前进程串行补齐
+                logger.warning(f"资产渲染进程池不可用，剩余 {len(jobs) - len(rendered)} 个资产改为串行渲染: {exc}")
+                if isinstance(exc, BrokenProcessPool) and pool is not None:
+                    _discard_pool(self.workers, pool)
+        rendered.extend(render_asset(job.kind, job.payload, self.font_path) for job in jobs[len(rendered):])
+        return rendered, parallelism
+
+
+__all__ = [
+    "AssetBatch",
+    "AssetCache",
+    "AssetPrerenderer",
+    "AssetRenderReport",
+    "png_data_uri",
+    "render_asset",
+    "renderer_fingerprint",
+    "resolve_asset_workers",
+    "warm_asset_pool",
+]
@@ -17,7 +17,7 @@ import os
 import re
 import base64
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 from loguru import logger
 
 from ReportEngine.ir.schema import ENGINE_AGENT_TITLES
@@ -30,6 +30,14 @@ from ReportEngine.utils.chart_validator import (
 )
 from ReportEngine.utils.chart_repair_api import create_llm_repair_functions
 from ReportEngine.utils.chart_review_service import get_chart_review_service
+from ReportEngine.utils.config import settings
+from .static_assets import ASSET_MODE_EXTERNAL, ASSET_MODE_INLINE, versioned_lib_name
+from .render_cache import ChapterFragment, DocumentRender, RenderCache, content_hash, get_render_cache
+
+# 可缓存章节片段中的图表/标题ID占位（章节内序号），复用时按当前计数器偏移还原
+_DEFERRED_ID_PATTERN = re.compile(r"\x00(chart-config|chart|heading)-(\d+)\x00")
+# <head> 缓存时标题的占位，主题相同、标题不同的报告共享同一份CSS/脚本
+_HEAD_TITLE_SLOT = "<!--report-title-->"
 
 
 class HTMLRenderer:
@@ -42,12 +50,14 @@ class HTMLRenderer:
     """
 
     # ===== 渲染流程快速导览（便于定位注释） =====
-    # render(document_ir): 单一公开入口，负责重置状态并串联 _render_head / _render_body。
+    # render(document_ir): 公开入口，负责重置状态并串联 _render_head / _render_body。
+    # render_stream(document_ir): 同样的输出按 head/目录/章节/脚本 分段产出，供流式响应。
     # _render_head: 根据 themeTokens 构造 <head>，注入 CSS 变量、内联库与 CDN fallback。
     # _render_body: 组装页面骨架（页眉/header、目录/toc、章节/blocks、脚本注水）。
     # _render_header: 生成顶部按钮区域，按钮 ID 及事件在 _hydration_script 内绑定。
     # _render_widget: 处理 Chart.js/词云组件，先校验与修复数据，再写入 <script type="application/json"> 配置。
     # _hydration_script: 输出末尾 JS，负责按钮交互（主题切换/打印/导出）与图表实例化。
+    # render_cache: 整份文档/单章片段/主题CSS按内容哈希缓存，见 _render_chapter 与 _render_head。
 
     CALLOUT_ALLOWED_TYPES = {
         "paragraph",
@@ -85,7 +95,11 @@ class HTMLRenderer:
         - config: dict | None，供调用方临时覆盖主题/调试开关等，优先级最高；
           典型键值：
             - themeOverride: 覆盖元数据里的 themeTokens；
-            - enableDebug: bool，是否输出额外日志。
+            - enableDebug: bool，是否输出额外日志；
+            - asset_mode: "inline" 内联第三方库（离线可用）/ "external" 引用带指纹的静态资源。
+              默认 inline：写入磁盘、供下载或 file:// 打开的报告必须自包含；只有网页查看接口
+              显式传入 REPORT_ASSET_MODE；
+            - asset_url_prefix: 外链模式下静态资源的URL前缀，默认取 REPORT_ASSET_URL_PREFIX。
         内部状态：
         - self.document/metadata/chapters：保存一次渲染周期的 IR；
         - self.widget_scripts：收集图表配置 JSON，后续在 _render_body 尾部注水；
@@ -94,6 +108,8 @@ class HTMLRenderer:
         - self.chart_validation_stats：记录总量/修复来源/失败数量，便于日志审计。
         """
         self.config = config or {}
+        self.asset_mode = self.config.get("asset_mode") or ASSET_MODE_INLINE
+        self.asset_url_prefix = (self.config.get("asset_url_prefix") or settings.REPORT_ASSET_URL_PREFIX).rstrip("/")
         self.document: Dict[str, Any] = {}
         self.widget_scripts: List[str] = []
         self.chart_counter = 0
@@ -108,6 +124,8 @@ class HTMLRenderer:
         self.toc_rendered = False
         self.hero_kpi_signature: tuple | None = None
         self._current_chapter: Dict[str, Any] | None = None
+        self._fragment_context: str | None = None
+        self._deferred_element_ids = False
         self._lib_cache: Dict[str, str] = {}
         self._pdf_font_base64: str | None = None
 
@@ -207,13 +225,14 @@ class HTMLRenderer:
         cdn_url: str,
         check_expression: str,
         lib_name: str,
-        is_defer: bool = False
+        is_defer: bool = False,
+        src_url: str | None = None
     ) -> str:
         """
         构建带有CDN fallback机制的script标签
 
         策略：
-        1. 优先嵌入本地库代码
+        1. 优先嵌入本地库代码（外链模式下引用带指纹的本地静态资源）
         2. 添加检测脚本，验证库是否成功加载
         3. 如果检测失败，动态加载CDN版本作为备用
 
@@ -223,15 +242,20 @@ class HTMLRenderer:
             check_expression: JavaScript表达式，用于检测库是否加载成功
             lib_name: 库名称（用于日志输出）
             is_defer: 是否使用defer属性
+            src_url: 外链模式下本地库的地址，提供时不再嵌入inline_code
 
         返回:
             str: 完整的script标签HTML
         """
         defer_attr = ' defer' if is_defer else ''
 
-        if inline_code:
+        if src_url:
+            # 引用外链版本，并添加fallback检测
+            loader = f"""
+  <script{defer_attr} src="{src_url}"></script>"""
+        elif inline_code:
             # 嵌入本地库代码，并添加fallback检测
-            return f"""
+            loader = f"""
   <script{defer_attr}>
     // {lib_name} - 嵌入式版本
     try {{
@@ -239,7 +263,13 @@ class HTMLRenderer:
     }} catch (e) {{
       console.error('{lib_name}嵌入式加载失败:', e);
     }}
-  </script>
+  </script>"""
+        else:
+            # 本地文件读取失败，直接使用CDN
+            logger.warning(f"{lib_name}本地文件未找到或读取失败，将直接使用CDN")
+            return f'  <script{defer_attr} src="{cdn_url}"></script>'
+
+        return f"""{loader}
   <script{defer_attr}>
     // {lib_name} - CDN Fallback检测
     (function() {{
@@ -268,10 +298,34 @@ class HTMLRenderer:
       }}
     }})();
   </script>""".strip()
-        else:
-            # 本地文件读取失败，直接使用CDN
-            logger.warning(f"{lib_name}本地文件未找到或读取失败，将直接使用CDN")
-            return f'  <script{defer_attr} src="{cdn_url}"></script>'
+
+    def _build_lib_tag(
+        self,
+        filename: str,
+        cdn_url: str,
+        check_expression: str,
+        lib_name: str,
+        is_defer: bool = False
+    ) -> str:
+        """按资源模式构建 libs 目录下某个库的script标签（内联或引用带指纹的外链）"""
+        if self.asset_mode == ASSET_MODE_EXTERNAL:
+            versioned_name = versioned_lib_name(filename)
+            if versioned_name:
+                return self._build_script_with_fallback(
+                    inline_code="",
+                    cdn_url=cdn_url,
+                    check_expression=check_expression,
+                    lib_name=lib_name,
+                    is_defer=is_defer,
+                    src_url=f"{self.asset_url_prefix}/{versioned_name}",
+                )
+        return self._build_script_with_fallback(
+            inline_code=self._load_lib(filename),
+            cdn_url=cdn_url,
+            check_expression=check_expression,
+            lib_name=lib_name,
+            is_defer=is_defer,
+        )
 
     # ====== 公共入口 ======
 
@@ -292,6 +346,76 @@ class HTMLRenderer:
         """
         self.document = document_ir or {}
 
+        # 同一份IR（含修复标记）再次渲染时直接复用整份HTML
+        cache = get_render_cache()
+        document_key, cached_render = self._lookup_cached_document(cache, ir_file_path)
+        if cached_render is not None:
+            return cached_render.html
+
+        html_document = "".join(self._render_document_parts(ir_file_path, cache))
+        if cache:
+            cache.put(
+                document_key,
+                DocumentRender(html_document, dict(self.chart_validation_stats)),
+                len(html_document),
+            )
+        return html_document
+
+    def render_stream(
+        self,
+        document_ir: Dict[str, Any],
+        ir_file_path: str | None = None
+    ) -> Iterator[str]:
+        """
+        与 render 输出相同的HTML，但按 <head>、页眉/目录、逐个章节、图表配置与注水脚本分段产出。
+
+        供Web接口做流式响应：首字节不必等整本报告渲染完。全部片段产出后拼接写入整份文档缓存，
+        再次查看同一份报告时直接整段返回；客户端中途断开时不写缓存。
+
+        参数:
+            document_ir: 由 DocumentComposer 生成的整本报告数据。
+            ir_file_path: 可选，IR 文件路径，提供时修复后会自动保存。
+
+        返回:
+            Iterator[str]: HTML片段，依次拼接即为完整文档。
+        """
+        self.document = document_ir or {}
+        cache = get_render_cache()
+        document_key, cached_render = self._lookup_cached_document(cache, ir_file_path)
+        if cached_render is not None:
+            yield cached_render.html
+            return
+
+        parts = []
+        for part in self._render_document_parts(ir_file_path, cache):
+            if cache:
+                parts.append(part)
+            yield part
+        if cache:
+            html_document = "".join(parts)
+            cache.put(
+                document_key,
+                DocumentRender(html_document, dict(self.chart_validation_stats)),
+                len(html_document),
+            )
+
+    def _lookup_cached_document(
+        self,
+        cache: RenderCache | None,
+        ir_file_path: str | None
+    ) -> tuple[str | None, DocumentRender | None]:
+        """按当前self.document计算整份文档缓存键并查找，命中时同步图表统计"""
+        if not cache:
+            return None, None
+        document_key = content_hash("document", self.document, ir_file_path, self.asset_mode, self.asset_url_prefix)
+        cached_render = cache.get(document_key)
+        if cached_render is not None:
+            self.chart_validation_stats.update(cached_render.chart_stats)
+            logger.info("HTMLRenderer: 文档内容未变化，复用已渲染的HTML")
+        return document_key, cached_render
+
+    def _render_document_parts(self, ir_file_path: str | None, cache: RenderCache | None) -> Iterator[str]:
+        """审查图表、准备渲染状态，并按顺序产出整份HTML的各个片段"""
         # 使用统一的 ChartReviewService 进行图表审查与修复
         # 修复结果会直接回写到 document_ir，避免多次渲染重复修复
         # review_document 返回本次会话的统计信息（线程安全）
@@ -326,14 +450,17 @@ class HTMLRenderer:
         title = metadata.get("title") or metadata.get("query") or "智能舆情报告"
         hero_kpis = (metadata.get("hero") or {}).get("kpis")
         self.hero_kpi_signature = self._kpi_signature_from_items(hero_kpis)
+        self._fragment_context = self._build_fragment_context(theme_tokens) if cache else None
 
-        head = self._render_head(title, theme_tokens)
-        body = self._render_body()
+        yield "<!DOCTYPE html>\n<html lang=\"zh-CN\" class=\"no-js\">\n"
+        yield self._render_head(title, theme_tokens)
+        yield "\n"
+        yield from self._render_body_parts()
 
         # 输出图表验证统计
         self._log_chart_validation_stats()
 
-        return f"<!DOCTYPE html>\n<html lang=\"zh-CN\" class=\"no-js\">\n{head}\n{body}\n</html>"
+        yield "\n</html>"
 
     # ====== 头部 / 正文 ======
 
@@ -374,6 +501,8 @@ class HTMLRenderer:
         """
         渲染<head>部分，加载主题CSS与必要的脚本依赖。
 
+        除标题外的内容只与主题有关，按 themeTokens 哈希缓存。
+
         参数:
             title: 页面title标签内容。
             theme_tokens: 主题变量，用于注入CSS。支持层级：
@@ -384,60 +513,63 @@ class HTMLRenderer:
         返回:
             str: head片段HTML。
         """
+        cache = get_render_cache()
+        head_key = content_hash("head", theme_tokens, self.asset_mode, self.asset_url_prefix) if cache else None
+        head_template = cache.get(head_key) if cache else None
+        if head_template is None:
+            head_template = self._render_head_template(theme_tokens)
+            if cache:
+                cache.put(head_key, head_template, len(head_template))
+        return head_template.replace(_HEAD_TITLE_SLOT, f"<title>{self._escape_html(title)}</title>", 1)
+
+    def _render_head_template(self, theme_tokens: Dict[str, Any]) -> str:
+        """生成<head>，标题位置留空（_HEAD_TITLE_SLOT），由 _render_head 填入"""
         css = self._build_css(theme_tokens)
 
-        # 加载第三方库
-        chartjs = self._load_lib("chart.js")
-        chartjs_sankey = self._load_lib("chartjs-chart-sankey.js")
-        html2canvas = self._load_lib("html2canvas.min.js")
-        jspdf = self._load_lib("jspdf.umd.min.js")
-        mathjax = self._load_lib("mathjax.js")
-        wordcloud2 = self._load_lib("wordcloud2.min.js")
-
-        # 生成嵌入式script标签，并为每个库添加CDN fallback机制
+        # 生成嵌入式（或外链）script标签，并为每个库添加CDN fallback机制
         # Chart.js - 主要图表库
-        chartjs_tag = self._build_script_with_fallback(
-            inline_code=chartjs,
+        chartjs_tag = self._build_lib_tag(
+            "chart.js",
             cdn_url="https://cdn.jsdelivr.net/npm/chart.js",
             check_expression="typeof Chart !== 'undefined'",
             lib_name="Chart.js"
         )
 
         # Chart.js Sankey插件
-        sankey_tag = self._build_script_with_fallback(
-            inline_code=chartjs_sankey,
+        sankey_tag = self._build_lib_tag(
+            "chartjs-chart-sankey.js",
             cdn_url="https://cdn.jsdelivr.net/npm/chartjs-chart-sankey@4",
             check_expression="typeof Chart !== 'undefined' && Chart.controllers && Chart.controllers.sankey",
             lib_name="chartjs-chart-sankey"
         )
 
         # wordcloud2 - 词云渲染
-        wordcloud_tag = self._build_script_with_fallback(
-            inline_code=wordcloud2,
+        wordcloud_tag = self._build_lib_tag(
+            "wordcloud2.min.js",
             cdn_url="https://cdnjs.cloudflare.com/ajax/libs/wordcloud2.js/1.2.2/wordcloud2.min.js",
             check_expression="typeof WordCloud !== 'undefined'",
             lib_name="wordcloud2"
         )
 
         # html2canvas - 用于截图
-        html2canvas_tag = self._build_script_with_fallback(
-            inline_code=html2canvas,
+        html2canvas_tag = self._build_lib_tag(
+            "html2canvas.min.js",
             cdn_url="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js",
             check_expression="typeof html2canvas !== 'undefined'",
             lib_name="html2canvas"
         )
 
         # jsPDF - 用于PDF导出
-        jspdf_tag = self._build_script_with_fallback(
-            inline_code=jspdf,
+        jspdf_tag = self._build_lib_tag(
+            "jspdf.umd.min.js",
             cdn_url="https://cdnjs.cloudflare.com/ajax/libs/jspdf/2.5.1/jspdf.umd.min.js",
             check_expression="typeof jspdf !== 'undefined'",
             lib_name="jsPDF"
         )
 
         # MathJax - 数学公式渲染
-        mathjax_tag = self._build_script_with_fallback(
-            inline_code=mathjax,
+        mathjax_tag = self._build_lib_tag(
+            "mathjax.js",
             cdn_url="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js",
             check_expression="typeof MathJax !== 'undefined'",
             lib_name="MathJax",
@@ -452,7 +584,7 @@ class HTMLRenderer:
   <meta charset="utf-8" />
   <meta http-equiv="X-UA-Compatible" content="IE=edge" />
   <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-  <title>{self._escape_html(title)}</title>
+  {_HEAD_TITLE_SLOT}
   {chartjs_tag}
   {sankey_tag}
   {wordcloud_tag}
@@ -489,13 +621,18 @@ class HTMLRenderer:
         返回:
             str: body片段HTML。
         """
+        return "".join(self._render_body_parts())
+
+    def _render_body_parts(self) -> Iterator[str]:
+        """
+        按输出顺序逐段产出<body>：页眉与目录、每个章节、图表配置JSON、注水脚本。
+
+        图表配置在章节渲染过程中收集，因此放在</main>之后输出，流式渲染时不需要回填。
+        """
         header = self._render_header()
         # cover = self._render_cover()  # 不再单独渲染cover
         hero = self._render_hero()
         toc_section = self._render_toc_section()
-        chapters = "".join(self._render_chapter(chapter) for chapter in self.chapters)
-        widget_scripts = "\n".join(self.widget_scripts)
-        hydration = self._hydration_script()
         overlay = """
 <div id="export-overlay" class="export-overlay no-print" aria-hidden="true">
   <div class="export-dialog" role="status" aria-live="assertive">
@@ -508,18 +645,11 @@ class HTMLRenderer:
 </div>
 """.strip()
 
-        return f"""
-<body>
-{header}
-{overlay}
-<main>
-{hero}
-{toc_section}
-{chapters}
-</main>
-{widget_scripts}
-{hydration}
-</body>""".strip()
+        yield f"<body>\n{header}\n{overlay}\n<main>\n{hero}\n{toc_section}\n"
+        for chapter in self.chapters:
+            yield self._render_chapter(chapter)
+        widget_scripts = "\n".join(self.widget_scripts)
+        yield f"\n</main>\n{widget_scripts}\n{self._hydration_script()}\n</body>"
 
     # ====== 页眉 / 元信息 / 目录 ======
 
@@ -1079,12 +1209,99 @@ class HTMLRenderer:
         """
         将章节blocks包裹进<section>，便于CSS控制。
 
+        启用渲染缓存时，章节IR与渲染上下文（主题、标题编号、目录状态等）均未变化则直接复用片段。
+
         参数:
             chapter: 单个章节JSON。
 
         返回:
             str: section包裹的HTML。
         """
+        cache = get_render_cache() if self._fragment_context else None
+        fragment_key = self._chapter_fragment_key(chapter) if cache else None
+        if fragment_key is None:
+            return self._render_chapter_section(chapter)
+
+        fragment = cache.get(fragment_key)
+        if fragment is None:
+            fragment = self._render_chapter_fragment(chapter)
+            cache.put(fragment_key, fragment, fragment.size)
+        return self._apply_chapter_fragment(fragment)
+
+    def _build_fragment_context(self, theme_tokens: Dict[str, Any]) -> str | None:
+        """
+        章节片段缓存键中与具体章节无关的部分。
+
+        匿名标题的锚点（heading-N）依赖全局计数，若有显式锚点恰好与之同名，则本次不缓存章节片段。
+        """
+        if any(str(anchor).startswith("heading-") for anchor in self.heading_label_map):
+            return None
+        return content_hash("chapter-context", theme_tokens, self.hero_kpi_signature)
+
+    def _chapter_fragment_key(self, chapter: Dict[str, Any]) -> str | None:
+        """计算章节片段的缓存键，无法安全缓存时返回None"""
+        chapter_json = json.dumps(chapter, sort_keys=True, ensure_ascii=False, default=str)
+        if "\\u0000" in chapter_json:
+            # 内容里的NUL会与ID占位混淆
+            return None
+        # 标题编号取决于章节在全文中的位置，只取本章出现过的锚点
+        labels = {
+            anchor: label
+            for anchor, label in self.heading_label_map.items()
+            if json.dumps(anchor, ensure_ascii=False) in chapter_json
+        }
+        toc_state = None
+        if '"type": "toc"' in chapter_json:
+            toc_state = [self.toc_rendered, self.toc_entries, self.metadata.get("toc")]
+        return content_hash("chapter", self._fragment_context, labels, toc_state, chapter_json)
+
+    def _render_chapter_fragment(self, chapter: Dict[str, Any]) -> ChapterFragment:
+        """以章节内序号渲染图表/标题ID，得到可在任意位置复用的片段"""
+        saved_state = (self.chart_counter, self.heading_counter, self.widget_scripts, self.toc_rendered)
+        self.chart_counter = 0
+        self.heading_counter = 0
+        self.widget_scripts = []
+        self._deferred_element_ids = True
+        try:
+            html_fragment = self._render_chapter_section(chapter)
+            return ChapterFragment(
+                html=html_fragment,
+                widget_scripts=self.widget_scripts,
+                chart_count=self.chart_counter,
+                heading_count=self.heading_counter,
+                toc_rendered=self.toc_rendered and not saved_state[3],
+            )
+        finally:
+            self.chart_counter, self.heading_counter, self.widget_scripts, _ = saved_state
+            self._deferred_element_ids = False
+
+    def _apply_chapter_fragment(self, fragment: ChapterFragment) -> str:
+        """把片段中的ID占位还原为全局序号，并同步计数器与图表配置脚本"""
+        chart_base, heading_base = self.chart_counter, self.heading_counter
+
+        def _restore(match: re.Match) -> str:
+            base = heading_base if match.group(1) == "heading" else chart_base
+            return f"{match.group(1)}-{base + int(match.group(2))}"
+
+        if fragment.chart_count or fragment.heading_count:
+            html_fragment = _DEFERRED_ID_PATTERN.sub(_restore, fragment.html)
+            scripts = [_DEFERRED_ID_PATTERN.sub(_restore, script) for script in fragment.widget_scripts]
+        else:
+            html_fragment, scripts = fragment.html, list(fragment.widget_scripts)
+        self.widget_scripts.extend(scripts)
+        self.chart_counter += fragment.chart_count
+        self.heading_counter += fragment.heading_count
+        self.toc_rendered = self.toc_rendered or fragment.toc_rendered
+        return html_fragment
+
+    def _element_id(self, prefix: str, index: int) -> str:
+        """生成图表/标题的DOM ID；渲染可缓存章节片段时输出占位"""
+        if self._deferred_element_ids:
+            return f"\x00{prefix}-{index}\x00"
+        return f"{prefix}-{index}"
+
+    def _render_chapter_section(self, chapter: Dict[str, Any]) -> str:
+        """实际渲染章节<section>"""
         section_id = self._escape_attr(chapter.get("anchor") or f"chapter-{chapter.get('chapterId', 'x')}")
         prev_chapter = self._current_chapter
         self._current_chapter = chapter
@@ -1190,7 +1407,7 @@ class HTMLRenderer:
             anchor_attr = self._escape_attr(anchor)
         else:
             self.heading_counter += 1
-            anchor = f"heading-{self.heading_counter}"
+            anchor = self._element_id("heading", self.heading_counter)
             anchor_attr = self._escape_attr(anchor)
         mapping = self.heading_label_map.get(anchor, {})
         display_text = mapping.get("display") or block.get("text", "")
@@ -2761,8 +2978,8 @@ class HTMLRenderer:
 
         # 渲染图表HTML
         self.chart_counter += 1
-        canvas_id = f"chart-{self.chart_counter}"
-        config_id = f"chart-config-{self.chart_counter}"
+        canvas_id = self._element_id("chart", self.chart_counter)
+        config_id = self._element_id("chart-config", self.chart_counter)
 
         props, normalized_data = self._prepare_widget_payload(block)
         payload = {
@@ -6533,4 +6750,31 @@ document.addEventListener('DOMContentLoaded', () => {
 """.strip()
 
 
-__all__ = ["HTMLRenderer"]
+def guard_render_stream(parts: Iterator[str], label: str = "") -> Iterator[str]:
+    """
+    包装 HTMLRenderer.render_stream 供Web接口流式响应，先取出第一个片段再开始响应。
+
+    IR加载、图表审查等前置步骤出错时异常在返回Response之前抛出，由接口按500处理；
+    响应头发出后再出错只能记录日志，并在已输出内容末尾追加提示，而不是静默截断。
+
+    参数:
+        parts: render_stream 返回的片段迭代器。
+        label: 写入日志的标识（如任务ID）。
+    """
+    first = next(parts, "")
+
+    def generate():
+        yield first
+        try:
+            yield from parts
+        except Exception as exc:
+            logger.exception(f"流式渲染报告中断 {label}: {exc}")
+            yield (
+                '<div role="alert" style="padding:16px;margin:16px;border:1px solid #e55353;color:#b42318;">'
+                '报告渲染中断，请刷新页面重试</div>'
+            )
+
+    return generate()
+
+
+__all__ = ["HTMLRenderer", "guard_render_stream"]
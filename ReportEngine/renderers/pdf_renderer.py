@@ -7,9 +7,9 @@ from __future__ import annotations
 
 import base64
 import copy
+import importlib.util
 import os
 import sys
-import io
 import re
 from pathlib import Path
 from typing import Any, Dict
@@ -71,13 +71,11 @@ from .html_renderer import HTMLRenderer
 from .pdf_layout_optimizer import PDFLayoutOptimizer, PDFLayoutConfig
 from .chart_to_svg import create_chart_converter
 from .math_to_svg import MathToSVG
+from .asset_prerender import AssetBatch, AssetPrerenderer, png_data_uri, render_asset, renderer_fingerprint
+from ReportEngine.utils.config import settings
 from ReportEngine.utils.chart_review_service import get_chart_review_service
-try:
-    from wordcloud import WordCloud
-    WORDCLOUD_AVAILABLE = True
-except ImportError:
-    WORDCLOUD_AVAILABLE = False
-    logger = logger  # ensure logger exists even before declaration
+# 词云在资产预渲染子进程中才导入，这里只检测依赖是否安装
+WORDCLOUD_AVAILABLE = importlib.util.find_spec("wordcloud") is not None
 
 
 class PDFRenderer:
@@ -128,6 +126,10 @@ class PDFRenderer:
             logger.warning(f"数学公式SVG转换器初始化失败: {e}，公式将显示为文本")
             self.math_converter = None
 
+        # 图表/词云/公式统一经缓存与进程池预渲染
+        self._asset_prerenderer: AssetPrerenderer | None = None
+        self.last_asset_report = None
+
     @staticmethod
     def _get_font_path() -> Path:
         """获取字体文件路径"""
@@ -194,62 +196,103 @@ class PDFRenderer:
         # 返回深拷贝，避免后续 SVG 转换过程影响回写后的原始 IR
         return copy.deepcopy(document_ir)
 
-    def _convert_charts_to_svg(self, document_ir: Dict[str, Any]) -> Dict[str, str]:
+    def _get_asset_prerenderer(self) -> AssetPrerenderer:
+        if self._asset_prerenderer is None:
+            self._asset_prerenderer = AssetPrerenderer(
+                font_path=str(self._get_font_path()),
+                cache_dir=self.config.get('asset_cache_dir', settings.PDF_ASSET_CACHE_DIR),
+                workers=self.config.get('asset_workers', settings.PDF_ASSET_WORKERS),
+            )
+        return self._asset_prerenderer
+
+    def _prerender_assets(
+        self,
+        document_ir: Dict[str, Any]
+    ) -> tuple[Dict[str, str], Dict[str, str], Dict[str, str]]:
+        """
+        收集并渲染PDF所需的全部图表、词云与数学公式
+
+        遍历IR时只登记任务，随后统一查缓存、在进程池中并行渲染未命中的部分。
+
+        返回:
+            (widgetId->图表SVG, widgetId->词云data URI, mathId->公式SVG)
         """
-        将document_ir中的所有图表转换为SVG
+        batch = AssetBatch(renderer_fingerprint(str(self._get_font_path()), settings.CHART_STYLE))
+        chart_keys = self._convert_charts_to_svg(document_ir, batch)
+        wordcloud_keys = self._convert_wordclouds_to_images(document_ir, batch)
+        math_keys = self._convert_math_to_svg(document_ir, batch)
+
+        results, report = self._get_asset_prerenderer().render(batch)
+        self.last_asset_report = report
+        logger.info(f"资产预渲染完成: {report.summary()}")
+
+        svg_map = {wid: results[key] for wid, key in chart_keys.items() if key in results}
+        wordcloud_map = {wid: png_data_uri(results[key]) for wid, key in wordcloud_keys.items() if key in results}
+        math_svg_map = {mid: results[key] for mid, key in math_keys.items() if key in results}
+        for label, keys, resolved in (('图表', chart_keys, svg_map), ('公式', math_keys, math_svg_map)):
+            if len(resolved) < len(keys):
+                logger.warning(f"{len(keys) - len(resolved)} 个{label}转换为SVG失败，将使用降级显示")
+        return svg_map, wordcloud_map, math_svg_map
+
+    def _convert_charts_to_svg(self, document_ir: Dict[str, Any], batch: AssetBatch) -> Dict[str, str]:
+        """
+        登记document_ir中所有图表的SVG渲染任务
 
         参数:
             document_ir: Document IR数据
+            batch: 资产任务集合
 
         返回:
-            Dict[str, str]: widgetId到SVG字符串的映射
+            Dict[str, str]: widgetId到资产键的映射
         """
-        svg_map = {}
+        key_map = {}
 
         if not hasattr(self, 'chart_converter') or not self.chart_converter:
             logger.warning("图表转换器未初始化，跳过图表转换")
-            return svg_map
+            return key_map
 
         # 遍历所有章节
         chapters = document_ir.get('chapters', [])
         for chapter in chapters:
             blocks = chapter.get('blocks', [])
-            self._extract_and_convert_widgets(blocks, svg_map)
+            self._extract_and_convert_widgets(blocks, key_map, batch)
 
-        logger.info(f"成功转换 {len(svg_map)} 个图表为SVG")
-        return svg_map
+        logger.info(f"共 {len(key_map)} 个图表待转换为SVG")
+        return key_map
 
-    def _convert_wordclouds_to_images(self, document_ir: Dict[str, Any]) -> Dict[str, str]:
+    def _convert_wordclouds_to_images(self, document_ir: Dict[str, Any], batch: AssetBatch) -> Dict[str, str]:
         """
-        将document_ir中的词云widget转换为PNG并返回data URI映射
+        登记document_ir中词云widget的PNG渲染任务，返回widgetId到资产键的映射
         """
-        img_map: Dict[str, str] = {}
+        key_map: Dict[str, str] = {}
 
         if not WORDCLOUD_AVAILABLE:
             logger.debug("wordcloud库未安装，词云将使用表格兜底")
-            return img_map
+            return key_map
 
         # 遍历所有章节
         chapters = document_ir.get('chapters', [])
         for chapter in chapters:
             blocks = chapter.get('blocks', [])
-            self._extract_wordcloud_widgets(blocks, img_map)
+            self._extract_wordcloud_widgets(blocks, key_map, batch)
 
-        if img_map:
-            logger.info(f"成功转换 {len(img_map)} 个词云为图片")
-        return img_map
+        if key_map:
+            logger.info(f"共 {len(key_map)} 个词云待转换为图片")
+        return key_map
 
     def _extract_and_convert_widgets(
         self,
         blocks: list,
-        svg_map: Dict[str, str]
+        svg_map: Dict[str, str],
+        converter: Any
     ) -> None:
         """
-        递归遍历blocks，找到所有widget并转换为SVG
+        递归遍历blocks，找到所有widget并交给converter转换为SVG
 
         参数:
             blocks: block列表
             svg_map: 用于存储转换结果的字典
+            converter: 提供convert_widget_to_svg的对象（AssetBatch登记任务并返回资产键）
         """
         for block in blocks:
             if not isinstance(block, dict):
@@ -279,7 +322,7 @@ class PDFRenderer:
                         )
                         continue
                     try:
-                        svg_content = self.chart_converter.convert_widget_to_svg(
+                        svg_content = converter.convert_widget_to_svg(
                             block,
                             width=800,
                             height=500,
@@ -287,7 +330,6 @@ class PDFRenderer:
                         )
                         if svg_content:
                             svg_map[widget_id] = svg_content
-                            logger.debug(f"图表 {widget_id} 转换为SVG成功")
                         else:
                             logger.warning(f"图表 {widget_id} 转换为SVG失败")
                     except Exception as e:
@@ -296,14 +338,14 @@ class PDFRenderer:
             # 递归处理嵌套的blocks
             nested_blocks = block.get('blocks')
             if isinstance(nested_blocks, list):
-                self._extract_and_convert_widgets(nested_blocks, svg_map)
+                self._extract_and_convert_widgets(nested_blocks, svg_map, converter)
 
             # 处理列表项
             if block_type == 'list':
                 items = block.get('items', [])
                 for item in items:
                     if isinstance(item, list):
-                        self._extract_and_convert_widgets(item, svg_map)
+                        self._extract_and_convert_widgets(item, svg_map, converter)
 
             # 处理表格单元格
             if block_type == 'table':
@@ -313,15 +355,16 @@ class PDFRenderer:
                     for cell in cells:
                         cell_blocks = cell.get('blocks', [])
                         if isinstance(cell_blocks, list):
-                            self._extract_and_convert_widgets(cell_blocks, svg_map)
+                            self._extract_and_convert_widgets(cell_blocks, svg_map, converter)
 
     def _extract_wordcloud_widgets(
         self,
         blocks: list,
-        img_map: Dict[str, str]
+        img_map: Dict[str, str],
+        batch: AssetBatch
     ) -> None:
         """
-        递归遍历blocks，找到词云widget并生成图片
+        递归遍历blocks，找到词云widget并登记图片渲染任务
         """
         for block in blocks:
             if not isinstance(block, dict):
@@ -339,23 +382,19 @@ class PDFRenderer:
                 ) or ('wordcloud' in props_type.lower())
 
                 if widget_id and is_wordcloud:
-                    try:
-                        data_uri = self._generate_wordcloud_image(block)
-                        if data_uri:
-                            img_map[widget_id] = data_uri
-                            logger.debug(f"词云 {widget_id} 转换为图片成功")
-                    except Exception as exc:
-                        logger.warning(f"生成词云图片失败 {widget_id}: {exc}")
+                    frequencies = self._wordcloud_frequencies(block)
+                    if frequencies:
+                        img_map[widget_id] = batch.convert_wordcloud(frequencies)
 
             nested_blocks = block.get('blocks')
             if isinstance(nested_blocks, list):
-                self._extract_wordcloud_widgets(nested_blocks, img_map)
+                self._extract_wordcloud_widgets(nested_blocks, img_map, batch)
 
             if block_type == 'list':
                 items = block.get('items', [])
                 for item in items:
                     if isinstance(item, list):
-                        self._extract_wordcloud_widgets(item, img_map)
+                        self._extract_wordcloud_widgets(item, img_map, batch)
 
             if block_type == 'table':
                 rows = block.get('rows', [])
@@ -364,7 +403,7 @@ class PDFRenderer:
                     for cell in cells:
                         cell_blocks = cell.get('blocks', [])
                         if isinstance(cell_blocks, list):
-                            self._extract_wordcloud_widgets(cell_blocks, img_map)
+                            self._extract_wordcloud_widgets(cell_blocks, img_map, batch)
 
     def _normalize_wordcloud_items(self, block: Dict[str, Any]) -> list:
         """
@@ -392,49 +431,38 @@ class PDFRenderer:
             normalized.append({'word': str(word), 'weight': weight_val, 'category': category})
         return normalized
 
-    def _generate_wordcloud_image(self, block: Dict[str, Any]) -> str | None:
+    def _wordcloud_frequencies(self, block: Dict[str, Any]) -> Dict[str, float]:
         """
-        生成词云PNG并返回data URI
+        把词云widget数据转换为wordcloud库使用的频次字典
         """
-        items = self._normalize_wordcloud_items(block)
-        if not items:
-            return None
-
-        # 使用频次形式馈入wordcloud库
         frequencies = {}
-        for item in items:
+        for item in self._normalize_wordcloud_items(block):
             weight = item['weight']
             # 兼容权重为0-1的小数，放大以体现差异
             freq = weight * 100 if 0 < weight <= 1.5 else weight
             frequencies[item['word']] = max(1, freq)
+        return frequencies
 
-        font_path = str(self._get_font_path())
-        wc = WordCloud(
-            width=1000,
-            height=360,
-            background_color="white",
-            font_path=font_path,
-            prefer_horizontal=0.98,
-            random_state=42,
-            max_words=180,
-            collocations=False,
-        )
-        wc.generate_from_frequencies(frequencies)
-
-        buffer = io.BytesIO()
-        wc.to_image().save(buffer, format='PNG')
-        encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
-        return f"data:image/png;base64,{encoded}"
+    def _generate_wordcloud_image(self, block: Dict[str, Any]) -> str | None:
+        """
+        在当前进程生成单个词云PNG并返回data URI（不经缓存与进程池）
+        """
+        frequencies = self._wordcloud_frequencies(block)
+        if not frequencies:
+            return None
+        png_bytes, _ = render_asset('wordcloud', {'frequencies': frequencies}, str(self._get_font_path()))
+        return png_data_uri(png_bytes) if png_bytes else None
 
-    def _convert_math_to_svg(self, document_ir: Dict[str, Any]) -> Dict[str, str]:
+    def _convert_math_to_svg(self, document_ir: Dict[str, Any], batch: AssetBatch) -> Dict[str, str]:
         """
-        将document_ir中的所有数学公式转换为SVG
+        登记document_ir中所有数学公式的SVG渲染任务
 
         参数:
             document_ir: Document IR数据
+            batch: 资产任务集合
 
         返回:
-            Dict[str, str]: 公式块ID到SVG字符串的映射
+            Dict[str, str]: 公式块ID到资产键的映射
         """
         svg_map = {}
 
@@ -447,16 +475,17 @@ class PDFRenderer:
         chapters = document_ir.get('chapters', [])
         for chapter in chapters:
             blocks = chapter.get('blocks', [])
-            self._extract_and_convert_math_blocks(blocks, svg_map, block_counter)
+            self._extract_and_convert_math_blocks(blocks, svg_map, block_counter, batch)
 
-        logger.info(f"成功转换 {len(svg_map)} 个数学公式为SVG")
+        logger.info(f"共 {len(svg_map)} 个数学公式待转换为SVG")
         return svg_map
 
     def _extract_and_convert_math_blocks(
         self,
         blocks: list,
         svg_map: Dict[str, str],
-        block_counter: list = None
+        block_counter: list = None,
+        converter: Any = None
     ) -> None:
         """
         递归遍历blocks，找到所有math块并转换为SVG
@@ -465,9 +494,12 @@ class PDFRenderer:
             blocks: block列表
             svg_map: 用于存储转换结果的字典
             block_counter: 用于生成唯一ID的计数器
+            converter: 提供convert_display_to_svg/convert_inline_to_svg的对象，默认self.math_converter
         """
         if block_counter is None:
             block_counter = [0]
+        if converter is None:
+            converter = self.math_converter
 
         def _extract_inline_math_from_inlines(inlines: list):
             """从段落内联节点中提取数学公式"""
@@ -492,13 +524,12 @@ class PDFRenderer:
                     run['mathId'] = math_id
                     try:
                         svg_content = (
-                            self.math_converter.convert_display_to_svg(latex)
+                            converter.convert_display_to_svg(latex)
                             if is_display else
-                            self.math_converter.convert_inline_to_svg(latex)
+                            converter.convert_inline_to_svg(latex)
                         )
                         if svg_content:
                             svg_map[math_id] = svg_content
-                            logger.debug(f"公式 {math_id} 转换为SVG成功")
                         else:
                             logger.warning(f"公式 {math_id} 转换为SVG失败: {latex[:50]}...")
                     except Exception as exc:
@@ -521,13 +552,12 @@ class PDFRenderer:
                     ids_for_html.append(math_id)
                     try:
                         svg_content = (
-                            self.math_converter.convert_display_to_svg(latex)
+                            converter.convert_display_to_svg(latex)
                             if is_display else
-                            self.math_converter.convert_inline_to_svg(latex)
+                            converter.convert_inline_to_svg(latex)
                         )
                         if svg_content:
                             svg_map[math_id] = svg_content
-                            logger.debug(f"公式 {math_id} 转换为SVG成功")
                         else:
                             logger.warning(f"公式 {math_id} 转换为SVG失败: {latex[:50]}...")
                     except Exception as exc:
@@ -549,12 +579,11 @@ class PDFRenderer:
                     block_counter[0] += 1
                     math_id = f"math-block-{block_counter[0]}"
                     try:
-                        svg_content = self.math_converter.convert_display_to_svg(latex)
+                        svg_content = converter.convert_display_to_svg(latex)
                         if svg_content:
                             svg_map[math_id] = svg_content
                             # 将ID添加到block中，以便后续注入时识别
                             block['mathId'] = math_id
-                            logger.debug(f"公式 {math_id} 转换为SVG成功")
                         else:
                             logger.warning(f"公式 {math_id} 转换为SVG失败: {latex[:50]}...")
                     except Exception as e:
@@ -568,14 +597,14 @@ class PDFRenderer:
             # 递归处理嵌套的blocks
             nested_blocks = block.get('blocks')
             if isinstance(nested_blocks, list):
-                self._extract_and_convert_math_blocks(nested_blocks, svg_map, block_counter)
+                self._extract_and_convert_math_blocks(nested_blocks, svg_map, block_counter, converter)
 
             # 处理列表项
             if block_type == 'list':
                 items = block.get('items', [])
                 for item in items:
                     if isinstance(item, list):
-                        self._extract_and_convert_math_blocks(item, svg_map, block_counter)
+                        self._extract_and_convert_math_blocks(item, svg_map, block_counter, converter)
 
             # 处理表格单元格
             if block_type == 'table':
@@ -585,13 +614,13 @@ class PDFRenderer:
                     for cell in cells:
                         cell_blocks = cell.get('blocks', [])
                         if isinstance(cell_blocks, list):
-                            self._extract_and_convert_math_blocks(cell_blocks, svg_map, block_counter)
+                            self._extract_and_convert_math_blocks(cell_blocks, svg_map, block_counter, converter)
 
             # 处理callout内部的blocks
             if block_type == 'callout':
                 callout_blocks = block.get('blocks', [])
                 if isinstance(callout_blocks, list):
-                    self._extract_and_convert_math_blocks(callout_blocks, svg_map, block_counter)
+                    self._extract_and_convert_math_blocks(callout_blocks, svg_map, block_counter, converter)
 
     def _inject_svg_into_html(self, html: str, svg_map: Dict[str, str]) -> str:
         """
@@ -865,17 +894,9 @@ class PDFRenderer:
         logger.info("预处理图表数据...")
         preprocessed_ir = self._preprocess_charts(document_ir, ir_file_path)
 
-        # 转换图表为SVG（使用预处理后的IR）
-        logger.info("开始转换图表为SVG矢量图形...")
-        svg_map = self._convert_charts_to_svg(preprocessed_ir)
-
-        # 转换词云为PNG
-        logger.info("开始转换词云为图片...")
-        wordcloud_map = self._convert_wordclouds_to_images(preprocessed_ir)
-
-        # 转换数学公式为SVG
-        logger.info("开始转换数学公式为SVG矢量图形...")
-        math_svg_map = self._convert_math_to_svg(preprocessed_ir)
+        # 图表/词云转换为SVG/PNG、数学公式转换为SVG（使用预处理后的IR，带缓存并行渲染）
+        logger.info("开始预渲染图表、词云与数学公式...")
+        svg_map, wordcloud_map, math_svg_map = self._prerender_assets(preprocessed_ir)
 
         # 使用HTML渲染器生成基础HTML（使用预处理后的IR，以便复用mathId等标记）
         html = self.html_renderer.render(preprocessed_ir, ir_file_path=ir_file_path)
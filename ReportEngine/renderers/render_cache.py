@@ -0,0 +1,127 @@
+"""
+HTML渲染片段缓存
+
+HTMLRenderer 每次渲染都会重建整份 HTML（数 MB 的内联 CSS/JS 与全部章节）。这里提供进程级的
+LRU 缓存，按内容哈希保存：
+- 整份文档：同一份 IR 再次渲染（导出、重复预览）直接返回；
+- 单个章节片段：只改动/重生成某一章时，其余章节直接复用；
+- <head> 中的 CSS：按主题 token 缓存。
+
+多个 HTMLRenderer 实例（如每次 PDF 导出新建的渲染器）共享同一缓存，按字节数上限淘汰。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from ReportEngine.utils.config import settings
+
+
+def content_hash(*parts: Any) -> str:
+    """对任意 JSON 兼容对象求稳定哈希（键排序，非 JSON 类型按 str 处理）"""
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class ChapterFragment:
+    """
+    单章渲染结果
+
+    html/widget_scripts 中的图表与标题ID以章节内序号占位，复用时按当前计数器偏移还原，
+    因此前面章节增删图表不会使后续章节的缓存失效。
+    """
+    html: str
+    widget_scripts: List[str] = field(default_factory=list)
+    chart_count: int = 0
+    heading_count: int = 0
+    toc_rendered: bool = False
+
+    @property
+    def size(self) -> int:
+        return len(self.html) + sum(len(script) for script in self.widget_scripts)
+
+
+@dataclass
+class DocumentRender:
+    """整份文档的渲染结果及当时的图表校验统计"""
+    html: str
+    chart_stats: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(self.html)
+
+
+class RenderCache:
+    """线程安全的 LRU 缓存，按条目 size（字符数）总和限制容量"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._total -= self._sizes[key]
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._total += size
+            while self._total > self.max_bytes and self._entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._total -= self._sizes.pop(old_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total = 0
+            self.hits = self.misses = 0
+
+
+_render_cache: Optional[RenderCache] = None
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> Optional[RenderCache]:
+    """获取全局渲染缓存，HTML_RENDER_CACHE_MB 为 0 时返回 None（不缓存）"""
+    global _render_cache
+    if settings.HTML_RENDER_CACHE_MB <= 0:
+        return None
+    if _render_cache is None:
+        with _render_cache_lock:
+            if _render_cache is None:
+                _render_cache = RenderCache(settings.HTML_RENDER_CACHE_MB * 1024 * 1024)
+    return _render_cache
+
+
+__all__ = [
+    "ChapterFragment",
+    "DocumentRender",
+    "RenderCache",
+    "content_hash",
+    "get_render_cache",
+]
@@ -0,0 +1,64 @@
+"""
+报告前端依赖库的版本化静态资源
+
+HTMLRenderer 默认把 Chart.js、MathJax 等库（约 2MB）内联进每份报告。外链模式下改为引用
+带内容指纹的地址（如 chart.3f2a1b9c0d.js），由 Web 服务以长期缓存头提供，浏览器只需下载一次；
+库文件更新后指纹随之变化，旧缓存自然失效。
+"""
+
+from __future__ import annotations
+
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+ASSET_MODE_INLINE = "inline"
+ASSET_MODE_EXTERNAL = "external"
+
+LIBS_DIR = Path(__file__).parent / "libs"
+_FINGERPRINT_LENGTH = 10
+
+
+@lru_cache(maxsize=None)
+def lib_fingerprint(filename: str) -> Optional[str]:
+    """库文件内容的短哈希，文件缺失时返回None"""
+    try:
+        data = (LIBS_DIR / filename).read_bytes()
+    except OSError:
+        return None
+    return hashlib.sha256(data).hexdigest()[:_FINGERPRINT_LENGTH]
+
+
+def versioned_lib_name(filename: str) -> Optional[str]:
+    """在扩展名前插入指纹：chart.js -> chart.<hash>.js；文件缺失时返回None"""
+    fingerprint = lib_fingerprint(filename)
+    if not fingerprint:
+        return None
+    stem, dot, suffix = filename.rpartition(".")
+    return f"{stem}.{fingerprint}.{suffix}" if dot else f"{filename}.{fingerprint}"
+
+
+def resolve_versioned_lib(asset_name: str) -> Optional[Path]:
+    """
+    把带指纹的文件名解析为 libs 目录下的文件
+
+    指纹与当前文件内容不符时返回None：长期缓存的地址必须始终对应同一份内容。
+    """
+    parts = asset_name.split(".")
+    if len(parts) < 3 or "/" in asset_name or "\\" in asset_name:
+        return None
+    fingerprint = parts[-2]
+    filename = ".".join(parts[:-2] + parts[-1:])
+    if lib_fingerprint(filename) != fingerprint:
+        return None
+    return LIBS_DIR / filename
+
+
+__all__ = [
+    "ASSET_MODE_EXTERNAL",
+    "ASSET_MODE_INLINE",
+    "lib_fingerprint",
+    "resolve_versioned_lib",
+    "versioned_lib_name",
+]
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+知识图谱索引重建工具。
+
+遍历章节目录下的全部运行目录，重新生成 graphrag_catalog.db，用于：
+- 升级后为已有的历史图谱建立索引；
+- 手动拷贝/删除运行目录后同步索引。
+
+使用方法:
+    python -m ReportEngine.scripts.rebuild_graph_catalog
+    python -m ReportEngine.scripts.rebuild_graph_catalog --chapters-dir final_reports/chapters
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from ReportEngine.graphrag.graph_catalog import GraphCatalog
+from ReportEngine.graphrag.graph_storage import GraphStorage
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="知识图谱索引重建工具")
+    parser.add_argument(
+        "--chapters-dir",
+        default=None,
+        help="章节目录，默认使用配置项 CHAPTER_OUTPUT_DIR",
+    )
+    args = parser.parse_args()
+
+    chapters_dir = Path(args.chapters_dir) if args.chapters_dir else GraphStorage().chapters_dir
+    if not chapters_dir.exists():
+        print(f"章节目录不存在: {chapters_dir}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    count = GraphCatalog(chapters_dir, GraphStorage.FILENAME).rebuild()
+    print(f"已登记 {count} 个知识图谱，用时 {time.perf_counter() - start:.2f}s -> {chapters_dir / 'graphrag_catalog.db'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -56,6 +56,15 @@ class Settings(BaseSettings):
     CHAPTER_JSON_MAX_ATTEMPTS: int = Field(
         2, description="章节JSON解析失败时的最大尝试次数"
     )
+    CHAPTER_PARALLELISM: int = Field(
+        3, description="章节并发生成数量（1 表示逐章串行）"
+    )
+    CHAPTER_STREAM_MAX_PREAMBLE_CHARS: int = Field(
+        2000, description="章节流式输出开头允许的非JSON字符数，超出即中止重试（0 不检查）"
+    )
+    CHAPTER_STREAM_MAX_INVALID_BLOCKS: int = Field(
+        3, description="章节流式校验允许连续出现的无法解析/重复block数，达到即中止重试（0 不检查）"
+    )
     TEMPLATE_DIR: str = Field("ReportEngine/report_template", description="多模板目录")
     API_TIMEOUT: float = Field(900.0, description="单API超时时间（秒）")
     MAX_RETRY_DELAY: float = Field(180.0, description="最大重试间隔（秒）")
@@ -63,6 +72,23 @@ class Settings(BaseSettings):
     LOG_FILE: str = Field("logs/report.log", description="日志输出文件")
     ENABLE_PDF_EXPORT: bool = Field(True, description="是否允许导出PDF")
     CHART_STYLE: str = Field("modern", description="图表样式：modern/classic/")
+    HTML_RENDER_CACHE_MB: int = Field(
+        256, description="HTML渲染缓存（整份文档/章节片段/主题CSS）容量上限，单位MB，0 为不缓存"
+    )
+    REPORT_ASSET_MODE: str = Field(
+        "external",
+        description="网页查看报告时第三方库引用方式：external 引用带指纹的静态资源 / inline 内联进报告；"
+                    "写入磁盘的报告文件始终 inline",
+    )
+    REPORT_ASSET_URL_PREFIX: str = Field(
+        "/api/report/assets", description="external 模式下静态资源的URL前缀"
+    )
+    PDF_ASSET_WORKERS: int = Field(
+        0, description="PDF图表/词云/公式预渲染进程数（0 按CPU自动，1 为串行）"
+    )
+    PDF_ASSET_CACHE_DIR: str = Field(
+        "final_reports/asset_cache", description="PDF预渲染资产缓存目录（留空不缓存）"
+    )
     JSON_ERROR_LOG_DIR: str = Field(
         "logs/json_repair_failures", description="无法修复的JSON块落盘目录"
     )
@@ -100,6 +126,8 @@ def print_config(config: Settings):
     message += f"输出目录: {config.OUTPUT_DIR}\n"
     message += f"章节JSON目录: {config.CHAPTER_OUTPUT_DIR}\n"
     message += f"章节JSON最大尝试次数: {config.CHAPTER_JSON_MAX_ATTEMPTS}\n"
+    message += f"章节并发生成数量: {config.CHAPTER_PARALLELISM}\n"
+    message += f"章节流式中止阈值: 开头 {config.CHAPTER_STREAM_MAX_PREAMBLE_CHARS} 字符 / 连续 {config.CHAPTER_STREAM_MAX_INVALID_BLOCKS} 个无法解析/重复block\n"
     message += f"整本IR目录: {config.DOCUMENT_IR_OUTPUT_DIR}\n"
     message += f"模板目录: {config.TEMPLATE_DIR}\n"
     message += f"API 超时时间: {config.API_TIMEOUT} 秒\n"
@@ -108,6 +136,10 @@ def print_config(config: Settings):
     message += f"日志文件: {config.LOG_FILE}\n"
     message += f"PDF 导出: {config.ENABLE_PDF_EXPORT}\n"
     message += f"图表样式: {config.CHART_STYLE}\n"
+    message += f"HTML 渲染缓存: {config.HTML_RENDER_CACHE_MB} MB\n"
+    message += f"HTML 第三方库引用方式: {config.REPORT_ASSET_MODE}\n"
+    message += f"PDF 资产预渲染进程数: {config.PDF_ASSET_WORKERS or '自动'}\n"
+    message += f"PDF 资产缓存目录: {config.PDF_ASSET_CACHE_DIR or '(不缓存)'}\n"
     message += f"LLM API Key: {'已配置' if config.REPORT_ENGINE_API_KEY else '未配置'}\n"
     message += "=========================\n"
     logger.info(message)
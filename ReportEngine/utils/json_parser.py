@@ -13,9 +13,11 @@ from __future__ import annotations
 
 import json
 import re
-from typing import Any, Dict, List, Optional, Tuple, Callable
+from typing import Any, Dict, List, Optional, Callable
 from loguru import logger
 
+from ReportEngine.utils.json_repairer import REPAIR_MESSAGES, repair_json_text
+
 try:
     from json_repair import repair_json as _json_repair_fn
 except ImportError:
@@ -59,9 +61,6 @@ class RobustJSONParser:
         r"^\s*根据.*?(?=\{|\[|$)",
     ]
 
-    # 冒号等号模式（LLM常见错误）
-    _COLON_EQUALS_PATTERN = re.compile(r'(":\s*)=')
-
     def __init__(
         self,
         llm_repair_fn: Optional[Callable[[str, str], Optional[str]]] = None,
@@ -291,212 +290,19 @@ class RobustJSONParser:
         """
         应用本地修复策略。
 
-        参数:
-            text: 原始JSON文本
-
-        返回:
-            str: 修复后的文本
-        """
-        repaired = text
-        mutated = False
-
-        # 修复 ":=" 错误
-        new_text = self._COLON_EQUALS_PATTERN.sub(r"\1", repaired)
-        if new_text != repaired:
-            logger.warning("检测到\":=\"字符，已自动移除多余的'='号")
-            repaired = new_text
-            mutated = True
-
-        # 转义控制字符
-        repaired, escaped = self._escape_control_characters(repaired)
-        if escaped:
-            logger.warning("检测到未转义的控制字符，已自动转换为转义序列")
-            mutated = True
-
-        # 修复缺少的逗号
-        repaired, commas_fixed = self._fix_missing_commas(repaired)
-        if commas_fixed:
-            logger.warning("检测到对象/数组之间缺少逗号，已自动补齐")
-            mutated = True
-
-        # 合并多余的方括号（LLM常见把二维列表层级写成三层）
-        repaired, brackets_collapsed = self._collapse_redundant_brackets(repaired)
-        if brackets_collapsed:
-            logger.warning("检测到连续的方括号嵌套，已尝试折叠为二维结构")
-            mutated = True
-
-        # 平衡括号
-        repaired, balanced = self._balance_brackets(repaired)
-        if balanced:
-            logger.warning("检测到括号不平衡，已自动补齐/剔除异常括号")
-            mutated = True
-
-        # 移除尾随逗号
-        repaired, trailing_removed = self._remove_trailing_commas(repaired)
-        if trailing_removed:
-            logger.warning("检测到尾随逗号，已自动移除")
-            mutated = True
-
-        return repaired if mutated else text
-
-    def _escape_control_characters(self, text: str) -> Tuple[str, bool]:
-        """
-        将字符串字面量中的裸换行/制表符/控制字符替换为JSON合法的转义序列。
-
-        参数:
-            text: 原始JSON文本
-
-        返回:
-            Tuple[str, bool]: (修复后的文本, 是否有修改)
-        """
-        if not text:
-            return text, False
-
-        result: List[str] = []
-        in_string = False
-        escaped = False
-        mutated = False
-        control_map = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
-
-        for ch in text:
-            if escaped:
-                result.append(ch)
-                escaped = False
-                continue
-
-            if ch == "\\":
-                result.append(ch)
-                escaped = True
-                continue
-
-            if ch == '"':
-                result.append(ch)
-                in_string = not in_string
-                continue
-
-            if in_string and ch in control_map:
-                result.append(control_map[ch])
-                mutated = True
-                continue
-
-            if in_string and ord(ch) < 0x20:
-                result.append(f"\\u{ord(ch):04x}")
-                mutated = True
-                continue
-
-            result.append(ch)
-
-        return "".join(result), mutated
-
-    def _fix_missing_commas(self, text: str) -> Tuple[str, bool]:
-        """
-        在对象/数组元素之间自动补逗号。
+        ":="、控制字符、缺少逗号、多余方括号、括号不平衡、尾随逗号在
+        repair_json_text 的一遍扫描中同时完成。
 
         参数:
             text: 原始JSON文本
 
         返回:
-            Tuple[str, bool]: (修复后的文本, 是否有修改)
-        """
-        if not text:
-            return text, False
-
-        chars: List[str] = []
-        mutated = False
-        in_string = False
-        escaped = False
-        length = len(text)
-        i = 0
-
-        while i < length:
-            ch = text[i]
-            chars.append(ch)
-
-            if escaped:
-                escaped = False
-                i += 1
-                continue
-
-            if ch == "\\":
-                escaped = True
-                i += 1
-                continue
-
-            if ch == '"':
-                # 如果我们正在退出字符串，检查后面是否需要逗号
-                if in_string:
-                    # 查找下一个非空白字符
-                    j = i + 1
-                    while j < length and text[j] in " \t\r\n":
-                        j += 1
-                    # 如果下一个字符是 " { [ 或数字，可能需要逗号
-                    if j < length:
-                        next_ch = text[j]
-                        if next_ch in "\"[{" or next_ch.isdigit():
-                            # 检查是否已经在对象或数组中
-                            # 通过检查前面是否有未闭合的 { 或 [
-                            has_opener = False
-                            for k in range(len(chars) - 1, -1, -1):
-                                if chars[k] in "{[":
-                                    has_opener = True
-                                    break
-                                elif chars[k] in "]}":
-                                    break
-
-                            if has_opener:
-                                chars.append(",")
-                                mutated = True
-
-                in_string = not in_string
-                i += 1
-                continue
-
-            # 在 } 或 ] 后面检查是否需要逗号
-            if not in_string and ch in "}]":
-                j = i + 1
-                # 跳过空白
-                while j < length and text[j] in " \t\r\n":
-                    j += 1
-                # 如果下一个非空白字符是 { [ " 或数字，添加逗号
-                if j < length:
-                    next_ch = text[j]
-                    if next_ch in "{[\"" or next_ch.isdigit():
-                        chars.append(",")
-                        mutated = True
-
-            i += 1
-
-        return "".join(chars), mutated
-
-    def _collapse_redundant_brackets(self, text: str) -> Tuple[str, bool]:
-        """
-        针对LLM生成的三层或更多层数组（如]]], [[ / [[[）进行折叠，避免表格/列表写出额外维度。
-
-        返回:
-            Tuple[str, bool]: (修复后的文本, 是否有修改)
+            str: 修复后的文本
         """
-        if not text:
-            return text, False
-
-        mutated = False
-
-        patterns = [
-            # 典型错误: "]]], [[{...}" -> "]], [{...}"
-            (re.compile(r"\]\s*\]\s*\]\s*,\s*\[\s*\["), "]],["),
-            # 极端情况: 连续三层开头 "[[[" -> "[["
-            (re.compile(r"\[\s*\[\s*\["), "[["),
-            # 极端情况: 结尾 "]]]" -> "]]"
-            (re.compile(r"\]\s*\]\s*\]"), "]]"),
-        ]
-
-        repaired = text
-        for pattern, replacement in patterns:
-            new_text, count = pattern.subn(replacement, repaired)
-            if count > 0:
-                mutated = True
-                repaired = new_text
-
-        return repaired, mutated
+        repaired, fixes = repair_json_text(text, collapse_brackets=True)
+        for fix in fixes:
+            logger.warning(REPAIR_MESSAGES[fix])
+        return repaired
 
     def _flatten_nested_arrays(self, text: str) -> str:
         """
@@ -508,93 +314,6 @@ class RobustJSONParser:
         text = re.sub(r"\[\s*\[\s*\[", "[[", text)
         return text
 
-    def _balance_brackets(self, text: str) -> Tuple[str, bool]:
-        """
-        尝试修复因LLM多写/少写括号导致的不平衡结构。
-
-        参数:
-            text: 原始JSON文本
-
-        返回:
-            Tuple[str, bool]: (修复后的文本, 是否有修改)
-        """
-        if not text:
-            return text, False
-
-        result: List[str] = []
-        stack: List[str] = []
-        mutated = False
-        in_string = False
-        escaped = False
-
-        opener_map = {"{": "}", "[": "]"}
-
-        for ch in text:
-            if escaped:
-                result.append(ch)
-                escaped = False
-                continue
-
-            if ch == "\\":
-                result.append(ch)
-                escaped = True
-                continue
-
-            if ch == '"':
-                result.append(ch)
-                in_string = not in_string
-                continue
-
-            if in_string:
-                result.append(ch)
-                continue
-
-            if ch in "{[":
-                stack.append(ch)
-                result.append(ch)
-                continue
-
-            if ch in "}]":
-                if stack and (
-                    (ch == "}" and stack[-1] == "{") or (ch == "]" and stack[-1] == "[")
-                ):
-                    stack.pop()
-                    result.append(ch)
-                else:
-                    # 不匹配的闭括号，忽略
-                    mutated = True
-                continue
-
-            result.append(ch)
-
-        # 补齐未闭合的括号
-        while stack:
-            opener = stack.pop()
-            result.append(opener_map[opener])
-            mutated = True
-
-        return "".join(result), mutated
-
-    def _remove_trailing_commas(self, text: str) -> Tuple[str, bool]:
-        """
-        移除JSON对象和数组中的尾随逗号。
-
-        参数:
-            text: 原始JSON文本
-
-        返回:
-            Tuple[str, bool]: (修复后的文本, 是否有修改)
-        """
-        if not text:
-            return text, False
-
-        # 使用正则表达式移除尾随逗号
-        # 匹配 , 后面跟着空白和 } 或 ] 的情况
-        pattern = r",(\s*[}\]])"
-        new_text = re.sub(pattern, r"\1", text)
-
-        return new_text, new_text != text
-
     def _attempt_json_repair(self, text: str, context_name: str) -> Optional[str]:
         """
         使用json_repair库进行高级修复。
@@ -0,0 +1,206 @@
+"""
+单遍JSON本地修复。
+
+RobustJSONParser 与章节生成节点原本各自维护一串修复函数：":=" 正则、控制字符转义、
+补逗号、折叠多余方括号、括号平衡、尾随逗号……每一遍都复制整段文本，补逗号时还要
+向前回溯查找括号，章节越长越慢。这里用一个正则分词器按 token 扫描一遍，
+同时维护括号栈与“上一个有效 token”，在同一个输出缓冲区里完成全部修复：
+
+- ":="            冒号后多余的 "=" 直接丢弃；
+- 控制字符        字符串内的裸换行/制表符/控制字符转成转义序列；
+- 缺少逗号        相邻两个值（或对象内值与下一个键）之间补 ","；
+- 多余方括号      （可选）连续三层 "[[[" / "]]]" 折叠为两层，"]]], [[" 折叠为 "]],["；
+- 括号不平衡      丢弃与栈顶不匹配的闭括号，结尾补齐未闭合的括号；
+- 尾随逗号        "}" / "]" 前的多余 "," 移除。
+
+只在字符串外做结构修复，字符串内容除控制字符外原样保留。
+"""
+
+from __future__ import annotations
+
+import re
+from typing import List, Optional, Tuple
+
+# 修复类型（按日志输出顺序排列）
+FIX_COLON_EQUALS = "colon_equals"
+FIX_CONTROL_CHARS = "control_chars"
+FIX_MISSING_COMMAS = "missing_commas"
+FIX_REDUNDANT_BRACKETS = "redundant_brackets"
+FIX_UNBALANCED_BRACKETS = "unbalanced_brackets"
+FIX_TRAILING_COMMAS = "trailing_commas"
+
+REPAIR_MESSAGES = {
+    FIX_COLON_EQUALS: "检测到\":=\"字符，已自动移除多余的'='号",
+    FIX_CONTROL_CHARS: "检测到字符串中未转义的控制字符，已自动转换为转义序列",
+    FIX_MISSING_COMMAS: "检测到对象/数组之间缺少逗号，已自动补齐",
+    FIX_REDUNDANT_BRACKETS: "检测到连续的方括号嵌套，已尝试折叠为二维结构",
+    FIX_UNBALANCED_BRACKETS: "检测到括号不平衡，已自动补齐/剔除异常括号",
+    FIX_TRAILING_COMMAS: "检测到尾随逗号，已自动移除",
+}
+_FIX_ORDER = list(REPAIR_MESSAGES)
+
+# 字符串（允许未闭合，直到文本结尾）| 空白 | 结构符号 | 其余连续字符（数字/字面量/杂质）
+_TOKEN_PATTERN = re.compile(
+    r'"[^"\\]*(?:\\.[^"\\]*)*(?:"|\\?\Z)'
+    r'|[ \t\r\n]+'
+    r'|[{}\[\],:]'
+    r'|[^ \t\r\n{}\[\],:"]+',
+    re.DOTALL,
+)
+_CONTROL_PATTERN = re.compile(r"[\x00-\x1f]")
+_CONTROL_MAP = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_CLOSER_FOR = {"{": "}", "[": "]"}
+
+# 上一个有效 token 的类别
+_OPEN = "open"
+_COMMA = "comma"
+_COLON = "colon"
+_KEY = "key"
+_VALUE = "value"
+
+
+def _escape_control(match: "re.Match[str]") -> str:
+    ch = match.group(0)
+    return _CONTROL_MAP.get(ch) or f"\\u{ord(ch):04x}"
+
+
+def repair_json_text(text: str, collapse_brackets: bool = False) -> Tuple[str, List[str]]:
+    """
+    单遍修复LLM输出的JSON文本。
+
+    参数:
+        text: 已去除Markdown包裹的JSON文本。
+        collapse_brackets: 是否折叠三层方括号（会改变合法的三维数组，仅在确定结构至多两层时开启）。
+
+    返回:
+        Tuple[str, List[str]]: (修复后的文本, 实际应用的修复类型)；未做任何修改时原样返回文本与空列表。
+    """
+    if not text:
+        return text, []
+
+    out: List[str] = []
+    stack: List[str] = []
+    fixes = set()
+    last: Optional[str] = None
+    # 最近一个尚未被后续值“确认”的逗号在 out 中的位置，遇到闭括号时据此删除尾随逗号
+    comma_index: Optional[int] = None
+    # 连续的同向方括号（只隔空白）计数，用于折叠三层嵌套
+    open_run = 0
+    close_run = 0
+    collapse_next_open = False
+
+    for match in _TOKEN_PATTERN.finditer(text):
+        token = match.group(0)
+        ch = token[0]
+
+        if ch in " \t\r\n":
+            out.append(token)
+            continue
+
+        if ch == '"':
+            if _CONTROL_PATTERN.search(token):
+                token = _CONTROL_PATTERN.sub(_escape_control, token)
+                fixes.add(FIX_CONTROL_CHARS)
+            in_object = bool(stack) and stack[-1] == "{"
+            if last == _VALUE and stack:
+                out.append(",")
+                fixes.add(FIX_MISSING_COMMAS)
+                last = _COMMA
+            out.append(token)
+            last = _KEY if in_object and last in (_OPEN, _COMMA) else _VALUE
+            comma_index = None
+            open_run = close_run = 0
+            collapse_next_open = False
+            continue
+
+        if ch == ",":
+            out.append(token)
+            comma_index = len(out) - 1
+            last = _COMMA
+            open_run = close_run = 0
+            continue
+
+        if ch == ":":
+            out.append(token)
+            last = _COLON
+            comma_index = None
+            open_run = close_run = 0
+            collapse_next_open = False
+            continue
+
+        if ch in "{[":
+            if ch == "[" and collapse_brackets:
+                if open_run >= 2 or (collapse_next_open and open_run == 1):
+                    fixes.add(FIX_REDUNDANT_BRACKETS)
+                    collapse_next_open = False
+                    continue
+                open_run += 1
+            else:
+                open_run = 0
+            if last == _VALUE and stack and stack[-1] == "[":
+                out.append(",")
+                fixes.add(FIX_MISSING_COMMAS)
+            out.append(ch)
+            stack.append(ch)
+            last = _OPEN
+            comma_index = None
+            close_run = 0
+            continue
+
+        if ch in "}]":
+            # 先折叠再配对：被折叠的开括号没有入栈，对应的第三层闭括号直接丢弃
+            if ch == "]" and collapse_brackets and close_run >= 2:
+                fixes.add(FIX_REDUNDANT_BRACKETS)
+                collapse_next_open = True
+                continue
+            if not stack or _CLOSER_FOR[stack[-1]] != ch:
+                fixes.add(FIX_UNBALANCED_BRACKETS)
+                continue
+            close_run = close_run + 1 if ch == "]" else 0
+            if comma_index is not None:
+                out[comma_index] = ""
+                fixes.add(FIX_TRAILING_COMMAS)
+                comma_index = None
+            out.append(ch)
+            stack.pop()
+            last = _VALUE
+            open_run = 0
+            continue
+
+        # 数字、true/false/null 或杂质字符
+        if ch == "=" and last == _COLON:
+            fixes.add(FIX_COLON_EQUALS)
+            token = token.lstrip("=")
+            if not token:
+                continue
+        if last == _VALUE and stack and stack[-1] == "[":
+            out.append(",")
+            fixes.add(FIX_MISSING_COMMAS)
+        out.append(token)
+        last = _VALUE
+        comma_index = None
+        open_run = close_run = 0
+        collapse_next_open = False
+
+    if stack:
+        fixes.add(FIX_UNBALANCED_BRACKETS)
+        if comma_index is not None:
+            out[comma_index] = ""
+            fixes.add(FIX_TRAILING_COMMAS)
+        out.extend(_CLOSER_FOR[opener] for opener in reversed(stack))
+
+    if not fixes:
+        return text, []
+    return "".join(out), [fix for fix in _FIX_ORDER if fix in fixes]
+
+
+__all__ = [
+    "FIX_COLON_EQUALS",
+    "FIX_CONTROL_CHARS",
+    "FIX_MISSING_COMMAS",
+    "FIX_REDUNDANT_BRACKETS",
+    "FIX_UNBALANCED_BRACKETS",
+    "FIX_TRAILING_COMMAS",
+    "REPAIR_MESSAGES",
+    "repair_json_text",
+]
@@ -7,6 +7,7 @@
 - 任务状态跟踪（由 Celery 任务更新）
 - 任务结果存储
 - 任务列表管理
+- 任务状态计数（随状态迁移增量维护，统计与列表开销与历史任务数无关）
 """
 
 import os
@@ -31,6 +32,68 @@ def get_redis_url() -> str:
 
 REDIS_URL = get_redis_url()
 
+# 任务索引（按创建时间排序的 ZSET）
+TASK_INDEX_KEY = "tasks:all"
+# 各状态任务数（HASH: status -> count）
+TASK_STATUS_COUNTS_KEY = "tasks:status_counts"
+# 每个任务当前计入的状态（HASH: task_id -> status），用于迁移时扣减旧状态
+TASK_STATUS_OF_KEY = "tasks:status_of"
+
+# 原子地把任务从旧状态迁移到新状态：一次往返，并发更新不会重复计数
+_STATUS_TRANSITION_LUA = """
+local old = redis.call('HGET', KEYS[2], ARGV[1])
+if old == ARGV[2] then
+    return 0
+end
+if old then
+    redis.call('HINCRBY', KEYS[1], old, -1)
+end
+redis.call('HINCRBY', KEYS[1], ARGV[2], 1)
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+return 1
+"""
+
+# 移除任务时扣减其当前状态的计数
+_STATUS_FORGET_LUA = """
+local old = redis.call('HGET', KEYS[2], ARGV[1])
+if old then
+    redis.call('HINCRBY', KEYS[1], old, -1)
+    redis.call('HDEL', KEYS[2], ARGV[1])
+end
+return old
+"""
+
+
+def record_task_status(r, task_id: str, status: str) -> None:
+    """
+    记录任务状态迁移，增量维护状态计数
+
+    每次写入任务状态时调用（TaskManager 与 Celery 任务中的 update_task_status）。
+
+    Args:
+        r: Redis 客户端
+        task_id: 任务 ID
+        status: 新状态
+    """
+    r.eval(_STATUS_TRANSITION_LUA, 2, TASK_STATUS_COUNTS_KEY, TASK_STATUS_OF_KEY, task_id, status)
+
+
+def forget_task_status(r, task_id: str) -> None:
+    """
+    任务被清理时从状态计数中移除
+
+    Args:
+        r: Redis 客户端
+        task_id: 任务 ID
+    """
+    r.eval(_STATUS_FORGET_LUA, 2, TASK_STATUS_COUNTS_KEY, TASK_STATUS_OF_KEY, task_id)
+
+
+def _decode(value) -> Optional[str]:
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
 
 @dataclass
 class AnalysisTask:
@@ -150,7 +213,8 @@ class TaskManager:
         )
 
         # 添加到任务列表（按时间排序）
-        r.zadd("tasks:all", {task_id: time.time()})
+        r.zadd(TASK_INDEX_KEY, {task_id: time.time()})
+        record_task_status(r, task_id, task.status)
 
         return task
 
@@ -167,23 +231,21 @@ class TaskManager:
             任务对象，不存在则返回 None
         """
         r = self._get_redis()
+        meta_data, status_data = r.mget(self._task_key(task_id), self._status_key(task_id))
+        return self._merge_task(meta_data, status_data)
 
-        # 读取元数据
-        meta_data = r.get(self._task_key(task_id))
+    @staticmethod
+    def _merge_task(meta_data, status_data) -> Optional[AnalysisTask]:
+        """合并元数据与 Celery 写入的最新状态"""
+        meta_data = _decode(meta_data)
         if not meta_data:
             return None
 
-        if isinstance(meta_data, bytes):
-            meta_data = meta_data.decode('utf-8')
-
         meta = json.loads(meta_data)
 
         # 读取最新状态（由 Celery 任务更新）
-        status_data = r.get(self._status_key(task_id))
+        status_data = _decode(status_data)
         if status_data:
-            if isinstance(status_data, bytes):
-                status_data = status_data.decode('utf-8')
-
             status = json.loads(status_data)
             meta['status'] = status.get('status', meta['status'])
             meta['progress'] = status.get('progress', meta['progress'])
@@ -258,14 +320,19 @@ class TaskManager:
         r = self._get_redis()
 
         # 获取任务 ID 列表（按时间倒序）
-        task_ids = r.zrevrange("tasks:all", offset, offset + limit - 1)
+        task_ids = [_decode(tid) for tid in r.zrevrange(TASK_INDEX_KEY, offset, offset + limit - 1)]
+        if not task_ids:
+            return []
 
-        tasks = []
-        for tid in task_ids:
-            if isinstance(tid, bytes):
-                tid = tid.decode('utf-8')
+        # 一次 pipeline 取回本页所有任务的元数据与状态
+        pipe = r.pipeline(transaction=False)
+        pipe.mget([self._task_key(tid) for tid in task_ids])
+        pipe.mget([self._status_key(tid) for tid in task_ids])
+        metas, statuses = pipe.execute()
 
-            task = self.get_task(tid)
+        tasks = []
+        for meta_data, status_data in zip(metas, statuses):
+            task = self._merge_task(meta_data, status_data)
             if task:
                 tasks.append(task)
 
@@ -275,14 +342,22 @@ class TaskManager:
         """
         获取各状态任务数量统计
 
+        读取增量维护的状态计数，开销与任务总数无关；
+        计数尚未建立时（旧数据）自动回填一次。
+
         Returns:
             状态统计字典
         """
         r = self._get_redis()
 
-        # 获取所有任务 ID
-        total = r.zcard("tasks:all")
-        task_ids = r.zrange("tasks:all", 0, -1)
+        pipe = r.pipeline(transaction=False)
+        pipe.zcard(TASK_INDEX_KEY)
+        pipe.hgetall(TASK_STATUS_COUNTS_KEY)
+        total, raw_counts = pipe.execute()
+
+        if total and not raw_counts:
+            self.rebuild_status_counts()
+            raw_counts = r.hgetall(TASK_STATUS_COUNTS_KEY)
 
         counts = {
             "pending": 0,
@@ -293,28 +368,47 @@ class TaskManager:
             "total": total
         }
 
-        # 统计各状态数量
-        for tid in task_ids:
-            if isinstance(tid, bytes):
-                tid = tid.decode('utf-8')
+        for status, count in raw_counts.items():
+            status = _decode(status)
+            if status in counts and status != "total":
+                counts[status] = max(int(count), 0)
 
-            status_data = r.get(self._status_key(tid))
-            if status_data:
-                if isinstance(status_data, bytes):
-                    status_data = status_data.decode('utf-8')
-                status = json.loads(status_data).get('status', 'pending')
-            else:
-                # 没有状态数据，检查元数据
-                meta_data = r.get(self._task_key(tid))
-                if meta_data:
-                    if isinstance(meta_data, bytes):
-                        meta_data = meta_data.decode('utf-8')
-                    status = json.loads(meta_data).get('status', 'pending')
-                else:
-                    status = 'pending'
-
-            if status in counts:
-                counts[status] += 1
+        return counts
+
+    def rebuild_status_counts(self, batch_size: int = 1000) -> Dict[str, int]:
+        """
+        全量扫描任务重建状态计数（用于迁移旧数据或修复计数）
+
+        Args:
+            batch_size: 每批读取的任务数
+
+        Returns:
+            重建后的 status -> count
+        """
+        r = self._get_redis()
+        counts: Dict[str, int] = {}
+        status_of: Dict[str, str] = {}
+
+        total = r.zcard(TASK_INDEX_KEY)
+        for start in range(0, total, batch_size):
+            task_ids = [_decode(tid) for tid in r.zrange(TASK_INDEX_KEY, start, start + batch_size - 1)]
+            pipe = r.pipeline(transaction=False)
+            pipe.mget([self._task_key(tid) for tid in task_ids])
+            pipe.mget([self._status_key(tid) for tid in task_ids])
+            metas, statuses = pipe.execute()
+
+            for tid, meta_data, status_data in zip(task_ids, metas, statuses):
+                raw = _decode(status_data) or _decode(meta_data)
+                status = json.loads(raw).get('status', 'pending') if raw else 'pending'
+                status_of[tid] = status
+                counts[status] = counts.get(status, 0) + 1
+
+        pipe = r.pipeline(transaction=True)
+        pipe.delete(TASK_STATUS_COUNTS_KEY, TASK_STATUS_OF_KEY)
+        if counts:
+            pipe.hset(TASK_STATUS_COUNTS_KEY, mapping=counts)
+            pipe.hset(TASK_STATUS_OF_KEY, mapping=status_of)
+        pipe.execute()
 
         return counts
 
@@ -353,5 +447,7 @@ class TaskManager:
             json.dumps(current, ensure_ascii=False),
             ex=86400
         )
+        if 'status' in kwargs:
+            record_task_status(r, task_id, kwargs['status'])
 
         return True
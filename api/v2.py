@@ -11,7 +11,7 @@ API v2 路由定义
 - GET /api/v2/health: 健康检查
 """
 
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from .task_manager import TaskManager
 
 api_v2 = Blueprint('api_v2', __name__, url_prefix='/api/v2')
@@ -208,10 +208,12 @@ def get_task_result(task_id: str):
         if isinstance(result, dict) and result.get('html_content'):
             html_content = result['html_content']
         else:
-            # 调用 HTMLRenderer 生成 HTML
+            # 调用 HTMLRenderer 流式生成 HTML，首字节不必等整本报告渲染完
             try:
-                from ReportEngine.renderers.html_renderer import HTMLRenderer
-                html_content = HTMLRenderer().render(result)
+                from ReportEngine.renderers.html_renderer import HTMLRenderer, guard_render_stream
+                html_content = stream_with_context(
+                    guard_render_stream(HTMLRenderer().render_stream(result), f"task_id={task_id}")
+                )
             except ImportError:
                 # 降级：使用简单 HTML 生成
                 html_content = _generate_simple_html(task.query, result)
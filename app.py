@@ -444,75 +444,49 @@ def parse_forum_log_line(line):
         'source': source
     }
 
-# Forum日志监听器
-# 存储每个客户端的历史日志发送位置
-forum_log_positions = {}
+# Forum消息推送
+# 每批最多推送的消息数
+FORUM_BROADCAST_BATCH_SIZE = 200
 
-def monitor_forum_log():
-    """监听forum.log文件变化并推送到前端"""
-    import time
-    from pathlib import Path
 
-    forum_log_file = LOG_DIR / "forum.log"
-    last_position = 0
-    processed_lines = set()  # 用于跟踪已处理的行，避免重复
+def _forum_console_line(line):
+    return {'app': 'forum', 'line': f"[{datetime.now().strftime('%H:%M:%S')}] {line}"}
 
-    # 如果文件存在，获取初始位置但不跳过内容
-    if forum_log_file.exists():
-        with open(forum_log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            # 记录文件大小，但不添加到processed_lines
-            # 这样用户打开forum标签时可以获取历史
-            f.seek(0, 2)  # 移到文件末尾
-            last_position = f.tell()
 
+def broadcast_forum_messages():
+    """订阅论坛消息总线，把LogMonitor写入的新消息按批推送到前端
+
+    消息带递增seq，按游标读取即可去重，无需再轮询和哈希比对forum.log
+    """
+    from ForumEngine.message_bus import get_forum_message_bus
+
+    bus = get_forum_message_bus()
+    cursor = bus.latest_seq()
     while True:
         try:
-            if forum_log_file.exists():
-                with open(forum_log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    f.seek(last_position)
-                    new_lines = f.readlines()
-
-                    if new_lines:
-                        for line in new_lines:
-                            line = line.rstrip('\n\r')
-                            if line.strip():
-                                line_hash = hash(line.strip())
-
-                                # 避免重复处理同一行
-                                if line_hash in processed_lines:
-                                    continue
-
-                                processed_lines.add(line_hash)
-
-                                # 解析日志行并发送forum消息
-                                parsed_message = parse_forum_log_line(line)
-                                if parsed_message:
-                                    socketio.emit('forum_message', parsed_message)
-
-                                # 只有在控制台显示forum时才发送控制台消息
-                                timestamp = datetime.now().strftime('%H:%M:%S')
-                                formatted_line = f"[{timestamp}] {line}"
-                                socketio.emit('console_output', {
-                                    'app': 'forum',
-                                    'line': formatted_line
-                                })
-
-                        last_position = f.tell()
-
-                        # 清理processed_lines集合，避免内存泄漏（保留最近1000行的哈希）
-                        if len(processed_lines) > 1000:
-                            # 保留最近500行的哈希
-                            recent_hashes = list(processed_lines)[-500:]
-                            processed_lines = set(recent_hashes)
-
-            time.sleep(1)  # 每秒检查一次
+            batch = bus.read_since(cursor, limit=FORUM_BROADCAST_BATCH_SIZE, timeout=1.0)
+            cursor = batch.cursor
+            if not batch.messages:
+                continue
+
+            parsed_messages = []
+            for message in batch.messages:
+                parsed_message = parse_forum_log_line(message['line'])
+                if parsed_message:
+                    parsed_message['seq'] = message['seq']
+                    parsed_messages.append(parsed_message)
+                    socketio.emit('forum_message', parsed_message)
+                socketio.emit('console_output', _forum_console_line(message['line']))
+
+            # 整批消息及游标，供按批渲染的客户端使用
+            socketio.emit('forum_messages', {'messages': parsed_messages, 'cursor': cursor})
         except Exception as e:
-            logger.error(f"Forum日志监听错误: {e}")
+            logger.error(f"Forum消息推送错误: {e}")
             time.sleep(5)
 
-# 启动Forum日志监听线程
-forum_monitor_thread = threading.Thread(target=monitor_forum_log, daemon=True)
-forum_monitor_thread.start()
+# 启动Forum消息推送线程
+forum_broadcast_thread = threading.Thread(target=broadcast_forum_messages, daemon=True)
+forum_broadcast_thread.start()
 
 # 全局变量存储进程信息
 processes = {
@@ -1068,20 +1042,45 @@ def stop_forum_monitoring_api():
 
 @app.route('/api/forum/log')
 def get_forum_log():
-    """获取ForumEngine的forum.log内容"""
+    """获取ForumEngine的forum.log内容
+
+    带 cursor 参数时只返回该游标之后的新消息（来自论坛消息总线）；
+    游标已超出总线保留窗口时返回完整日志并置 reset=True
+    """
     try:
+        from ForumEngine.message_bus import get_forum_message_bus
+
+        bus = get_forum_message_bus()
+        cursor = request.args.get('cursor', type=int)
+        if cursor is not None:
+            batch = bus.read_since(cursor, limit=request.args.get('limit', 1000, type=int))
+            if not batch.gap:
+                lines = [message['line'] for message in batch.messages]
+                parsed_messages = []
+                for message in batch.messages:
+                    parsed_message = parse_forum_log_line(message['line'])
+                    if parsed_message:
+                        parsed_message['seq'] = message['seq']
+                        parsed_messages.append(parsed_message)
+                return jsonify({
+                    'success': True,
+                    'log_lines': lines,
+                    'parsed_messages': parsed_messages,
+                    'total_lines': len(lines),
+                    'cursor': batch.cursor,
+                    'reset': False
+                })
+
+        # 持有forum.log写入锁读取文件和游标，保证全量内容与后续增量首尾相接、不重不漏
+        from ForumEngine.monitor import get_monitor
+
         forum_log_file = LOG_DIR / "forum.log"
-        if not forum_log_file.exists():
-            return jsonify({
-                'success': True,
-                'log_lines': [],
-                'parsed_messages': [],
-                'total_lines': 0
-            })
-        
-        with open(forum_log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            lines = [line.rstrip('\n\r') for line in lines if line.strip()]
+        with get_monitor().write_lock:
+            latest_cursor = bus.latest_seq()
+            lines = []
+            if forum_log_file.exists():
+                with open(forum_log_file, 'r', encoding='utf-8', errors='ignore') as f:
+                    lines = [line.rstrip('\n\r') for line in f if line.strip()]
         
         # 解析每一行日志并提取对话信息
         parsed_messages = []
@@ -1094,7 +1093,9 @@ def get_forum_log():
             'success': True,
             'log_lines': lines,
             'parsed_messages': parsed_messages,
-            'total_lines': len(lines)
+            'total_lines': len(lines),
+            'cursor': latest_cursor,
+            'reset': cursor is not None
         })
     except Exception as e:
         return jsonify({'success': False, 'message': f'读取forum.log失败: {str(e)}'})
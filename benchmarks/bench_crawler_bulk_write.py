@@ -0,0 +1,115 @@
+"""
+MediaCrawler 数据库写入基准测试
+
+在本地 SQLite 上直接调用 DouyinDbStoreImplement.store_comment，对比：
+- per_item: 逐条 SELECT-by-id → INSERT/UPDATE → COMMIT（ENABLE_DB_BULK_WRITE=False）
+- bulk: 按表缓冲后批量写入（ENABLE_DB_BULK_WRITE=True），分别测试
+  普通索引（SELECT IN + executemany 回退路径）与唯一索引（原生 ON CONFLICT upsert）
+
+评论数据中有一部分 comment_id 会重复出现，模拟翻页/重复抓取时的更新。
+
+    python benchmarks/bench_crawler_bulk_write.py --items 20000 --dup-ratio 0.2
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+MEDIA_CRAWLER_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "MindSpider", "DeepSentimentCrawling", "MediaCrawler",
+)
+sys.path.insert(0, MEDIA_CRAWLER_DIR)
+
+import config  # noqa: E402
+from sqlalchemy import Index, func, select  # noqa: E402
+from database import bulk_writer, db_session  # noqa: E402
+from database.models import Base, DouyinAwemeComment  # noqa: E402
+from store.douyin._store_impl import DouyinDbStoreImplement  # noqa: E402
+
+
+def _generate_items(count: int, dup_ratio: float, seed: int = 11):
+    rng = random.Random(seed)
+    issued = []
+    for i in range(count):
+        if issued and rng.random() < dup_ratio:
+            comment_id = rng.choice(issued)
+        else:
+            comment_id = str(7_000_000_000 + i)
+            issued.append(comment_id)
+        yield {
+            "comment_id": comment_id,
+            "aweme_id": str(7_100_000 + i // 50),
+            "create_time": 1_700_000_000 + i,
+            "content": f"评论内容 {i} " + "不错" * rng.randint(1, 10),
+            "user_id": str(rng.randint(1, 10**9)),
+            "nickname": f"user{i % 997}",
+            "sub_comment_count": str(rng.randint(0, 20)),
+            "like_count": str(rng.randint(0, 5000)),
+            "last_modify_ts": 1_700_000_000 + i,
+        }
+
+
+async def _prepare(db_path: str, unique_key: bool):
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    db_session.sqlite_db_config["db_path"] = db_path
+    engine = db_session._engines.pop("sqlite", None)
+    if engine is not None:
+        await engine.dispose()
+    bulk_writer._buffers.clear()
+    engine = db_session.get_async_engine("sqlite")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        if unique_key:
+            index = Index("uq_bench_comment_id", DouyinAwemeComment.__table__.c.comment_id, unique=True)
+            await conn.run_sync(index.create)
+    return engine
+
+
+async def _run(mode: str, items, db_path: str):
+    config.SAVE_DATA_OPTION = "sqlite"
+    config.ENABLE_DB_BULK_WRITE = mode != "per_item"
+    engine = await _prepare(db_path, unique_key=(mode == "bulk_unique"))
+    store = DouyinDbStoreImplement()
+
+    start = time.perf_counter()
+    for item in items:
+        await store.store_comment(dict(item))
+    await bulk_writer.flush_all()
+    elapsed = time.perf_counter() - start
+
+    async with engine.connect() as conn:
+        stored = (await conn.execute(select(func.count()).select_from(DouyinAwemeComment.__table__))).scalar()
+    return elapsed, stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MediaCrawler DB 写入基准")
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--dup-ratio", type=float, default=0.2, help="重复 comment_id 的比例")
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    config.DB_BULK_BATCH_SIZE = args.batch_size
+    items = list(_generate_items(args.items, args.dup_ratio))
+    unique_ids = len({item["comment_id"] for item in items})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        print(f"items={args.items} unique={unique_ids} batch_size={args.batch_size}")
+        print(f"{'mode':<14}{'seconds':>10}{'items/s':>12}{'rows':>10}")
+        baseline = None
+        for mode in ("per_item", "bulk_fallback", "bulk_unique"):
+            elapsed, stored = asyncio.run(_run(mode, items, db_path))
+            rate = args.items / elapsed
+            baseline = baseline or rate
+            print(f"{mode:<14}{elapsed:>10.2f}{rate:>12.0f}{stored:>10}   x{rate / baseline:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+话题搜索全文索引基准测试
+
+在本地 SQLite 中生成百万行级别的合成评论数据（结构与 weibo_note_comment 的
+id/content/create_time 一致），对比：
+- like: 现有的 `content LIKE '%词%'` 全表扫描
+- fulltext: FTS5 trigram 索引上的短语匹配（与 MySQL ngram FULLTEXT、PostgreSQL pg_trgm
+  的匹配语义一致：按连续 n-gram 命中子串）
+
+    python benchmarks/bench_fulltext_search.py --rows 1000000
+    python benchmarks/bench_fulltext_search.py --rows 1000000 --csv /tmp/comments.csv
+
+--csv 会额外导出同一份数据，可用 MySQL LOAD DATA / PostgreSQL COPY 导入后，
+再执行 `python MindSpider/schema/db_manager.py --fulltext-index` 在真实数据库上复测。
+"""
+
+import os
+import csv
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import statistics
+
+# 普通评论用语，构成绝大部分数据
+FILLER = [
+    '支持一下', '太离谱了', '希望尽快处理', '理性看待', '排队太久', '评论区沦陷', '说得对',
+    '蹲一个后续', '有没有人一起', '笑死我了', '真的假的', '已经习惯了', '楼上说得好',
+]
+# 话题词及其出现概率：舆情话题通常只命中极少量行，这才是索引的主要场景
+TERMS = {
+    '冰雪大世界冻伤': 0.01,
+    '食堂涨价事件': 0.001,
+    '新能源汽车召回': 0.0001,
+    '不存在的话题词': 0.0,
+}
+
+
+def _generate_rows(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    base_ts = 1_700_000_000
+    for i in range(1, count + 1):
+        parts = [rng.choice(FILLER) for _ in range(rng.randint(2, 6))]
+        for term, probability in TERMS.items():
+            if rng.random() < probability:
+                parts.insert(rng.randrange(len(parts) + 1), term)
+        yield i, '，'.join(parts), base_ts + i * 17
+
+
+def _measure(conn, sql: str, term: str, repeat: int):
+    latencies, rows = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(conn.execute(sql, (term,)).fetchall())
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='话题搜索全文索引基准测试')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--limit', type=int, default=500, help='与 DEFAULT_GET_COMMENTS_FOR_TOPIC_LIMIT 对应')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--db', default=None, help='SQLite 文件路径（默认临时文件）')
+    parser.add_argument('--csv', default=None, help='同时导出 CSV（id,content,create_time）')
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), 'bench_fulltext.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute('DROP TABLE IF EXISTS weibo_note_comment')
+    conn.execute('DROP TABLE IF EXISTS weibo_note_comment_fts')
+    conn.execute('CREATE TABLE weibo_note_comment (id INTEGER PRIMARY KEY, content TEXT, create_time BIGINT)')
+
+    print(f"生成 {args.rows} 行合成数据 -> {db_path}")
+    start = time.perf_counter()
+    writer, csv_file = None, None
+    if args.csv:
+        csv_file = open(args.csv, 'w', newline='', encoding='utf-8')
+        writer = csv.writer(csv_file)
+        writer.writerow(['id', 'content', 'create_time'])
+    batch = []
+    for row in _generate_rows(args.rows):
+        batch.append(row)
+        if writer:
+            writer.writerow(row)
+        if len(batch) >= 50_000:
+            conn.executemany('INSERT INTO weibo_note_comment VALUES (?, ?, ?)', batch)
+            batch.clear()
+    if batch:
+        conn.executemany('INSERT INTO weibo_note_comment VALUES (?, ?, ?)', batch)
+    conn.commit()
+    if csv_file:
+        csv_file.close()
+    print(f"数据生成耗时 {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    conn.execute(
+        "CREATE VIRTUAL TABLE weibo_note_comment_fts USING fts5("
+        "content, content='weibo_note_comment', content_rowid='id', tokenize='trigram')"
+    )
+    conn.execute("INSERT INTO weibo_note_comment_fts(weibo_note_comment_fts) VALUES('rebuild')")
+    conn.commit()
+    print(f"trigram 索引构建耗时 {time.perf_counter() - start:.1f}s")
+
+    like_sql = f"SELECT * FROM weibo_note_comment WHERE content LIKE '%' || ? || '%' ORDER BY id DESC LIMIT {args.limit}"
+    fts_sql = (
+        "SELECT c.* FROM weibo_note_comment c JOIN weibo_note_comment_fts f ON f.rowid = c.id "
+        f"WHERE weibo_note_comment_fts MATCH '\"' || ? || '\"' ORDER BY c.id DESC LIMIT {args.limit}"
+    )
+
+    print(f"{'词':<12}{'出现概率':>10}{'like(ms)':>12}{'fulltext(ms)':>14}{'加速比':>10}")
+    for term, probability in TERMS.items():
+        like_ms, like_rows = _measure(conn, like_sql, term, args.repeat)
+        fts_ms, fts_rows = _measure(conn, fts_sql, term, args.repeat)
+        assert like_rows == fts_rows, f"{term}: 结果数不一致 {like_rows} != {fts_rows}"
+        print(f"{term:<12}{probability:>10.4f}{like_ms:>12.1f}{fts_ms:>14.1f}{like_ms / max(fts_ms, 1e-6):>9.1f}x")
+
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
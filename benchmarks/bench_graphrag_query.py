@@ -0,0 +1,137 @@
+"""
+GraphRAG 图谱查询基准测试
+
+在合成图谱上对比：
+- legacy: 每次查询逐节点拼接并小写化搜索文本做子串匹配、逐条扫描边表（旧实现）
+- indexed: QueryEngine 的 n-gram 倒排索引与 Graph 的出边/入边、按类型索引
+
+    python benchmarks/bench_graphrag_query.py --nodes 100000 --queries 50
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ReportEngine.graphrag.graph_storage import Graph
+from ReportEngine.graphrag.query_engine import QueryEngine, QueryParams, get_keyword_index
+
+VOCAB = [
+    '高校', '食堂', '涨价', '学生', '舆情', '热搜', '品牌', '危机', '公关', '回应',
+    '政策', '调整', '房价', '楼市', '新能源', '汽车', '召回', '事故', '调查', '通报',
+    '景区', '门票', '旅游', '冰雪', '冻伤', '网红', '直播', '带货', '投诉', '维权',
+    '医保', '改革', '教育', '减负', '考研', '就业', '裁员', '招聘', '消费', '降级',
+]
+ENGINES = ['insight', 'media', 'query']
+
+
+def _phrase(rng: random.Random, low: int, high: int) -> str:
+    return ''.join(rng.sample(VOCAB, rng.randint(low, high)))
+
+
+def build_graph(node_count: int, seed: int = 42) -> Graph:
+    """按真实图谱的类型比例生成：少量段落，大量搜索词与来源"""
+    rng = random.Random(seed)
+    graph = Graph()
+    sections = []
+    for idx in range(max(1, node_count // 100)):
+        sections.append(graph.add_node(
+            'section', name=f"段落{idx}", node_id=f"section_{idx}",
+            title=_phrase(rng, 2, 3), summary=_phrase(rng, 6, 10),
+            engine=ENGINES[idx % 3], order=idx,
+        ))
+    while graph.node_count < node_count:
+        idx = graph.node_count
+        if idx % 2:
+            node = graph.add_node('search_query', name=f"q{idx}", node_id=f"query_{idx}",
+                                  query_text=_phrase(rng, 2, 4), engine=ENGINES[idx % 3])
+        else:
+            node = graph.add_node('source', name=f"s{idx}", node_id=f"source_{idx}",
+                                  title=_phrase(rng, 3, 5), engine=ENGINES[idx % 3])
+        graph.add_edge(rng.choice(sections), node, 'contains')
+    return graph
+
+
+def legacy_match(graph: Graph, keywords):
+    matched = set()
+    for node in graph.nodes.values():
+        search_text = f"{node.name} {node.get('title', '')} {node.get('query_text', '')} {node.get('summary', '')}"
+        search_text = search_text.lower()
+        if any(keyword.lower() in search_text for keyword in keywords):
+            matched.add(node.id)
+    return matched
+
+
+def legacy_edges_from(graph: Graph, node_id: str):
+    return [e for e in graph.edges if e.from_id == node_id]
+
+
+def _timed(fn, runs):
+    samples = []
+    result = None
+    for args in runs:
+        start = time.perf_counter()
+        result = fn(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, result
+
+
+def _report(label, samples):
+    print(f"{label:<28} 中位数 {statistics.median(samples):9.3f} ms   最大 {max(samples):9.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GraphRAG 图谱查询基准测试')
+    parser.add_argument('--nodes', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    graph = build_graph(args.nodes, args.seed)
+    print(f"生成图谱: {graph.node_count} 节点 / {graph.edge_count} 边，用时 {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(args.seed + 1)
+    # 两个词拼接的长关键词命中很少，单个词命中较多，覆盖两种选择性
+    keyword_sets = [[''.join(rng.sample(VOCAB, 2)), rng.choice(VOCAB)] for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    get_keyword_index(graph)
+    print(f"建立关键词索引用时 {time.perf_counter() - start:.2f}s（每个图谱只建一次）")
+
+    engine = QueryEngine(graph)
+    legacy_samples, _ = _timed(lambda kws: legacy_match(graph, kws), [(kws,) for kws in keyword_sets])
+    indexed_samples, _ = _timed(
+        lambda kws: engine._match_keywords(QueryParams(keywords=kws, depth=0)),
+        [(kws,) for kws in keyword_sets],
+    )
+    rare_samples, _ = _timed(
+        lambda kws: engine._match_keywords(QueryParams(keywords=kws, depth=0)),
+        [([kws[0]],) for kws in keyword_sets],
+    )
+    for kws in keyword_sets[:5]:
+        assert legacy_match(graph, kws) == engine._match_keywords(QueryParams(keywords=kws, depth=0))
+
+    print("\n关键词匹配:")
+    _report("legacy 全图扫描", legacy_samples)
+    _report("indexed 倒排索引", indexed_samples)
+    _report("indexed 仅低频长关键词", rare_samples)
+
+    section_ids = [n.id for n in graph.get_nodes_by_type('section')]
+    probe_ids = [(rng.choice(section_ids),) for _ in range(args.queries)]
+    legacy_edge_samples, _ = _timed(lambda node_id: legacy_edges_from(graph, node_id), probe_ids)
+    indexed_edge_samples, _ = _timed(graph.get_edges_from, probe_ids)
+
+    print("\n出边查找:")
+    _report("legacy 扫描边表", legacy_edge_samples)
+    _report("indexed 邻接索引", indexed_edge_samples)
+
+
+if __name__ == '__main__':
+    main()
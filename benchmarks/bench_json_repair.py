@@ -0,0 +1,348 @@
+"""
+JSON本地修复基准测试
+
+对比两条修复链在LLM畸形输出上的耗时与修复成功率：
+- legacy: RobustJSONParser 的六遍修复（":=" 正则、控制字符、补逗号、折叠方括号、括号平衡、尾随逗号）
+          与章节节点的四遍修复（":="、控制字符、括号平衡、补逗号），每遍复制整段文本
+- single-pass: ReportEngine.utils.json_repairer.repair_json_text 单遍分词修复
+
+语料优先取真实输出：章节目录下的 */*/stream.raw 与 JSON 错误日志目录中的 rawOutput；
+再按 LLM 常见错误（漏逗号、裸换行、":="、尾随逗号、截断、多余括号、三层列表）
+生成合成章节补足样本。--scale-kb 额外测量单个大章节上的耗时随长度的变化。
+
+    python benchmarks/bench_json_repair.py --synthetic 300 --repeat 3
+    python benchmarks/bench_json_repair.py --corpus final_reports/chapters --synthetic 0
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ReportEngine.utils.config import settings
+from ReportEngine.utils.json_parser import RobustJSONParser
+from ReportEngine.utils.json_repairer import repair_json_text
+
+# ==================== 旧修复链（逐遍复制，供对比） ====================
+
+_COLON_EQUALS = re.compile(r'(":\s*)=')
+
+
+def _legacy_escape(text: str, carriage: str) -> str:
+    result, in_string, escaped = [], False, False
+    control_map = {"\n": "\\n", "\r": carriage, "\t": "\\t"}
+    for ch in text:
+        if escaped:
+            result.append(ch)
+            escaped = False
+        elif ch == "\\":
+            result.append(ch)
+            escaped = True
+        elif ch == '"':
+            result.append(ch)
+            in_string = not in_string
+        elif in_string and ch in control_map:
+            result.append(control_map[ch])
+        elif in_string and ord(ch) < 0x20:
+            result.append(f"\\u{ord(ch):04x}")
+        else:
+            result.append(ch)
+    return "".join(result)
+
+
+def _legacy_parser_commas(text: str) -> str:
+    chars, in_string, escaped, length, i = [], False, False, len(text), 0
+    while i < length:
+        ch = text[i]
+        chars.append(ch)
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == '"':
+            if in_string:
+                j = i + 1
+                while j < length and text[j] in " \t\r\n":
+                    j += 1
+                if j < length and (text[j] in "\"[{" or text[j].isdigit()):
+                    for k in range(len(chars) - 1, -1, -1):
+                        if chars[k] in "{[":
+                            chars.append(",")
+                            break
+                        if chars[k] in "]}":
+                            break
+            in_string = not in_string
+        elif not in_string and ch in "}]":
+            j = i + 1
+            while j < length and text[j] in " \t\r\n":
+                j += 1
+            if j < length and (text[j] in "{[\"" or text[j].isdigit()):
+                chars.append(",")
+        i += 1
+    return "".join(chars)
+
+
+def _legacy_node_commas(text: str) -> str:
+    chars, in_string, escaped, length, i = [], False, False, len(text), 0
+    while i < length:
+        ch = text[i]
+        chars.append(ch)
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == '"':
+            in_string = not in_string
+        elif not in_string and ch in "}]":
+            j = i + 1
+            while j < length and text[j] in " \t\r\n":
+                j += 1
+            if j < length and text[j] in "{[":
+                chars.append(",")
+        i += 1
+    return "".join(chars)
+
+
+def _legacy_balance(text: str) -> str:
+    result, stack, in_string, escaped = [], [], False, False
+    for ch in text:
+        if escaped:
+            result.append(ch)
+            escaped = False
+        elif ch == "\\":
+            result.append(ch)
+            escaped = True
+        elif ch == '"':
+            result.append(ch)
+            in_string = not in_string
+        elif in_string:
+            result.append(ch)
+        elif ch in "{[":
+            stack.append(ch)
+            result.append(ch)
+        elif ch in "}]":
+            if stack and stack[-1] == ("{" if ch == "}" else "["):
+                stack.pop()
+                result.append(ch)
+        else:
+            result.append(ch)
+    while stack:
+        result.append("}" if stack.pop() == "{" else "]")
+    return "".join(result)
+
+
+def _legacy_collapse(text: str) -> str:
+    text = re.sub(r"\]\s*\]\s*\]\s*,\s*\[\s*\[", "]],[", text)
+    text = re.sub(r"\[\s*\[\s*\[", "[[", text)
+    return re.sub(r"\]\s*\]\s*\]", "]]", text)
+
+
+def legacy_parser_repair(text: str) -> str:
+    """RobustJSONParser._apply_local_repairs 的旧实现"""
+    text = _COLON_EQUALS.sub(r"\1", text)
+    text = _legacy_escape(text, "\\r")
+    text = _legacy_parser_commas(text)
+    text = _legacy_collapse(text)
+    text = _legacy_balance(text)
+    return re.sub(r",(\s*[}\]])", r"\1", text)
+
+
+def legacy_chapter_repair(text: str) -> str:
+    """ChapterGenerationNode._repair_llm_json 的旧实现"""
+    text = _COLON_EQUALS.sub(r"\1", text)
+    text = _legacy_escape(text, "\\n")
+    text = _legacy_balance(text)
+    return _legacy_node_commas(text)
+
+
+IMPLEMENTATIONS: List[Tuple[str, Callable[[str], str]]] = [
+    ("legacy parser chain", legacy_parser_repair),
+    ("single-pass (parser)", lambda text: repair_json_text(text, collapse_brackets=True)[0]),
+    ("legacy chapter chain", legacy_chapter_repair),
+    ("single-pass (chapter)", lambda text: repair_json_text(text)[0]),
+]
+
+# ==================== 语料 ====================
+
+WORDS = ['高校', '食堂', '涨价', '舆情', '热搜', '回应', '政策', '调整', '学生', '家长',
+         '平台', '数据', '显示', '讨论', '情绪', '负面', '正面', '关注', '持续', '发酵']
+
+
+def _sentence(rng: random.Random) -> str:
+    text = ''.join(rng.choice(WORDS) for _ in range(rng.randint(8, 30)))
+    return text + rng.choice(['。', '，"引用"内容。', '：{"括号"在字符串里}。', '；[注]'])
+
+
+def build_chapter(rng: random.Random, blocks: int) -> Dict:
+    """按章节IR的常见结构生成一章"""
+    items = [{"type": "heading", "level": 2, "text": _sentence(rng), "anchor": "s1"}]
+    for idx in range(blocks):
+        kind = idx % 4
+        if kind == 0:
+            items.append({"type": "list", "listType": "bullet", "items": [
+                [{"type": "paragraph", "inlines": [{"text": _sentence(rng)}]}] for _ in range(3)
+            ]})
+        elif kind == 1:
+            items.append({"type": "table", "rows": [
+                {"cells": [{"blocks": [{"type": "paragraph", "inlines": [{"text": _sentence(rng)}]}]}
+                           for _ in range(3)]} for _ in range(3)
+            ]})
+        else:
+            items.append({"type": "paragraph", "inlines": [
+                {"text": _sentence(rng), "marks": [{"type": "bold"}] if rng.random() < 0.3 else []}
+                for _ in range(rng.randint(1, 4))
+            ]})
+    return {"chapter": {"chapterId": "S1", "title": "章节", "anchor": "s1", "order": 10, "blocks": items}}
+
+
+def _drop_comma(text: str, rng: random.Random) -> str:
+    spots = [m.start() for m in re.finditer(r'(?<=[}\]"]),(?=\s*[{\["])', text)]
+    return text if not spots else (lambda i: text[:i] + text[i + 1:])(rng.choice(spots))
+
+
+def _raw_newline(text: str, rng: random.Random) -> str:
+    spots = [m.start() for m in re.finditer(r'。', text)]
+    return text if not spots else (lambda i: text[:i + 1] + "\n" + text[i + 1:])(rng.choice(spots))
+
+
+def _colon_equals(text: str, rng: random.Random) -> str:
+    return text.replace('": ', '":= ', 1)
+
+
+def _trailing_comma(text: str, rng: random.Random) -> str:
+    spots = [m.start() for m in re.finditer(r'\}\s*\]', text)]
+    return text if not spots else (lambda i: text[:i + 1] + "," + text[i + 1:])(rng.choice(spots))
+
+
+def _truncate(text: str, rng: random.Random) -> str:
+    # 截掉结尾若干闭括号（流式输出提前结束）
+    return text.rstrip("}] \n")
+
+
+def _extra_closer(text: str, rng: random.Random) -> str:
+    spots = [m.start() for m in re.finditer(r'\}\s*,', text)]
+    return text if not spots else (lambda i: text[:i + 1] + "}" + text[i + 1:])(rng.choice(spots))
+
+
+def _triple_list(text: str, rng: random.Random) -> str:
+    return text.replace('"items": [[', '"items": [[[', 1).replace(']]}', ']]]}', 1)
+
+
+FAULTS = [_drop_comma, _raw_newline, _colon_equals, _trailing_comma, _truncate, _extra_closer, _triple_list]
+
+
+def synthetic_corpus(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        text = json.dumps(build_chapter(rng, rng.randint(6, 40)), ensure_ascii=False, indent=2)
+        for fault in rng.sample(FAULTS, rng.randint(1, 3)):
+            text = fault(text, rng)
+        corpus.append("```json\n" + text + "\n```")
+    return corpus
+
+
+def real_corpus(dirs: List[Path]) -> List[str]:
+    """章节目录中的 stream.raw 与错误日志中的 rawOutput"""
+    corpus = []
+    for base in dirs:
+        if not base.exists():
+            continue
+        for path in sorted(base.glob("**/stream.raw")):
+            text = path.read_text(encoding="utf-8", errors="replace")
+            if text.strip():
+                corpus.append(text)
+        for path in sorted(base.glob("*.json")):
+            try:
+                raw = json.loads(path.read_text(encoding="utf-8")).get("rawOutput")
+            except (OSError, ValueError, AttributeError):
+                continue
+            if isinstance(raw, str) and raw.strip():
+                corpus.append(raw)
+    return corpus
+
+
+# ==================== 测量 ====================
+
+def _parses(text: str) -> bool:
+    try:
+        json.loads(text)
+        return True
+    except ValueError:
+        return False
+
+
+def run_corpus(label: str, corpus: List[str], repeat: int):
+    cleaner = RobustJSONParser(enable_json_repair=False)
+    cleaned = [cleaner._clean_response(text) for text in corpus]
+    broken = [text for text in cleaned if not _parses(text)]
+    total_kb = sum(len(text) for text in broken) / 1024
+    print(f"\n[{label}] 样本 {len(corpus)} 个，其中无法直接解析 {len(broken)} 个（{total_kb:.0f} KB）")
+    if not broken:
+        return
+    for name, repair in IMPLEMENTATIONS:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            outputs = [repair(text) for text in broken]
+        elapsed = (time.perf_counter() - start) / repeat
+        repaired = sum(_parses(text) for text in outputs)
+        print(f"  {name:<22} {elapsed * 1000:8.1f} ms  "
+              f"{total_kb / max(elapsed, 1e-9) / 1024:6.1f} MB/s  "
+              f"修复成功 {repaired}/{len(broken)} ({repaired / len(broken):.0%})")
+
+
+def run_scale(sizes_kb: List[int]):
+    """单个大章节（漏逗号+截断）上耗时随长度的变化"""
+    rng = random.Random(11)
+    print("\n[长度扩展] 单章耗时（ms）")
+    print("  " + f"{'KB':>6}" + "".join(f"{name:>24}" for name, _ in IMPLEMENTATIONS))
+    for size_kb in sizes_kb:
+        blocks = 8
+        text = ""
+        while len(text) < size_kb * 1024:
+            blocks *= 2
+            text = json.dumps(build_chapter(rng, blocks), ensure_ascii=False, indent=2)
+        for _ in range(20):
+            text = _drop_comma(text, rng)
+        text = _truncate(text, rng)
+        row = f"  {len(text) / 1024:>6.0f}"
+        for _, repair in IMPLEMENTATIONS:
+            start = time.perf_counter()
+            repair(text)
+            row += f"{(time.perf_counter() - start) * 1000:>24.1f}"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON本地修复基准测试")
+    parser.add_argument("--corpus", action="append", default=None,
+                        help="真实输出目录，可重复指定；默认章节目录与JSON错误日志目录")
+    parser.add_argument("--synthetic", type=int, default=300, help="合成畸形章节数量（0 不生成）")
+    parser.add_argument("--repeat", type=int, default=3, help="每个实现重复测量次数")
+    parser.add_argument("--scale-kb", type=int, nargs="*", default=[64, 256, 1024],
+                        help="长度扩展测试的章节大小（KB）")
+    args = parser.parse_args()
+
+    dirs = [Path(d) for d in (args.corpus or [settings.CHAPTER_OUTPUT_DIR, settings.JSON_ERROR_LOG_DIR])]
+    real = real_corpus(dirs)
+    if real:
+        run_corpus("真实输出", real, args.repeat)
+    else:
+        print(f"未在 {', '.join(str(d) for d in dirs)} 找到真实输出，仅使用合成语料")
+    if args.synthetic:
+        run_corpus("合成畸形章节", synthetic_corpus(args.synthetic), args.repeat)
+    if args.scale_kb:
+        run_scale(args.scale_kb)
+
+
+if __name__ == "__main__":
+    main()
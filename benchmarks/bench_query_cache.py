@@ -0,0 +1,98 @@
+"""
+查询结果缓存相似度查找基准测试
+
+对比两种实现的命中延迟：
+- legacy: KEYS cache:query:*:meta + 逐条 GET/JSON 解析（旧实现，不截断）
+- indexed: tasks.analysis.check_query_cache（倒排索引 + 前缀过滤）
+
+会向目标 Redis 写入 cache:query:* 键，请使用独立的 DB：
+
+    python benchmarks/bench_query_cache.py --redis-url redis://127.0.0.1:6379/15 --entries 100000
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+VOCAB = [
+    '高校', '食堂', '涨价', '学生', '舆情', '热搜', '品牌', '危机', '公关', '回应',
+    '政策', '调整', '房价', '楼市', '新能源', '汽车', '召回', '事故', '调查', '通报',
+    '景区', '门票', '旅游', '冰雪', '冻伤', '网红', '直播', '带货', '投诉', '维权',
+    '医保', '改革', '教育', '减负', '考研', '就业', '裁员', '招聘', '消费', '降级',
+]
+
+
+def _random_query(rng: random.Random) -> str:
+    return ''.join(rng.sample(VOCAB, rng.randint(3, 6)))
+
+
+def _legacy_lookup(r, query_tokens: set, analysis):
+    best_match, best_similarity = None, 0.0
+    for meta_key in r.keys("cache:query:*:meta"):
+        meta_data = r.get(meta_key)
+        if not meta_data:
+            continue
+        meta = json.loads(meta_data)
+        similarity = analysis._jaccard_similarity(query_tokens, set(meta.get('tokens', [])))
+        if similarity > best_similarity:
+            best_similarity, best_match = similarity, meta
+    if best_match and best_similarity >= analysis.SIMILARITY_THRESHOLD:
+        return r.get(best_match['result_key'])
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='查询缓存相似度查找基准测试')
+    parser.add_argument('--redis-url', default='redis://127.0.0.1:6379/15')
+    parser.add_argument('--entries', type=int, default=10000)
+    parser.add_argument('--lookups', type=int, default=50)
+    parser.add_argument('--skip-legacy', action='store_true', help='跳过旧实现（条目很多时非常慢）')
+    args = parser.parse_args()
+
+    os.environ['REDIS_URL'] = args.redis_url
+    from tasks import analysis, report
+
+    r = analysis._get_redis_client()
+    rng = random.Random(42)
+
+    print(f"写入 {args.entries} 条缓存...")
+    queries = []
+    t0 = time.perf_counter()
+    for i in range(args.entries):
+        query = f"{_random_query(rng)}{i}"
+        queries.append(query)
+        report._set_query_cache(query, {'id': i}, ttl=3600)
+    print(f"写入耗时 {time.perf_counter() - t0:.2f}s")
+
+    # 相似查询：去掉编号后缀，保留原词集合
+    probes = [q.rstrip('0123456789') for q in rng.sample(queries, args.lookups)]
+
+    def _measure(fn):
+        latencies, hits = [], 0
+        for probe in probes:
+            start = time.perf_counter()
+            if fn(probe):
+                hits += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+        return statistics.median(latencies), max(latencies), hits
+
+    median, worst, hits = _measure(analysis.check_query_cache)
+    print(f"indexed: p50={median:.2f}ms max={worst:.2f}ms hits={hits}/{len(probes)}")
+
+    if not args.skip_legacy:
+        median, worst, hits = _measure(
+            lambda q: _legacy_lookup(r, analysis._tokenize(q), analysis)
+        )
+        print(f"legacy:  p50={median:.2f}ms max={worst:.2f}ms hits={hits}/{len(probes)}")
+
+
+if __name__ == '__main__':
+    main()
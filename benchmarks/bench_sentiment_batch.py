@@ -0,0 +1,68 @@
+"""
+情感分析批量推理吞吐基准测试（CPU）
+
+对比逐条推理与不同 micro-batch 大小下的 texts/sec，可选开启 CPU 动态量化：
+
+    python benchmarks/bench_sentiment_batch.py --texts 256
+    python benchmarks/bench_sentiment_batch.py --texts 256 --quantize
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+SAMPLES = [
+    "这家餐厅的菜味道非常棒！",
+    "服务态度太差了，很失望",
+    "食堂又涨价了，学生们的意见很大，希望学校能给个说法",
+    "I absolutely love this product!",
+    "The customer service was disappointing.",
+    "政策出台后，网友普遍表示支持，但也有人担心执行层面会走样。",
+    "冰雪大世界的体验还可以，就是排队时间太长了，冻得手脚发麻。",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='情感分析批量推理吞吐基准测试')
+    parser.add_argument('--texts', type=int, default=256, help='测试文本数量')
+    parser.add_argument('--batch-sizes', default='1,16,64', help='逗号分隔的批大小')
+    parser.add_argument('--quantize', action='store_true', help='启用 CPU 动态量化')
+    args = parser.parse_args()
+
+    import torch
+    from InsightEngine.tools import sentiment_analyzer as sa
+
+    sa.SENTIMENT_CPU_DYNAMIC_QUANTIZATION = args.quantize
+    analyzer = sa.WeiboMultilingualSentimentAnalyzer()
+    analyzer._select_device = lambda: torch.device("cpu")
+    if not analyzer.initialize():
+        print("模型初始化失败，无法进行基准测试")
+        return
+
+    rng = random.Random(0)
+    texts = [
+        " ".join(rng.choice(SAMPLES) for _ in range(rng.randint(1, 6)))
+        for _ in range(args.texts)
+    ]
+
+    start = time.perf_counter()
+    for text in texts:
+        analyzer.analyze_single_text(text)
+    elapsed = time.perf_counter() - start
+    print(f"逐条推理: {len(texts) / elapsed:.1f} texts/sec")
+
+    for batch_size in [int(b) for b in args.batch_sizes.split(',')]:
+        start = time.perf_counter()
+        analyzer.analyze_batch(texts, show_progress=False, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"batch_size={batch_size}: {len(texts) / elapsed:.1f} texts/sec")
+
+
+if __name__ == '__main__':
+    main()
@@ -39,6 +39,7 @@ celery_app = Celery(
     broker=REDIS_URL,
     backend=REDIS_URL,
     include=[
+        'tasks.agent_pool',
         'tasks.analysis',
         'tasks.agents',
         'tasks.agents_phased',
@@ -37,6 +37,11 @@ class Settings(BaseSettings):
     DB_PASSWORD: str = Field("your_db_password", description="数据库密码")
     DB_NAME: str = Field("your_db_name", description="数据库名称")
     DB_CHARSET: str = Field("utf8mb4", description="数据库字符集，推荐utf8mb4，兼容emoji")
+    DB_POOL_SIZE: int = Field(8, description="SQLAlchemy连接池常驻连接数")
+    DB_MAX_OVERFLOW: int = Field(8, description="SQLAlchemy连接池允许的额外溢出连接数")
+    DB_PARALLEL_TABLE_QUERIES: bool = Field(True, description="多表搜索时是否并发执行各表查询")
+    DB_TABLE_QUERY_TIMEOUT: float = Field(30.0, description="并发多表查询的等待预算（秒），同时作为服务端语句超时（MySQL MAX_EXECUTION_TIME / PostgreSQL statement_timeout），超时的表结果将被丢弃")
+    DB_FULLTEXT_SEARCH: bool = Field(True, description="检测到MindSpider创建的全文索引时，话题搜索改用MATCH ... AGAINST（MySQL）")
     
     # ======================= LLM 相关 =======================
     # 我们的LLM模型API赞助商有：https://aihubmix.com/?aff=8Ds9，提供了非常全面的模型api
@@ -75,7 +80,20 @@ class Settings(BaseSettings):
     KEYWORD_OPTIMIZER_API_KEY: Optional[str] = Field(None, description="SQL Keyword Optimizer（推荐 qwen-plus，官方申请地址：https://www.aliyun.com/product/bailian）API 密钥")
     KEYWORD_OPTIMIZER_BASE_URL: Optional[str] = Field(None, description="Keyword Optimizer BaseUrl，可按所选服务配置")
     KEYWORD_OPTIMIZER_MODEL_NAME: Optional[str] = Field(None, description="Keyword Optimizer LLM 模型名称，例如 qwen-plus")
+    KEYWORD_OPTIMIZER_CACHE_MAX_ENTRIES: int = Field(5000, description="关键词优化结果进程内 LRU 缓存条数，0 表示不缓存")
+    KEYWORD_OPTIMIZER_CACHE_REDIS_URL: Optional[str] = Field(None, description="关键词优化结果的 Redis 共享缓存地址（可选），多进程/多任务之间复用，如 redis://127.0.0.1:6379/10")
+    KEYWORD_OPTIMIZER_CACHE_TTL: int = Field(3 * 86400, description="关键词优化结果在 Redis 中的过期时间（秒）")
     
+    # ================== LLM 提示词缓存配置 ====================
+    LLM_PROMPT_CACHE_HINT: Literal["none", "prompt_cache_key", "cache_control"] = Field("none", description="提示词前缀缓存提示：none 只保证稳定内容在前；prompt_cache_key 附带 OpenAI 缓存路由键；cache_control 在稳定前缀上标记显式缓存（通义千问/OpenRouter 等）")
+    LLM_STREAM_USAGE: bool = Field(False, description="流式请求是否要求服务商回传用量（stream_options.include_usage），用于统计缓存命中；部分服务商不支持该参数，默认关闭")
+
+    # ================== ForumEngine 日志监听配置 ====================
+    FORUM_LOG_WATCH_MODE: Literal["auto", "inotify", "poll"] = Field("auto", description="论坛监听引擎日志的方式：auto 优先使用 inotify（仅 Linux），不可用时轮询；poll 强制轮询")
+    FORUM_LOG_POLL_INTERVAL: float = Field(0.5, description="轮询模式下检查日志文件变化的间隔（秒）")
+    FORUM_MESSAGE_BUS: Literal["memory", "redis"] = Field("memory", description="论坛消息总线：memory 为进程内（ForumEngine 与 Web 服务同进程）；redis 使用 Redis Stream 跨进程推送")
+    FORUM_MESSAGE_BUS_SIZE: int = Field(2000, description="论坛消息总线保留的最近消息条数，/api/forum/log 游标落后超过该窗口时整体重新同步")
+
     # ================== GraphRAG 配置 ====================
     GRAPHRAG_ENABLED: bool = Field(False, description="是否启用GraphRAG知识图谱功能（true/false）")
     GRAPHRAG_MAX_QUERIES: int = Field(3, description="GraphRAG每个章节生成前的最大查询次数")
@@ -102,6 +120,9 @@ class Settings(BaseSettings):
     DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT: int = Field(200, description="平台搜索话题最大数")
     MAX_SEARCH_RESULTS_FOR_LLM: int = Field(0, description="供LLM用搜索结果最大数")
     MAX_HIGH_CONFIDENCE_SENTIMENT_RESULTS: int = Field(0, description="高置信度情感分析最大数")
+    KEYWORD_SEARCH_CONCURRENCY: int = Field(4, description="一次工具调用中各优化关键词子查询的并发数，1 为串行")
+    KEYWORD_SEARCH_TIMEOUT: float = Field(60.0, description="等待全部关键词子查询的预算（秒），超时未返回的关键词结果将被丢弃")
+    KEYWORD_SEARCH_MAX_RESULTS: int = Field(0, description="一次工具调用去重后最多收集的结果数，达到后不再等待其余关键词；0 表示不限")
     MAX_REFLECTIONS: int = Field(3, description="最大反思次数")
     MAX_PARAGRAPHS: int = Field(6, description="最大段落数")
     SEARCH_TIMEOUT: int = Field(240, description="单次搜索请求超时")
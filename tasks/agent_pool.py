@@ -0,0 +1,146 @@
+"""
+Worker 级 Agent 池
+
+每个 Celery worker 进程为三个引擎各维护一组预初始化的 DeepSearchAgent 外壳：
+- LLM 客户端、节点、搜索工具在创建时一次性构建
+- InsightEngine 的情感分析模型与聚类模型在预热时加载，进程内共享
+- 任务通过 acquire() 借出 Agent，Phased 方法会从 state_dict 重新绑定状态，
+  归还时重置 state，避免任务之间互相污染
+
+预热在 worker_process_init（prefork 子进程）或 worker_init（gevent/threads/solo
+等单进程 pool）中执行，可通过环境变量 AGENT_POOL_WARMUP 控制预热哪些引擎
+（逗号分隔，默认 query,media,insight；设为空字符串则关闭预热，按需创建）。
+"""
+
+import os
+import time
+import threading
+import importlib
+from contextlib import contextmanager
+from typing import Dict, List, Iterable, Optional
+
+from celery.signals import worker_init, worker_process_init
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+ENGINE_MODULES = {
+    'query': 'QueryEngine.agent',
+    'media': 'MediaEngine.agent',
+    'insight': 'InsightEngine.agent',
+}
+
+
+def _warmup_engines_from_env() -> List[str]:
+    raw = os.getenv('AGENT_POOL_WARMUP', 'query,media,insight')
+    return [name.strip() for name in raw.split(',') if name.strip() in ENGINE_MODULES]
+
+
+class AgentPool:
+    """按引擎缓存可复用的 DeepSearchAgent 实例"""
+
+    def __init__(self):
+        self._idle: Dict[str, List] = {name: [] for name in ENGINE_MODULES}
+        self._lock = threading.Lock()
+        self.created: Dict[str, int] = {name: 0 for name in ENGINE_MODULES}
+        self.reused: Dict[str, int] = {name: 0 for name in ENGINE_MODULES}
+        self.warmup_seconds: Dict[str, float] = {}
+
+    def _create(self, engine: str):
+        module = importlib.import_module(ENGINE_MODULES[engine])
+        agent = module.DeepSearchAgent()
+        with self._lock:
+            self.created[engine] += 1
+        return agent
+
+    @staticmethod
+    def _reset(agent) -> None:
+        """清空任务相关状态，只保留客户端、节点与模型"""
+        agent.state = type(agent.state)()
+
+    def warmup(self, engines: Optional[Iterable[str]] = None) -> None:
+        """
+        预创建 Agent 并加载重量级模型，已预热成功的引擎会被跳过
+
+        Args:
+            engines: 需要预热的引擎名称，默认读取 AGENT_POOL_WARMUP
+        """
+        for engine in (engines if engines is not None else _warmup_engines_from_env()):
+            if engine in self.warmup_seconds:
+                # 同一进程内只预热一次，重复触发的信号不会再创建实例
+                continue
+            start = time.perf_counter()
+            try:
+                agent = self._create(engine)
+                if engine == 'insight':
+                    analyzer = agent.sentiment_analyzer
+                    if not analyzer.is_initialized and not analyzer.is_disabled:
+                        analyzer.initialize()
+                    agent._get_clustering_model()
+                with self._lock:
+                    self._idle[engine].append(agent)
+            except Exception as exc:
+                logger.warning(f"[AgentPool] {engine} 预热失败，将在任务中按需创建: {exc}")
+                continue
+            self.warmup_seconds[engine] = time.perf_counter() - start
+            logger.info(f"[AgentPool] {engine} 预热完成，耗时 {self.warmup_seconds[engine]:.2f}s")
+
+    @contextmanager
+    def acquire(self, engine: str):
+        """
+        借出一个 Agent，退出上下文时重置状态并归还
+
+        并发任务各自持有独立实例；池中没有空闲实例时新建一个。
+        """
+        if engine not in ENGINE_MODULES:
+            raise ValueError(f"未知的引擎: {engine}")
+
+        start = time.perf_counter()
+        with self._lock:
+            agent = self._idle[engine].pop() if self._idle[engine] else None
+            if agent is not None:
+                self.reused[engine] += 1
+        if agent is None:
+            agent = self._create(engine)
+        logger.info(
+            f"[AgentPool] 借出 {engine} Agent，耗时 {(time.perf_counter() - start) * 1000:.1f}ms "
+            f"(复用 {self.reused[engine]} 次 / 创建 {self.created[engine]} 个)"
+        )
+
+        try:
+            yield agent
+        finally:
+            self._reset(agent)
+            with self._lock:
+                self._idle[engine].append(agent)
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                engine: {
+                    'idle': len(self._idle[engine]),
+                    'created': self.created[engine],
+                    'reused': self.reused[engine],
+                    'warmup_seconds': round(self.warmup_seconds.get(engine, 0.0), 3),
+                }
+                for engine in ENGINE_MODULES
+            }
+
+
+agent_pool = AgentPool()
+
+
+@worker_process_init.connect
+def _warm_agent_pool_in_child(**kwargs):
+    """prefork 子进程启动后预热（模型不跨 fork 共享）"""
+    agent_pool.warmup()
+
+
+@worker_init.connect
+def _warm_agent_pool_in_worker(sender=None, **kwargs):
+    """gevent / threads / solo pool 没有子进程，在 worker 主进程中预热"""
+    pool_cls = getattr(sender, 'pool_cls', None)
+    pool_name = getattr(pool_cls, '__module__', '') if pool_cls is not None else ''
+    if 'prefork' in str(pool_cls) or pool_name.endswith('.prefork'):
+        return
+    agent_pool.warmup()
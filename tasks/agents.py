@@ -19,6 +19,7 @@ from datetime import datetime
 from celery.utils.log import get_task_logger
 
 from celery_app import celery_app
+from tasks.agent_pool import agent_pool
 
 logger = get_task_logger(__name__)
 
@@ -99,14 +100,12 @@ def query_research(self, task_id: str, query: str) -> dict:
         update_agent_progress(task_id, 'query', 'running', 10)
 
         # 调用实际的 Agent
-        from QueryEngine.agent import DeepSearchAgent
-        agent = DeepSearchAgent()
+        with agent_pool.acquire('query') as agent:
+            # 更新进度：Agent 创建完成
+            update_agent_progress(task_id, 'query', 'running', 30)
 
-        # 更新进度：Agent 创建完成
-        update_agent_progress(task_id, 'query', 'running', 30)
-
-        # 执行研究（不保存报告文件）
-        result = agent.research(query, save_report=False)
+            # 执行研究（不保存报告文件）
+            result = agent.research(query, save_report=False)
 
         # 更新进度：研究完成
         update_agent_progress(task_id, 'query', 'completed', 100)
@@ -149,14 +148,12 @@ def media_research(self, task_id: str, query: str) -> dict:
         update_agent_progress(task_id, 'media', 'running', 10)
 
         # 调用实际的 Agent
-        from MediaEngine.agent import DeepSearchAgent
-        agent = DeepSearchAgent()
-
-        # 更新进度：Agent 创建完成
-        update_agent_progress(task_id, 'media', 'running', 30)
+        with agent_pool.acquire('media') as agent:
+            # 更新进度：Agent 创建完成
+            update_agent_progress(task_id, 'media', 'running', 30)
 
-        # 执行研究
-        result = agent.research(query, save_report=False)
+            # 执行研究
+            result = agent.research(query, save_report=False)
 
         # 更新进度：研究完成
         update_agent_progress(task_id, 'media', 'completed', 100)
@@ -198,14 +195,12 @@ def insight_research(self, task_id: str, query: str) -> dict:
         update_agent_progress(task_id, 'insight', 'running', 10)
 
         # 调用实际的 Agent
-        from InsightEngine.agent import DeepSearchAgent
-        agent = DeepSearchAgent()
-
-        # 更新进度：Agent 创建完成
-        update_agent_progress(task_id, 'insight', 'running', 30)
+        with agent_pool.acquire('insight') as agent:
+            # 更新进度：Agent 创建完成
+            update_agent_progress(task_id, 'insight', 'running', 30)
 
-        # 执行研究
-        result = agent.research(query, save_report=False)
+            # 执行研究
+            result = agent.research(query, save_report=False)
 
         # 更新进度：研究完成
         update_agent_progress(task_id, 'insight', 'completed', 100)
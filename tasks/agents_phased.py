@@ -19,6 +19,7 @@ from celery.utils.log import get_task_logger
 
 from celery_app import celery_app
 from tasks.blackboard import Blackboard
+from tasks.agent_pool import agent_pool
 
 logger = get_task_logger(__name__)
 
@@ -51,8 +52,9 @@ def query_plan(self, task_id: str, query: str, agent: str = 'query') -> Dict[str
 
     try:
         logger.info(f"[{task_id}] QueryEngine Plan 阶段开始: {query}")
-        blackboard.set_agent_phase(task_id, agent, 'plan')
-        blackboard.append_forum_log(task_id, agent, f"开始 Plan 阶段: {query}")
+        with blackboard.atomic() as bb:
+            bb.set_agent_phase(task_id, agent, 'plan')
+            bb.append_forum_log(task_id, agent, f"开始 Plan 阶段: {query}")
 
         # 获取可能的 Guidance
         guidance = blackboard.get_guidance(task_id, 'plan')
@@ -60,16 +62,16 @@ def query_plan(self, task_id: str, query: str, agent: str = 'query') -> Dict[str
             logger.info(f"[{task_id}] 收到 Plan Guidance: {guidance[:100]}...")
 
         # 调用 Agent 的 generate_plan 方法
-        from QueryEngine.agent import DeepSearchAgent
-        agent_instance = DeepSearchAgent()
-        plan = agent_instance.generate_plan(query, guidance=guidance)
+        with agent_pool.acquire('query') as agent_instance:
+            plan = agent_instance.generate_plan(query, guidance=guidance)
 
         # 保存到 Blackboard（包含 state_dict）
-        blackboard.save_plan_result(task_id, agent, plan)
-        blackboard.append_forum_log(
-            task_id, agent,
-            f"Plan 完成，生成 {plan.get('paragraph_count', 0)} 个段落"
-        )
+        with blackboard.atomic() as bb:
+            bb.save_plan_result(task_id, agent, plan)
+            bb.append_forum_log(
+                task_id, agent,
+                f"Plan 完成，生成 {plan.get('paragraph_count', 0)} 个段落"
+            )
 
         logger.info(f"[{task_id}] QueryEngine Plan 完成")
         return plan
@@ -113,13 +115,13 @@ def query_research(self, task_id: str, query: str, agent: str = 'query') -> Dict
             blackboard.append_forum_log(task_id, agent, f"收到 Guidance，调整研究策略")
 
         # 调用 Agent 的 execute_research 方法
-        from QueryEngine.agent import DeepSearchAgent
-        agent_instance = DeepSearchAgent()
-        research_data = agent_instance.execute_research(plan, guidance=guidance)
+        with agent_pool.acquire('query') as agent_instance:
+            research_data = agent_instance.execute_research(plan, guidance=guidance)
 
         # 保存到 Blackboard
-        blackboard.save_research_result(task_id, agent, research_data)
-        blackboard.append_forum_log(task_id, agent, "Research 阶段完成")
+        with blackboard.atomic() as bb:
+            bb.save_research_result(task_id, agent, research_data)
+            bb.append_forum_log(task_id, agent, "Research 阶段完成")
 
         logger.info(f"[{task_id}] QueryEngine Research 完成")
         return research_data
@@ -157,13 +159,13 @@ def query_report(self, task_id: str, query: str, agent: str = 'query') -> str:
             raise ValueError("未找到有效的 Research 结果（缺少 state_dict）")
 
         # 调用 Agent 的 generate_report 方法
-        from QueryEngine.agent import DeepSearchAgent
-        agent_instance = DeepSearchAgent()
-        report = agent_instance.generate_report(research_data)
+        with agent_pool.acquire('query') as agent_instance:
+            report = agent_instance.generate_report(research_data)
 
         # 保存到 Blackboard
-        blackboard.save_report_result(task_id, agent, report)
-        blackboard.append_forum_log(task_id, agent, "Report 阶段完成")
+        with blackboard.atomic() as bb:
+            bb.save_report_result(task_id, agent, report)
+            bb.append_forum_log(task_id, agent, "Report 阶段完成")
 
         logger.info(f"[{task_id}] QueryEngine Report 完成")
         return report
@@ -195,8 +197,9 @@ def media_plan(self, task_id: str, query: str, agent: str = 'media') -> Dict[str
 
     try:
         logger.info(f"[{task_id}] MediaEngine Plan 阶段开始: {query}")
-        blackboard.set_agent_phase(task_id, agent, 'plan')
-        blackboard.append_forum_log(task_id, agent, f"开始 Plan 阶段: {query}")
+        with blackboard.atomic() as bb:
+            bb.set_agent_phase(task_id, agent, 'plan')
+            bb.append_forum_log(task_id, agent, f"开始 Plan 阶段: {query}")
 
         # 获取可能的 Guidance
         guidance = blackboard.get_guidance(task_id, 'plan')
@@ -204,16 +207,16 @@ def media_plan(self, task_id: str, query: str, agent: str = 'media') -> Dict[str
             logger.info(f"[{task_id}] 收到 Plan Guidance: {guidance[:100]}...")
 
         # 调用 Agent 的 generate_plan 方法
-        from MediaEngine.agent import DeepSearchAgent
-        agent_instance = DeepSearchAgent()
-        plan = agent_instance.generate_plan(query, guidance=guidance)
+        with agent_pool.acquire('media') as agent_instance:
+            plan = agent_instance.generate_plan(query, guidance=guidance)
 
         # 保存到 Blackboard
-        blackboard.save_plan_result(task_id, agent, plan)
-        blackboard.append_forum_log(
-            task_id, agent,
-            f"Plan 完成，生成 {plan.get('paragraph_count', 0)} 个段落"
-        )
+        with blackboard.atomic() as bb:
+            bb.save_plan_result(task_id, agent, plan)
+            bb.append_forum_log(
+                task_id, agent,
+                f"Plan 完成，生成 {plan.get('paragraph_count', 0)} 个段落"
+            )
 
         logger.info(f"[{task_id}] MediaEngine Plan 完成")
         return plan
@@ -257,13 +260,13 @@ def media_research(self, task_id: str, query: str, agent: str = 'media') -> Dict
             blackboard.append_forum_log(task_id, agent, f"收到 Guidance")
 
         # 调用 Agent 的 execute_research 方法
-        from MediaEngine.agent import DeepSearchAgent
-        agent_instance = DeepSearchAgent()
-        research_data = agent_instance.execute_research(plan, guidance=guidance)
+        with agent_pool.acquire('media') as agent_instance:
+            research_data = agent_instance.execute_research(plan, guidance=guidance)
 
         # 保存到 Blackboard
-        blackboard.save_research_result(task_id, agent, research_data)
-        blackboard.append_forum_log(task_id, agent, "Research 阶段完成")
+        with blackboard.atomic() as bb:
+            bb.save_research_result(task_id, agent, research_data)
+            bb.append_forum_log(task_id, agent, "Research 阶段完成")
 
         logger.info(f"[{task_id}] MediaEngine Research 完成")
         return research_data
@@ -301,13 +304,13 @@ def media_report(self, task_id: str, query: str, agent: str = 'media') -> str:
             raise ValueError("未找到有效的 Research 结果（缺少 state_dict）")
 
         # 调用 Agent 的 generate_report 方法
-        from MediaEngine.agent import DeepSearchAgent
-        agent_instance = DeepSearchAgent()
-        report = agent_instance.generate_report(research_data)
+        with agent_pool.acquire('media') as agent_instance:
+            report = agent_instance.generate_report(research_data)
 
         # 保存到 Blackboard
-        blackboard.save_report_result(task_id, agent, report)
-        blackboard.append_forum_log(task_id, agent, "Report 阶段完成")
+        with blackboard.atomic() as bb:
+            bb.save_report_result(task_id, agent, report)
+            bb.append_forum_log(task_id, agent, "Report 阶段完成")
 
         logger.info(f"[{task_id}] MediaEngine Report 完成")
         return report
@@ -339,8 +342,9 @@ def insight_plan(self, task_id: str, query: str, agent: str = 'insight') -> Dict
 
     try:
         logger.info(f"[{task_id}] InsightEngine Plan 阶段开始: {query}")
-        blackboard.set_agent_phase(task_id, agent, 'plan')
-        blackboard.append_forum_log(task_id, agent, f"开始 Plan 阶段: {query}")
+        with blackboard.atomic() as bb:
+            bb.set_agent_phase(task_id, agent, 'plan')
+            bb.append_forum_log(task_id, agent, f"开始 Plan 阶段: {query}")
 
         # 获取可能的 Guidance
         guidance = blackboard.get_guidance(task_id, 'plan')
@@ -348,16 +352,16 @@ def insight_plan(self, task_id: str, query: str, agent: str = 'insight') -> Dict
             logger.info(f"[{task_id}] 收到 Plan Guidance: {guidance[:100]}...")
 
         # 调用 Agent 的 generate_plan 方法
-        from InsightEngine.agent import DeepSearchAgent
-        agent_instance = DeepSearchAgent()
-        plan = agent_instance.generate_plan(query, guidance=guidance)
+        with agent_pool.acquire('insight') as agent_instance:
+            plan = agent_instance.generate_plan(query, guidance=guidance)
 
         # 保存到 Blackboard
-        blackboard.save_plan_result(task_id, agent, plan)
-        blackboard.append_forum_log(
-            task_id, agent,
-            f"Plan 完成，生成 {plan.get('paragraph_count', 0)} 个段落"
-        )
+        with blackboard.atomic() as bb:
+            bb.save_plan_result(task_id, agent, plan)
+            bb.append_forum_log(
+                task_id, agent,
+                f"Plan 完成，生成 {plan.get('paragraph_count', 0)} 个段落"
+            )
 
         logger.info(f"[{task_id}] InsightEngine Plan 完成")
         return plan
@@ -401,13 +405,13 @@ def insight_research(self, task_id: str, query: str, agent: str = 'insight') ->
             blackboard.append_forum_log(task_id, agent, f"收到 Guidance")
 
         # 调用 Agent 的 execute_research 方法
-        from InsightEngine.agent import DeepSearchAgent
-        agent_instance = DeepSearchAgent()
-        research_data = agent_instance.execute_research(plan, guidance=guidance)
+        with agent_pool.acquire('insight') as agent_instance:
+            research_data = agent_instance.execute_research(plan, guidance=guidance)
 
         # 保存到 Blackboard
-        blackboard.save_research_result(task_id, agent, research_data)
-        blackboard.append_forum_log(task_id, agent, "Research 阶段完成")
+        with blackboard.atomic() as bb:
+            bb.save_research_result(task_id, agent, research_data)
+            bb.append_forum_log(task_id, agent, "Research 阶段完成")
 
         logger.info(f"[{task_id}] InsightEngine Research 完成")
         return research_data
@@ -445,13 +449,13 @@ def insight_report(self, task_id: str, query: str, agent: str = 'insight') -> st
             raise ValueError("未找到有效的 Research 结果（缺少 state_dict）")
 
         # 调用 Agent 的 generate_report 方法
-        from InsightEngine.agent import DeepSearchAgent
-        agent_instance = DeepSearchAgent()
-        report = agent_instance.generate_report(research_data)
+        with agent_pool.acquire('insight') as agent_instance:
+            report = agent_instance.generate_report(research_data)
 
         # 保存到 Blackboard
-        blackboard.save_report_result(task_id, agent, report)
-        blackboard.append_forum_log(task_id, agent, "Report 阶段完成")
+        with blackboard.atomic() as bb:
+            bb.save_report_result(task_id, agent, report)
+            bb.append_forum_log(task_id, agent, "Report 阶段完成")
 
         logger.info(f"[{task_id}] InsightEngine Report 完成")
         return report
@@ -492,13 +496,13 @@ def query_supplemental_research(self, task_id: str, query: str, guidance: str, a
             raise ValueError("未找到有效的 Research 结果（缺少 state_dict）")
 
         # 调用 Agent 的 execute_supplemental_research 方法
-        from QueryEngine.agent import DeepSearchAgent
-        agent_instance = DeepSearchAgent()
-        updated_research = agent_instance.execute_supplemental_research(research_data, guidance)
+        with agent_pool.acquire('query') as agent_instance:
+            updated_research = agent_instance.execute_supplemental_research(research_data, guidance)
 
         # 更新 Blackboard
-        blackboard.save_research_result(task_id, agent, updated_research)
-        blackboard.append_forum_log(task_id, agent, "补充研究完成")
+        with blackboard.atomic() as bb:
+            bb.save_research_result(task_id, agent, updated_research)
+            bb.append_forum_log(task_id, agent, "补充研究完成")
 
         logger.info(f"[{task_id}] QueryEngine 补充研究完成")
         return updated_research
@@ -526,12 +530,12 @@ def media_supplemental_research(self, task_id: str, query: str, guidance: str, a
         if not research_data or 'state_dict' not in research_data:
             raise ValueError("未找到有效的 Research 结果（缺少 state_dict）")
 
-        from MediaEngine.agent import DeepSearchAgent
-        agent_instance = DeepSearchAgent()
-        updated_research = agent_instance.execute_supplemental_research(research_data, guidance)
+        with agent_pool.acquire('media') as agent_instance:
+            updated_research = agent_instance.execute_supplemental_research(research_data, guidance)
 
-        blackboard.save_research_result(task_id, agent, updated_research)
-        blackboard.append_forum_log(task_id, agent, "补充研究完成")
+        with blackboard.atomic() as bb:
+            bb.save_research_result(task_id, agent, updated_research)
+            bb.append_forum_log(task_id, agent, "补充研究完成")
 
         logger.info(f"[{task_id}] MediaEngine 补充研究完成")
         return updated_research
@@ -559,12 +563,12 @@ def insight_supplemental_research(self, task_id: str, query: str, guidance: str,
         if not research_data or 'state_dict' not in research_data:
             raise ValueError("未找到有效的 Research 结果（缺少 state_dict）")
 
-        from InsightEngine.agent import DeepSearchAgent
-        agent_instance = DeepSearchAgent()
-        updated_research = agent_instance.execute_supplemental_research(research_data, guidance)
+        with agent_pool.acquire('insight') as agent_instance:
+            updated_research = agent_instance.execute_supplemental_research(research_data, guidance)
 
-        blackboard.save_research_result(task_id, agent, updated_research)
-        blackboard.append_forum_log(task_id, agent, "补充研究完成")
+        with blackboard.atomic() as bb:
+            bb.save_research_result(task_id, agent, updated_research)
+            bb.append_forum_log(task_id, agent, "补充研究完成")
 
         logger.info(f"[{task_id}] InsightEngine 补充研究完成")
         return updated_research
@@ -14,6 +14,7 @@
 import os
 import sys
 import json
+import math
 import hashlib
 from datetime import datetime
 from celery import chord, group
@@ -21,8 +22,9 @@ from celery.utils.log import get_task_logger
 
 from celery_app import celery_app
 from .agents import query_research, media_research, insight_research
-from .report import generate_report
+from .report import generate_report, QUERY_CACHE_INDEX_PREFIX
 from tasks.blackboard import Blackboard
+from api.task_manager import record_task_status, forget_task_status
 
 logger = get_task_logger(__name__)
 
@@ -33,7 +35,7 @@ if PROJECT_ROOT not in sys.path:
 
 # 相似度缓存配置
 SIMILARITY_THRESHOLD = 0.80  # 相似度阈值，超过此值认为是相似查询（0.8 = 80% 词重叠）
-MAX_CACHE_SCAN = 100  # 最多扫描多少个缓存条目
+CANDIDATE_FETCH_BATCH = 500  # 候选元数据每批 MGET 的数量
 
 
 def _tokenize(text: str) -> set:
@@ -63,6 +65,73 @@ def _jaccard_similarity(set1: set, set2: set) -> float:
     return intersection / union if union > 0 else 0.0
 
 
+def _find_similar_cached_query(r, query_tokens: set) -> tuple:
+    """
+    通过倒排索引查找最相似的缓存查询
+
+    Jaccard >= t 要求候选与查询至少共享 ceil(t * |q|) 个词，因此候选必然包含
+    查询中任意 |q| - ceil(t * |q|) + 1 个词之一（前缀过滤）。这里按索引集合
+    大小挑选最稀有的这些词，只读取它们的倒排集合，再批量 MGET 候选元数据
+    精确计算相似度。Redis 往返次数与缓存总量无关。
+
+    Args:
+        r: Redis 客户端
+        query_tokens: 查询分词集合
+
+    Returns:
+        (最佳匹配的元数据, 相似度)，无候选时返回 (None, 0.0)
+    """
+    tokens = sorted(query_tokens)
+    index_keys = [f"{QUERY_CACHE_INDEX_PREFIX}{t}" for t in tokens]
+
+    pipe = r.pipeline(transaction=False)
+    for index_key in index_keys:
+        pipe.scard(index_key)
+    sizes = pipe.execute()
+
+    min_overlap = max(1, math.ceil(SIMILARITY_THRESHOLD * len(tokens) - 1e-9))
+    probe_count = len(tokens) - min_overlap + 1
+    probe_keys = [
+        key for size, key in sorted(zip(sizes, index_keys))[:probe_count] if size
+    ]
+    if not probe_keys:
+        return None, 0.0
+
+    candidate_hashes = [
+        h.decode() if isinstance(h, bytes) else h
+        for h in r.sunion(probe_keys)
+    ]
+
+    best_match = None
+    best_similarity = 0.0
+    stale_hashes = []
+
+    for i in range(0, len(candidate_hashes), CANDIDATE_FETCH_BATCH):
+        batch = candidate_hashes[i:i + CANDIDATE_FETCH_BATCH]
+        metas = r.mget([f"cache:query:{h}:meta" for h in batch])
+        for query_hash, meta_data in zip(batch, metas):
+            if not meta_data:
+                stale_hashes.append(query_hash)
+                continue
+            try:
+                meta = json.loads(meta_data)
+            except Exception:
+                continue
+            similarity = _jaccard_similarity(query_tokens, set(meta.get('tokens', [])))
+            if similarity > best_similarity:
+                best_similarity = similarity
+                best_match = meta
+
+    # 惰性清理已过期条目在倒排索引中残留的成员
+    if stale_hashes:
+        pipe = r.pipeline(transaction=False)
+        for key in probe_keys:
+            pipe.srem(key, *stale_hashes)
+        pipe.execute()
+
+    return best_match, best_similarity
+
+
 def get_redis_url() -> str:
     """获取 Redis URL，优先使用环境变量"""
     env_url = os.getenv('REDIS_URL')
@@ -106,6 +175,7 @@ def update_task_status(task_id: str, status: str, progress: int,
             data['error'] = error
 
         r.set(status_key, json.dumps(data), ex=86400)
+        record_task_status(r, task_id, status)
 
     except Exception as exc:
         logger.warning(f"[{task_id}] 更新任务状态失败: {exc}")
@@ -141,28 +211,7 @@ def check_query_cache(query: str) -> dict | None:
         if not query_tokens:
             return None
 
-        # 获取缓存索引
-        index_keys = r.keys("cache:query:*:meta")
-        if not index_keys:
-            return None
-
-        best_match = None
-        best_similarity = 0.0
-
-        for meta_key in index_keys[:MAX_CACHE_SCAN]:
-            try:
-                meta_data = r.get(meta_key)
-                if not meta_data:
-                    continue
-                meta = json.loads(meta_data)
-                cached_tokens = set(meta.get('tokens', []))
-
-                similarity = _jaccard_similarity(query_tokens, cached_tokens)
-                if similarity > best_similarity:
-                    best_similarity = similarity
-                    best_match = meta
-            except Exception:
-                continue
+        best_match, best_similarity = _find_similar_cached_query(r, query_tokens)
 
         # 如果相似度超过阈值，返回缓存结果
         if best_match and best_similarity >= SIMILARITY_THRESHOLD:
@@ -267,8 +316,9 @@ def cleanup_expired_tasks():
             for key in keys_to_delete:
                 r.delete(key)
 
-            # 从任务列表中移除
+            # 从任务列表与状态计数中移除
             r.zrem("tasks:all", task_id)
+            forget_task_status(r, task_id)
             cleaned += 1
 
         logger.info(f"清理完成，共清理 {cleaned} 个过期任务")
@@ -6,11 +6,15 @@ Blackboard - Redis 共享状态管理
 - Plan/Research/Report 结果存储
 - Guidance 机制支持
 - Forum 讨论日志
+
+读取多个 Agent 的结果时使用 MGET / pipeline 合并为单次往返；
+多个写操作可通过 atomic() 放入同一个 MULTI 事务提交。
 """
 
 import os
 import json
 import redis
+from contextlib import contextmanager
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
@@ -39,6 +43,53 @@ class Blackboard:
         """
         self._redis = redis_client or get_redis_client()
 
+    @contextmanager
+    def atomic(self):
+        """
+        原子批量写入上下文
+
+        上下文内返回一个绑定到 Redis 事务 pipeline 的 Blackboard，所有写操作
+        （阶段、结果、Guidance、Forum 日志）在退出时通过一次 MULTI/EXEC 提交；
+        发生异常时丢弃已排队的命令。上下文内只应调用写方法。
+
+        Example:
+            with blackboard.atomic() as bb:
+                bb.save_plan_result(task_id, agent, plan)
+                bb.append_forum_log(task_id, agent, "Plan 完成")
+        """
+        pipe = self._redis.pipeline(transaction=True)
+        try:
+            yield Blackboard(redis_client=pipe)
+            pipe.execute()
+        finally:
+            pipe.reset()
+
+    @staticmethod
+    def _agent_key(task_id: str, agent: str, kind: str) -> str:
+        return f"task:{task_id}:agent:{agent}:{kind}"
+
+    @staticmethod
+    def _decode_field(raw: Optional[str], field: str) -> Any:
+        if raw:
+            return json.loads(raw).get(field)
+        return None
+
+    def _collect_agents(self, agents: List[str], values: List[Optional[str]], field: str) -> Dict[str, Any]:
+        """将 MGET 结果按 Agent 解码，过滤掉不存在或为空的条目"""
+        result = {}
+        for agent, raw in zip(agents, values):
+            value = self._decode_field(raw, field)
+            if value:
+                result[agent] = value
+        return result
+
+    def _mget_agents(self, task_id: str, agents: List[str], kind: str, field: str) -> Dict[str, Any]:
+        """一次 MGET 读取所有 Agent 的同类数据"""
+        if not agents:
+            return {}
+        keys = [self._agent_key(task_id, agent, kind) for agent in agents]
+        return self._collect_agents(agents, self._redis.mget(keys), field)
+
     # ==================== Agent 阶段管理 ====================
 
     def set_agent_phase(self, task_id: str, agent: str, phase: str) -> None:
@@ -85,12 +136,7 @@ class Blackboard:
         Returns:
             Agent -> 阶段的映射字典
         """
-        result = {}
-        for agent in agents:
-            phase = self.get_agent_phase(task_id, agent)
-            if phase:
-                result[agent] = phase
-        return result
+        return self._mget_agents(task_id, agents, 'phase', 'phase')
 
     # ==================== Plan 阶段结果 ====================
 
@@ -139,12 +185,7 @@ class Blackboard:
         Returns:
             Agent -> Plan 数据的映射字典
         """
-        result = {}
-        for agent in agents:
-            plan = self.get_plan_result(task_id, agent)
-            if plan:
-                result[agent] = plan
-        return result
+        return self._mget_agents(task_id, agents, 'plan', 'plan')
 
     # ==================== Research 阶段结果 ====================
 
@@ -193,12 +234,7 @@ class Blackboard:
         Returns:
             Agent -> Research 数据的映射字典
         """
-        result = {}
-        for agent in agents:
-            research = self.get_research_result(task_id, agent)
-            if research:
-                result[agent] = research
-        return result
+        return self._mget_agents(task_id, agents, 'research', 'research')
 
     # ==================== Report 阶段结果 ====================
 
@@ -247,12 +283,7 @@ class Blackboard:
         Returns:
             Agent -> 报告内容的映射字典
         """
-        result = {}
-        for agent in agents:
-            report = self.get_report_result(task_id, agent)
-            if report:
-                result[agent] = report
-        return result
+        return self._mget_agents(task_id, agents, 'report', 'report')
 
     # ==================== Guidance 机制 ====================
 
@@ -303,8 +334,10 @@ class Blackboard:
             当前轮次（从 1 开始）
         """
         key = f"task:{task_id}:supplement:round"
-        count = self._redis.incr(key)
-        self._redis.expire(key, self.DEFAULT_TTL)
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.incr(key)
+        pipe.expire(key, self.DEFAULT_TTL)
+        count, _ = pipe.execute()
         return count
 
     def get_supplement_round(self, task_id: str) -> int:
@@ -338,8 +371,15 @@ class Blackboard:
             'content': content,
             'timestamp': datetime.now().isoformat()
         }
-        self._redis.rpush(key, json.dumps(log_entry, ensure_ascii=False))
-        self._redis.expire(key, self.DEFAULT_TTL)
+        if isinstance(self._redis, redis.client.Pipeline):
+            # 已处于 atomic() 事务中，直接排队
+            self._redis.rpush(key, json.dumps(log_entry, ensure_ascii=False))
+            self._redis.expire(key, self.DEFAULT_TTL)
+            return
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.rpush(key, json.dumps(log_entry, ensure_ascii=False))
+        pipe.expire(key, self.DEFAULT_TTL)
+        pipe.execute()
 
     def get_forum_log(self, task_id: str) -> List[Dict[str, str]]:
         """
@@ -465,16 +505,30 @@ class Blackboard:
         Returns:
             包含所有阶段、结果、日志的摘要
         """
+        # 所有读取合并为一次 pipeline 往返
+        kinds = ('phase', 'plan', 'research', 'report')
+        pipe = self._redis.pipeline(transaction=False)
+        for kind in kinds:
+            pipe.mget([self._agent_key(task_id, agent, kind) for agent in agents] or [''])
+        pipe.get(f"task:{task_id}:supplement:round")
+        pipe.mget([f"task:{task_id}:guidance:plan", f"task:{task_id}:guidance:research"])
+        pipe.lrange(f"task:{task_id}:forum:log", 0, -1)
+        *agent_values, round_raw, guidance_raw, logs = pipe.execute()
+
+        phases, plans, research, reports = (
+            self._collect_agents(agents, values, kind)
+            for kind, values in zip(kinds, agent_values)
+        )
         return {
             'task_id': task_id,
-            'phases': self.get_all_agent_phases(task_id, agents),
-            'plans': self.get_all_plans(task_id, agents),
-            'research': self.get_all_research(task_id, agents),
-            'reports': self.get_all_reports(task_id, agents),
-            'supplement_round': self.get_supplement_round(task_id),
+            'phases': phases,
+            'plans': plans,
+            'research': research,
+            'reports': reports,
+            'supplement_round': int(round_raw) if round_raw else 0,
             'guidance': {
-                'plan': self.get_guidance(task_id, 'plan'),
-                'research': self.get_guidance(task_id, 'research'),
+                'plan': self._decode_field(guidance_raw[0], 'guidance'),
+                'research': self._decode_field(guidance_raw[1], 'guidance'),
             },
-            'forum_log': self.get_forum_log(task_id)
+            'forum_log': [json.loads(log) for log in logs]
         }
@@ -147,8 +147,9 @@ def orchestrate_plan(self, task_id: str, query: str, agents: List[str] = None) -
 
         # 保存 Guidance
         if guidance:
-            blackboard.save_guidance(task_id, 'plan', guidance)
-            blackboard.append_forum_log(task_id, 'orchestrator', f'Plan 评审：{decision}，生成 Guidance')
+            with blackboard.atomic() as bb:
+                bb.save_guidance(task_id, 'plan', guidance)
+                bb.append_forum_log(task_id, 'orchestrator', f'Plan 评审：{decision}，生成 Guidance')
         else:
             blackboard.append_forum_log(task_id, 'orchestrator', f'Plan 评审：{decision}')
 
@@ -226,11 +227,12 @@ def orchestrate_research(self, task_id: str, query: str, agents: List[str] = Non
         if decision == 'supplement':
             new_round = blackboard.increment_supplement_round(task_id)
             logger.info(f"[{task_id}] 触发补充研究，轮次：{new_round}")
-            blackboard.append_forum_log(task_id, 'orchestrator', f'Research 评审：需要补充（轮次 {new_round}）')
+            with blackboard.atomic() as bb:
+                bb.append_forum_log(task_id, 'orchestrator', f'Research 评审：需要补充（轮次 {new_round}）')
 
-            # 保存 Guidance
-            if guidance:
-                blackboard.save_guidance(task_id, 'research', guidance)
+                # 保存 Guidance
+                if guidance:
+                    bb.save_guidance(task_id, 'research', guidance)
         else:
             blackboard.append_forum_log(task_id, 'orchestrator', f'Research 评审：{decision}')
 
@@ -11,6 +11,7 @@ from datetime import datetime
 from celery.utils.log import get_task_logger
 
 from celery_app import celery_app
+from api.task_manager import record_task_status
 
 logger = get_task_logger(__name__)
 
@@ -34,6 +35,9 @@ def get_redis_url() -> str:
 
 REDIS_URL = get_redis_url()
 
+# 查询缓存倒排索引：cache:query:idx:{token} -> {query_hash, ...}
+QUERY_CACHE_INDEX_PREFIX = "cache:query:idx:"
+
 
 def _get_redis_client():
     """获取 Redis 客户端"""
@@ -73,6 +77,7 @@ def update_task_status(task_id: str, status: str, progress: int,
             data['error'] = error
 
         r.set(status_key, json.dumps(data), ex=86400)
+        record_task_status(r, task_id, status)
 
     except Exception as exc:
         logger.warning(f"[{task_id}] 更新任务状态失败: {exc}")
@@ -202,9 +207,11 @@ def _set_query_cache(query: str, result: dict, ttl: int = 86400):
 
     用于任务去重，相同或相似查询可直接返回缓存结果。
 
-    存储两个 key：
+    存储以下 key：
     1. cache:query:{hash} - 存储完整结果（用于精确匹配）
     2. cache:query:{hash}:meta - 存储查询元数据（用于相似度匹配）
+    3. cache:query:idx:{token} - 词 -> 查询哈希的倒排索引（Set），
+       相似度查找只需读取候选条目，无需 KEYS 全量扫描
 
     Args:
         query: 查询内容
@@ -216,11 +223,7 @@ def _set_query_cache(query: str, result: dict, ttl: int = 86400):
         r = _get_redis_client()
         query_hash = hashlib.md5(query.encode()).hexdigest()
 
-        # 1. 存储完整结果（用于精确匹配）
         cache_key = f"cache:query:{query_hash}"
-        r.set(cache_key, json.dumps(result, ensure_ascii=False), ex=ttl)
-
-        # 2. 存储元数据（用于相似度匹配）
         tokens = _tokenize(query)
         meta = {
             'query': query,
@@ -229,7 +232,19 @@ def _set_query_cache(query: str, result: dict, ttl: int = 86400):
             'created_at': datetime.now().isoformat()
         }
         meta_key = f"cache:query:{query_hash}:meta"
-        r.set(meta_key, json.dumps(meta, ensure_ascii=False), ex=ttl)
+
+        pipe = r.pipeline(transaction=False)
+        # 1. 存储完整结果（用于精确匹配）
+        pipe.set(cache_key, json.dumps(result, ensure_ascii=False), ex=ttl)
+        # 2. 存储元数据（用于相似度匹配）
+        pipe.set(meta_key, json.dumps(meta, ensure_ascii=False), ex=ttl)
+        # 3. 更新倒排索引；索引集合的过期时间随最新写入顺延，
+        #    过期条目残留的成员由 check_query_cache 惰性清理
+        for token in set(tokens):
+            index_key = f"{QUERY_CACHE_INDEX_PREFIX}{token}"
+            pipe.sadd(index_key, query_hash)
+            pipe.expire(index_key, ttl)
+        pipe.execute()
 
         logger.info(f"查询缓存已设置: '{query[:30]}...' (tokens: {len(tokens)})")
 
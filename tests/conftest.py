@@ -0,0 +1,10 @@
+"""
+tests 目录公共配置
+
+config.settings 在首次导入时读取环境变量；InsightEngine 包导入时会创建关键词优化器，
+因此在任何测试模块导入 config 之前先提供占位密钥，避免结果依赖测试收集顺序。
+"""
+
+import os
+
+os.environ.setdefault("KEYWORD_OPTIMIZER_API_KEY", "test-key")
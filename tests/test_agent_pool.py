@@ -0,0 +1,145 @@
+"""
+测试Worker级Agent池
+
+用桩引擎模块验证：复用的Agent以全新的state开始、并发借出互不共享实例、
+预热每个worker进程只执行一次（prefork父进程跳过，子进程与单进程pool各预热一次）
+"""
+
+import sys
+import types
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tasks import agent_pool as agent_pool_module
+from tasks.agent_pool import AgentPool, ENGINE_MODULES
+
+
+@dataclass
+class StubState:
+    query: str = ""
+    paragraphs: List[str] = field(default_factory=list)
+
+
+class StubAnalyzer:
+    def __init__(self):
+        self.is_initialized = False
+        self.is_disabled = False
+        self.initialize_calls = 0
+
+    def initialize(self):
+        self.initialize_calls += 1
+        self.is_initialized = True
+        return True
+
+
+class StubAgent:
+    instances = 0
+
+    def __init__(self):
+        StubAgent.instances += 1
+        self.state = StubState()
+        self.sentiment_analyzer = StubAnalyzer()
+        self.clustering_loads = 0
+
+    def _get_clustering_model(self):
+        self.clustering_loads += 1
+
+
+@pytest.fixture(autouse=True)
+def stub_engines(monkeypatch):
+    module = types.ModuleType("stub_engine_agent")
+    module.DeepSearchAgent = StubAgent
+    monkeypatch.setitem(sys.modules, "stub_engine_agent", module)
+    for engine in list(ENGINE_MODULES):
+        monkeypatch.setitem(ENGINE_MODULES, engine, "stub_engine_agent")
+    StubAgent.instances = 0
+
+
+class TestAgentPool:
+
+    def test_reused_agent_starts_with_fresh_state(self):
+        pool = AgentPool()
+        with pool.acquire('query') as agent:
+            agent.state.query = "第一个任务"
+            agent.state.paragraphs.append("段落")
+            first = agent
+
+        with pool.acquire('query') as agent:
+            assert agent is first
+            assert agent.state == StubState()
+
+        stats = pool.stats()['query']
+        assert (stats['created'], stats['reused'], stats['idle']) == (1, 1, 1)
+
+    def test_state_reset_even_when_task_fails(self):
+        pool = AgentPool()
+        with pytest.raises(RuntimeError):
+            with pool.acquire('media') as agent:
+                agent.state.query = "失败的任务"
+                raise RuntimeError("boom")
+        with pool.acquire('media') as again:
+            assert again is agent
+            assert again.state.query == ""
+
+    def test_concurrent_acquire_gets_distinct_agents(self):
+        pool = AgentPool()
+        with pool.acquire('insight') as a, pool.acquire('insight') as b:
+            assert a is not b
+        assert pool.stats()['insight']['idle'] == 2
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            with AgentPool().acquire('unknown'):
+                pass
+
+    def test_warmup_loads_models_once(self):
+        pool = AgentPool()
+        pool.warmup(['insight', 'query'])
+        pool.warmup(['insight', 'query'])
+        assert StubAgent.instances == 2
+
+        with pool.acquire('insight') as agent:
+            assert agent.sentiment_analyzer.initialize_calls == 1
+            assert agent.clustering_loads == 1
+        assert pool.stats()['insight']['reused'] == 1
+        assert StubAgent.instances == 2
+
+
+class TestWarmupSignals:
+
+    @pytest.fixture
+    def pool(self, monkeypatch):
+        monkeypatch.setenv("AGENT_POOL_WARMUP", "query,media,insight")
+        pool = AgentPool()
+        monkeypatch.setattr(agent_pool_module, "agent_pool", pool)
+        return pool
+
+    def test_prefork_parent_skips_and_child_warms_once(self, pool):
+        from celery.concurrency.prefork import TaskPool
+
+        agent_pool_module._warm_agent_pool_in_worker(sender=types.SimpleNamespace(pool_cls=TaskPool))
+        assert StubAgent.instances == 0
+
+        agent_pool_module._warm_agent_pool_in_child()
+        assert StubAgent.instances == 3
+        assert {engine: s['idle'] for engine, s in pool.stats().items()} == {'query': 1, 'media': 1, 'insight': 1}
+
+    def test_single_process_pool_warms_once(self, pool):
+        from celery.concurrency.thread import TaskPool
+
+        agent_pool_module._warm_agent_pool_in_worker(sender=types.SimpleNamespace(pool_cls=TaskPool))
+        agent_pool_module._warm_agent_pool_in_worker(sender=types.SimpleNamespace(pool_cls=TaskPool))
+        agent_pool_module._warm_agent_pool_in_child()
+        assert StubAgent.instances == 3
+
+    def test_warmup_disabled_by_env(self, pool, monkeypatch):
+        monkeypatch.setenv("AGENT_POOL_WARMUP", "")
+        agent_pool_module._warm_agent_pool_in_child()
+        assert StubAgent.instances == 0
@@ -0,0 +1,135 @@
+"""
+测试Blackboard的批量读写
+
+基于fakeredis验证：MGET批量读取与逐个GET的结果一致、get_task_summary单次pipeline汇总
+与逐项读取一致、atomic()事务内的写操作（含append_forum_log的Pipeline分支）在退出时一并提交、
+异常时全部丢弃
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from tasks.blackboard import Blackboard
+
+AGENTS = ['query', 'media', 'insight']
+TASK_ID = 'task-bb'
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def blackboard(redis_client):
+    bb = Blackboard(redis_client=redis_client)
+    # 故意留出缺失的 Agent，验证批量读取对空值的过滤与逐个读取一致
+    bb.set_agent_phase(TASK_ID, 'query', 'research')
+    bb.set_agent_phase(TASK_ID, 'media', 'plan')
+    bb.save_plan_result(TASK_ID, 'query', {'sections': ['背景', '观点']})
+    bb.save_plan_result(TASK_ID, 'insight', {'sections': ['情感']})
+    bb.save_research_result(TASK_ID, 'media', {'summary': '媒体研究'})
+    bb.save_research_result(TASK_ID, 'insight', {})
+    bb.save_report_result(TASK_ID, 'query', '# 报告')
+    bb.save_guidance(TASK_ID, 'plan', '补充时间线')
+    bb.increment_supplement_round(TASK_ID)
+    bb.increment_supplement_round(TASK_ID)
+    bb.append_forum_log(TASK_ID, 'orchestrator', '评审通过')
+    bb.append_forum_log(TASK_ID, 'query', 'Plan 完成')
+    return bb
+
+
+def _unbatched(bb, getter, agents=AGENTS):
+    """旧实现：逐个 Agent GET 并过滤空值"""
+    result = {}
+    for agent in agents:
+        value = getter(TASK_ID, agent)
+        if value:
+            result[agent] = value
+    return result
+
+
+class TestBatchedReads:
+
+    @pytest.mark.parametrize("batched, single", [
+        ('get_all_agent_phases', 'get_agent_phase'),
+        ('get_all_plans', 'get_plan_result'),
+        ('get_all_research', 'get_research_result'),
+        ('get_all_reports', 'get_report_result'),
+    ])
+    def test_mget_matches_per_agent_get(self, blackboard, batched, single):
+        expected = _unbatched(blackboard, getattr(blackboard, single))
+        assert getattr(blackboard, batched)(TASK_ID, AGENTS) == expected
+        assert getattr(blackboard, batched)(TASK_ID, []) == {}
+
+    def test_task_summary_matches_individual_reads(self, blackboard):
+        summary = blackboard.get_task_summary(TASK_ID, AGENTS)
+        assert summary == {
+            'task_id': TASK_ID,
+            'phases': _unbatched(blackboard, blackboard.get_agent_phase),
+            'plans': _unbatched(blackboard, blackboard.get_plan_result),
+            'research': _unbatched(blackboard, blackboard.get_research_result),
+            'reports': _unbatched(blackboard, blackboard.get_report_result),
+            'supplement_round': blackboard.get_supplement_round(TASK_ID),
+            'guidance': {
+                'plan': blackboard.get_guidance(TASK_ID, 'plan'),
+                'research': blackboard.get_guidance(TASK_ID, 'research'),
+            },
+            'forum_log': blackboard.get_forum_log(TASK_ID),
+        }
+        assert summary['supplement_round'] == 2
+        assert [log['speaker'] for log in summary['forum_log']] == ['orchestrator', 'query']
+
+    def test_task_summary_for_unknown_task(self, redis_client):
+        summary = Blackboard(redis_client=redis_client).get_task_summary('missing', [])
+        assert summary['phases'] == {} and summary['forum_log'] == []
+        assert summary['supplement_round'] == 0
+        assert summary['guidance'] == {'plan': None, 'research': None}
+
+
+class TestAtomicWrites:
+
+    def test_writes_commit_together_on_exit(self, redis_client):
+        bb = Blackboard(redis_client=redis_client)
+        with bb.atomic() as tx:
+            tx.set_agent_phase(TASK_ID, 'query', 'report')
+            tx.save_report_result(TASK_ID, 'query', '# 报告')
+            tx.append_forum_log(TASK_ID, 'query', 'Report 完成')
+            # 事务提交前对外不可见
+            assert bb.get_agent_phase(TASK_ID, 'query') is None
+            assert bb.get_forum_log(TASK_ID) == []
+
+        assert bb.get_agent_phase(TASK_ID, 'query') == 'report'
+        assert bb.get_report_result(TASK_ID, 'query') == '# 报告'
+        assert [log['content'] for log in bb.get_forum_log(TASK_ID)] == ['Report 完成']
+        assert 0 < redis_client.ttl(f"task:{TASK_ID}:forum:log") <= Blackboard.DEFAULT_TTL
+
+    def test_forum_log_in_transaction_matches_direct_append(self, redis_client):
+        bb = Blackboard(redis_client=redis_client)
+        bb.append_forum_log('direct', 'media', '发言')
+        with bb.atomic() as tx:
+            tx.append_forum_log('atomic', 'media', '发言')
+
+        direct, queued = bb.get_forum_log('direct'), bb.get_forum_log('atomic')
+        assert [(l['speaker'], l['content']) for l in direct] == [(l['speaker'], l['content']) for l in queued]
+        assert redis_client.ttl("task:atomic:forum:log") == redis_client.ttl("task:direct:forum:log")
+
+    def test_exception_discards_queued_writes(self, redis_client):
+        bb = Blackboard(redis_client=redis_client)
+        with pytest.raises(RuntimeError):
+            with bb.atomic() as tx:
+                tx.save_plan_result(TASK_ID, 'media', {'sections': []})
+                tx.append_forum_log(TASK_ID, 'media', 'Plan 完成')
+                raise RuntimeError("boom")
+
+        assert bb.get_plan_result(TASK_ID, 'media') is None
+        assert bb.get_forum_log(TASK_ID) == []
+        assert redis_client.keys('*') == []
@@ -0,0 +1,191 @@
+"""
+测试章节JSON流式增量解析与提前中止
+
+覆盖：任意切分的delta都能逐个解析出顶层block（字符串内括号/转义、嵌套blocks不误判）、
+{"chapter": ...} 包裹与裸章节两种形式、开头迟迟没有JSON或连续无法解析/重复的block时中止（仅校验失败的block不中止）、
+ChapterGenerationNode 在流中途关闭LLM流并抛出可重试异常、关闭中止时完整读取输出
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.core import ChapterStorage
+from ReportEngine.ir import ChapterStreamParser, IRValidator
+from ReportEngine.nodes import ChapterGenerationNode, ChapterJsonParseError, ChapterStreamAbortedError
+
+
+def _paragraph(text):
+    return {"type": "paragraph", "inlines": [{"text": text}]}
+
+
+BLOCKS = [
+    {"type": "heading", "level": 2, "text": "一、概述 {重点}", "anchor": "s1"},
+    _paragraph('含有 "引号"、[方括号] 与 {花括号} 的正文\\n'),
+    {
+        "type": "engineQuote",
+        "engine": "insight",
+        "title": "Insight Agent",
+        "blocks": [_paragraph("嵌套段落不应单独推送")],
+    },
+    _paragraph("结尾段落"),
+]
+
+
+def _chapter_text(blocks=BLOCKS, wrap=True):
+    chapter = {"chapterId": "S1", "title": "概述", "anchor": "s1", "order": 10, "blocks": blocks}
+    payload = {"chapter": chapter} if wrap else chapter
+    return "```json\n" + json.dumps(payload, ensure_ascii=False, indent=2) + "\n```"
+
+
+def _split(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _feed_all(parser, deltas):
+    completed = []
+    for delta in deltas:
+        completed.extend(parser.feed(delta))
+    return completed
+
+
+class TestChapterStreamParser:
+
+    @pytest.mark.parametrize("size", [1, 7, 64, 100000])
+    def test_blocks_emitted_for_any_split(self, size):
+        parser = ChapterStreamParser(IRValidator())
+        completed = _feed_all(parser, _split(_chapter_text(), size))
+        assert [item.block for item in completed] == BLOCKS
+        assert all(item.valid for item in completed)
+        assert parser.abort_reason is None
+
+    def test_unwrapped_chapter(self):
+        parser = ChapterStreamParser(IRValidator())
+        completed = _feed_all(parser, _split(_chapter_text(wrap=False), 5))
+        assert [item.index for item in completed] == [0, 1, 2, 3]
+
+    def test_block_emitted_as_soon_as_it_closes(self):
+        text = _chapter_text()
+        cut = text.index("结尾段落")
+        parser = ChapterStreamParser(IRValidator())
+        assert len(parser.feed(text[:cut])) == 3
+        assert len(parser.feed(text[cut:])) == 1
+
+    def test_single_invalid_block_does_not_abort(self):
+        blocks = [_paragraph("a"), {"type": "paragraph"}, _paragraph("b")]
+        parser = ChapterStreamParser(IRValidator(), max_invalid_blocks=2)
+        completed = _feed_all(parser, _split(_chapter_text(blocks), 9))
+        assert [item.valid for item in completed] == [True, False, True]
+        assert parser.abort_reason is None
+
+    def test_consecutive_unparseable_blocks_abort(self):
+        blocks = [_paragraph("a")] + [f"@BROKEN{i}@" for i in range(5)]
+        text = _chapter_text(blocks)
+        for i in range(5):
+            # 括号配对但缺少逗号，无法解析为JSON
+            text = text.replace(f'"@BROKEN{i}@"', f'{{"type": "paragraph" "n": {i}}}')
+        parser = ChapterStreamParser(IRValidator(), max_invalid_blocks=3)
+        completed = _feed_all(parser, _split(text, 9))
+        assert parser.abort_reason and "连续 3 个block" in parser.abort_reason
+        assert "无法解析为JSON" in parser.abort_reason
+        # 中止后不再继续解析
+        assert len(completed) == 4
+
+    def test_schema_invalid_blocks_left_to_repair(self):
+        # 能解析但校验失败的block由流结束后的结构修复处理，不触发中止
+        blocks = [_paragraph("a")] + [{"type": "unknownBlock", "n": i} for i in range(5)]
+        parser = ChapterStreamParser(IRValidator(), max_invalid_blocks=3)
+        completed = _feed_all(parser, _split(_chapter_text(blocks), 9))
+        assert parser.abort_reason is None
+        assert [item.valid for item in completed] == [True] + [False] * 5
+
+    def test_repeated_block_counts_as_invalid(self):
+        blocks = [_paragraph("循环输出")] * 4
+        parser = ChapterStreamParser(IRValidator(), max_invalid_blocks=3)
+        _feed_all(parser, _split(_chapter_text(blocks), 11))
+        assert parser.abort_reason and "重复" in parser.abort_reason
+
+    def test_missing_json_aborts(self):
+        parser = ChapterStreamParser(IRValidator(), max_preamble_chars=50)
+        parser.feed("抱歉，我无法按要求输出JSON，以下是普通文本说明。" * 3)
+        assert parser.abort_reason
+
+    def test_thresholds_zero_disable_abort(self):
+        parser = ChapterStreamParser(IRValidator(), max_preamble_chars=0, max_invalid_blocks=0)
+        blocks = [{"type": "unknownBlock", "n": i} for i in range(5)]
+        _feed_all(parser, ["x" * 5000, _chapter_text(blocks)])
+        assert parser.abort_reason is None
+        assert len(parser.blocks) == 5
+
+
+class FakeStreamLLM:
+    """按固定切片流式返回文本，记录被消费的切片数与流是否被关闭"""
+
+    def __init__(self, text, size=20):
+        self.deltas = _split(text, size)
+        self.consumed = 0
+        self.closed = False
+
+    def stream_invoke(self, system_prompt, user_prompt, **kwargs):
+        try:
+            for delta in self.deltas:
+                self.consumed += 1
+                yield delta
+        finally:
+            self.closed = True
+
+
+@pytest.fixture
+def workdir():
+    path = Path(tempfile.mkdtemp())
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def _node(llm, workdir):
+    return ChapterGenerationNode(
+        llm,
+        IRValidator(),
+        ChapterStorage(str(workdir / "chapters")),
+        error_log_dir=workdir / "errors",
+    )
+
+
+class TestChapterNodeStreaming:
+
+    def test_blocks_pushed_during_stream(self, workdir):
+        llm = FakeStreamLLM(_chapter_text())
+        events = []
+        raw = _node(llm, workdir)._stream_llm(
+            "prompt", workdir, block_callback=lambda event, meta: events.append(event),
+            section_meta={"title": "概述"},
+        )
+        assert raw == _chapter_text()
+        assert [event["index"] for event in events] == [0, 1, 2, 3]
+        assert all(event["valid"] for event in events)
+
+    def test_unrecoverable_stream_is_closed_early(self, workdir):
+        # 模型陷入循环，反复输出同一个block
+        blocks = [_paragraph("x" * 40) for _ in range(40)]
+        llm = FakeStreamLLM(_chapter_text(blocks))
+        with pytest.raises(ChapterStreamAbortedError) as exc_info:
+            _node(llm, workdir)._stream_llm("prompt", workdir, section_meta={"title": "概述"})
+        assert isinstance(exc_info.value, ChapterJsonParseError)
+        assert llm.closed
+        assert llm.consumed < len(llm.deltas) // 4
+        assert (workdir / "stream.raw").read_text(encoding="utf-8") == exc_info.value.raw_text
+
+    def test_abort_disabled_reads_full_output(self, workdir):
+        blocks = [{"type": "unknownBlock", "text": "x" * 40} for _ in range(40)]
+        llm = FakeStreamLLM(_chapter_text(blocks))
+        raw = _node(llm, workdir)._stream_llm("prompt", workdir, stream_abort=False)
+        assert llm.consumed == len(llm.deltas)
+        assert raw == _chapter_text(blocks)
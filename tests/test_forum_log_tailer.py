@@ -0,0 +1,168 @@
+"""
+测试ForumEngine的增量日志读取（LogTailer）与事件驱动等待（LogWatcher）
+
+覆盖：字节偏移基线、半行缓冲、截断/重建检测、inotify唤醒延迟，以及LogMonitor端到端写入forum.log
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ForumEngine.log_tailer import InotifyLogWatcher, LogTailer, create_log_watcher
+from ForumEngine.monitor import LogMonitor
+from tests import forum_log_test_data as test_data
+
+
+def _append(path: Path, text: str):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(text)
+
+
+class TestLogTailer:
+
+    def setup_method(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.log_file = Path(self.tmpdir.name) / 'insight.log'
+
+    def teardown_method(self):
+        self.tmpdir.cleanup()
+
+    def test_starts_from_current_end(self):
+        _append(self.log_file, "旧内容1\n旧内容2\n")
+        tailer = LogTailer(self.log_file)
+        assert tailer.read_new_lines() == ([], False)
+
+        _append(self.log_file, "新内容\n")
+        assert tailer.read_new_lines() == (["新内容"], False)
+
+    def test_partial_line_waits_for_newline(self):
+        tailer = LogTailer(self.log_file)
+        _append(self.log_file, "半行")
+        assert tailer.read_new_lines() == ([], False)
+        _append(self.log_file, "内容\n下一行\n")
+        assert tailer.read_new_lines() == (["半行内容", "下一行"], False)
+
+    def test_multibyte_character_split_across_reads(self):
+        tailer = LogTailer(self.log_file)
+        encoded = "论坛\n".encode('utf-8')
+        with open(self.log_file, 'ab') as f:
+            f.write(encoded[:4])
+        assert tailer.read_new_lines() == ([], False)
+        with open(self.log_file, 'ab') as f:
+            f.write(encoded[4:])
+        assert tailer.read_new_lines() == (["论坛"], False)
+
+    def test_truncation_restarts_from_beginning(self):
+        _append(self.log_file, "x" * 100 + "\n")
+        tailer = LogTailer(self.log_file)
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.truncate(0)
+        _append(self.log_file, "清空后\n")
+        assert tailer.read_new_lines() == (["清空后"], True)
+        assert tailer.read_new_lines() == ([], False)
+
+    def test_recreated_file_is_detected(self):
+        _append(self.log_file, "旧文件内容很长很长很长\n")
+        tailer = LogTailer(self.log_file)
+        # 先建新文件再替换，保证 inode 不会被复用
+        replacement = self.log_file.with_suffix('.new')
+        _append(replacement, "新文件的内容更长更长更长更长更长\n")
+        os.replace(replacement, self.log_file)
+        assert tailer.read_new_lines() == (["新文件的内容更长更长更长更长更长"], True)
+
+    def test_missing_file(self):
+        tailer = LogTailer(self.log_file)
+        assert tailer.read_new_lines() == ([], False)
+        _append(self.log_file, "出现\n")
+        assert tailer.read_new_lines() == (["出现"], False)
+        self.log_file.unlink()
+        assert tailer.read_new_lines() == ([], True)
+
+
+class TestLogWatcher:
+
+    def setup_method(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.log_dir = Path(self.tmpdir.name)
+
+    def teardown_method(self):
+        self.tmpdir.cleanup()
+
+    def test_poll_mode(self):
+        watcher = create_log_watcher(self.log_dir, ['insight.log'], mode='poll', poll_interval=0.01)
+        assert watcher.mode == 'poll'
+        assert watcher.wait(1.0) is True
+        watcher.close()
+        assert watcher.wait(1.0) is False
+
+    def test_inotify_wakes_on_write(self):
+        try:
+            watcher = InotifyLogWatcher(self.log_dir, ['insight.log'])
+        except OSError:
+            pytest.skip("inotify 不可用")
+
+        def write_later():
+            time.sleep(0.1)
+            _append(self.log_dir / 'forum.log', "无关文件\n")
+            time.sleep(0.1)
+            _append(self.log_dir / 'insight.log', "新行\n")
+
+        writer = threading.Thread(target=write_later)
+        start = time.monotonic()
+        writer.start()
+        try:
+            assert watcher.wait(5.0) is True
+            elapsed = time.monotonic() - start
+            # 无关文件不应唤醒，关注的文件写入后立即唤醒
+            assert 0.15 <= elapsed < 1.0
+        finally:
+            writer.join()
+            watcher.close()
+
+
+class TestLogMonitorIncremental:
+
+    def setup_method(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.monitor = LogMonitor(log_dir=self.tmpdir.name)
+        for app_name, log_file in self.monitor.monitored_logs.items():
+            self.monitor.tailers[app_name] = LogTailer(log_file)
+            self.monitor._reset_capture_state(app_name)
+
+    def teardown_method(self):
+        self.tmpdir.cleanup()
+
+    def _forum_lines(self):
+        return self.monitor.get_forum_log_content()
+
+    def test_first_summary_starts_session_and_is_captured(self):
+        insight_log = self.monitor.monitored_logs['insight']
+        _append(insight_log, test_data.NEW_FORMAT_FIRST_SUMMARY + "\n")
+        assert self.monitor.process_log_updates() is True
+        assert self.monitor.is_searching
+        assert any("[INSIGHT]" in line and "首次总结" in line for line in self._forum_lines())
+
+        _append(insight_log, "\n".join(test_data.NEW_FORMAT_MULTILINE_JSON) + "\n")
+        self.monitor.process_log_updates()
+        assert any("JSON内容" in line for line in self._forum_lines())
+
+    def test_truncation_ends_session(self):
+        insight_log = self.monitor.monitored_logs['insight']
+        _append(insight_log, test_data.NEW_FORMAT_FIRST_SUMMARY + "\n")
+        self.monitor.process_log_updates()
+        assert self.monitor.is_searching
+
+        with open(insight_log, 'a', encoding='utf-8') as f:
+            f.truncate(0)
+        assert self.monitor.process_log_updates() is False
+        assert not self.monitor.is_searching
+        assert "论坛结束" in self._forum_lines()[-1]
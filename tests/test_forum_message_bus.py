@@ -0,0 +1,103 @@
+"""
+测试ForumEngine论坛消息总线
+
+覆盖：seq游标增量读取、单批条数限制、保留窗口外/进程重启后的重新同步、阻塞等待唤醒，
+以及LogMonitor写入forum.log时按相同顺序发布消息；Redis Stream后端在安装fakeredis时测试
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ForumEngine.message_bus import ForumMessageBus, RedisForumMessageBus, build_forum_message
+from ForumEngine.monitor import LogMonitor
+
+
+def _message(idx):
+    return build_forum_message(f"[10:00:00] [QUERY] 发言{idx}", f"发言{idx}", "query", "10:00:00")
+
+
+def _make_redis_bus(max_messages):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return RedisForumMessageBus(fakeredis.FakeRedis(decode_responses=True), max_messages)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def make_bus(request):
+    if request.param == "memory":
+        return ForumMessageBus
+    return _make_redis_bus
+
+
+class TestForumMessageBus:
+
+    def test_cursor_reads_each_message_once(self, make_bus):
+        bus = make_bus(100)
+        for idx in range(3):
+            bus.publish(_message(idx))
+
+        batch = bus.read_since(0)
+        assert [m['content'] for m in batch.messages] == ["发言0", "发言1", "发言2"]
+        assert [m['seq'] for m in batch.messages] == [1, 2, 3]
+        assert batch.cursor == 3 and not batch.gap
+
+        assert bus.read_since(batch.cursor).messages == []
+        bus.publish(_message(3))
+        batch = bus.read_since(batch.cursor)
+        assert [m['content'] for m in batch.messages] == ["发言3"]
+        assert batch.messages[0]['source'] == "QUERY"
+
+    def test_limit_pages_through_backlog(self, make_bus):
+        bus = make_bus(100)
+        for idx in range(5):
+            bus.publish(_message(idx))
+        first = bus.read_since(0, limit=2)
+        second = bus.read_since(first.cursor, limit=2)
+        third = bus.read_since(second.cursor, limit=2)
+        assert [m['seq'] for m in first.messages + second.messages + third.messages] == [1, 2, 3, 4, 5]
+
+    def test_gap_when_cursor_unknown(self):
+        bus = ForumMessageBus(max_messages=3)
+        for idx in range(6):
+            bus.publish(_message(idx))
+        # 游标早于保留窗口
+        batch = bus.read_since(1)
+        assert batch.gap
+        assert [m['seq'] for m in batch.messages] == [4, 5, 6]
+        # 游标来自上一个进程（seq 已重置）
+        assert bus.read_since(99).gap
+        assert not bus.read_since(6).gap
+
+    def test_blocking_read_wakes_on_publish(self, make_bus):
+        bus = make_bus(100)
+        publisher = threading.Timer(0.1, bus.publish, args=(_message(0),))
+        start = time.monotonic()
+        publisher.start()
+        batch = bus.read_since(0, timeout=5.0)
+        publisher.join()
+        assert [m['seq'] for m in batch.messages] == [1]
+        assert time.monotonic() - start < 2.0
+
+
+class TestLogMonitorPublishes:
+
+    def test_forum_log_lines_are_published_in_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            bus = ForumMessageBus()
+            monitor = LogMonitor(log_dir=tmp, message_bus=bus)
+            monitor.write_to_forum_log("第一行\n第二行", "INSIGHT")
+            monitor.write_to_forum_log("主持人发言", "HOST")
+
+            messages = bus.read_since(0).messages
+            assert [m['line'] for m in messages] == monitor.get_forum_log_content()
+            assert messages[0]['content'] == "第一行\n第二行"
+            assert [m['source'] for m in messages] == ["INSIGHT", "HOST"]
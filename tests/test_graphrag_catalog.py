@@ -0,0 +1,139 @@
+"""
+测试知识图谱目录索引（GraphCatalog）
+
+覆盖：保存即登记、按目录名/分隔符变体/文件内ID查找与旧遍历逻辑一致、最新图谱与列表、
+索引缺失或版本过旧时自动重建、运行目录被删除后索引自清理、
+目录名包含报告ID的查找也走别名索引（不扫描全表）
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.graphrag import graph_catalog
+from ReportEngine.graphrag.graph_catalog import CATALOG_FILENAME, GraphCatalog
+from ReportEngine.graphrag.graph_storage import Graph, GraphStorage
+from ReportEngine.utils.config import settings
+
+
+def _graph(title):
+    graph = Graph()
+    graph.add_node('section', name=title, node_id=f"section_{title}", title=title)
+    return graph
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    tmpdir = tempfile.mkdtemp()
+    monkeypatch.setattr(settings, "CHAPTER_OUTPUT_DIR", tmpdir)
+    yield GraphStorage()
+    shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def _save(storage, dir_name, task_id=None, mtime=None):
+    path = storage.save(_graph(dir_name), task_id or dir_name, storage.chapters_dir / dir_name)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+        # 修改时间以登记时为准，这里同步刷新索引
+        storage.catalog.record(dir_name, json.loads(path.read_text(encoding='utf-8')), mtime)
+    return path
+
+
+class TestGraphCatalog:
+
+    def test_lookups_match_directory_scan(self, storage, monkeypatch):
+        paths = {
+            'report_a': _save(storage, 'report_a', mtime=1000),
+            'report-b-20240101': _save(storage, 'report-b-20240101', mtime=3000),
+            'run-1': _save(storage, 'run-1', task_id='task_xyz', mtime=2000),
+        }
+        assert (storage.chapters_dir / CATALOG_FILENAME).exists()
+
+        # 查找不应再遍历目录
+        def no_scan(*args, **kwargs):
+            raise AssertionError("不应遍历运行目录")
+        monkeypatch.setattr(GraphStorage, "_scan_graph_by_report_id", no_scan)
+        assert storage.find_graph_by_report_id('report-a') == paths['report_a']
+        assert storage.find_graph_by_report_id('report_b') == paths['report-b-20240101']
+        assert storage.find_graph_by_report_id('task-xyz') == paths['run-1']
+        assert storage.find_graph_by_report_id('missing') is None
+        assert storage.find_latest_graph() == paths['report-b-20240101']
+
+    def test_catalog_agrees_with_scan(self, storage):
+        for name in ['report_a', 'report-b-20240101', 'run-1']:
+            _save(storage, name, task_id=f"id_{name}")
+        for report_id in ['report_a', 'report-a', 'report_b', 'id-run-1', 'nothing']:
+            assert storage.find_graph_by_report_id(report_id) == \
+                   storage._scan_graph_by_report_id(storage.chapters_dir, report_id)
+        listed = storage.list_all_graphs()
+        assert [g['dir_name'] for g in listed] == ['run-1', 'report-b-20240101', 'report_a']
+        assert listed[0]['report_id'] == 'id_run-1'
+        assert listed[0]['stats']['total_nodes'] == 1
+
+    def test_missing_catalog_is_rebuilt_from_existing_runs(self, storage):
+        path = _save(storage, 'legacy_run')
+        (storage.chapters_dir / CATALOG_FILENAME).unlink()
+        (storage.chapters_dir / 'broken').mkdir()
+        (storage.chapters_dir / 'broken' / GraphStorage.FILENAME).write_text('{', encoding='utf-8')
+
+        assert storage.find_graph_by_report_id('legacy-run') == path
+        assert GraphCatalog(storage.chapters_dir).rebuild() == 1
+
+    def test_deleted_run_is_dropped(self, storage):
+        older = _save(storage, 'older', mtime=1000)
+        newer = _save(storage, 'newer', mtime=2000)
+        shutil.rmtree(newer.parent)
+        assert [g['dir_name'] for g in storage.list_all_graphs()] == ['older']
+        assert storage.find_latest_graph() == older
+        assert storage.find_graph_by_report_id('newer') is None
+
+    def test_graph_saved_outside_chapters_dir_is_not_registered(self, storage):
+        outside = Path(tempfile.mkdtemp())
+        try:
+            storage.save(_graph('x'), 'outside_run', outside / 'outside_run')
+            assert storage.find_graph_by_report_id('outside_run') is None
+        finally:
+            shutil.rmtree(outside, ignore_errors=True)
+
+    def test_segment_lookup_uses_alias_index(self, storage, monkeypatch):
+        older = _save(storage, 'report_c_20240101', mtime=1000)
+        newer = _save(storage, '20240202-report-c', mtime=2000)
+        _save(storage, 'other', mtime=3000)
+
+        statements = []
+        real_connect = graph_catalog.sqlite3.connect
+
+        def traced_connect(*args, **kwargs):
+            conn = real_connect(*args, **kwargs)
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        monkeypatch.setattr(graph_catalog.sqlite3, "connect", traced_connect)
+        # 目录名片段命中多个时取最新的
+        assert storage.find_graph_by_report_id('report-c') == newer
+        assert storage.find_graph_by_report_id('c_20240101') == older
+        assert storage.find_graph_by_report_id('port-c') is None
+        selects = [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+        assert selects and all("alias = '" in sql for sql in selects)
+
+    def test_outdated_catalog_is_rebuilt(self, storage):
+        path = _save(storage, 'report-d-20240101')
+        db_path = storage.chapters_dir / CATALOG_FILENAME
+        conn = sqlite3.connect(str(db_path))
+        with conn:
+            conn.execute("DELETE FROM aliases WHERE kind = ?", (graph_catalog.ALIAS_DIR_SEGMENT,))
+            conn.execute("PRAGMA user_version = 0")
+        conn.close()
+        graph_catalog._initialized_paths.discard(str(db_path.resolve()))
+
+        assert GraphCatalog(storage.chapters_dir).find_by_report_id('report_d') == path
@@ -0,0 +1,106 @@
+"""
+测试GraphRAG图谱索引
+
+覆盖：出边/入边与按类型索引、序列化往返后索引一致、关键词倒排索引与逐节点扫描结果一致、
+图谱新增节点后索引增量补齐
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.graphrag.graph_storage import Graph
+from ReportEngine.graphrag.query_engine import QueryEngine, QueryParams, get_keyword_index
+
+WORDS = ['高校', '食堂', '涨价', 'Brand', 'crisis', '回应', '政策', '新能源', 'EV', '召回']
+
+
+def _scan(graph, keyword):
+    keyword = keyword.lower()
+    return [
+        node for node in graph.nodes.values()
+        if keyword in f"{node.name} {node.get('title', '')} {node.get('query_text', '')} {node.get('summary', '')}".lower()
+    ]
+
+
+def _random_graph(seed=7, sections=40, queries=80):
+    rng = random.Random(seed)
+    graph = Graph()
+    engines = ['insight', 'media', 'query']
+    section_nodes = []
+    for idx in range(sections):
+        section_nodes.append(graph.add_node(
+            'section', name=f"S{idx}", node_id=f"section_{idx}",
+            title=''.join(rng.sample(WORDS, 2)), summary=' '.join(rng.sample(WORDS, 3)),
+            engine=engines[idx % 3], order=idx,
+        ))
+    for idx in range(queries):
+        query = graph.add_node(
+            'search_query', name=f"Q{idx}", node_id=f"query_{idx}",
+            query_text=''.join(rng.sample(WORDS, 3)), engine=engines[idx % 3],
+        )
+        graph.add_edge(rng.choice(section_nodes), query, 'searched')
+    return graph
+
+
+class TestGraphIndexes:
+
+    def test_edges_and_types_match_scan(self):
+        graph = _random_graph()
+        for node_id in list(graph.nodes)[:20]:
+            assert graph.get_edges_from(node_id) == [e for e in graph.edges if e.from_id == node_id]
+            assert graph.get_edges_to(node_id) == [e for e in graph.edges if e.to_id == node_id]
+        assert graph.get_nodes_by_type('section') == [n for n in graph.nodes.values() if n.type == 'section']
+        assert graph.get_edges_from('missing') == [] and graph.get_nodes_by_type('missing') == []
+        assert graph.get_stats()['section'] == 40
+
+    def test_from_dict_rebuilds_indexes(self):
+        graph = _random_graph()
+        restored = Graph.from_dict(graph.to_dict())
+        assert restored.get_stats() == graph.get_stats()
+        for node_id in graph.nodes:
+            assert [e.to_dict() for e in restored.get_edges_from(node_id)] == \
+                   [e.to_dict() for e in graph.get_edges_from(node_id)]
+
+    def test_returned_lists_are_copies(self):
+        graph = _random_graph()
+        graph.get_nodes_by_type('section').clear()
+        graph.get_edges_from('section_0').clear()
+        assert len(graph.get_nodes_by_type('section')) == 40
+        assert graph.get_edges_from('section_0') == [e for e in graph.edges if e.from_id == 'section_0']
+
+
+class TestKeywordIndex:
+
+    def test_lookup_matches_scan(self):
+        graph = _random_graph()
+        index = get_keyword_index(graph)
+        for keyword in WORDS + ['brand', 'ev', '高', 'e', '', '不存在的词', 's1', 'crisis 回应']:
+            assert index.lookup(keyword) == _scan(graph, keyword), keyword
+
+    def test_index_catches_up_with_new_nodes(self):
+        graph = _random_graph()
+        assert get_keyword_index(graph).lookup('独有词') == []
+        graph.add_node('section', name="late", node_id="section_late", title="独有词")
+        assert [n.id for n in get_keyword_index(graph).lookup('独有词')] == ['section_late']
+
+    def test_query_results_unchanged(self):
+        graph = _random_graph()
+        engine = QueryEngine(graph)
+        params = QueryParams(keywords=['政策', 'EV'], node_types=['search_query'], engine_filter=['media'], depth=0)
+        expected = {
+            node.id for node in graph.nodes.values()
+            if node.type == 'search_query' and node.get('engine') == 'media'
+            and (node in _scan(graph, '政策') or node in _scan(graph, 'EV'))
+        }
+        assert expected
+        assert engine._match_keywords(params) == expected
+        # 字符串关键词按逗号/空格拆分，空关键词只返回段落
+        assert engine._match_keywords(QueryParams(keywords='政策,EV', depth=0)) == \
+               engine._match_keywords(QueryParams(keywords=['政策', 'EV'], depth=0))
+        assert engine._match_keywords(QueryParams(keywords=[], depth=0)) == \
+               {n.id for n in graph.get_nodes_by_type('section')}
@@ -0,0 +1,277 @@
+"""
+测试HTMLRenderer的渲染缓存
+
+覆盖：缓存输出与不缓存时逐字节一致、整份文档命中不再渲染、只改动一章时其余章节复用片段
+（含图表/匿名标题ID的偏移还原）、主题变化时CSS重新生成、流式渲染完整输出后写入整份文档缓存；
+结果查看接口 inline 模式直接返回保存的HTML、external 模式多次查看只渲染一次；
+ReportEngine 与 /api/v2 结果接口流式中途出错有提示、首个片段前出错返回500
+"""
+
+import copy
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.renderers import html_renderer as html_renderer_module
+from ReportEngine.renderers.html_renderer import HTMLRenderer
+from ReportEngine.renderers.render_cache import RenderCache
+
+
+def _chart_block(widget_id, values):
+    return {
+        "type": "widget",
+        "widgetId": widget_id,
+        "widgetType": "chart.js/bar",
+        "props": {"type": "bar", "title": f"图表{widget_id}"},
+        "data": {"labels": ["A", "B", "C"], "datasets": [{"label": "数量", "data": values}]},
+    }
+
+
+def _chapter(idx, charts=1):
+    blocks = [
+        {"type": "heading", "level": 2, "text": f"第{idx}章", "anchor": f"section-{idx}"},
+        {"type": "heading", "level": 3, "text": "无锚点小节"},
+        {"type": "paragraph", "inlines": [{"text": f"第{idx}章正文"}]},
+    ]
+    blocks += [_chart_block(f"w{idx}-{n}", [idx, n, 3]) for n in range(charts)]
+    return {"chapterId": f"S{idx}", "title": f"第{idx}章", "anchor": f"section-{idx}", "order": idx, "blocks": blocks}
+
+
+def _document(chapter_count=3):
+    return {
+        "metadata": {"title": "缓存测试报告", "themeTokens": {"colors": {"primary": "#123456"}}},
+        "chapters": [_chapter(idx) for idx in range(1, chapter_count + 1)],
+    }
+
+
+def _render(document):
+    return HTMLRenderer().render(copy.deepcopy(document))
+
+
+@pytest.fixture
+def render_cache(monkeypatch):
+    cache = RenderCache(64 * 1024 * 1024)
+    monkeypatch.setattr(html_renderer_module, "get_render_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def uncached(monkeypatch):
+    def render(document):
+        with monkeypatch.context() as patch:
+            patch.setattr(html_renderer_module, "get_render_cache", lambda: None)
+            return _render(document)
+    return render
+
+
+@pytest.fixture
+def count_chapter_renders(monkeypatch):
+    rendered = []
+    original = HTMLRenderer._render_chapter_section
+
+    def tracking(self, chapter):
+        rendered.append(chapter.get("chapterId"))
+        return original(self, chapter)
+
+    monkeypatch.setattr(HTMLRenderer, "_render_chapter_section", tracking)
+    return rendered
+
+
+class TestHTMLRenderCache:
+
+    def test_cached_output_matches_uncached(self, render_cache, uncached):
+        document = _document()
+        expected = uncached(document)
+        assert _render(document) == expected
+        # 第二次走整份文档缓存
+        assert _render(document) == expected
+        assert 'id="chart-3"' in expected and 'id="heading-3"' in expected
+
+    def test_unchanged_document_is_not_rerendered(self, render_cache, count_chapter_renders):
+        document = _document()
+        _render(document)
+        count_chapter_renders.clear()
+        _render(document)
+        assert count_chapter_renders == []
+
+    def test_editing_one_chapter_rerenders_only_that_chapter(self, render_cache, uncached, count_chapter_renders):
+        document = _document()
+        _render(document)
+        count_chapter_renders.clear()
+
+        # 第一章多出两个图表，后续章节的图表ID整体后移但片段仍可复用
+        edited = copy.deepcopy(document)
+        edited["chapters"][0] = _chapter(1, charts=3)
+        html = _render(edited)
+        assert count_chapter_renders == ["S1"]
+        assert html == uncached(edited)
+        assert 'id="chart-5"' in html
+
+    def test_theme_change_rebuilds_css(self, render_cache, uncached):
+        document = _document()
+        _render(document)
+        themed = copy.deepcopy(document)
+        themed["metadata"]["themeTokens"] = {"colors": {"primary": "#abcdef"}}
+        html = _render(themed)
+        assert "#abcdef" in html
+        assert html == uncached(themed)
+
+    def test_lru_evicts_by_size(self):
+        cache = RenderCache(max_bytes=10)
+        cache.put("a", "x", 5)
+        cache.put("b", "y", 4)
+        assert cache.get("a") == "x"
+        cache.put("c", "z", 5)
+        # b 最久未使用，被淘汰
+        assert cache.get("b") is None
+        assert cache.get("a") == "x" and cache.get("c") == "z"
+        cache.put("huge", "w", 11)
+        assert cache.get("huge") is None
+
+
+class TestHTMLRenderStream:
+
+    def test_stream_matches_render(self, uncached):
+        document = _document()
+        expected = uncached(document)
+        with pytest.MonkeyPatch.context() as patch:
+            patch.setattr(html_renderer_module, "get_render_cache", lambda: None)
+            parts = list(HTMLRenderer().render_stream(copy.deepcopy(document)))
+        assert "".join(parts) == expected
+        # 文档头 + head + 换行 + 页眉/目录 + 3个章节 + 脚本 + </html>
+        assert len(parts) == 9
+
+    def test_head_is_yielded_before_chapters_render(self, render_cache, count_chapter_renders):
+        stream = HTMLRenderer().render_stream(copy.deepcopy(_document()))
+        assert next(stream).startswith("<!DOCTYPE html>")
+        assert "<title>缓存测试报告</title>" in next(stream)
+        assert count_chapter_renders == []
+        rest = "".join(stream)
+        assert count_chapter_renders == ["S1", "S2", "S3"]
+        assert rest.endswith("</html>")
+
+    def test_completed_stream_fills_document_cache(self, render_cache, count_chapter_renders):
+        first = "".join(HTMLRenderer().render_stream(copy.deepcopy(_document())))
+        assert count_chapter_renders == ["S1", "S2", "S3"]
+
+        again = [list(HTMLRenderer().render_stream(copy.deepcopy(_document()))) for _ in range(2)]
+        assert again == [[first], [first]]
+        assert count_chapter_renders == ["S1", "S2", "S3"]
+        assert _render(_document()) == first
+
+    def test_abandoned_stream_not_cached(self, render_cache, count_chapter_renders):
+        stream = HTMLRenderer().render_stream(copy.deepcopy(_document()))
+        next(stream)
+        stream.close()
+        "".join(HTMLRenderer().render_stream(copy.deepcopy(_document())))
+        assert count_chapter_renders == ["S1", "S2", "S3"]
+        assert len(list(HTMLRenderer().render_stream(copy.deepcopy(_document())))) == 1
+
+
+class TestResultEndpoint:
+
+    @pytest.fixture
+    def client(self, monkeypatch, tmp_path, render_cache):
+        from flask import Flask
+        from ReportEngine import flask_interface
+
+        ir_path = tmp_path / "report_ir.json"
+        ir_path.write_text(json.dumps(_document(), ensure_ascii=False), encoding="utf-8")
+        task = flask_interface.ReportTask("缓存测试", "task-view")
+        task.status = "completed"
+        task.html_content = "<html>saved</html>"
+        task.ir_file_path = str(ir_path)
+        monkeypatch.setitem(flask_interface.tasks_registry, task.task_id, task)
+
+        app = Flask(__name__)
+        app.register_blueprint(flask_interface.report_bp, url_prefix="/api/report")
+        return app.test_client()
+
+    def test_inline_mode_serves_saved_html(self, client, monkeypatch, count_chapter_renders):
+        from ReportEngine import flask_interface
+        monkeypatch.setattr(flask_interface.settings, "REPORT_ASSET_MODE", "inline")
+        response = client.get("/api/report/result/task-view")
+        assert response.status_code == 200
+        assert response.get_data(as_text=True) == "<html>saved</html>"
+        assert count_chapter_renders == []
+
+    def test_external_views_render_once(self, client, monkeypatch, count_chapter_renders):
+        from ReportEngine import flask_interface
+        monkeypatch.setattr(flask_interface.settings, "REPORT_ASSET_MODE", "external")
+        bodies = [client.get("/api/report/result/task-view").get_data(as_text=True) for _ in range(3)]
+        assert bodies[0].endswith("</html>") and bodies[1:] == bodies[:1] * 2
+        assert count_chapter_renders == ["S1", "S2", "S3"]
+
+    def test_error_mid_stream_is_reported(self, client, monkeypatch):
+        from ReportEngine import flask_interface
+        monkeypatch.setattr(flask_interface.settings, "REPORT_ASSET_MODE", "external")
+
+        def broken(self, chapter):
+            raise RuntimeError("章节渲染失败")
+
+        monkeypatch.setattr(HTMLRenderer, "_render_chapter_section", broken)
+        body = client.get("/api/report/result/task-view").get_data(as_text=True)
+        assert body.startswith("<!DOCTYPE html>")
+        assert body.endswith("报告渲染中断，请刷新页面重试</div>")
+
+    def test_error_before_first_part_returns_500(self, client, monkeypatch):
+        from ReportEngine import flask_interface
+        monkeypatch.setattr(flask_interface.settings, "REPORT_ASSET_MODE", "external")
+
+        def broken(self, ir_file_path, cache):
+            raise RuntimeError("图表审查失败")
+            yield
+
+        monkeypatch.setattr(HTMLRenderer, "_render_document_parts", broken)
+        response = client.get("/api/report/result/task-view")
+        assert response.status_code == 500
+        assert response.get_json()["error"] == "图表审查失败"
+
+
+class TestV2ResultEndpoint:
+
+    @pytest.fixture
+    def client(self, monkeypatch, render_cache):
+        from flask import Flask
+        from api import v2
+
+        class StubTaskManager:
+            def get_task(self, task_id):
+                return SimpleNamespace(status="completed", query="缓存测试", progress=100)
+
+            def get_result(self, task_id):
+                return _document()
+
+        monkeypatch.setattr(v2, "task_manager", StubTaskManager())
+        app = Flask(__name__)
+        app.register_blueprint(v2.api_v2)
+        return app.test_client()
+
+    def test_html_streamed_from_result(self, client):
+        body = client.get("/api/v2/task/t1/result?format=html").get_data(as_text=True)
+        assert body == _render(_document())
+
+    def test_error_mid_stream_is_reported(self, client, monkeypatch):
+        def broken(self, chapter):
+            raise RuntimeError("章节渲染失败")
+
+        monkeypatch.setattr(HTMLRenderer, "_render_chapter_section", broken)
+        body = client.get("/api/v2/task/t1/result?format=html").get_data(as_text=True)
+        assert body.startswith("<!DOCTYPE html>")
+        assert body.endswith("报告渲染中断，请刷新页面重试</div>")
+
+    def test_error_before_first_part_is_not_a_200(self, client, monkeypatch):
+        def broken(self, ir_file_path, cache):
+            raise RuntimeError("图表审查失败")
+            yield
+
+        monkeypatch.setattr(HTMLRenderer, "_render_document_parts", broken)
+        client.application.testing = False
+        assert client.get("/api/v2/task/t1/result?format=html").status_code == 500
@@ -0,0 +1,105 @@
+"""
+测试 DeepSearchAgent 按优化关键词并发执行子查询
+
+覆盖：并发结果与串行一致（按关键词顺序去重）、子查询确实并发执行、单个关键词出错不影响其余、
+达到结果上限后不再等待慢关键词、等待预算耗尽时丢弃未返回的关键词
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from InsightEngine.agent import DeepSearchAgent
+from InsightEngine.tools.search import DBResponse, QueryResult
+
+
+class FakeSearchAgency:
+    """按关键词返回固定结果，可为个别关键词设置延迟或异常"""
+
+    def __init__(self, delays=None, errors=()):
+        self.delays = delays or {}
+        self.errors = set(errors)
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def search_topic_globally(self, topic, limit_per_table):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delays.get(topic, 0.05))
+            if topic in self.errors:
+                raise RuntimeError("数据库超时")
+            results = [
+                QueryResult(platform="weibo", content_type="note", title_or_content=f"{topic}-{i}", url=f"u/{topic}/{i}")
+                for i in range(3)
+            ]
+            # 每个关键词都命中一条公共结果，用于验证去重
+            results.append(QueryResult(platform="weibo", content_type="note", title_or_content="公共", url="u/shared"))
+            return DBResponse(tool_name="search_topic_globally", parameters={}, results=results, results_count=len(results))
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _agent(agency, concurrency=4, timeout=30.0, max_results=0):
+    agent = DeepSearchAgent.__new__(DeepSearchAgent)
+    agent.config = SimpleNamespace(
+        DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE=50,
+        KEYWORD_SEARCH_CONCURRENCY=concurrency,
+        KEYWORD_SEARCH_TIMEOUT=timeout,
+        KEYWORD_SEARCH_MAX_RESULTS=max_results,
+    )
+    agent.search_agency = agency
+    return agent
+
+
+def _urls(results):
+    return [r.url for r in results]
+
+
+KEYWORDS = ["甲", "乙", "丙", "丁", "戊"]
+
+
+class TestKeywordSearches:
+
+    def test_concurrent_matches_serial(self):
+        delays = {"甲": 0.2, "乙": 0.01, "丙": 0.1, "丁": 0.05, "戊": 0.01}
+        serial, serial_total = _agent(FakeSearchAgency(delays), concurrency=1)._run_keyword_searches(
+            "search_topic_globally", KEYWORDS)
+        agency = FakeSearchAgency(delays)
+        concurrent, total = _agent(agency)._run_keyword_searches("search_topic_globally", KEYWORDS)
+        assert _urls(concurrent) == _urls(serial)
+        assert total == serial_total == 20
+        assert len(concurrent) == 16
+        assert agency.max_active > 1
+
+    def test_failed_keyword_is_skipped(self):
+        results, total = _agent(FakeSearchAgency(errors={"乙"}))._run_keyword_searches(
+            "search_topic_globally", KEYWORDS)
+        assert total == 16
+        assert not any("乙" in url for url in _urls(results))
+
+    def test_result_limit_stops_waiting_for_slow_keywords(self):
+        agency = FakeSearchAgency({"甲": 2.0})
+        start = time.perf_counter()
+        results, _ = _agent(agency, concurrency=5, max_results=6)._run_keyword_searches(
+            "search_topic_globally", KEYWORDS)
+        assert time.perf_counter() - start < 1.5
+        assert len(results) == 6
+        assert not any("甲" in url for url in _urls(results))
+
+    def test_timeout_drops_unfinished_keywords(self):
+        agency = FakeSearchAgency({"丙": 2.0})
+        start = time.perf_counter()
+        results, total = _agent(agency, timeout=0.5)._run_keyword_searches("search_topic_globally", KEYWORDS)
+        assert time.perf_counter() - start < 1.5
+        assert total == 16
+        assert not any("丙" in url for url in _urls(results))
@@ -0,0 +1,212 @@
+"""
+测试 MediaCrawlerDB.search_topic_by_date 的时间范围下推
+
+使用本地 SQLite 夹具覆盖各平台的时间存储格式（sec / ms / str / sec_str / date_str），
+验证日期范围被编译进 WHERE 子句，并且时间列上的索引可以被使用；
+并发多表查询按表的原始顺序返回，并向数据库下发服务端语句超时；
+表级超时从查询开始执行时计时，排队等待线程的表不会被丢弃。
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# InsightEngine 包导入时会创建关键词优化器，需要一个占位密钥
+os.environ.setdefault("KEYWORD_OPTIMIZER_API_KEY", "test-key")
+
+from sqlalchemy import create_engine, text
+
+from InsightEngine.utils import db as insight_db
+from InsightEngine.tools.search import MediaCrawlerDB
+from InsightEngine.tools import search as insight_search
+
+
+IN_RANGE = datetime(2025, 8, 22, 12, 0, 0)
+BEFORE = datetime(2025, 8, 20, 12, 0, 0)
+AFTER = datetime(2025, 8, 24, 12, 0, 0)
+
+# 表名 -> (建表语句, 时间列, 时间值转换函数)
+FIXTURE_TABLES = {
+    'bilibili_video': ("id INTEGER PRIMARY KEY, title TEXT, `desc` TEXT, source_keyword TEXT, create_time BIGINT", 'create_time', lambda dt: int(dt.timestamp())),
+    'douyin_aweme': ("id INTEGER PRIMARY KEY, title TEXT, `desc` TEXT, source_keyword TEXT, create_time BIGINT", 'create_time', lambda dt: int(dt.timestamp() * 1000)),
+    'kuaishou_video': ("id INTEGER PRIMARY KEY, title TEXT, `desc` TEXT, source_keyword TEXT, create_time BIGINT", 'create_time', lambda dt: int(dt.timestamp() * 1000)),
+    'weibo_note': ("id INTEGER PRIMARY KEY, content TEXT, source_keyword TEXT, create_date_time VARCHAR(255)", 'create_date_time', lambda dt: dt.strftime('%Y-%m-%d %H:%M:%S') + '+08:00'),
+    'xhs_note': ("id INTEGER PRIMARY KEY, title TEXT, `desc` TEXT, tag_list TEXT, source_keyword TEXT, time BIGINT", 'time', lambda dt: int(dt.timestamp() * 1000)),
+    'zhihu_content': ("id INTEGER PRIMARY KEY, title TEXT, `desc` TEXT, content_text TEXT, source_keyword TEXT, created_time VARCHAR(32)", 'created_time', lambda dt: str(int(dt.timestamp()))),
+    'tieba_note': ("id INTEGER PRIMARY KEY, title TEXT, `desc` TEXT, source_keyword TEXT, publish_time VARCHAR(255)", 'publish_time', lambda dt: dt.strftime('%Y-%m-%d %H:%M')),
+    'daily_news': ("id INTEGER PRIMARY KEY, title TEXT, crawl_date DATE", 'crawl_date', lambda dt: dt.strftime('%Y-%m-%d')),
+}
+
+
+class TestSearchTopicByDate(unittest.TestCase):
+    """search_topic_by_date 时间过滤测试"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmp_dir, 'fixture.db')}")
+        with self.engine.begin() as conn:
+            for table, (columns, time_col, convert) in FIXTURE_TABLES.items():
+                conn.execute(text(f"CREATE TABLE {table} ({columns})"))
+                conn.execute(text(f"CREATE INDEX idx_{table}_{time_col} ON {table} ({time_col})"))
+                text_col = 'content' if table == 'weibo_note' else 'title'
+                for label, dt in (('in', IN_RANGE), ('before', BEFORE), ('after', AFTER)):
+                    conn.execute(
+                        text(f"INSERT INTO {table} ({text_col}, {time_col}) VALUES (:content, :ts)"),
+                        {'content': f"冰雪大世界 {label}", 'ts': convert(dt)},
+                    )
+
+        self._saved_engine = insight_db._engine
+        insight_db._engine = self.engine
+        self._saved_fulltext = MediaCrawlerDB._fulltext_columns_cache
+        MediaCrawlerDB._fulltext_columns_cache = {}
+        self.db = MediaCrawlerDB()
+
+    def tearDown(self):
+        insight_db._engine = self._saved_engine
+        MediaCrawlerDB._fulltext_columns_cache = self._saved_fulltext
+        self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_only_rows_in_range_returned(self):
+        """每张表只返回日期范围内的一行"""
+        response = self.db.search_topic_by_date("冰雪大世界", "2025-08-21", "2025-08-23")
+        self.assertIsNone(response.error_message)
+        tables = sorted(r.source_table for r in response.results)
+        self.assertEqual(tables, sorted(FIXTURE_TABLES))
+        for result in response.results:
+            self.assertTrue(result.title_or_content.endswith("in"), result)
+
+    def test_end_date_is_inclusive_day(self):
+        """结束日期当天的数据应被包含"""
+        response = self.db.search_topic_by_date("冰雪大世界", "2025-08-22", "2025-08-22")
+        self.assertEqual(response.results_count, len(FIXTURE_TABLES))
+
+    def test_range_without_data(self):
+        """范围内没有数据时返回空结果"""
+        response = self.db.search_topic_by_date("冰雪大世界", "2024-01-01", "2024-01-31")
+        self.assertEqual(response.results_count, 0)
+
+    def test_invalid_date_format(self):
+        """日期格式错误时返回错误信息"""
+        response = self.db.search_topic_by_date("冰雪大世界", "2025/08/21", "2025-08-23")
+        self.assertIsNotNone(response.error_message)
+
+    def test_time_filter_normalization(self):
+        """各时间类型的参数按存储格式归一化"""
+        start, end = datetime(2025, 8, 21), datetime(2025, 8, 24)
+        expectations = {
+            'sec': (int(start.timestamp()), int(end.timestamp())),
+            'ms': (int(start.timestamp() * 1000), int(end.timestamp() * 1000)),
+            'str': ('2025-08-21', '2025-08-24'),
+            'date_str': ('2025-08-21', '2025-08-24'),
+            'sec_str': (str(int(start.timestamp())), str(int(end.timestamp()))),
+        }
+        for time_type, bounds in expectations.items():
+            clause, params = self.db._build_time_filter('create_time', time_type, start, end)
+            self.assertNotIn('CAST', clause)
+            self.assertEqual((params['t_start'], params['t_end']), bounds, time_type)
+
+    def test_time_predicate_uses_index(self):
+        """时间谓词可以走时间列索引（范围扫描而非全表扫描）"""
+        clause, params = self.db._build_time_filter('create_time', 'sec', datetime(2025, 8, 21), datetime(2025, 8, 23))
+        with self.engine.connect() as conn:
+            plan = conn.execute(text(f"EXPLAIN QUERY PLAN SELECT * FROM bilibili_video WHERE {clause}"), params).all()
+        detail = " ".join(str(row[-1]) for row in plan)
+        self.assertIn("idx_bilibili_video_create_time", detail)
+
+
+class TestParallelTableQueries(unittest.TestCase):
+    """并发多表查询的顺序与服务端超时"""
+
+    def test_results_follow_table_order(self):
+        """完成先后不同，结果仍按提交的表顺序返回，并携带语句超时"""
+        tables = [f"table_{idx}" for idx in range(6)]
+        seen_timeouts = []
+
+        def fake_execute(query, params=None, timeout=None):
+            seen_timeouts.append(timeout)
+            # 排在前面的表最晚完成
+            time.sleep(0.02 * (len(tables) - params['idx']))
+            return [{'table': query}]
+
+        db = MediaCrawlerDB()
+        patched = SimpleNamespace(DB_PARALLEL_TABLE_QUERIES=True, DB_TABLE_QUERY_TIMEOUT=5.0)
+        with mock.patch.object(insight_search, 'settings', patched), \
+                mock.patch.object(db, '_execute_query', side_effect=fake_execute):
+            results = list(db._run_table_queries([(t, t, {'idx': i}) for i, t in enumerate(tables)]))
+
+        self.assertEqual([table for table, _ in results], tables)
+        self.assertEqual([rows[0]['table'] for _, rows in results], tables)
+        self.assertEqual(seen_timeouts, [5.0] * len(tables))
+
+    def _run_on_narrow_pool(self, fake_execute, tables, timeout):
+        """在单线程的查询线程池上执行，模拟关键词并发把共享线程池占满的情况"""
+        db = MediaCrawlerDB()
+        patched = SimpleNamespace(DB_PARALLEL_TABLE_QUERIES=True, DB_TABLE_QUERY_TIMEOUT=timeout)
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            with mock.patch.object(insight_search, 'settings', patched), \
+                    mock.patch.object(insight_search, 'get_query_executor', return_value=executor), \
+                    mock.patch.object(db, '_execute_query', side_effect=fake_execute):
+                return list(db._run_table_queries([(t, t, {}) for t in tables]))
+        finally:
+            executor.shutdown(wait=True)
+
+    def test_queue_wait_does_not_count_against_budget(self):
+        """排队总时长超过预算，但每张表的执行时间都在预算内，全部表结果保留"""
+        tables = [f"table_{idx}" for idx in range(4)]
+
+        def fake_execute(query, params=None, timeout=None):
+            time.sleep(0.1)
+            return [{'table': query}]
+
+        results = self._run_on_narrow_pool(fake_execute, tables, timeout=0.25)
+        self.assertEqual([table for table, _ in results], tables)
+
+    def test_running_query_over_budget_is_dropped(self):
+        """开始执行后超过预算的表被丢弃并告警，排在它后面的表照常执行返回"""
+        tables = ["fast_a", "slow", "fast_b"]
+
+        def fake_execute(query, params=None, timeout=None):
+            time.sleep(0.6 if query == "slow" else 0.01)
+            return [{'table': query}]
+
+        with mock.patch.object(insight_search.logger, 'warning') as warning:
+            results = self._run_on_narrow_pool(fake_execute, tables, timeout=0.2)
+        self.assertEqual([table for table, _ in results], ["fast_a", "fast_b"])
+        self.assertIn("slow", warning.call_args[0][0])
+
+    def test_statement_timeout_per_dialect(self):
+        """MySQL 设置会话级 MAX_EXECUTION_TIME 并需复位，PostgreSQL 使用 SET LOCAL，其余方言不设置"""
+        def fake_conn(dialect):
+            executed = []
+            conn = SimpleNamespace(dialect=SimpleNamespace(name=dialect), execute=lambda stmt: executed.append(str(stmt)))
+            return conn, executed
+
+        conn, executed = fake_conn("mysql")
+        self.assertTrue(insight_db._apply_statement_timeout(conn, 2.5))
+        self.assertEqual(executed, ["SET SESSION MAX_EXECUTION_TIME = 2500"])
+
+        conn, executed = fake_conn("postgresql")
+        self.assertFalse(insight_db._apply_statement_timeout(conn, 30))
+        self.assertEqual(executed, ["SET LOCAL statement_timeout = 30000"])
+
+        conn, executed = fake_conn("sqlite")
+        self.assertFalse(insight_db._apply_statement_timeout(conn, 30))
+        self.assertEqual(executed, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
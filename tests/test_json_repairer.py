@@ -0,0 +1,102 @@
+"""
+测试单遍JSON修复（repair_json_text）
+
+覆盖：各类修复单独生效并上报修复类型、合法JSON原样返回、字符串内的括号/逗号不被改动、
+方括号折叠仅在开启时生效、多种错误叠加时一次修复、RobustJSONParser 与章节节点共用同一实现
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.utils.json_parser import RobustJSONParser
+from ReportEngine.utils.json_repairer import (
+    FIX_COLON_EQUALS,
+    FIX_CONTROL_CHARS,
+    FIX_MISSING_COMMAS,
+    FIX_REDUNDANT_BRACKETS,
+    FIX_TRAILING_COMMAS,
+    FIX_UNBALANCED_BRACKETS,
+    repair_json_text,
+)
+
+
+class TestRepairJsonText:
+
+    @pytest.mark.parametrize("text, fix, expected", [
+        ('{"name":= "test"}', FIX_COLON_EQUALS, {"name": "test"}),
+        ('{"text": "第一行\n第二行\t尾"}', FIX_CONTROL_CHARS, {"text": "第一行\n第二行\t尾"}),
+        ('{"g": ["甲"\n    "乙"], "n": [1 2]}', FIX_MISSING_COMMAS, {"g": ["甲", "乙"], "n": [1, 2]}),
+        ('[{"a": 1}\n{"b": 2}]', FIX_MISSING_COMMAS, [{"a": 1}, {"b": 2}]),
+        ('{"a": 1 "b": 2}', FIX_MISSING_COMMAS, {"a": 1, "b": 2}),
+        ('{"items": [1, 2, 3,], }', FIX_TRAILING_COMMAS, {"items": [1, 2, 3]}),
+        ('{"a": {"b": 1}', FIX_UNBALANCED_BRACKETS, {"a": {"b": 1}}),
+        ('{"a": [1, 2]]}}', FIX_UNBALANCED_BRACKETS, {"a": [1, 2]}),
+    ])
+    def test_single_fix(self, text, fix, expected):
+        repaired, fixes = repair_json_text(text)
+        assert fix in fixes
+        assert json.loads(repaired) == expected
+
+    def test_valid_json_untouched(self):
+        text = json.dumps({"a": [[1, 2], [3]], "s": "含 {括号] 与 , 的字符串", "t": None}, ensure_ascii=False)
+        assert repair_json_text(text, collapse_brackets=True) == (text, [])
+
+    def test_string_content_preserved(self):
+        text = '{"s": "a,]} \\"引号\\" ,}", "t": [1,]'
+        repaired, fixes = repair_json_text(text)
+        assert json.loads(repaired) == {"s": 'a,]} "引号" ,}', "t": [1]}
+        assert fixes == [FIX_UNBALANCED_BRACKETS, FIX_TRAILING_COMMAS]
+
+    def test_bracket_collapse_is_opt_in(self):
+        text = '{"rows": [[[{"c": 1}]]]}'
+        assert repair_json_text(text) == (text, [])
+        repaired, fixes = repair_json_text(text, collapse_brackets=True)
+        assert json.loads(repaired) == {"rows": [[{"c": 1}]]}
+        assert fixes == [FIX_REDUNDANT_BRACKETS]
+
+    def test_combined_faults_fixed_in_one_pass(self):
+        text = '{\n "chapter": {"title":= "标题\n副标题", "blocks": [\n  {"type": "p"}\n  {"type": "q",},\n'
+        repaired, fixes = repair_json_text(text)
+        assert json.loads(repaired) == {
+            "chapter": {"title": "标题\n副标题", "blocks": [{"type": "p"}, {"type": "q"}]}
+        }
+        assert fixes == [
+            FIX_COLON_EQUALS, FIX_CONTROL_CHARS, FIX_MISSING_COMMAS,
+            FIX_UNBALANCED_BRACKETS, FIX_TRAILING_COMMAS,
+        ]
+
+    def test_unterminated_string_left_for_later_stages(self):
+        repaired, _ = repair_json_text('{"a": "未闭合')
+        with pytest.raises(json.JSONDecodeError):
+            json.loads(repaired)
+
+
+class TestSharedRepair:
+
+    def test_parser_uses_single_pass(self, monkeypatch):
+        calls = []
+        import ReportEngine.utils.json_parser as json_parser
+
+        def spy(text, collapse_brackets=False):
+            calls.append(collapse_brackets)
+            return repair_json_text(text, collapse_brackets)
+
+        monkeypatch.setattr(json_parser, "repair_json_text", spy)
+        parser = RobustJSONParser(enable_json_repair=False)
+        assert parser.parse('{"items": [1, 2,], "n": 1', "测试") == {"items": [1, 2], "n": 1}
+        assert calls == [True]
+
+    def test_chapter_node_repair(self):
+        from ReportEngine.nodes.chapter_generation_node import ChapterGenerationNode
+
+        node = ChapterGenerationNode.__new__(ChapterGenerationNode)
+        text = '{"chapter": {"blocks": [{"type": "hr"} {"type": "hr"},]}'
+        assert json.loads(node._repair_llm_json(text)) == {"chapter": {"blocks": [{"type": "hr"}] * 2}}
+        assert node._repair_llm_json('{"a": 1}') == '{"a": 1}'
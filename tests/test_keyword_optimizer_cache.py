@@ -0,0 +1,88 @@
+"""
+测试关键词优化结果缓存
+
+覆盖：规范化后相同的查询只调用一次LLM、上下文参与缓存键、备用结果不入缓存、
+Redis 第二层跨实例复用（安装 fakeredis 时）
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from InsightEngine.tools.keyword_optimizer import KeywordOptimizationCache, KeywordOptimizer
+
+
+class FakeLLM:
+    """记录调用并按原始查询返回关键词"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def __call__(self, system_prompt, user_prompt):
+        self.calls.append(user_prompt)
+        if self.fail:
+            return {"success": False, "error": "服务不可用"}
+        query = user_prompt.split("原始查询：", 1)[1].split("\n", 1)[0]
+        return {"success": True, "content": json.dumps({"keywords": [f"词{query}"], "reasoning": "单条"}, ensure_ascii=False)}
+
+
+def _optimizer(llm, cache=None):
+    optimizer = KeywordOptimizer(
+        api_key="test-key", base_url="http://127.0.0.1:9", model_name="test-model",
+        cache=cache or KeywordOptimizationCache(max_entries=100, redis_url=""),
+    )
+    optimizer._call_qwen_api = llm
+    return optimizer
+
+
+class TestKeywordOptimizationCache:
+
+    def test_repeated_query_skips_llm(self):
+        llm = FakeLLM()
+        optimizer = _optimizer(llm)
+        first = optimizer.optimize_keywords("武汉大学 食堂", context="ctx")
+        second = optimizer.optimize_keywords("  武汉大学   食堂 ", context="ctx")
+        assert len(llm.calls) == 1
+        assert second.optimized_keywords == first.optimized_keywords == ["词武汉大学 食堂"]
+        assert second.original_query == "  武汉大学   食堂 "
+        assert optimizer.cache.stats()["hit_ratio"] == 0.5
+
+    def test_context_is_part_of_key(self):
+        llm = FakeLLM()
+        optimizer = _optimizer(llm)
+        optimizer.optimize_keywords("食堂", context="使用search_topic_globally工具进行查询")
+        optimizer.optimize_keywords("食堂", context="使用get_comments_for_topic工具进行查询")
+        assert len(llm.calls) == 2
+
+    def test_fallback_result_is_not_cached(self):
+        llm = FakeLLM(fail=True)
+        optimizer = _optimizer(llm)
+        response = optimizer.optimize_keywords("高校 食堂 涨价")
+        assert response.optimized_keywords == ["高校", "食堂", "涨价"]
+        optimizer.optimize_keywords("高校 食堂 涨价")
+        assert len(llm.calls) == 2
+        assert optimizer.cache.stats()["entries"] == 0
+
+    def test_redis_tier_shared_between_processes(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+
+        def make_cache():
+            cache = KeywordOptimizationCache(max_entries=100, redis_url="")
+            cache._redis = fakeredis.FakeRedis(server=server)
+            return cache
+
+        llm = FakeLLM()
+        _optimizer(llm, make_cache()).optimize_keywords("冰雪大世界")
+        other = _optimizer(llm, make_cache())
+        assert other.optimize_keywords("冰雪大世界").optimized_keywords == ["词冰雪大世界"]
+        assert len(llm.calls) == 1
+        assert other.cache.stats()["redis_hits"] == 1
+
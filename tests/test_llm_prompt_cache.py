@@ -0,0 +1,266 @@
+"""
+测试LLM提示词前缀缓存
+
+用本地模拟的 OpenAI 兼容服务（按与历史请求的最长公共前缀计算命中缓存的 token）验证：
+系统提示词在前、时间追加在用户输入末尾，跨分钟的同段落调用仍能命中缓存；
+prompt_cache_key / cache_control 缓存提示按配置发送；非流式与流式调用都记录缓存命中；
+流式用量回传默认关闭、服务商以400拒绝 stream_options 时去掉后重试；三种服务商用量字段都能解析
+"""
+
+import json
+import sys
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import config
+from InsightEngine.llms import base as insight_base
+from InsightEngine.llms import LLMClient as InsightLLMClient
+from ReportEngine.llms import LLMClient as ReportLLMClient
+from utils.prompt_cache import (
+    PromptCacheStats,
+    build_messages,
+    current_time_note,
+    extract_usage,
+    prompt_cache_key,
+)
+
+SYSTEM_PROMPT = "你是一位舆情分析师。" * 40
+PARAGRAPH = json.dumps({"title": "事件背景", "content": "梳理事件起因与发展脉络"}, ensure_ascii=False)
+
+
+def _prompt_text(messages):
+    """把消息序列化为模拟服务端的“token”序列（每个字符算一个token）"""
+    parts = []
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, list):
+            content = "".join(part["text"] for part in content)
+        parts.append(f"<{message['role']}>{content}")
+    return "".join(parts)
+
+
+class MockLLMServer:
+    """模拟按前缀缓存计费的 OpenAI 兼容服务"""
+
+    def __init__(self, reject_stream_options=False):
+        self.requests = []
+        self._history = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if reject_stream_options and "stream_options" in body:
+                    server.requests.append(body)
+                    payload = json.dumps({"error": {"message": "Unrecognized request argument: stream_options"}}).encode("utf-8")
+                    self.send_response(400)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+                usage = server.usage_for(body)
+                if body.get("stream"):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.end_headers()
+                    chunks = [
+                        {"choices": [{"index": 0, "delta": {"content": text}}]}
+                        for text in ("流式", "响应")
+                    ]
+                    if body.get("stream_options", {}).get("include_usage"):
+                        chunks.append({"choices": [], "usage": usage})
+                    for chunk in chunks:
+                        chunk.update({"id": "c", "object": "chat.completion.chunk", "created": 0, "model": body["model"]})
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    return
+                payload = json.dumps({
+                    "id": "c",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "响应"},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": usage,
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def usage_for(self, body):
+        self.requests.append(body)
+        text = _prompt_text(body["messages"])
+        cached = 0
+        for previous in self._history:
+            common = 0
+            for a, b in zip(previous, text):
+                if a != b:
+                    break
+                common += 1
+            cached = max(cached, common)
+        self._history.append(text)
+        return {
+            "prompt_tokens": len(text),
+            "completion_tokens": 2,
+            "total_tokens": len(text) + 2,
+            "prompt_tokens_details": {"cached_tokens": cached},
+        }
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1,localhost")
+    monkeypatch.setattr(config.settings, "LLM_PROMPT_CACHE_HINT", "none")
+    monkeypatch.setattr(config.settings, "LLM_STREAM_USAGE", True)
+    with MockLLMServer() as mock:
+        yield mock
+
+
+@pytest.fixture
+def strict_server(monkeypatch):
+    """不支持 stream_options 的服务商"""
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1,localhost")
+    monkeypatch.setattr(config.settings, "LLM_PROMPT_CACHE_HINT", "none")
+    with MockLLMServer(reject_stream_options=True) as mock:
+        yield mock
+
+
+def _insight(server):
+    return InsightLLMClient(api_key="test", model_name="mock-model", base_url=server.base_url)
+
+
+class TestBuildMessages:
+
+    def test_stable_prefix_first(self):
+        now = datetime(2026, 10, 16, 9, 30)
+        messages = build_messages("系统", "输入", time_note=current_time_note(now))
+        assert [m["role"] for m in messages] == ["system", "user"]
+        assert messages[1]["content"] == "输入\n\n今天的实际时间是2026年10月16日09时30分"
+
+    def test_cache_control_marks_system_prompt(self):
+        marked = build_messages("系统", "输入", cache_hint="cache_control")
+        assert marked[0]["content"] == [{"type": "text", "text": "系统", "cache_control": {"type": "ephemeral"}}]
+        assert marked[1]["content"] == "输入"
+        assert build_messages("系统", "输入", cache_hint="none")[0]["content"] == "系统"
+
+    @pytest.mark.parametrize("usage, cached", [
+        ({"prompt_tokens": 100, "prompt_tokens_details": {"cached_tokens": 64}}, 64),
+        ({"prompt_tokens": 100, "prompt_cache_hit_tokens": 80, "prompt_cache_miss_tokens": 20}, 80),
+        ({"prompt_tokens": 100, "cached_tokens": 32}, 32),
+        ({"prompt_tokens": 100}, 0),
+    ])
+    def test_extract_usage_provider_formats(self, usage, cached):
+        assert extract_usage(usage) == {"prompt_tokens": 100, "cached_tokens": cached, "completion_tokens": 0}
+
+    def test_stats_without_usage(self):
+        stats = PromptCacheStats()
+        stats.record(None)
+        stats.record({"prompt_tokens": 200, "prompt_tokens_details": {"cached_tokens": 50}})
+        snapshot = stats.snapshot()
+        assert (snapshot["calls"], snapshot["reported_calls"], snapshot["hit_ratio"]) == (2, 1, 0.25)
+
+
+class TestLLMClientPromptCache:
+
+    def test_time_change_keeps_prefix_cached(self, server, monkeypatch):
+        client = _insight(server)
+        notes = iter([
+            current_time_note(datetime(2026, 10, 16, 9, 30)),
+            current_time_note(datetime(2026, 10, 16, 9, 31)),
+        ])
+        monkeypatch.setattr(insight_base, "current_time_note", lambda: next(notes))
+
+        client.invoke(SYSTEM_PROMPT, PARAGRAPH + "\n首次搜索")
+        client.invoke(SYSTEM_PROMPT, PARAGRAPH + "\n反思搜索")
+
+        first, second = server.requests
+        assert first["messages"][0] == {"role": "system", "content": SYSTEM_PROMPT}
+        assert first["messages"][1]["content"].endswith("09时30分")
+        assert second["messages"][1]["content"].startswith(PARAGRAPH)
+
+        stats = client.get_cache_stats()
+        assert stats["calls"] == 2
+        # 时间变化不影响：系统提示词与段落信息都命中缓存
+        assert stats["last"]["cached_tokens"] >= len(SYSTEM_PROMPT) + len(PARAGRAPH)
+        assert "extra_body" not in first and "prompt_cache_key" not in first
+
+    def test_stream_usage_recorded(self, server):
+        client = _insight(server)
+        assert client.stream_invoke_to_string(SYSTEM_PROMPT, "第一次") == "流式响应"
+        assert client.stream_invoke_to_string(SYSTEM_PROMPT, "第二次") == "流式响应"
+        assert server.requests[0]["stream_options"] == {"include_usage": True}
+        stats = client.get_cache_stats()
+        assert stats["reported_calls"] == 2
+        assert stats["cached_tokens"] > len(SYSTEM_PROMPT)
+
+    def test_stream_usage_can_be_disabled(self, server, monkeypatch):
+        monkeypatch.setattr(config.settings, "LLM_STREAM_USAGE", False)
+        client = _insight(server)
+        assert client.stream_invoke_to_string(SYSTEM_PROMPT, "输入") == "流式响应"
+        assert "stream_options" not in server.requests[0]
+        assert client.get_cache_stats()["reported_calls"] == 0
+
+    def test_prompt_cache_key_hint(self, server, monkeypatch):
+        monkeypatch.setattr(config.settings, "LLM_PROMPT_CACHE_HINT", "prompt_cache_key")
+        _insight(server).invoke(SYSTEM_PROMPT, "输入")
+        assert server.requests[0]["prompt_cache_key"] == prompt_cache_key("mock-model", SYSTEM_PROMPT)
+
+    def test_cache_control_hint(self, server, monkeypatch):
+        monkeypatch.setattr(config.settings, "LLM_PROMPT_CACHE_HINT", "cache_control")
+        client = ReportLLMClient(api_key="test", model_name="mock-model", base_url=server.base_url)
+        client.invoke(SYSTEM_PROMPT, "章节一")
+        client.invoke(SYSTEM_PROMPT, "章节二")
+        messages = server.requests[0]["messages"]
+        assert messages[0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+        # Report Engine 不追加时间
+        assert messages[1] == {"role": "user", "content": "章节一"}
+        assert client.get_cache_stats()["last"]["cached_tokens"] > len(SYSTEM_PROMPT)
+
+
+class TestStreamUsageOptIn:
+
+    def test_disabled_by_default(self, strict_server, monkeypatch):
+        default = config.Settings.model_fields["LLM_STREAM_USAGE"].default
+        assert default is False
+        monkeypatch.setattr(config.settings, "LLM_STREAM_USAGE", default)
+        client = _insight(strict_server)
+        assert client.stream_invoke_to_string(SYSTEM_PROMPT, "输入") == "流式响应"
+        assert len(strict_server.requests) == 1
+
+    def test_rejected_stream_options_retried_without(self, strict_server, monkeypatch):
+        monkeypatch.setattr(config.settings, "LLM_STREAM_USAGE", True)
+        client = ReportLLMClient(api_key="test", model_name="mock-model", base_url=strict_server.base_url)
+        assert client.stream_invoke_to_string(SYSTEM_PROMPT, "输入") == "流式响应"
+        rejected, retried = strict_server.requests
+        assert rejected["stream_options"] == {"include_usage": True}
+        assert "stream_options" not in retried
+        assert client.get_cache_stats()["reported_calls"] == 0
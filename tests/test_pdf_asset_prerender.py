@@ -0,0 +1,191 @@
+"""
+测试PDF资产预渲染（AssetBatch / AssetCache / AssetPrerenderer）
+
+覆盖：相同内容去重、资产键随渲染参数与指纹变化、磁盘缓存命中、进程池与串行渲染结果一致、
+渲染失败不写缓存、
+进程池规模与单次资产数量无关且并发导出共用、进程池损坏或任务被取消时串行补齐、预热后不再临时 fork；
+不实例化PDFRenderer，避免依赖WeasyPrint的系统库
+"""
+
+import re
+import sys
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.renderers import asset_prerender
+from ReportEngine.renderers.asset_prerender import (
+    AssetBatch,
+    AssetCache,
+    AssetPrerenderer,
+    renderer_fingerprint,
+)
+
+
+def _bar_widget(label="销量"):
+    return {
+        'widgetType': 'chart.js/bar',
+        'data': {'labels': ['一月', '二月', '三月'], 'datasets': [{'label': label, 'data': [3, 5, 2]}]},
+        'props': {'type': 'bar'},
+    }
+
+
+def _build_batch(fingerprint="fp"):
+    batch = AssetBatch(fingerprint)
+    keys = {
+        'chart': batch.convert_widget_to_svg(_bar_widget(), width=600, height=400, dpi=80),
+        'chart_dup': batch.convert_widget_to_svg(_bar_widget(), width=600, height=400, dpi=80),
+        'chart_other': batch.convert_widget_to_svg(_bar_widget("利润"), width=600, height=400, dpi=80),
+        'display': batch.convert_display_to_svg(r'E = mc^2'),
+        'inline': batch.convert_inline_to_svg(r'\alpha + \beta'),
+    }
+    return batch, keys
+
+
+class TestAssetBatch:
+
+    def test_identical_assets_share_one_job(self):
+        batch, keys = _build_batch()
+        assert keys['chart'] == keys['chart_dup']
+        assert keys['chart'] != keys['chart_other']
+        assert len(batch.jobs) == 4
+
+    def test_key_depends_on_size_mode_and_fingerprint(self):
+        batch = AssetBatch("fp")
+        assert batch.convert_widget_to_svg(_bar_widget(), width=600) != batch.convert_widget_to_svg(_bar_widget(), width=800)
+        assert batch.convert_display_to_svg('x^2') != batch.convert_inline_to_svg('x^2')
+        assert AssetBatch("other").convert_display_to_svg('x^2') != batch.convert_display_to_svg('x^2')
+
+    def test_fingerprint_depends_on_font_and_theme(self):
+        assert renderer_fingerprint('/fonts/a.otf', 'modern') == renderer_fingerprint('/other/a.otf', 'modern')
+        assert renderer_fingerprint('/fonts/a.otf', 'modern') != renderer_fingerprint('/fonts/b.otf', 'modern')
+        assert renderer_fingerprint('/fonts/a.otf', 'modern') != renderer_fingerprint('/fonts/a.otf', 'classic')
+
+
+class TestAssetPrerenderer:
+
+    def setup_method(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.tmpdir.name)
+
+    def teardown_method(self):
+        self.tmpdir.cleanup()
+
+    def test_second_render_hits_cache(self):
+        batch, keys = _build_batch()
+        prerenderer = AssetPrerenderer(font_path=None, cache_dir=self.cache_dir, workers=1)
+
+        results, report = prerenderer.render(batch)
+        assert '<svg' in results[keys['chart']]
+        assert '<svg' in results[keys['display']]
+        assert report.kinds['chart'].rendered == 2
+        assert report.kinds['math'].rendered == 2
+
+        cached_results, cached_report = prerenderer.render(_build_batch()[0])
+        assert cached_results == results
+        assert cached_report.kinds['chart'].cached == 2
+        assert cached_report.kinds['math'].cached == 2
+        assert sum(stats.rendered for stats in cached_report.kinds.values()) == 0
+        assert '缓存命中 2' in cached_report.summary()
+
+    def test_process_pool_matches_serial(self):
+        batch, keys = _build_batch()
+        serial, _ = AssetPrerenderer(font_path=None, workers=1).render(batch)
+        parallel, report = AssetPrerenderer(font_path=None, workers=2).render(batch)
+        assert set(parallel) == set(serial)
+        # 公式SVG除matplotlib写入的生成时间外，两种方式输出应完全一致
+        strip_date = lambda svg: re.sub(r'<dc:date>.*?</dc:date>', '', svg)
+        assert strip_date(parallel[keys['display']]) == strip_date(serial[keys['display']])
+        assert report.workers in (1, 2)
+
+    def test_failed_render_is_not_cached(self):
+        batch = AssetBatch("fp")
+        key = batch.convert_widget_to_svg({'widgetType': 'chart.js/bar', 'data': None, 'props': None})
+        prerenderer = AssetPrerenderer(font_path=None, cache_dir=self.cache_dir, workers=1)
+
+        results, report = prerenderer.render(batch)
+        assert key not in results
+        assert report.kinds['chart'].failed == 1
+        assert AssetCache(self.cache_dir).get('chart', key) is None
+
+
+class TestAssetPool:
+
+    def setup_method(self):
+        asset_prerender._shutdown_pools()
+
+    def teardown_method(self):
+        asset_prerender._shutdown_pools()
+        asset_prerender._prefork_only = False
+
+    def test_pool_size_independent_of_batch(self):
+        prerenderer = AssetPrerenderer(font_path=None, workers=2)
+        small = AssetBatch("fp")
+        small.convert_display_to_svg('x^2')
+        small.convert_display_to_svg('y^2')
+        prerenderer.render(small)
+        pool = asset_prerender._pools[2]
+
+        large = AssetBatch("fp")
+        for i in range(6):
+            large.convert_inline_to_svg(f'x_{i}')
+        results, report = prerenderer.render(large)
+        assert len(results) == 6 and report.workers == 2
+        assert asset_prerender._pools == {2: pool}
+
+    def test_concurrent_exports_share_pool(self):
+        def export(count):
+            batch = AssetBatch("fp")
+            for i in range(count):
+                batch.convert_inline_to_svg(f'\\alpha_{{{count}_{i}}}')
+            return AssetPrerenderer(font_path=None, workers=2).render(batch)[0]
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            outputs = list(executor.map(export, [12, 2]))
+        assert [len(out) for out in outputs] == [12, 2]
+        assert list(asset_prerender._pools) == [2]
+
+    def test_broken_pool_falls_back_to_serial(self):
+        class BrokenPool:
+            def submit(self, *args, **kwargs):
+                raise BrokenProcessPool("worker died")
+
+            def shutdown(self, wait=True, cancel_futures=False):
+                self.shut_down = True
+
+        broken = BrokenPool()
+        asset_prerender._pools[2] = broken
+        batch, keys = _build_batch()
+        results, report = AssetPrerenderer(font_path=None, workers=2).render(batch)
+        assert '<svg' in results[keys['chart']] and '<svg' in results[keys['inline']]
+        assert report.workers == 1
+        assert 2 not in asset_prerender._pools and broken.shut_down
+
+    def test_cancelled_futures_fall_back_to_serial(self):
+        class CancellingPool:
+            def submit(self, *args, **kwargs):
+                future = Future()
+                future.cancel()
+                return future
+
+            def shutdown(self, wait=True, cancel_futures=False):
+                pass
+
+        asset_prerender._pools[2] = CancellingPool()
+        batch, keys = _build_batch()
+        results, _ = AssetPrerenderer(font_path=None, workers=2).render(batch)
+        assert set(results) == {keys['chart'], keys['chart_other'], keys['display'], keys['inline']}
+
+    def test_no_lazy_fork_after_warmup(self):
+        assert asset_prerender.warm_asset_pool(2) == 2
+        assert asset_prerender._prefork_only
+        # 预热之后不再为其他规模临时 fork，直接串行渲染
+        batch, _ = _build_batch()
+        results, report = AssetPrerenderer(font_path=None, workers=3).render(batch)
+        assert len(results) == 4 and report.workers == 1
+        assert list(asset_prerender._pools) == [2]
@@ -0,0 +1,105 @@
+"""
+测试查询结果缓存的倒排索引查找
+
+覆盖：倒排索引 + 前缀过滤查到的最相似缓存与旧的 KEYS 全量扫描一致（命中与否、相似度、返回结果）、
+已过期条目在倒排索引中残留的成员被惰性清理
+"""
+
+import hashlib
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("jieba")
+
+from tasks import analysis, report
+
+VOCAB = [
+    '高校', '食堂', '涨价', '学生', '舆情', '热搜', '品牌', '危机', '公关', '回应',
+    '政策', '调整', '房价', '楼市', '汽车', '召回', '事故', '调查', '通报', '景区',
+]
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    r = fakeredis.FakeRedis()
+    monkeypatch.setattr(analysis, "_get_redis_client", lambda: r)
+    monkeypatch.setattr(report, "_get_redis_client", lambda: r)
+    return r
+
+
+def _legacy_lookup(r, query_tokens):
+    """旧实现：KEYS 扫描全部元数据并逐条计算相似度"""
+    best_match, best_similarity = None, 0.0
+    for meta_key in r.keys("cache:query:*:meta"):
+        meta_data = r.get(meta_key)
+        if not meta_data:
+            continue
+        meta = json.loads(meta_data)
+        similarity = analysis._jaccard_similarity(query_tokens, set(meta.get('tokens', [])))
+        if similarity > best_similarity:
+            best_similarity, best_match = similarity, meta
+    return best_match, best_similarity
+
+
+def _hash(query):
+    return hashlib.md5(query.encode()).hexdigest()
+
+
+class TestQueryCacheIndex:
+
+    def test_matches_legacy_scan(self, redis_client):
+        rng = random.Random(7)
+        queries = set()
+        while len(queries) < 300:
+            queries.add(''.join(rng.sample(VOCAB, rng.randint(3, 6))))
+        for query in sorted(queries):
+            report._set_query_cache(query, {'query': query})
+
+        probes = [''.join(rng.sample(VOCAB, rng.randint(3, 6))) for _ in range(200)]
+        hits = 0
+        for probe in probes:
+            tokens = analysis._tokenize(probe)
+            legacy_match, legacy_similarity = _legacy_lookup(redis_client, tokens)
+            match, similarity = analysis._find_similar_cached_query(redis_client, tokens)
+
+            if legacy_similarity >= analysis.SIMILARITY_THRESHOLD:
+                hits += 1
+                # 前缀过滤保证达到阈值的候选一个不漏，最佳相似度必须相同
+                assert similarity == legacy_similarity
+                assert analysis._jaccard_similarity(tokens, set(match['tokens'])) == similarity
+                cached = analysis.check_query_cache(probe)
+                assert cached is not None
+                assert analysis._jaccard_similarity(tokens, analysis._tokenize(cached['query'])) == similarity
+            else:
+                assert similarity < analysis.SIMILARITY_THRESHOLD
+                if probe not in queries:
+                    assert analysis.check_query_cache(probe) is None
+        assert hits > 0
+
+    def test_exact_match_preferred(self, redis_client):
+        report._set_query_cache('高校食堂涨价', {'v': 1})
+        assert analysis.check_query_cache('高校食堂涨价') == {'v': 1}
+
+    def test_expired_members_pruned(self, redis_client):
+        report._set_query_cache('涨价', {'v': 'stale'})
+        report._set_query_cache('涨价舆情', {'v': 'live'})
+        # 模拟过期：结果与元数据已被 Redis 淘汰，倒排索引中仍残留成员
+        redis_client.delete(f"cache:query:{_hash('涨价')}", f"cache:query:{_hash('涨价')}:meta")
+
+        index_key = f"{report.QUERY_CACHE_INDEX_PREFIX}涨价"
+        assert redis_client.scard(index_key) == 2
+
+        match, similarity = analysis._find_similar_cached_query(redis_client, {'涨价'})
+        assert match['query'] == '涨价舆情'
+        assert similarity == 0.5
+        assert redis_client.smembers(index_key) == {_hash('涨价舆情').encode()}
+        assert analysis.check_query_cache('涨价') is None
@@ -0,0 +1,134 @@
+"""
+测试ReportEngine章节并发生成调度
+
+覆盖：并发生成时结果仍按模板顺序组装、同时运行的章节数不超过配置的并发度、
+并发度为1时逐章串行、任一章节失败时异常向上传播、并发写入章节时清单记录完整
+"""
+
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.agent import ReportAgent
+from ReportEngine.core import ChapterStorage, TemplateSection
+
+
+def _make_sections(count):
+    return [
+        TemplateSection(
+            title=f"第{idx}章",
+            slug=f"section-{idx}",
+            order=idx * 10,
+            depth=1,
+            raw_title=f"第{idx}章",
+            number=str(idx),
+            chapter_id=f"S{idx}",
+            outline=[],
+        )
+        for idx in range(1, count + 1)
+    ]
+
+
+class ChapterScheduleTestCase(unittest.TestCase):
+    """章节并发调度：结果顺序、并发宽度与失败传播。"""
+
+    def _agent(self, parallelism):
+        agent = ReportAgent.__new__(ReportAgent)
+        agent.config = SimpleNamespace(CHAPTER_PARALLELISM=parallelism)
+        return agent
+
+    def test_results_follow_template_order(self):
+        sections = _make_sections(6)
+        # 靠前的章节耗时更长，完成顺序与模板顺序相反
+        delays = {s.chapter_id: 0.01 * (len(sections) - i) for i, s in enumerate(sections)}
+
+        def generate(section):
+            time.sleep(delays[section.chapter_id])
+            return {"chapterId": section.chapter_id}
+
+        chapters = self._agent(4)._run_chapter_schedule(sections, generate)
+        self.assertEqual([c["chapterId"] for c in chapters], [s.chapter_id for s in sections])
+
+    def test_parallelism_is_bounded(self):
+        sections = _make_sections(8)
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def generate(section):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.02)
+            with lock:
+                state["active"] -= 1
+            return {"chapterId": section.chapter_id}
+
+        self._agent(3)._run_chapter_schedule(sections, generate)
+        self.assertLessEqual(state["peak"], 3)
+        self.assertGreater(state["peak"], 1)
+
+    def test_serial_mode_runs_in_order(self):
+        sections = _make_sections(4)
+        seen = []
+
+        def generate(section):
+            seen.append(section.chapter_id)
+            return {"chapterId": section.chapter_id}
+
+        self._agent(1)._run_chapter_schedule(sections, generate)
+        self.assertEqual(seen, [s.chapter_id for s in sections])
+
+    def test_chapter_failure_propagates(self):
+        sections = _make_sections(4)
+
+        def generate(section):
+            if section.chapter_id == "S2":
+                raise ValueError("boom")
+            return {"chapterId": section.chapter_id}
+
+        with self.assertRaises(ValueError):
+            self._agent(2)._run_chapter_schedule(sections, generate)
+
+
+class ChapterStorageConcurrencyTestCase(unittest.TestCase):
+    def test_concurrent_chapters_all_recorded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = ChapterStorage(tmp)
+            run_dir = storage.start_session("report-test", {"title": "t"})
+            sections = _make_sections(12)
+
+            def write(section):
+                meta = {
+                    "chapterId": section.chapter_id,
+                    "slug": section.slug,
+                    "title": section.title,
+                    "order": section.order,
+                }
+                storage.begin_chapter(run_dir, meta)
+                storage.persist_chapter(run_dir, meta, {"chapterId": section.chapter_id, "blocks": []})
+
+            threads = [threading.Thread(target=write, args=(s,)) for s in sections]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            manifest = json.loads((Path(run_dir) / "manifest.json").read_text(encoding="utf-8"))
+            self.assertEqual(
+                [c["chapterId"] for c in manifest["chapters"]],
+                [s.chapter_id for s in sections],
+            )
+            self.assertTrue(all(c["status"] == "ready" for c in manifest["chapters"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
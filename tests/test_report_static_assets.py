@@ -0,0 +1,67 @@
+"""
+测试HTML报告第三方库的外链（带指纹静态资源）模式
+
+覆盖：指纹文件名的生成与解析、外链模式的报告体积、inline 模式仍内联全部库、
+未显式指定时（落盘的报告文件）不受 REPORT_ASSET_MODE 影响
+"""
+
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.renderers import html_renderer as html_renderer_module
+from ReportEngine.renderers.html_renderer import HTMLRenderer
+from ReportEngine.renderers.static_assets import LIBS_DIR, resolve_versioned_lib, versioned_lib_name
+from tests.test_html_render_cache import _document
+
+
+@pytest.fixture(autouse=True)
+def no_render_cache(monkeypatch):
+    monkeypatch.setattr(html_renderer_module, "get_render_cache", lambda: None)
+
+
+class TestVersionedLibs:
+
+    def test_round_trip(self):
+        name = versioned_lib_name("html2canvas.min.js")
+        assert name.startswith("html2canvas.min.") and name.endswith(".js")
+        assert resolve_versioned_lib(name) == LIBS_DIR / "html2canvas.min.js"
+
+    def test_rejects_stale_or_unknown_names(self):
+        assert resolve_versioned_lib("chart.0000000000.js") is None
+        assert resolve_versioned_lib("chart.js") is None
+        assert resolve_versioned_lib("../config.0000000000.py") is None
+        assert versioned_lib_name("missing.js") is None
+
+
+class TestExternalAssetMode:
+
+    def _render(self, mode):
+        renderer = HTMLRenderer({"asset_mode": mode, "asset_url_prefix": "/static/report/"})
+        return renderer.render(copy.deepcopy(_document()))
+
+    def test_external_mode_references_fingerprinted_libs(self):
+        html = self._render("external")
+        for filename in ("chart.js", "mathjax.js", "jspdf.umd.min.js"):
+            assert f'src="/static/report/{versioned_lib_name(filename)}"' in html
+        # CDN 兜底检测脚本保留
+        assert "cdn.jsdelivr.net/npm/chart.js" in html
+
+    def test_external_mode_is_an_order_of_magnitude_smaller(self):
+        inline_html = self._render("inline")
+        external_html = self._render("external")
+        assert (LIBS_DIR / "chart.js").read_text(encoding="utf-8")[:200] in inline_html
+        assert len(external_html) * 10 < len(inline_html)
+
+    def test_default_renderer_stays_inline(self, monkeypatch):
+        # REPORT_ASSET_MODE 只作用于网页查看接口；落盘/脚本使用的默认渲染器必须自包含
+        monkeypatch.setattr(html_renderer_module.settings, "REPORT_ASSET_MODE", "external")
+        html = HTMLRenderer().render(copy.deepcopy(_document()))
+        assert html == self._render("inline")
+        assert "/api/report/assets/" not in html
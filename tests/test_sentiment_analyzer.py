@@ -0,0 +1,170 @@
+"""
+测试WeiboMultilingualSentimentAnalyzer批量推理
+
+用确定性的桩分词器/桩模型（对有效token取平均，与填充长度无关）验证：
+按长度排序、切分micro-batch后的批量结果与逐条 analyze_single_text 一致且保持输入顺序，
+空文本原位返回输入错误；结果缓存键只在量化实际成功时带 int8 标记，Redis 中损坏的条目按未命中处理
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+torch = pytest.importorskip("torch")
+
+from InsightEngine.tools.sentiment_analyzer import (
+    SentimentResultCache,
+    WeiboMultilingualSentimentAnalyzer,
+)
+
+TEXTS = [
+    "这家店的服务态度非常好，下次还会再来",
+    "差评",
+    "",
+    "物流太慢了，等了整整一周才到货，包装还破了",
+    "一般般吧",
+    "   ",
+    "The product quality exceeded my expectations!",
+    "还行",
+    "客服回复及时，问题很快解决了，点赞",
+]
+
+
+class StubTokenizer:
+    """按字符编码为token id，按批次内最长文本右填充，记录每次调用的批次"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts, max_length=512, padding=True, truncation=True, return_tensors="pt"):
+        self.batches.append(list(texts))
+        ids = [[ord(ch) % 997 + 1 for ch in text][:max_length] for text in texts]
+        width = max(len(row) for row in ids)
+        input_ids = torch.tensor([row + [0] * (width - len(row)) for row in ids])
+        attention_mask = torch.tensor([[1] * len(row) + [0] * (width - len(row)) for row in ids])
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+
+class StubModel(torch.nn.Module):
+    """对有效token的嵌入取平均后线性分类，输出与填充无关"""
+
+    def __init__(self):
+        super().__init__()
+        generator = torch.Generator().manual_seed(0)
+        self.embedding = torch.nn.Parameter(torch.randn(1000, 16, generator=generator))
+        self.classifier = torch.nn.Parameter(torch.randn(16, 5, generator=generator))
+
+    def forward(self, input_ids, attention_mask):
+        mask = attention_mask.unsqueeze(-1).float()
+        pooled = (self.embedding[input_ids] * mask).sum(dim=1) / mask.sum(dim=1)
+
+        class Output:
+            logits = pooled @ self.classifier
+
+        return Output()
+
+
+def _analyzer():
+    analyzer = WeiboMultilingualSentimentAnalyzer(result_cache=SentimentResultCache(redis_url=None))
+    analyzer.tokenizer = StubTokenizer()
+    analyzer.model = StubModel().eval()
+    analyzer.device = torch.device("cpu")
+    analyzer.is_initialized = True
+    return analyzer
+
+
+def _assert_same(batched, single):
+    assert batched.text == single.text
+    assert batched.success == single.success
+    assert batched.sentiment_label == single.sentiment_label
+    assert batched.confidence == pytest.approx(single.confidence, abs=1e-5)
+    assert batched.probability_distribution.keys() == single.probability_distribution.keys()
+    for label, prob in single.probability_distribution.items():
+        assert batched.probability_distribution[label] == pytest.approx(prob, abs=1e-5)
+
+
+class TestAnalyzeBatch:
+
+    @pytest.mark.parametrize("batch_size", [1, 3, 32])
+    def test_batched_matches_single_in_input_order(self, batch_size):
+        batch_analyzer = _analyzer()
+        batch = batch_analyzer.analyze_batch(TEXTS, show_progress=False, batch_size=batch_size)
+
+        single_analyzer = _analyzer()
+        singles = [single_analyzer.analyze_single_text(text) for text in TEXTS]
+
+        assert [r.text for r in batch.results] == TEXTS
+        for batched, single in zip(batch.results, singles):
+            _assert_same(batched, single)
+        assert batch.success_count == sum(r.success for r in singles) == len(TEXTS) - 2
+        assert batch.failed_count == 2
+
+    def test_micro_batches_sorted_by_length(self):
+        analyzer = _analyzer()
+        analyzer.analyze_batch(TEXTS, show_progress=False, batch_size=3)
+
+        batches = analyzer.tokenizer.batches
+        assert [len(b) for b in batches] == [3, 3, 1]
+        lengths = [len(text) for b in batches for text in b]
+        assert lengths == sorted(lengths)
+
+    def test_cached_texts_skip_model(self):
+        analyzer = _analyzer()
+        analyzer.analyze_batch(TEXTS, show_progress=False)
+        calls = len(analyzer.tokenizer.batches)
+        again = analyzer.analyze_batch(list(reversed(TEXTS)), show_progress=False)
+        assert len(analyzer.tokenizer.batches) == calls
+        assert [r.text for r in again.results] == list(reversed(TEXTS))
+
+
+class TestSentimentResultCache:
+
+    def test_cache_key_tagged_only_when_quantized(self, monkeypatch):
+        analyzer = _analyzer()
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("no quantized engine")
+
+        monkeypatch.setattr(torch.quantization, "quantize_dynamic", fail)
+        analyzer._quantize_for_cpu()
+        assert not analyzer.is_quantized
+        assert analyzer._cache_model_id() == analyzer.MODEL_NAME
+
+        monkeypatch.setattr(torch.quantization, "quantize_dynamic", lambda model, *args, **kwargs: model)
+        analyzer._quantize_for_cpu()
+        assert analyzer.is_quantized
+        assert analyzer._cache_model_id() == f"{analyzer.MODEL_NAME}#int8"
+
+        analyzer.disable("测试", drop_state=True)
+        assert not analyzer.is_quantized
+
+    def test_corrupt_redis_entry_is_a_miss(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        cache = SentimentResultCache(redis_url=None)
+        cache._redis = fakeredis.FakeRedis()
+        cache.set_many({"a": [0.1, 0.9], "b": [0.5, 0.5]})
+        cache.clear()
+        cache._redis.set(cache.KEY_PREFIX + "b", b"{not json")
+
+        assert cache.get_many(["a", "b", "c"]) == {"a": [0.1, 0.9]}
+        stats = cache.stats()
+        assert (stats["redis_hits"], stats["misses"]) == (1, 2)
+
+    def test_corrupt_entry_recomputed_by_analyzer(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        analyzer = _analyzer()
+        analyzer.result_cache._redis = fakeredis.FakeRedis()
+        expected = analyzer.analyze_single_text(TEXTS[0])
+
+        analyzer.result_cache.clear()
+        key = SentimentResultCache.make_key(analyzer._cache_model_id(), analyzer._preprocess_text(TEXTS[0]))
+        analyzer.result_cache._redis.set(SentimentResultCache.KEY_PREFIX + key, b"\xff")
+
+        result = analyzer.analyze_single_text(TEXTS[0])
+        assert result.success
+        _assert_same(result, expected)
@@ -0,0 +1,122 @@
+"""
+测试TaskManager的任务状态计数与分页列表
+
+基于fakeredis（需要lupa执行Lua脚本）验证：同一状态重复写入不会重复计数、状态迁移扣减旧状态、
+forget移除计数、全量重建与增量计数一致、计数缺失时get_task_count自动回填、分页列表按创建时间倒序
+"""
+
+import itertools
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from api import task_manager
+from api.task_manager import (
+    TASK_STATUS_COUNTS_KEY,
+    TASK_STATUS_OF_KEY,
+    TaskManager,
+    forget_task_status,
+    record_task_status,
+)
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    r = fakeredis.FakeRedis()
+    monkeypatch.setattr(TaskManager, "_get_redis", lambda self: r)
+    # create_task 以毫秒时间戳作为任务 ID，测试中用递增时钟避免同一毫秒内冲突
+    clock = itertools.count(1_700_000_000_000)
+    monkeypatch.setattr(task_manager, "time", SimpleNamespace(time=lambda: next(clock) / 1000))
+    return r
+
+
+def _counts(r):
+    return {k.decode(): int(v) for k, v in r.hgetall(TASK_STATUS_COUNTS_KEY).items() if int(v)}
+
+
+def _celery_update(r, task_id, status):
+    """模拟 Celery 任务中的 update_task_status：写状态 key 并记录迁移"""
+    r.set(f"task:{task_id}:status", json.dumps({'status': status, 'progress': 50, 'updated_at': 'now'}))
+    record_task_status(r, task_id, status)
+
+
+class TestStatusCounters:
+
+    def test_repeated_same_status_counted_once(self, redis_client):
+        for _ in range(3):
+            record_task_status(redis_client, "t1", "running")
+        record_task_status(redis_client, "t2", "running")
+        assert _counts(redis_client) == {"running": 2}
+
+    def test_transitions_move_count(self, redis_client):
+        for status in ("pending", "running", "generating_report", "completed"):
+            record_task_status(redis_client, "t1", status)
+        record_task_status(redis_client, "t2", "pending")
+        record_task_status(redis_client, "t2", "failed")
+        assert _counts(redis_client) == {"completed": 1, "failed": 1}
+        assert redis_client.hget(TASK_STATUS_OF_KEY, "t1") == b"completed"
+
+    def test_forget_removes_task(self, redis_client):
+        record_task_status(redis_client, "t1", "completed")
+        record_task_status(redis_client, "t2", "completed")
+        forget_task_status(redis_client, "t1")
+        forget_task_status(redis_client, "t1")
+        forget_task_status(redis_client, "never-recorded")
+        assert _counts(redis_client) == {"completed": 1}
+        assert not redis_client.hexists(TASK_STATUS_OF_KEY, "t1")
+
+
+class TestTaskManagerCounts:
+
+    def _populate(self, r):
+        manager = TaskManager()
+        tasks = [manager.create_task(f"查询{i}") for i in range(7)]
+        ids = [task.task_id for task in tasks]
+        _celery_update(r, ids[0], "running")
+        _celery_update(r, ids[1], "running")
+        _celery_update(r, ids[1], "generating_report")
+        _celery_update(r, ids[2], "completed")
+        _celery_update(r, ids[2], "completed")
+        _celery_update(r, ids[3], "failed")
+        manager.update_task(ids[4], status="failed", error="cancelled")
+        return manager, ids
+
+    def test_rebuild_matches_incremental(self, redis_client):
+        manager, _ = self._populate(redis_client)
+        incremental = _counts(redis_client)
+        assert incremental == {"pending": 2, "running": 1, "generating_report": 1, "completed": 1, "failed": 2}
+        status_of = redis_client.hgetall(TASK_STATUS_OF_KEY)
+
+        assert manager.rebuild_status_counts(batch_size=3) == incremental
+        assert _counts(redis_client) == incremental
+        assert redis_client.hgetall(TASK_STATUS_OF_KEY) == status_of
+
+    def test_counts_rebuilt_when_missing(self, redis_client):
+        manager, _ = self._populate(redis_client)
+        expected = manager.get_task_count()
+        assert expected["total"] == 7
+
+        redis_client.delete(TASK_STATUS_COUNTS_KEY, TASK_STATUS_OF_KEY)
+        assert manager.get_task_count() == expected
+        assert redis_client.exists(TASK_STATUS_OF_KEY)
+
+    def test_paged_listing_newest_first(self, redis_client):
+        manager, ids = self._populate(redis_client)
+        pages = [manager.list_tasks(limit=3, offset=offset) for offset in (0, 3, 6, 9)]
+        assert [len(page) for page in pages] == [3, 3, 1, 0]
+        listed = [task for page in pages for task in page]
+        assert [task.task_id for task in listed] == list(reversed(ids))
+        by_id = {task.task_id: task for task in listed}
+        assert by_id[ids[1]].status == "generating_report"
+        assert by_id[ids[4]].error_message == "cancelled"
+        assert by_id[ids[6]].status == "pending"
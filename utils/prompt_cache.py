@@ -0,0 +1,229 @@
+"""
+LLM 提示词前缀缓存工具。
+
+OpenAI 兼容服务（OpenAI、DeepSeek、通义千问、Kimi 等）普遍按“消息前缀”复用已计算的提示词，
+命中部分计费更低、首字延迟更短。原先 Insight/Media/Query 三个引擎的 LLMClient 把精确到分钟的
+“今天的实际时间是…”插在用户消息最前面，同一段落的首次搜索/总结/反思之间本可共享的
+用户消息前缀（段落标题与预期内容）因此每分钟都会失效。
+
+这里统一消息编排与用量统计，供各引擎 LLMClient 复用：
+- build_messages：系统提示词 → 用户输入 → 时间等动态信息，稳定内容始终在前；
+- request_options：按 LLM_PROMPT_CACHE_HINT 附加服务商缓存提示，LLM_STREAM_USAGE 开启时为流式请求要求用量回传；
+- create_stream_completion：服务商以400拒绝 stream_options 时去掉该参数重试一次；
+- PromptCacheStats：记录每次调用的提示词 token 数与命中缓存的 token 数。
+"""
+
+import hashlib
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+# 缓存提示方式
+CACHE_HINT_NONE = "none"  # 仅调整消息顺序（所有服务商通用）
+CACHE_HINT_KEY = "prompt_cache_key"  # OpenAI：按系统提示词生成 prompt_cache_key，相同前缀路由到同一缓存
+CACHE_HINT_CONTROL = "cache_control"  # 通义千问/OpenRouter 等：在稳定前缀末尾标记 cache_control 显式缓存
+CACHE_HINTS = (CACHE_HINT_NONE, CACHE_HINT_KEY, CACHE_HINT_CONTROL)
+
+TIME_NOTE_TEMPLATE = "今天的实际时间是{time}"
+
+
+def _setting(name: str, default: Any) -> Any:
+    """优先读取全局配置（.env），无法导入时退回环境变量"""
+    try:
+        import config
+        value = getattr(getattr(config, "settings", None), name, None)
+    except ImportError:
+        value = None
+    if value is None:
+        value = os.getenv(name)
+    return default if value is None else value
+
+
+def resolve_cache_hint(hint: Optional[str] = None) -> str:
+    """规范化缓存提示方式，未知取值按 none 处理"""
+    value = str(hint if hint is not None else _setting("LLM_PROMPT_CACHE_HINT", CACHE_HINT_NONE)).strip().lower()
+    return value if value in CACHE_HINTS else CACHE_HINT_NONE
+
+
+def stream_usage_enabled() -> bool:
+    """流式请求是否要求服务商在最后一个分块回传用量（默认关闭，部分服务商会拒绝 stream_options）"""
+    value = _setting("LLM_STREAM_USAGE", False)
+    if isinstance(value, str):
+        return value.strip().lower() not in ("0", "false", "no", "off")
+    return bool(value)
+
+
+def current_time_note(now: Optional[datetime] = None) -> str:
+    """精确到分钟的当前时间说明"""
+    return TIME_NOTE_TEMPLATE.format(time=(now or datetime.now()).strftime("%Y年%m月%d日%H时%M分"))
+
+
+def _content(text: str, cache_point: bool) -> Any:
+    if not cache_point:
+        return text
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+def build_messages(
+    system_prompt: str,
+    user_prompt: str,
+    time_note: Optional[str] = None,
+    cache_hint: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    按“稳定内容在前、动态内容在后”编排消息。
+
+    Args:
+        system_prompt: 系统提示词（各节点的长提示词，跨调用不变）
+        user_prompt: 本次调用的用户输入
+        time_note: 当前时间等动态说明，追加在用户消息末尾；为空则不追加
+        cache_hint: 缓存提示方式，cache_control 时在系统提示词上标记缓存点
+
+    Returns:
+        OpenAI Chat Completion 格式的消息列表
+    """
+    mark = resolve_cache_hint(cache_hint) == CACHE_HINT_CONTROL
+    parts = [part for part in (user_prompt, time_note) if part]
+    return [
+        {"role": "system", "content": _content(system_prompt, mark)},
+        {"role": "user", "content": "\n\n".join(parts)},
+    ]
+
+
+def prompt_cache_key(model_name: str, system_prompt: str) -> str:
+    """由模型与系统提示词生成稳定的缓存路由键"""
+    digest = hashlib.sha256(f"{model_name}\n{system_prompt}".encode("utf-8")).hexdigest()
+    return f"bettafish-{digest[:32]}"
+
+
+def request_options(
+    model_name: str,
+    system_prompt: str,
+    stream: bool = False,
+    cache_hint: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    需要附加到 chat.completions.create 的缓存相关参数。
+
+    服务商专有字段放在 extra_body 中，不依赖 openai SDK 版本是否声明了该参数。
+    """
+    options: Dict[str, Any] = {}
+    if resolve_cache_hint(cache_hint) == CACHE_HINT_KEY:
+        options["extra_body"] = {"prompt_cache_key": prompt_cache_key(model_name, system_prompt)}
+    if stream and stream_usage_enabled():
+        options["stream_options"] = {"include_usage": True}
+    return options
+
+
+def create_stream_completion(client: Any, **params: Any) -> Any:
+    """
+    发起流式 chat.completions 请求。
+
+    带 stream_options 的请求被服务商以400拒绝时（不支持用量回传），去掉该参数重试一次。
+    """
+    try:
+        return client.chat.completions.create(**params)
+    except Exception as exc:
+        if "stream_options" not in params or getattr(exc, "status_code", None) != 400:
+            raise
+        logger.warning(f"服务商拒绝 stream_options（{exc}），去掉后重试；该服务商不支持时请设置 LLM_STREAM_USAGE=false")
+        params = {key: value for key, value in params.items() if key != "stream_options"}
+        return client.chat.completions.create(**params)
+
+
+def _field(obj: Any, name: str) -> Any:
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def extract_usage(usage: Any) -> Optional[Dict[str, int]]:
+    """
+    从响应 usage 中提取提示词 token 与命中缓存的 token。
+
+    兼容 prompt_tokens_details.cached_tokens（OpenAI/通义千问）、
+    prompt_cache_hit_tokens（DeepSeek）与 cached_tokens（Kimi）三种字段。
+    """
+    if usage is None:
+        return None
+    cached = _field(_field(usage, "prompt_tokens_details"), "cached_tokens")
+    if cached is None:
+        cached = _field(usage, "prompt_cache_hit_tokens")
+    if cached is None:
+        cached = _field(usage, "cached_tokens")
+    return {
+        "prompt_tokens": int(_field(usage, "prompt_tokens") or 0),
+        "cached_tokens": int(cached or 0),
+        "completion_tokens": int(_field(usage, "completion_tokens") or 0),
+    }
+
+
+def stream_chunk_usage(chunk: Any) -> Any:
+    """流式分块中的 usage（标准位置在分块上，Kimi 放在 choices[0] 上）"""
+    usage = _field(chunk, "usage")
+    if usage is None:
+        choices = _field(chunk, "choices")
+        if choices:
+            usage = _field(choices[0], "usage")
+    return usage
+
+
+class PromptCacheStats:
+    """
+    单个 LLMClient 的提示词缓存命中统计（线程安全）
+
+    last 保存最近一次调用的用量，snapshot 返回累计值与命中率。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.reported_calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.last: Optional[Dict[str, int]] = None
+
+    def record(self, usage: Any) -> Optional[Dict[str, int]]:
+        """记录一次调用；服务商未返回用量时只计调用次数"""
+        extracted = extract_usage(usage)
+        with self._lock:
+            self.calls += 1
+            self.last = extracted
+            if extracted:
+                self.reported_calls += 1
+                self.prompt_tokens += extracted["prompt_tokens"]
+                self.cached_tokens += extracted["cached_tokens"]
+        return extracted
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "reported_calls": self.reported_calls,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "hit_ratio": round(self.cached_tokens / self.prompt_tokens, 4) if self.prompt_tokens else 0.0,
+                "last": dict(self.last) if self.last else None,
+            }
+
+
+__all__ = [
+    "CACHE_HINT_NONE",
+    "CACHE_HINT_KEY",
+    "CACHE_HINT_CONTROL",
+    "PromptCacheStats",
+    "build_messages",
+    "create_stream_completion",
+    "current_time_note",
+    "extract_usage",
+    "prompt_cache_key",
+    "request_options",
+    "resolve_cache_hint",
+    "stream_chunk_usage",
+    "stream_usage_enabled",
+]